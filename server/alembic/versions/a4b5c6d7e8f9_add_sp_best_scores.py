@@ -0,0 +1,43 @@
+"""Add sp_best_scores (best single-player submission per name).
+
+Revision ID: a4b5c6d7e8f9
+Revises: z3a4b5c6d7e8
+Create Date: 2026-03-12
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = 'a4b5c6d7e8f9'
+down_revision = 'z3a4b5c6d7e8'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        'sp_best_scores',
+        sa.Column('player_name', sa.String(64), primary_key=True),
+        sa.Column('score_id', sa.Integer(), nullable=False),
+        sa.Column('net_worth', sa.Integer(), nullable=False),
+        sa.Column('ships_count', sa.Integer(), nullable=False, server_default='0'),
+        sa.Column('workers_count', sa.Integer(), nullable=False, server_default='0'),
+        sa.Column('game_date', sa.String(64), nullable=False, server_default=''),
+        sa.Column('submitted_at', sa.DateTime(timezone=True),
+                  server_default=sa.text('NOW()'), nullable=False),
+    )
+    op.create_index('idx_sp_best_scores_net_worth', 'sp_best_scores', ['net_worth'])
+
+    # Backfill: earliest of each name's highest submissions
+    op.execute("""
+        INSERT INTO sp_best_scores
+            (player_name, score_id, net_worth, ships_count, workers_count, game_date, submitted_at)
+        SELECT DISTINCT ON (player_name)
+            player_name, id, net_worth, ships_count, workers_count, game_date, submitted_at
+        FROM sp_scores
+        ORDER BY player_name, net_worth DESC, id
+    """)
+
+
+def downgrade() -> None:
+    op.drop_index('idx_sp_best_scores_net_worth', table_name='sp_best_scores')
+    op.drop_table('sp_best_scores')
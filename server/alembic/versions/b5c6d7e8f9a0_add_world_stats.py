@@ -0,0 +1,39 @@
+"""Add world_stats (maintained counters for the admin dashboards).
+
+Revision ID: b5c6d7e8f9a0
+Revises: a4b5c6d7e8f9
+Create Date: 2026-03-13
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+revision = 'b5c6d7e8f9a0'
+down_revision = 'a4b5c6d7e8f9'
+branch_labels = None
+depends_on = None
+
+_COUNTERS = (
+    'total_players', 'active_players_7d', 'active_players_30d',
+    'total_ships', 'derelict_ships', 'ownerless_ships',
+    'total_workers', 'total_missions', 'active_missions',
+)
+
+
+def upgrade() -> None:
+    op.create_table(
+        'world_stats',
+        sa.Column('id', sa.Integer(), primary_key=True),
+        *(sa.Column(name, sa.BigInteger(), nullable=False, server_default='0') for name in _COUNTERS),
+        sa.Column('total_reserves', sa.Float(), nullable=False, server_default='0'),
+        sa.Column('reserves_by_ore', postgresql.JSONB(), nullable=False,
+                  server_default=sa.text("'{}'::jsonb")),
+        sa.Column('reconciled_at', sa.DateTime(timezone=True), nullable=True),
+        sa.Column('updated_at', sa.DateTime(timezone=True),
+                  server_default=sa.text('NOW()'), nullable=False),
+    )
+    # The row is filled by the first reconciliation (server/world_stats.py).
+
+
+def downgrade() -> None:
+    op.drop_table('world_stats')
@@ -0,0 +1,59 @@
+"""Move asteroid reserves from JSONB columns into asteroid_reserves rows.
+
+Revision ID: c6d7e8f9a0b1
+Revises: b5c6d7e8f9a0
+Create Date: 2026-03-14
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+revision = 'c6d7e8f9a0b1'
+down_revision = 'b5c6d7e8f9a0'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        'asteroid_reserves',
+        sa.Column('asteroid_id', sa.Integer(),
+                  sa.ForeignKey('asteroids.id', ondelete='CASCADE'), primary_key=True),
+        sa.Column('ore_type', sa.String(32), primary_key=True),
+        sa.Column('tonnes', sa.Float(), nullable=False, server_default='0'),
+        sa.Column('original_tonnes', sa.Float(), nullable=False, server_default='0'),
+    )
+    op.create_index(
+        'idx_asteroid_reserves_ore', 'asteroid_reserves', ['ore_type'],
+        postgresql_include=['tonnes'],
+    )
+
+    op.execute("""
+        INSERT INTO asteroid_reserves (asteroid_id, ore_type, tonnes, original_tonnes)
+        SELECT a.id, r.key, r.value::float8,
+               COALESCE((a.original_reserves ->> r.key)::float8, r.value::float8)
+        FROM asteroids AS a, jsonb_each_text(a.reserves) AS r
+    """)
+
+    op.drop_column('asteroids', 'original_reserves')
+    op.drop_column('asteroids', 'reserves')
+
+
+def downgrade() -> None:
+    op.add_column('asteroids', sa.Column('reserves', postgresql.JSONB(astext_type=sa.Text()),
+                                         nullable=False, server_default='{}'))
+    op.add_column('asteroids', sa.Column('original_reserves', postgresql.JSONB(astext_type=sa.Text()),
+                                         nullable=False, server_default='{}'))
+    op.execute("""
+        UPDATE asteroids AS a
+        SET reserves = r.remaining, original_reserves = r.original
+        FROM (
+            SELECT asteroid_id,
+                   jsonb_object_agg(ore_type, tonnes) AS remaining,
+                   jsonb_object_agg(ore_type, original_tonnes) AS original
+            FROM asteroid_reserves GROUP BY asteroid_id
+        ) AS r
+        WHERE a.id = r.asteroid_id
+    """)
+    op.drop_index('idx_asteroid_reserves_ore', table_name='asteroid_reserves')
+    op.drop_table('asteroid_reserves')
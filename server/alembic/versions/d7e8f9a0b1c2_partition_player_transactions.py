@@ -0,0 +1,135 @@
+"""Partition player_transactions by day; add finance rollups.
+
+Existing rows move into one partition covering everything before today,
+named after yesterday so the retention sweep drops it like any other day.
+Their rollups are computed here in one pass and every day before today is
+marked final, so the simulation's first ledger pass starts at today instead
+of walking (and re-scanning) all of history.
+
+Revision ID: d7e8f9a0b1c2
+Revises: c6d7e8f9a0b1
+Create Date: 2026-03-15
+"""
+from datetime import datetime, timedelta, timezone
+
+from alembic import op
+import sqlalchemy as sa
+
+revision = 'd7e8f9a0b1c2'
+down_revision = 'c6d7e8f9a0b1'
+branch_labels = None
+depends_on = None
+
+PREMAKE_DAYS = 7
+COLUMNS = "id, player_id, created_at, amount, balance_after, game_ticks, source, detail"
+
+
+def _day_start(day) -> str:
+    return datetime(day.year, day.month, day.day, tzinfo=timezone.utc).isoformat()
+
+
+def upgrade() -> None:
+    today = datetime.now(timezone.utc).date()
+
+    op.execute("ALTER TABLE player_transactions RENAME TO player_transactions_old")
+    op.execute("ALTER TABLE player_transactions_old RENAME CONSTRAINT player_transactions_pkey TO player_transactions_old_pkey")
+    op.execute("ALTER INDEX ix_player_transactions_id RENAME TO ix_player_transactions_old_id")
+    op.execute("ALTER INDEX ix_player_transactions_player_id RENAME TO ix_player_transactions_old_player_id")
+    op.execute("ALTER SEQUENCE player_transactions_id_seq RENAME TO player_transactions_old_id_seq")
+
+    op.execute("""
+        CREATE TABLE player_transactions (
+            id SERIAL NOT NULL,
+            player_id INTEGER NOT NULL REFERENCES players(id) ON DELETE CASCADE,
+            created_at TIMESTAMPTZ NOT NULL DEFAULT NOW(),
+            amount BIGINT NOT NULL,
+            balance_after BIGINT NOT NULL,
+            game_ticks DOUBLE PRECISION NOT NULL DEFAULT 0,
+            source VARCHAR(32) NOT NULL,
+            detail VARCHAR(128) NOT NULL DEFAULT '',
+            PRIMARY KEY (id, created_at)
+        ) PARTITION BY RANGE (created_at)
+    """)
+    op.execute(
+        "CREATE INDEX idx_player_transactions_player_created "
+        "ON player_transactions (player_id, created_at)"
+    )
+    op.execute(
+        f"CREATE TABLE player_transactions_p{today - timedelta(days=1):%Y%m%d} "
+        f"PARTITION OF player_transactions FOR VALUES FROM (MINVALUE) TO ('{_day_start(today)}')"
+    )
+    for offset in range(PREMAKE_DAYS + 1):
+        day = today + timedelta(days=offset)
+        op.execute(
+            f"CREATE TABLE player_transactions_p{day:%Y%m%d} PARTITION OF player_transactions "
+            f"FOR VALUES FROM ('{_day_start(day)}') TO ('{_day_start(day + timedelta(days=1))}')"
+        )
+
+    op.execute(f"INSERT INTO player_transactions ({COLUMNS}) SELECT {COLUMNS} FROM player_transactions_old")
+    op.execute(
+        "SELECT setval(pg_get_serial_sequence('player_transactions', 'id'), "
+        "COALESCE((SELECT MAX(id) FROM player_transactions), 0) + 1, false)"
+    )
+    op.execute("DROP TABLE player_transactions_old")
+
+    op.create_table(
+        'player_finance_daily',
+        sa.Column('player_id', sa.Integer(),
+                  sa.ForeignKey('players.id', ondelete='CASCADE'), primary_key=True),
+        sa.Column('day', sa.Date(), primary_key=True),
+        sa.Column('source', sa.String(32), primary_key=True),
+        sa.Column('income', sa.BigInteger(), nullable=False, server_default='0'),
+        sa.Column('expense', sa.BigInteger(), nullable=False, server_default='0'),
+        sa.Column('tx_count', sa.Integer(), nullable=False, server_default='0'),
+        sa.Column('updated_at', sa.DateTime(timezone=True),
+                  server_default=sa.text('NOW()'), nullable=False),
+    )
+    op.create_table(
+        'ledger_rollup_state',
+        sa.Column('id', sa.Integer(), primary_key=True),
+        sa.Column('closed_through', sa.Date(), nullable=True),
+        sa.Column('rolled_up_at', sa.DateTime(timezone=True), nullable=True),
+    )
+
+    op.execute(f"""
+        INSERT INTO player_finance_daily (player_id, day, source, income, expense, tx_count)
+        SELECT player_id, (created_at AT TIME ZONE 'UTC')::date, source,
+               COALESCE(SUM(amount) FILTER (WHERE amount > 0), 0),
+               COALESCE(-SUM(amount) FILTER (WHERE amount < 0), 0),
+               COUNT(*)
+        FROM player_transactions
+        WHERE created_at < '{_day_start(today)}'
+        GROUP BY 1, 2, 3
+    """)
+    op.execute(
+        f"INSERT INTO ledger_rollup_state (id, closed_through, rolled_up_at) "
+        f"VALUES (1, '{today - timedelta(days=1)}', NOW())"
+    )
+
+
+def downgrade() -> None:
+    op.drop_table('ledger_rollup_state')
+    op.drop_table('player_finance_daily')
+
+    op.execute("ALTER TABLE player_transactions RENAME TO player_transactions_partitioned")
+    op.execute("ALTER SEQUENCE player_transactions_id_seq RENAME TO player_transactions_partitioned_id_seq")
+    op.create_table(
+        'player_transactions',
+        sa.Column('id', sa.Integer(), primary_key=True, index=True),
+        sa.Column('player_id', sa.Integer(),
+                  sa.ForeignKey('players.id', ondelete='CASCADE'),
+                  nullable=False, index=True),
+        sa.Column('created_at', sa.DateTime(timezone=True),
+                  server_default=sa.text('NOW()'), nullable=False),
+        sa.Column('amount', sa.BigInteger(), nullable=False),
+        sa.Column('balance_after', sa.BigInteger(), nullable=False),
+        sa.Column('game_ticks', sa.Float(), nullable=False, server_default='0'),
+        sa.Column('source', sa.String(32), nullable=False),
+        sa.Column('detail', sa.String(128), nullable=False, server_default=''),
+    )
+    op.execute(f"INSERT INTO player_transactions ({COLUMNS}) SELECT {COLUMNS} FROM player_transactions_partitioned")
+    op.execute(
+        "SELECT setval(pg_get_serial_sequence('player_transactions', 'id'), "
+        "COALESCE((SELECT MAX(id) FROM player_transactions), 0) + 1, false)"
+    )
+    op.execute("DROP TABLE player_transactions_partitioned")
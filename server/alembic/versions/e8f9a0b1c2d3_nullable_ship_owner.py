@@ -0,0 +1,24 @@
+"""Allow ownerless (derelict) ships.
+
+Dissolving a corporation sets its ships adrift with player_id = NULL.
+
+Revision ID: e8f9a0b1c2d3
+Revises: d7e8f9a0b1c2
+Create Date: 2026-03-16
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = 'e8f9a0b1c2d3'
+down_revision = 'd7e8f9a0b1c2'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.alter_column('ships', 'player_id', existing_type=sa.Integer(), nullable=True)
+
+
+def downgrade() -> None:
+    op.execute("DELETE FROM ships WHERE player_id IS NULL")
+    op.alter_column('ships', 'player_id', existing_type=sa.Integer(), nullable=False)
@@ -0,0 +1,41 @@
+"""Add jobs table for background admin operations.
+
+Revision ID: f9a0b1c2d3e4
+Revises: e8f9a0b1c2d3
+Create Date: 2026-03-17
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects.postgresql import JSONB
+
+revision = 'f9a0b1c2d3e4'
+down_revision = 'e8f9a0b1c2d3'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        'jobs',
+        sa.Column('id', sa.Integer(), primary_key=True),
+        sa.Column('kind', sa.String(32), nullable=False),
+        sa.Column('params', JSONB(), nullable=False, server_default='{}'),
+        sa.Column('status', sa.Integer(), nullable=False, server_default='0'),
+        sa.Column('progress', sa.Float(), nullable=False, server_default='0'),
+        sa.Column('message', sa.String(255), nullable=False, server_default=''),
+        sa.Column('result', JSONB(), nullable=True),
+        sa.Column('error', sa.String(512), nullable=True),
+        sa.Column('cancel_requested', sa.Boolean(), nullable=False, server_default=sa.false()),
+        sa.Column('worker', sa.String(64), nullable=True),
+        sa.Column('created_at', sa.DateTime(timezone=True),
+                  server_default=sa.text('NOW()'), nullable=False),
+        sa.Column('started_at', sa.DateTime(timezone=True), nullable=True),
+        sa.Column('heartbeat_at', sa.DateTime(timezone=True), nullable=True),
+        sa.Column('finished_at', sa.DateTime(timezone=True), nullable=True),
+    )
+    op.create_index('idx_jobs_queued', 'jobs', ['id'], postgresql_where=sa.text('status = 0'))
+
+
+def downgrade() -> None:
+    op.drop_index('idx_jobs_queued', table_name='jobs')
+    op.drop_table('jobs')
@@ -0,0 +1,93 @@
+"""Add mission history tables and per-player mission summary.
+
+Revision ID: y2z3a4b5c6d7
+Revises: x1y2z3a4b5c6
+Create Date: 2026-03-10
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = 'y2z3a4b5c6d7'
+down_revision = 'x1y2z3a4b5c6'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.add_column('missions', sa.Column('tonnes_mined', sa.Float(), nullable=False, server_default='0'))
+    op.add_column('missions', sa.Column('revenue', sa.BigInteger(), nullable=False, server_default='0'))
+    op.add_column('trade_missions', sa.Column('tonnes_sold', sa.Float(), nullable=False, server_default='0'))
+
+    # The archiver scans for finished rows; keep that scan off the active rows.
+    op.create_index(
+        'idx_missions_finished', 'missions', ['id'],
+        postgresql_where=sa.text('status IN (3, 4, 5)'),
+    )
+    op.create_index(
+        'idx_trade_missions_finished', 'trade_missions', ['id'],
+        postgresql_where=sa.text('status = 5'),
+    )
+
+    op.create_table(
+        'mission_history',
+        sa.Column('id', sa.Integer(), primary_key=True),
+        sa.Column('player_id', sa.Integer(),
+                  sa.ForeignKey('players.id', ondelete='CASCADE'), nullable=False),
+        sa.Column('ship_id', sa.Integer(), nullable=False),
+        sa.Column('asteroid_id', sa.Integer(), nullable=True),
+        sa.Column('mission_type', sa.Integer(), nullable=False),
+        sa.Column('status', sa.Integer(), nullable=False),
+        sa.Column('origin_name', sa.String(64), nullable=False, server_default=''),
+        sa.Column('origin_is_earth', sa.Boolean(), nullable=False, server_default=sa.true()),
+        sa.Column('transit_time', sa.Float(), nullable=False),
+        sa.Column('mining_duration', sa.Float(), nullable=False),
+        sa.Column('tonnes_mined', sa.Float(), nullable=False, server_default='0'),
+        sa.Column('revenue', sa.BigInteger(), nullable=False, server_default='0'),
+        sa.Column('created_at', sa.DateTime(timezone=True), nullable=False),
+        sa.Column('archived_at', sa.DateTime(timezone=True),
+                  server_default=sa.text('NOW()'), nullable=False),
+    )
+    op.create_index('idx_mission_history_player_id', 'mission_history', ['player_id', 'id'])
+
+    op.create_table(
+        'trade_mission_history',
+        sa.Column('id', sa.Integer(), primary_key=True),
+        sa.Column('player_id', sa.Integer(),
+                  sa.ForeignKey('players.id', ondelete='CASCADE'), nullable=False),
+        sa.Column('ship_id', sa.Integer(), nullable=False),
+        sa.Column('colony_id', sa.Integer(), nullable=True),
+        sa.Column('tonnes_sold', sa.Float(), nullable=False, server_default='0'),
+        sa.Column('revenue', sa.BigInteger(), nullable=False, server_default='0'),
+        sa.Column('origin_name', sa.String(64), nullable=False, server_default='Earth'),
+        sa.Column('transit_time', sa.Float(), nullable=False),
+        sa.Column('created_at', sa.DateTime(timezone=True), nullable=False),
+        sa.Column('archived_at', sa.DateTime(timezone=True),
+                  server_default=sa.text('NOW()'), nullable=False),
+    )
+    op.create_index('idx_trade_mission_history_player_id', 'trade_mission_history', ['player_id', 'id'])
+
+    op.create_table(
+        'player_mission_summary',
+        sa.Column('player_id', sa.Integer(),
+                  sa.ForeignKey('players.id', ondelete='CASCADE'), primary_key=True),
+        sa.Column('mission_runs', sa.Integer(), nullable=False, server_default='0'),
+        sa.Column('trade_runs', sa.Integer(), nullable=False, server_default='0'),
+        sa.Column('failed_runs', sa.Integer(), nullable=False, server_default='0'),
+        sa.Column('revenue', sa.BigInteger(), nullable=False, server_default='0'),
+        sa.Column('tonnes_mined', sa.Float(), nullable=False, server_default='0'),
+        sa.Column('updated_at', sa.DateTime(timezone=True),
+                  server_default=sa.text('NOW()'), nullable=False),
+    )
+
+
+def downgrade() -> None:
+    op.drop_table('player_mission_summary')
+    op.drop_index('idx_trade_mission_history_player_id', table_name='trade_mission_history')
+    op.drop_table('trade_mission_history')
+    op.drop_index('idx_mission_history_player_id', table_name='mission_history')
+    op.drop_table('mission_history')
+    op.drop_index('idx_trade_missions_finished', table_name='trade_missions')
+    op.drop_index('idx_missions_finished', table_name='missions')
+    op.drop_column('trade_missions', 'tonnes_sold')
+    op.drop_column('missions', 'revenue')
+    op.drop_column('missions', 'tonnes_mined')
@@ -0,0 +1,43 @@
+"""Add email_outbox table.
+
+Revision ID: z3a4b5c6d7e8
+Revises: y2z3a4b5c6d7
+Create Date: 2026-03-11
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = 'z3a4b5c6d7e8'
+down_revision = 'y2z3a4b5c6d7'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        'email_outbox',
+        sa.Column('id', sa.Integer(), primary_key=True),
+        sa.Column('kind', sa.String(32), nullable=False),
+        sa.Column('to_email', sa.String(255), nullable=False),
+        sa.Column('subject', sa.String(255), nullable=False),
+        sa.Column('body_text', sa.Text(), nullable=False),
+        sa.Column('body_html', sa.Text(), nullable=True),
+        sa.Column('status', sa.Integer(), nullable=False, server_default='0'),
+        sa.Column('attempts', sa.Integer(), nullable=False, server_default='0'),
+        sa.Column('next_attempt_at', sa.DateTime(timezone=True),
+                  server_default=sa.text('NOW()'), nullable=False),
+        sa.Column('last_error', sa.String(512), nullable=True),
+        sa.Column('created_at', sa.DateTime(timezone=True),
+                  server_default=sa.text('NOW()'), nullable=False),
+        sa.Column('sent_at', sa.DateTime(timezone=True), nullable=True),
+    )
+    # Only pending rows are ever polled; keep the index to those.
+    op.create_index(
+        'idx_email_outbox_due', 'email_outbox', ['next_attempt_at'],
+        postgresql_where=sa.text('status = 0'),
+    )
+
+
+def downgrade() -> None:
+    op.drop_index('idx_email_outbox_due', table_name='email_outbox')
+    op.drop_table('email_outbox')
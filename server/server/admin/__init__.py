@@ -1,12 +1,14 @@
 """Admin utilities and endpoints."""
 from server.admin.account_deletion import (
     delete_player_account,
+    cleanup_inactive_job,
     cleanup_inactive_players,
-    get_deletion_preview
+    get_deletion_preview,
 )
 
 __all__ = [
     "delete_player_account",
+    "cleanup_inactive_job",
     "cleanup_inactive_players",
-    "get_deletion_preview"
+    "get_deletion_preview",
 ]
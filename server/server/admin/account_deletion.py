@@ -9,19 +9,141 @@ When a corporation ceases to exist:
 """
 from __future__ import annotations
 import logging
+from dataclasses import dataclass
 from datetime import datetime, timedelta, timezone
+from typing import Awaitable, Callable
 
-from sqlalchemy import select
+from sqlalchemy import delete, func, select, update
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from server.config import settings
+from server.jobs import JobContext, job_handler
+from server.leaderboard_index import mark_players_dirty
+from server.models.equipment import Equipment
+from server.models.loading import load_profile
 from server.models.player import Player
 from server.models.ship import Ship
+from server.models.trade_mission import TradeMission
 from server.models.worker import Worker
 from server.models.mission import Mission
+from server.simulation.cluster import send_command
+from server.world_stats import ACTIVE_MISSION_STATUSES, stage_delta
 
 logger = logging.getLogger(__name__)
 
 
+# ── Set-based dissolution ─────────────────────────────────────────────────────
+
+@dataclass
+class _Victim:
+    id: int
+    username: str
+    email: str
+    last_seen: datetime
+    ships: int = 0
+    derelict_already: int = 0
+    workers: int = 0
+    equipment: int = 0
+    missions: int = 0
+    active_missions: int = 0
+
+    def summary(self, reason: str, dry_run: bool = False) -> dict:
+        if dry_run:
+            return {
+                "dry_run": True,
+                "player_id": self.id,
+                "username": self.username,
+                "last_seen": self.last_seen.isoformat(),
+                "days_inactive": (datetime.now(timezone.utc) - self.last_seen).days,
+                "ships": self.ships,
+                "workers": self.workers,
+            }
+        return {
+            "success": True,
+            "player_id": self.id,
+            "username": self.username,
+            "email": self.email,
+            "reason": reason,
+            "ships_set_adrift": self.ships,
+            "workers_lost": self.workers,
+            "equipment_salvageable": self.equipment,
+            "deleted_at": datetime.now(timezone.utc).isoformat(),
+        }
+
+
+async def _count_assets(db: AsyncSession, victims: dict[int, _Victim]) -> None:
+    """Fill in ship / worker / equipment / mission counts with one grouped query each."""
+    ids = list(victims)
+    for player_id, ships, derelict in await db.execute(
+        select(Ship.player_id, func.count(), func.count().filter(Ship.is_derelict == True))  # noqa: E712
+        .where(Ship.player_id.in_(ids)).group_by(Ship.player_id)
+    ):
+        victims[player_id].ships, victims[player_id].derelict_already = ships, derelict
+    for player_id, workers in await db.execute(
+        select(Worker.player_id, func.count()).where(Worker.player_id.in_(ids)).group_by(Worker.player_id)
+    ):
+        victims[player_id].workers = workers
+    for player_id, equipment in await db.execute(
+        select(Ship.player_id, func.count(Equipment.id))
+        .join(Equipment, Equipment.ship_id == Ship.id)
+        .where(Ship.player_id.in_(ids)).group_by(Ship.player_id)
+    ):
+        victims[player_id].equipment = equipment
+    for player_id, missions, active in await db.execute(
+        select(
+            Mission.player_id, func.count(),
+            func.count().filter(Mission.status.in_(ACTIVE_MISSION_STATUSES)),
+        ).where(Mission.player_id.in_(ids)).group_by(Mission.player_id)
+    ):
+        victims[player_id].missions, victims[player_id].active_missions = missions, active
+
+
+async def _dissolve(db: AsyncSession, victims: dict[int, _Victim]) -> None:
+    """
+    Dissolve the corporations in one transaction. Does not commit.
+
+    Ships are cut loose as derelicts (trajectory, cargo and equipment kept),
+    workers and missions are deleted, then the players; everything else they
+    own goes with them through ON DELETE CASCADE.
+    """
+    ids = list(victims)
+    await db.execute(
+        update(Ship).where(Ship.player_id.in_(ids))
+        .values(player_id=None, is_derelict=True)
+        .execution_options(synchronize_session=False)
+    )
+    await db.execute(delete(Worker).where(Worker.player_id.in_(ids)).execution_options(synchronize_session=False))
+    await db.execute(delete(TradeMission).where(TradeMission.player_id.in_(ids)).execution_options(synchronize_session=False))
+    await db.execute(delete(Mission).where(Mission.player_id.in_(ids)).execution_options(synchronize_session=False))
+    await db.execute(delete(Player).where(Player.id.in_(ids)).execution_options(synchronize_session=False))
+
+    # Bulk statements bypass the ORM listeners; report the effect directly
+    now = datetime.now(timezone.utc)
+    v = victims.values()
+    stage_delta(
+        db,
+        total_players=-len(victims),
+        active_players_7d=-sum(x.last_seen >= now - timedelta(days=7) for x in v),
+        active_players_30d=-sum(x.last_seen >= now - timedelta(days=30) for x in v),
+        ownerless_ships=sum(x.ships for x in v),
+        derelict_ships=sum(x.ships - x.derelict_already for x in v),
+        total_workers=-sum(x.workers for x in v),
+        total_missions=-sum(x.missions for x in v),
+        active_missions=-sum(x.active_missions for x in v),
+    )
+
+
+def _forget_players(player_ids) -> None:
+    """After _dissolve commits: drop cached principals and leaderboard entries in every worker."""
+    ids = list(player_ids)
+    send_command("invalidate_players", players=ids)
+    mark_players_dirty(ids)
+
+
+def _victims_query(*where):
+    return select(Player.id, Player.username, Player.email, Player.last_seen).where(*where).order_by(Player.id)
+
+
 async def delete_player_account(
     db: AsyncSession,
     player_id: int,
@@ -50,154 +172,131 @@ async def delete_player_account(
                 "reason": str
             }
     """
-    player = await db.get(Player, player_id)
-    if not player:
+    row = (await db.execute(_victims_query(Player.id == player_id).with_for_update())).one_or_none()
+    if row is None:
         return {
             "success": False,
             "error": "Player not found",
             "player_id": player_id
         }
 
-    summary = {
-        "success": True,
-        "player_id": player_id,
-        "username": player.username,
-        "email": player.email,
-        "reason": reason,
-        "ships_set_adrift": 0,
-        "workers_lost": 0,
-        "equipment_salvageable": 0,
-        "deleted_at": datetime.now(timezone.utc).isoformat()
-    }
-
-    # 1. Ships: Set adrift as derelicts (maintain trajectory)
-    ships_result = await db.execute(
-        select(Ship).where(Ship.player_id == player_id)
-    )
-    ships = list(ships_result.scalars().all())
-
-    for ship in ships:
-        # Remove ownership, mark as derelict
-        ship.player_id = None
-        ship.is_derelict = True
-        ship.derelict_reason = f"Corporation dissolved: {reason}"
-
-        # Clear crew (they died with the corporation)
-        ship.crew = []
-
-        # Ship maintains current trajectory and velocity
-        # (position/velocity unchanged - pure physics from here)
-
-        # Equipment stays with ship (salvageable)
-        summary["equipment_salvageable"] += len(ship.equipment or [])
-        summary["ships_set_adrift"] += 1
-
-        db.add(ship)
-        logger.info(
-            f"Ship {ship.id} ({ship.ship_name}) set adrift at "
-            f"({ship.position_x:.3f}, {ship.position_y:.3f} AU)"
-        )
-
-    # 2. Workers: Die with corporation (CASCADE will delete them)
-    workers_result = await db.execute(
-        select(Worker).where(Worker.player_id == player_id)
-    )
-    workers = list(workers_result.scalars().all())
-    summary["workers_lost"] = len(workers)
-
-    # Log worker deaths
-    for worker in workers:
-        logger.info(
-            f"Worker {worker.id} ({worker.full_name}) lost with corporation {player.username}"
-        )
-
-    # 3. Missions: Will be deleted via CASCADE, but ships continue their drift
-    missions_result = await db.execute(
-        select(Mission).where(Mission.player_id == player_id)
-    )
-    missions = list(missions_result.scalars().all())
-
-    for mission in missions:
-        logger.info(
-            f"Mission {mission.id} terminated - ship now drifting"
-        )
-
-    # 4. Delete player (CASCADE deletes workers, missions, but ships already updated)
-    await db.delete(player)
+    victim = _Victim(*row)
+    await _count_assets(db, {player_id: victim})
+    await _dissolve(db, {player_id: victim})
     await db.commit()
+    _forget_players([player_id])
 
     logger.warning(
-        f"Player {player_id} ({player.username}) deleted: "
-        f"{summary['ships_set_adrift']} ships adrift, "
-        f"{summary['workers_lost']} workers lost. "
+        f"Player {player_id} ({victim.username}) deleted: "
+        f"{victim.ships} ships adrift, "
+        f"{victim.workers} workers lost. "
         f"Reason: {reason}"
     )
-
-    return summary
+    return victim.summary(reason)
 
 
 async def cleanup_inactive_players(
     db: AsyncSession,
     days_inactive: int = 90,
-    dry_run: bool = True
+    dry_run: bool = True,
+    batch_size: int | None = None,
+    progress: Callable[[int, int, int], Awaitable[None]] | None = None,
 ) -> list[dict]:
     """
     Delete players who haven't logged in for specified days.
 
+    Players are taken in id order, batch_size at a time; each batch is counted
+    and dissolved with a handful of set-based statements and committed on its
+    own, so locks stay short and a failure loses at most one batch. Players
+    locked by another transaction are skipped (picked up by the next run).
+
     Args:
         db: Database session
         days_inactive: Delete after this many days of inactivity
         dry_run: If True, only return what would be deleted
+        batch_size: Players per batch (default ACCOUNT_CLEANUP_BATCH)
+        progress: Called after each batch with (players, ships, workers) so far
 
     Returns:
         list[dict]: Summary for each deleted player
     """
+    batch_size = batch_size or settings.ACCOUNT_CLEANUP_BATCH
     cutoff = datetime.now(timezone.utc) - timedelta(days=days_inactive)
+    results: list[dict] = []
+    players = ships = workers = 0
+    after = 0
 
-    # Find inactive players (exclude admins)
-    result = await db.execute(
-        select(Player).where(
+    while True:
+        # Find inactive players (exclude admins)
+        stmt = _victims_query(
             Player.last_seen < cutoff,
-            Player.is_admin == False  # noqa: E712
-        )
-    )
-    inactive_players = list(result.scalars().all())
+            Player.is_admin == False,  # noqa: E712
+            Player.id > after,
+        ).limit(batch_size)
+        if not dry_run:
+            stmt = stmt.with_for_update(skip_locked=True)
+        rows = (await db.execute(stmt)).all()
+        if not rows:
+            break
+        after = rows[-1].id
+        victims = {row.id: _Victim(*row) for row in rows}
+        await _count_assets(db, victims)
+
+        if dry_run:
+            results.extend(v.summary("", dry_run=True) for v in victims.values())
+            await db.rollback()  # end the read transaction between batches
+        else:
+            await _dissolve(db, victims)
+            await db.commit()
+            _forget_players(victims)
+            for v in victims.values():
+                days = (datetime.now(timezone.utc) - v.last_seen).days
+                results.append(v.summary(f"Inactive for {days} days"))
+
+        players += len(victims)
+        ships += sum(v.ships for v in victims.values())
+        workers += sum(v.workers for v in victims.values())
+        if progress is not None:
+            await progress(players, ships, workers)
+        if len(rows) < batch_size:
+            break
 
     logger.info(
-        f"Found {len(inactive_players)} inactive players "
-        f"(>{days_inactive} days since last seen)"
+        f"{'Found' if dry_run else 'Deleted'} {players} inactive players "
+        f"(>{days_inactive} days since last seen): {ships} ships, {workers} workers"
     )
+    return results
 
-    if dry_run:
-        summaries = []
-        for player in inactive_players:
-            # Count what would be affected
-            ships = await db.execute(select(Ship).where(Ship.player_id == player.id))
-            workers = await db.execute(select(Worker).where(Worker.player_id == player.id))
 
-            summaries.append({
-                "dry_run": True,
-                "player_id": player.id,
-                "username": player.username,
-                "last_seen": player.last_seen.isoformat(),
-                "days_inactive": (datetime.now(timezone.utc) - player.last_seen).days,
-                "ships": len(list(ships.scalars())),
-                "workers": len(list(workers.scalars()))
-            })
-        return summaries
-
-    # Actually delete
-    results = []
-    for player in inactive_players:
-        days = (datetime.now(timezone.utc) - player.last_seen).days
-        summary = await delete_player_account(
-            db,
-            player.id,
-            f"Inactive for {days} days"
+# ── Background job ────────────────────────────────────────────────────────────
+
+_MAX_JOB_RESULTS = 1000
+
+
+@job_handler("cleanup_inactive")
+async def cleanup_inactive_job(ctx: JobContext, days_inactive: int = 90, dry_run: bool = True) -> dict:
+    """cleanup_inactive_players as a job: progress per batch, cancellable between batches."""
+    cutoff = datetime.now(timezone.utc) - timedelta(days=days_inactive)
+    total = await ctx.db.scalar(
+        select(func.count()).select_from(Player)
+        .where(Player.last_seen < cutoff, Player.is_admin == False)  # noqa: E712
+    )
+    await ctx.db.rollback()
+
+    async def report(players: int, ships: int, workers: int) -> None:
+        await ctx.progress(
+            players / total if total else 1.0,
+            f"{players}/{total} players, {ships} ships, {workers} workers",
         )
-        results.append(summary)
 
-    return results
+    results = await cleanup_inactive_players(ctx.db, days_inactive, dry_run, progress=report)
+    return {
+        "dry_run": dry_run,
+        "days_inactive_threshold": days_inactive,
+        "players_affected": len(results),
+        "results": results[:_MAX_JOB_RESULTS],
+        "results_truncated": len(results) > _MAX_JOB_RESULTS,
+    }
 
 
 async def get_deletion_preview(db: AsyncSession, player_id: int) -> dict:
@@ -215,7 +314,9 @@ async def get_deletion_preview(db: AsyncSession, player_id: int) -> dict:
     if not player:
         return {"error": "Player not found"}
 
-    ships_result = await db.execute(select(Ship).where(Ship.player_id == player_id))
+    ships_result = await db.execute(
+        select(Ship).options(*load_profile("deletion.ships")).where(Ship.player_id == player_id)
+    )
     ships = list(ships_result.scalars().all())
 
     workers_result = await db.execute(select(Worker).where(Worker.player_id == player_id))
@@ -243,7 +344,7 @@ async def get_deletion_preview(db: AsyncSession, player_id: int) -> dict:
                         "position": f"({s.position_x:.2f}, {s.position_y:.2f}) AU",
                         "cargo_capacity": s.cargo_capacity,
                         "equipment_count": len(s.equipment or []),
-                        "crew_count": len(s.crew or []),
+                        "crew_count": sum(1 for w in workers if w.assigned_ship_id == s.id),
                         "is_derelict": s.is_derelict,
                         "on_mission": any(m.ship_id == s.id for m in missions)
                     }
@@ -258,14 +359,14 @@ async def get_deletion_preview(db: AsyncSession, player_id: int) -> dict:
                         "name": w.full_name,
                         "total_skill": w.pilot_skill + w.engineer_skill + w.mining_skill,
                         "wage": w.wage,
-                        "assigned_ship": w.ship_id
+                        "assigned_ship": w.assigned_ship_id
                     }
                     for w in workers
                 ]
             },
             "missions": {
                 "count": len(missions),
-                "active_count": sum(1 for m in missions if m.status != "COMPLETED")
+                "active_count": sum(1 for m in missions if m.status in ACTIVE_MISSION_STATUSES)
             },
             "money": player.money,
             "reputation": player.reputation
@@ -1,17 +1,28 @@
 from __future__ import annotations
+import asyncio
+import hashlib
+import logging
+import time
+from collections import OrderedDict, deque
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
 from datetime import datetime, timedelta, timezone
 from typing import Any
 from jose import JWTError, jwt
 from passlib.context import CryptContext
 from fastapi import Depends, Header, HTTPException, status
 from fastapi.security import OAuth2PasswordBearer
-from sqlalchemy import select
+from sqlalchemy import event, inspect, select
 from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
 from server.config import settings
 from server.database import get_db
+from server.models.loading import load_profile
 from server.models.player import Player
 from server.schemas.player import TokenData
 
+logger = logging.getLogger(__name__)
+
 pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/auth/login")
 
@@ -24,6 +35,88 @@ def hash_password(plain: str) -> str:
     return pwd_context.hash(plain)
 
 
+# ── Password hashing off the event loop ───────────────────────────────────────
+# bcrypt costs ~200 ms of CPU per call and releases the GIL while it runs, so a
+# small thread pool keeps logins from stalling the tick and event streams. At
+# most PASSWORD_HASH_WORKERS + PASSWORD_HASH_QUEUE calls are in flight; beyond
+# that requests get 503 immediately rather than queueing behind a burst.
+
+_hash_executor: ThreadPoolExecutor | None = None
+_hash_in_flight = 0
+_hash_rejected = 0
+_hash_latencies: deque[float] = deque(maxlen=512)  # seconds, queue wait included
+_hash_cpu: deque[float] = deque(maxlen=512)  # seconds inside bcrypt
+_SLOW_HASH_SECONDS = 1.0
+
+
+def _timed(fn, *args):
+    started = time.perf_counter()
+    try:
+        return fn(*args)
+    finally:
+        _hash_cpu.append(time.perf_counter() - started)
+
+
+async def _run_hash(fn, *args):
+    global _hash_executor, _hash_in_flight, _hash_rejected
+    if _hash_in_flight >= settings.PASSWORD_HASH_WORKERS + settings.PASSWORD_HASH_QUEUE:
+        _hash_rejected += 1
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Authentication is busy, please retry shortly",
+            headers={"Retry-After": "1"},
+        )
+    if _hash_executor is None:
+        _hash_executor = ThreadPoolExecutor(
+            max_workers=settings.PASSWORD_HASH_WORKERS, thread_name_prefix="bcrypt",
+        )
+    _hash_in_flight += 1
+    started = time.perf_counter()
+    try:
+        return await asyncio.get_running_loop().run_in_executor(_hash_executor, _timed, fn, *args)
+    finally:
+        _hash_in_flight -= 1
+        elapsed = time.perf_counter() - started
+        _hash_latencies.append(elapsed)
+        if elapsed > _SLOW_HASH_SECONDS:
+            logger.warning("Password hash took %.0f ms (in flight: %d)", elapsed * 1000, _hash_in_flight)
+
+
+async def verify_password_async(plain: str, hashed: str) -> bool:
+    return await _run_hash(verify_password, plain, hashed)
+
+
+async def hash_password_async(plain: str) -> str:
+    return await _run_hash(hash_password, plain)
+
+
+def password_hash_stats() -> dict:
+    """Latency percentiles (ms) over recent hashes, plus pool pressure."""
+
+    def pct(window: deque[float], p: float) -> float | None:
+        samples = sorted(window)
+        if not samples:
+            return None
+        return round(samples[min(len(samples) - 1, int(p * len(samples)))] * 1000, 1)
+
+    return {
+        "in_flight": _hash_in_flight,
+        "capacity": settings.PASSWORD_HASH_WORKERS + settings.PASSWORD_HASH_QUEUE,
+        "rejected": _hash_rejected,
+        "p50_ms": pct(_hash_latencies, 0.50),
+        "p95_ms": pct(_hash_latencies, 0.95),
+        "max_ms": pct(_hash_latencies, 1.0),
+        "bcrypt_p50_ms": pct(_hash_cpu, 0.50),
+    }
+
+
+def shutdown_hash_pool() -> None:
+    global _hash_executor
+    if _hash_executor is not None:
+        _hash_executor.shutdown(wait=False, cancel_futures=True)
+        _hash_executor = None
+
+
 def create_access_token(data: dict[str, Any], expires_delta: timedelta | None = None) -> str:
     to_encode = data.copy()
     expire = datetime.now(timezone.utc) + (
@@ -39,15 +132,43 @@ def require_admin_key(x_admin_key: str = Header(...)) -> None:
         raise HTTPException(status_code=403, detail="Invalid admin key")
 
 
-async def get_current_player(
-    token: str = Depends(oauth2_scheme),
-    db: AsyncSession = Depends(get_db),
-) -> Player:
-    credentials_exc = HTTPException(
+def _credentials_exception() -> HTTPException:
+    return HTTPException(
         status_code=status.HTTP_401_UNAUTHORIZED,
         detail="Could not validate credentials",
         headers={"WWW-Authenticate": "Bearer"},
     )
+
+
+@dataclass(frozen=True)
+class Principal:
+    """The authenticated caller, without any of the Player relationship graph."""
+    id: int
+    username: str
+    is_admin: bool
+    is_npc: bool
+
+
+# Verified tokens: sha256(token) -> (player_id, exp). Skips JWT verification on repeat calls.
+_token_cache: OrderedDict[bytes, tuple[int, float]] = OrderedDict()
+# player_id -> (Principal, cached_at). Dropped in every process when a principal field is committed;
+# require_admin still re-reads is_admin so a demotion applies on the next request.
+_principal_cache: dict[int, tuple[Principal, float]] = {}
+_PRINCIPAL_FIELDS = ("username", "is_admin", "is_npc")
+
+
+def decode_access_token(token: str) -> int:
+    """Return the player id carried by a JWT, or raise 401."""
+    key = hashlib.sha256(token.encode("utf-8")).digest()
+    cached = _token_cache.get(key)
+    if cached is not None:
+        player_id, exp = cached
+        if exp > time.time():
+            _token_cache.move_to_end(key)
+            return player_id
+        del _token_cache[key]
+
+    credentials_exc = _credentials_exception()
     try:
         payload = jwt.decode(token, settings.SECRET_KEY, algorithms=[settings.ALGORITHM])
         player_id: int | None = payload.get("sub")
@@ -56,18 +177,99 @@ async def get_current_player(
         token_data = TokenData(player_id=int(player_id))
     except JWTError:
         raise credentials_exc
-    result = await db.execute(select(Player).where(Player.id == token_data.player_id))
+
+    _token_cache[key] = (token_data.player_id, float(payload.get("exp", 0)))
+    if len(_token_cache) > settings.AUTH_TOKEN_CACHE_SIZE:
+        _token_cache.popitem(last=False)
+    return token_data.player_id
+
+
+def invalidate_player(player_id: int) -> None:
+    """Forget the cached principal. Call after writes that bypass the ORM (bulk UPDATE/DELETE)."""
+    _principal_cache.pop(player_id, None)
+
+
+@event.listens_for(Session, "after_flush")
+def _collect_changed_principals(session: Session, flush_context) -> None:
+    changed: set[int] = session.info.setdefault("principal_players", set())
+    for obj in session.deleted:
+        if isinstance(obj, Player):
+            changed.add(obj.id)
+    for obj in session.dirty:
+        if isinstance(obj, Player):
+            state = inspect(obj)
+            if any(state.attrs[f].history.has_changes() for f in _PRINCIPAL_FIELDS):
+                changed.add(obj.id)
+
+
+@event.listens_for(Session, "after_commit")
+def _invalidate_changed_principals(session: Session) -> None:
+    # After commit, not flush: a read in between would re-cache the old row.
+    changed = session.info.pop("principal_players", None)
+    if changed:
+        from server.simulation.cluster import send_command
+        send_command("invalidate_players", players=sorted(changed))
+
+
+@event.listens_for(Session, "after_rollback")
+def _drop_changed_principals(session: Session) -> None:
+    session.info.pop("principal_players", None)
+
+
+async def principal_from_token(token: str, db: AsyncSession) -> Principal:
+    """Resolve a JWT to a Principal, from cache when fresh. Used by transports without OAuth2 headers."""
+    player_id = decode_access_token(token)
+    cached = _principal_cache.get(player_id)
+    if cached is not None and time.monotonic() - cached[1] < settings.AUTH_PRINCIPAL_TTL:
+        return cached[0]
+
+    result = await db.execute(
+        select(Player.id, Player.username, Player.is_admin, Player.is_npc).where(Player.id == player_id)
+    )
+    row = result.one_or_none()
+    if row is None:
+        invalidate_player(player_id)
+        raise _credentials_exception()
+    principal = Principal(id=row.id, username=row.username, is_admin=row.is_admin, is_npc=row.is_npc)
+    _principal_cache[player_id] = (principal, time.monotonic())
+    return principal
+
+
+async def get_current_principal(
+    token: str = Depends(oauth2_scheme),
+    db: AsyncSession = Depends(get_db),
+) -> Principal:
+    """Lean auth dependency: one cached lookup, no relationship loading."""
+    return await principal_from_token(token, db)
+
+
+async def get_current_player(
+    principal: Principal = Depends(get_current_principal),
+    db: AsyncSession = Depends(get_db),
+) -> Player:
+    """
+    The caller's Player row, for endpoints that read or write player columns.
+
+    Relationships are not loaded; touching one raises. Endpoints that need
+    ships, workers etc. must query them explicitly.
+    """
+    result = await db.execute(
+        select(Player).options(*load_profile("auth.player")).where(Player.id == principal.id)
+    )
     player = result.scalar_one_or_none()
     if player is None:
-        raise credentials_exc
+        invalidate_player(principal.id)
+        raise _credentials_exception()
     return player
 
 
 async def require_admin(
-    player: Player = Depends(get_current_player),
-) -> Player:
-    """Require authenticated player to have admin privileges."""
-    if not player.is_admin:
+    player: Principal = Depends(get_current_principal),
+    db: AsyncSession = Depends(get_db),
+) -> Principal:
+    """Require authenticated player to have admin privileges (read from the DB, never the cache)."""
+    is_admin = (await db.execute(select(Player.is_admin).where(Player.id == player.id))).scalar_one_or_none()
+    if not is_admin:
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN,
             detail="Admin access required"
@@ -63,9 +63,189 @@ class Settings(BaseSettings):
     WORLD_NAME: str = "Euterpe"
     TICK_INTERVAL: float = Field(default=1.0, ge=0.01, le=10.0)
 
+    # Where the simulation runs: inside an API worker, or in its own process
+    SIMULATION_MODE: str = Field(
+        default="embedded",
+        description="embedded|external (external = run `python -m server.simulation.runner`)"
+    )
+    SIMULATION_SOCKET: str = Field(
+        default="/tmp/claim-sim.sock",
+        description="Unix socket the standalone simulator listens on"
+    )
+
+    # Shared-memory world snapshot read by /game/world, /game/market and /game/state
+    SNAPSHOT_ENABLED: bool = Field(default=True, description="Publish and read the mmap world snapshot")
+    SNAPSHOT_PATH: str = Field(
+        default="",
+        description="Snapshot file (default: /dev/shm/claim-world-<id>.snap)"
+    )
+    SNAPSHOT_MAX_SHIPS: int = Field(default=16384, ge=1, description="Ship record capacity")
+    SNAPSHOT_MAX_MISSIONS: int = Field(default=16384, ge=1, description="Active mission record capacity")
+    SNAPSHOT_MAX_AGE: float = Field(
+        default=5.0, gt=0,
+        description="Seconds after which a snapshot is treated as stale and reads go to the DB"
+    )
+    SNAPSHOT_WRITE_GRACE: float = Field(
+        default=3.0, ge=0,
+        description="Seconds after a player's write during which their reads skip the snapshot"
+    )
+    SNAPSHOT_FULL_REFRESH_INTERVAL: float = Field(
+        default=60.0, gt=0,
+        description="Seconds between full re-reads of the snapshot's ships, missions and colonies"
+    )
+
+    # Finished missions are moved to history tables by the simulation leader
+    MISSION_ARCHIVE_INTERVAL: float = Field(
+        default=60.0, gt=0,
+        description="Seconds between mission archival passes"
+    )
+    MISSION_ARCHIVE_BATCH: int = Field(
+        default=1000, ge=1, le=50000,
+        description="Missions moved per archival statement"
+    )
+
+    # Leaderboard index: committed writes in any process mark players dirty
+    LEADERBOARD_REBUILD_INTERVAL: float = Field(
+        default=600.0, gt=0,
+        description="Seconds between background full leaderboard rebuilds (bulk writes, price drift)"
+    )
+
+    # Asteroid orbits for positions and distances (server/simulation/ephemeris.py)
+    EPHEMERIS_CATALOG_TTL: float = Field(
+        default=300.0, gt=0,
+        description="Seconds a worker keeps its cached asteroid orbital elements before re-reading"
+    )
+    EPHEMERIS_TABLE_ENABLED: bool = Field(default=True, description="Interpolate positions from precomputed tables")
+    EPHEMERIS_TABLE_STEP_HOURS: float = Field(
+        default=12.0, gt=0, le=240,
+        description="Game-hours between precomputed positions"
+    )
+    EPHEMERIS_TABLE_WINDOW_DAYS: float = Field(
+        default=8.0, gt=0, le=365,
+        description="Game-days covered by one precomputed table"
+    )
+    EPHEMERIS_MAX_ERROR_KM: float = Field(
+        default=1000.0, gt=0,
+        description="Bodies interpolating worse than this (checked at build) are solved exactly"
+    )
+    EPHEMERIS_TABLE_DIR: str = Field(
+        default="",
+        description="Directory for memory-mapped tables shared by this host's workers ('' = in memory only)"
+    )
+
+    # Dispatch intercepts (server/simulation/intercept.py)
+    INTERCEPT_CACHE_SIZE: int = Field(default=50_000, ge=0, description="Intercept results kept per worker (LRU)")
+    INTERCEPT_CACHE_BUCKET: float = Field(
+        default=600.0, gt=0,
+        description="Game-seconds of launch time sharing one cached intercept"
+    )
+
+    # Best mining targets (server/simulation/targets.py)
+    BEST_TARGETS_TICK_BUCKET: int = Field(
+        default=60, ge=1,
+        description="Ticks sharing one set of rankings (yields, reserves and prices re-read per bucket)"
+    )
+    BEST_TARGETS_REFINE: int = Field(
+        default=256, ge=1,
+        description="Top candidates re-timed with moving-target intercepts before the final ranking"
+    )
+    BEST_TARGETS_CACHE_SIZE: int = Field(default=1_000, ge=0, description="Rankings kept per worker (LRU)")
+
+    # Admin dashboard counters (server/world_stats.py)
+    WORLD_STATS_FLUSH_INTERVAL: float = Field(
+        default=5.0, gt=0,
+        description="Seconds between each worker adding its counter deltas to world_stats"
+    )
+    WORLD_STATS_RECONCILE_INTERVAL: float = Field(
+        default=600.0, gt=0,
+        description="Seconds between full recounts of world_stats by the simulation leader"
+    )
+
+    # Single-player leaderboard
+    SP_BOARD_CACHE_TTL: float = Field(
+        default=30.0, gt=0,
+        description="Seconds a worker serves its cached SP top scores before re-reading"
+    )
+    SP_SCORE_PRUNE_INTERVAL: float = Field(
+        default=3600.0, gt=0,
+        description="Seconds between passes deleting SP submissions that are not a name's best"
+    )
+    SP_SCORE_PRUNE_BATCH: int = Field(
+        default=5000, ge=1, le=50000,
+        description="SP submissions deleted per prune statement"
+    )
+
+    LEDGER_INSERT_CHUNK: int = Field(
+        default=1000, ge=1, le=4000,
+        description="Transaction rows per multi-row INSERT when the ledger cannot use COPY"
+    )
+    ACCOUNT_CLEANUP_BATCH: int = Field(
+        default=500, ge=1, le=10000,
+        description="Players dissolved per transaction by the inactive account cleanup"
+    )
+    LEDGER_ROLLUP_INTERVAL: float = Field(
+        default=300.0, gt=0,
+        description="Seconds between daily finance rollup / partition maintenance passes"
+    )
+    LEDGER_ROLLUP_GRACE: float = Field(
+        default=300.0, ge=0,
+        description="Seconds after UTC midnight before the previous day's rollups are final"
+    )
+    LEDGER_RETENTION_DAYS: int = Field(
+        default=30, ge=1,
+        description="Days of raw player_transactions kept (rollups are kept)"
+    )
+    LEDGER_PARTITION_PREMAKE_DAYS: int = Field(
+        default=7, ge=1, le=60,
+        description="Daily player_transactions partitions created ahead of time"
+    )
+
+    # Multi-worker coordination: one process runs the simulation, all relay events
+    SIM_LEADER_ELECTION: bool = Field(
+        default=True,
+        description="Elect a single simulation leader via a Postgres advisory lock"
+    )
+    SIM_LEADER_LOCK_ID: int = Field(
+        default=7214001,
+        description="Advisory lock key held by the simulation leader"
+    )
+    SIM_LEADER_POLL_INTERVAL: float = Field(
+        default=5.0, ge=0.5, le=60.0,
+        description="Seconds between leadership checks (bounds failover time)"
+    )
+    EVENT_CHANNEL: str = Field(
+        default="claim_events",
+        description="Postgres NOTIFY channel used to relay events between workers"
+    )
+
     # JWT settings
     ALGORITHM: str = "HS256"
     ACCESS_TOKEN_EXPIRE_MINUTES: int = 60 * 24 * 30  # 30 days
+    AUTH_TOKEN_CACHE_SIZE: int = Field(default=10000, ge=1, description="Verified-token LRU entries")
+    AUTH_PRINCIPAL_TTL: float = Field(
+        default=30.0, ge=0,
+        description="Seconds a cached principal (id, username, admin flags) is trusted"
+    )
+    PASSWORD_HASH_WORKERS: int = Field(
+        default=2, ge=1, le=32,
+        description="Threads running bcrypt off the event loop"
+    )
+    PASSWORD_HASH_QUEUE: int = Field(
+        default=8, ge=0,
+        description="bcrypt jobs allowed to wait for a thread before requests get 503"
+    )
+
+    # Rate limiting (server/rate_limit.py)
+    RATE_LIMIT_ENABLED: bool = Field(default=True, description="Enforce endpoint rate limits")
+    RATE_LIMIT_BACKEND: str = Field(
+        default="shared",
+        description="shared = one table for all workers on this host, memory = per process"
+    )
+    RATE_LIMIT_SHM_PATH: str = Field(
+        default="",
+        description="Shared rate-limit table (default: /dev/shm/claim-ratelimit.bin)"
+    )
+    RATE_LIMIT_SLOTS: int = Field(default=65536, ge=256, description="Buckets in the shared table")
 
     # CORS settings
     CORS_ORIGINS: str = Field(
@@ -96,6 +276,21 @@ class Settings(BaseSettings):
     SMTP_USERNAME: str = Field(default="", description="SMTP username")
     SMTP_PASSWORD: str = Field(default="", description="SMTP password")
     SMTP_FROM_EMAIL: str = Field(default="noreply@claim.game", description="From email address")
+    EMAIL_WORKER_ENABLED: bool = Field(default=True, description="Deliver the email outbox from this process")
+    EMAIL_BATCH_SIZE: int = Field(default=20, ge=1, le=500, description="Outbox rows claimed per pass")
+    EMAIL_POLL_INTERVAL: float = Field(default=2.0, gt=0, description="Seconds between outbox polls when idle")
+    EMAIL_RATE_PER_MINUTE: float = Field(default=60.0, gt=0, description="Max emails sent per minute per process")
+    EMAIL_MAX_ATTEMPTS: int = Field(default=6, ge=1, description="Delivery attempts before an email is marked failed")
+    EMAIL_RETRY_BASE: float = Field(default=30.0, gt=0, description="First retry delay in seconds (doubles each attempt)")
+    EMAIL_SMTP_TIMEOUT: float = Field(default=30.0, gt=0, description="SMTP socket timeout in seconds")
+
+    # Background jobs (long admin operations)
+    JOB_WORKERS: int = Field(default=2, ge=0, le=16, description="Jobs run concurrently by this process (0 = none)")
+    JOB_POLL_INTERVAL: float = Field(default=2.0, gt=0, description="Seconds between job queue polls when idle")
+    JOB_HEARTBEAT_INTERVAL: float = Field(default=5.0, gt=0, description="Seconds between heartbeats of running jobs")
+    JOB_STALE_AFTER: float = Field(default=120.0, gt=0, description="Running jobs without a heartbeat this long are marked failed")
+    JOB_PROGRESS_INTERVAL: float = Field(default=1.0, ge=0, description="Minimum seconds between progress writes of one job")
+    JOB_INLINE_WAIT: float = Field(default=10.0, ge=0, description="Seconds an admin request waits for its job before answering 202")
 
     # Frontend URL (for email links)
     FRONTEND_URL: str = Field(
@@ -1,5 +1,7 @@
 from collections.abc import AsyncGenerator
+from contextvars import ContextVar
 
+from sqlalchemy import event
 from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
 from sqlalchemy.orm import DeclarativeBase
 
@@ -21,10 +23,33 @@ AsyncSessionLocal = async_sessionmaker(
 )
 
 
+# Statements executed in the current request/task; see count_queries().
+_query_count: ContextVar[list[int] | None] = ContextVar("_query_count", default=None)
+
+
+@event.listens_for(async_engine.sync_engine, "before_cursor_execute")
+def _count_statement(conn, cursor, statement, parameters, context, executemany) -> None:
+    counter = _query_count.get()
+    if counter is not None:
+        counter[0] += 1
+
+
+def count_queries() -> list[int]:
+    """Start counting SQL statements issued from this context. Read result[0]."""
+    counter = [0]
+    _query_count.set(counter)
+    return counter
+
+
 class Base(DeclarativeBase):
     pass
 
 
+def raw_database_url() -> str:
+    """DATABASE_URL in the form plain asyncpg.connect() accepts."""
+    return settings.DATABASE_URL.replace("postgresql+asyncpg://", "postgresql://", 1)
+
+
 async def get_db() -> AsyncGenerator[AsyncSession, None]:
     async with AsyncSessionLocal() as session:
         try:
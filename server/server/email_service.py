@@ -1,36 +1,54 @@
-"""Email sending service for password resets and notifications."""
+"""
+Email for password resets and notifications.
+
+Request handlers never talk to SMTP. They call enqueue_* with their own
+session, so the email row commits (or rolls back) together with the change
+that triggered it. OutboxWorker, started with the app in every API process,
+leases due rows in a short FOR UPDATE SKIP LOCKED transaction and sends
+them afterwards, outside any transaction, over one reused SMTP connection
+(in a thread, off the event loop). Each row's outcome is committed as soon
+as it is known. Sending is rate-limited to EMAIL_RATE_PER_MINUTE and
+transient failures are retried with exponential backoff.
+
+To test against a local SMTP sink, run one (for example
+`python -m aiosmtpd -n -l localhost:1025`), set SMTP_ENABLED=true,
+SMTP_HOST=localhost, SMTP_PORT=1025, SMTP_TLS=false, then either start the
+server or drain the outbox once with `python -m server.email_service`.
+"""
+
+from __future__ import annotations
 
+import asyncio
 import logging
+import random
 import smtplib
-from email.mime.text import MIMEText
+import time
+from datetime import datetime, timedelta, timezone
 from email.mime.multipart import MIMEMultipart
+from email.mime.text import MIMEText
+
+from sqlalchemy import select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+
 from server.config import settings
+from server.database import AsyncSessionLocal
+from server.models.email_outbox import EmailOutbox, STATUS_FAILED, STATUS_PENDING, STATUS_SENT
 
 logger = logging.getLogger(__name__)
 
+_MAX_BACKOFF_SECONDS = 3600.0
+_SMTP_IDLE_SECONDS = 60.0  # drop the connection after this long without sending
+_CLAIM_MARGIN_SECONDS = 300.0  # lease on claimed rows beyond the batch's throttled send time
 
-def send_password_reset_email(to_email: str, username: str, reset_token: str) -> bool:
-    """
-    Send password reset email with reset link.
-    Returns True if sent successfully, False otherwise.
-    """
-    if not settings.SMTP_ENABLED:
-        logger.warning(f"SMTP disabled - would send reset email to {to_email}")
-        logger.info(f"Password reset token for {username}: {reset_token}")
-        return True  # Succeed in dev mode so we can test without real email
 
-    try:
-        # Create reset link
-        reset_url = f"{settings.FRONTEND_URL}/reset-password?token={reset_token}"
+# ── Templates ─────────────────────────────────────────────────────────────────
 
-        # Create email
-        msg = MIMEMultipart("alternative")
-        msg["Subject"] = "Claim - Password Reset Request"
-        msg["From"] = settings.SMTP_FROM_EMAIL
-        msg["To"] = to_email
+def _password_reset_message(username: str, reset_token: str) -> tuple[str, str, str]:
+    """Return (subject, text, html) for a password reset email."""
+    reset_url = f"{settings.FRONTEND_URL}/reset-password?token={reset_token}"
 
-        # Plain text version
-        text = f"""
+    # Plain text version
+    text = f"""
 Hello {username},
 
 You requested a password reset for your Claim account.
@@ -44,8 +62,8 @@ Best regards,
 The Claim Team
 """
 
-        # HTML version
-        html = f"""
+    # HTML version
+    html = f"""
 <html>
 <body style="font-family: Arial, sans-serif; line-height: 1.6; color: #333;">
     <div style="max-width: 600px; margin: 0 auto; padding: 20px;">
@@ -74,41 +92,12 @@ The Claim Team
 </html>
 """
 
-        msg.attach(MIMEText(text, "plain"))
-        msg.attach(MIMEText(html, "html"))
-
-        # Send email
-        with smtplib.SMTP(settings.SMTP_HOST, settings.SMTP_PORT) as server:
-            if settings.SMTP_TLS:
-                server.starttls()
-            if settings.SMTP_USERNAME and settings.SMTP_PASSWORD:
-                server.login(settings.SMTP_USERNAME, settings.SMTP_PASSWORD)
-            server.send_message(msg)
-
-        logger.info(f"Password reset email sent to {to_email}")
-        return True
-
-    except Exception as e:
-        logger.error(f"Failed to send password reset email to {to_email}: {e}")
-        return False
-
+    return "Claim - Password Reset Request", text, html
 
-def send_welcome_email(to_email: str, username: str) -> bool:
-    """
-    Send welcome email to new users.
-    Returns True if sent successfully, False otherwise.
-    """
-    if not settings.SMTP_ENABLED:
-        logger.warning(f"SMTP disabled - would send welcome email to {to_email}")
-        return True
-
-    try:
-        msg = MIMEMultipart("alternative")
-        msg["Subject"] = "Welcome to Claim!"
-        msg["From"] = settings.SMTP_FROM_EMAIL
-        msg["To"] = to_email
 
-        text = f"""
+def _welcome_message(username: str) -> tuple[str, str, str]:
+    """Return (subject, text, html) for a welcome email."""
+    text = f"""
 Welcome to Claim, {username}!
 
 Your account has been created successfully. You can now log in and start your asteroid mining empire!
@@ -119,7 +108,7 @@ Best regards,
 The Claim Team
 """
 
-        html = f"""
+    html = f"""
 <html>
 <body style="font-family: Arial, sans-serif; line-height: 1.6; color: #333;">
     <div style="max-width: 600px; margin: 0 auto; padding: 20px;">
@@ -142,19 +131,227 @@ The Claim Team
 </html>
 """
 
-        msg.attach(MIMEText(text, "plain"))
-        msg.attach(MIMEText(html, "html"))
+    return "Welcome to Claim!", text, html
+
+
+# ── Enqueue (called from request handlers) ────────────────────────────────────
+
+def enqueue_email(
+    db: AsyncSession, kind: str, to_email: str, subject: str, text: str, html: str | None = None,
+) -> EmailOutbox:
+    """Add an email to the outbox. Delivered after the caller commits."""
+    row = EmailOutbox(kind=kind, to_email=to_email, subject=subject, body_text=text, body_html=html)
+    db.add(row)
+    return row
+
+
+def enqueue_password_reset_email(db: AsyncSession, to_email: str, username: str, reset_token: str) -> EmailOutbox:
+    subject, text, html = _password_reset_message(username, reset_token)
+    return enqueue_email(db, "password_reset", to_email, subject, text, html)
+
 
-        with smtplib.SMTP(settings.SMTP_HOST, settings.SMTP_PORT) as server:
-            if settings.SMTP_TLS:
-                server.starttls()
-            if settings.SMTP_USERNAME and settings.SMTP_PASSWORD:
-                server.login(settings.SMTP_USERNAME, settings.SMTP_PASSWORD)
-            server.send_message(msg)
+def enqueue_welcome_email(db: AsyncSession, to_email: str, username: str) -> EmailOutbox:
+    subject, text, html = _welcome_message(username)
+    return enqueue_email(db, "welcome", to_email, subject, text, html)
 
-        logger.info(f"Welcome email sent to {to_email}")
+
+# ── Delivery ──────────────────────────────────────────────────────────────────
+
+def _is_permanent(exc: Exception) -> bool:
+    """Rejections that retrying cannot fix (bad recipient, message refused)."""
+    if isinstance(exc, smtplib.SMTPRecipientsRefused):
         return True
+    if isinstance(exc, smtplib.SMTPAuthenticationError):
+        return False  # our credentials; fixable without touching the message
+    if isinstance(exc, smtplib.SMTPResponseException):
+        return exc.smtp_code >= 500
+    return False
+
+
+class SmtpSender:
+    """
+    One SMTP connection reused across messages. Blocking; call from a thread.
+    With SMTP_ENABLED off it only logs, so development needs no mail server.
+    """
+
+    def __init__(self) -> None:
+        self._smtp: smtplib.SMTP | None = None
+        self._last_used = 0.0
+
+    def _connect(self) -> smtplib.SMTP:
+        smtp = smtplib.SMTP(settings.SMTP_HOST, settings.SMTP_PORT, timeout=settings.EMAIL_SMTP_TIMEOUT)
+        if settings.SMTP_TLS:
+            smtp.starttls()
+        if settings.SMTP_USERNAME and settings.SMTP_PASSWORD:
+            smtp.login(settings.SMTP_USERNAME, settings.SMTP_PASSWORD)
+        return smtp
+
+    def send(self, to_email: str, subject: str, text: str, html: str | None) -> None:
+        if not settings.SMTP_ENABLED:
+            logger.warning("SMTP disabled - would send %r to %s", subject, to_email)
+            logger.info("Email body for %s:\n%s", to_email, text)
+            return
+
+        msg = MIMEMultipart("alternative")
+        msg["Subject"] = subject
+        msg["From"] = settings.SMTP_FROM_EMAIL
+        msg["To"] = to_email
+        msg.attach(MIMEText(text, "plain"))
+        if html:
+            msg.attach(MIMEText(html, "html"))
+
+        if self._smtp is None:
+            self._smtp = self._connect()
+        try:
+            self._smtp.send_message(msg)
+        except smtplib.SMTPServerDisconnected:
+            # Server dropped an idle connection; one fresh attempt.
+            self._smtp = self._connect()
+            self._smtp.send_message(msg)
+        self._last_used = time.monotonic()
+
+    def close_if_idle(self, max_idle: float = _SMTP_IDLE_SECONDS) -> None:
+        if self._smtp is not None and time.monotonic() - self._last_used > max_idle:
+            self.close()
+
+    def close(self) -> None:
+        smtp, self._smtp = self._smtp, None
+        if smtp is not None:
+            try:
+                smtp.quit()
+            except (smtplib.SMTPException, OSError):
+                smtp.close()
+
+
+class OutboxWorker:
+    """Delivers due outbox rows. Safe to run in several processes at once."""
+
+    def __init__(self, sender: SmtpSender | None = None) -> None:
+        self.sender = sender or SmtpSender()
+        self._task: asyncio.Task | None = None
+        self._next_send = 0.0
+
+    async def start(self) -> None:
+        self._task = asyncio.create_task(self._run(), name="email_outbox")
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        await asyncio.to_thread(self.sender.close)
+
+    async def _run(self) -> None:
+        while True:
+            try:
+                async with AsyncSessionLocal() as db:
+                    sent = await self.deliver_batch(db)
+            except asyncio.CancelledError:
+                raise
+            except Exception as exc:
+                logger.exception("Email outbox pass failed: %s", exc)
+                sent = 0
+            if sent < settings.EMAIL_BATCH_SIZE:
+                await asyncio.to_thread(self.sender.close_if_idle)
+                await asyncio.sleep(settings.EMAIL_POLL_INTERVAL)
+
+    async def _throttle(self) -> None:
+        loop = asyncio.get_running_loop()
+        wait = self._next_send - loop.time()
+        if wait > 0:
+            await asyncio.sleep(wait)
+        self._next_send = max(self._next_send, loop.time()) + 60.0 / settings.EMAIL_RATE_PER_MINUTE
+
+    async def deliver_batch(self, db: AsyncSession) -> int:
+        """Send up to EMAIL_BATCH_SIZE due emails. Returns how many were attempted."""
+        batch = await self._claim(db)
+        for row in batch:
+            await self._throttle()
+            try:
+                await asyncio.to_thread(self.sender.send, row.to_email, row.subject, row.body_text, row.body_html)
+            except Exception as exc:
+                await asyncio.to_thread(self.sender.close)
+                row.last_error = f"{type(exc).__name__}: {exc}"[:512]
+                if _is_permanent(exc) or row.attempts >= settings.EMAIL_MAX_ATTEMPTS:
+                    row.status = STATUS_FAILED
+                    logger.error("Giving up on %s email %d to %s: %s", row.kind, row.id, row.to_email, exc)
+                else:
+                    delay = min(settings.EMAIL_RETRY_BASE * 2 ** (row.attempts - 1), _MAX_BACKOFF_SECONDS)
+                    row.next_attempt_at = datetime.now(timezone.utc) + timedelta(
+                        seconds=delay * random.uniform(0.8, 1.2)
+                    )
+                    logger.warning(
+                        "Email %d to %s failed (attempt %d), retrying in %.0fs: %s",
+                        row.id, row.to_email, row.attempts, delay, exc,
+                    )
+            else:
+                row.status = STATUS_SENT
+                row.sent_at = datetime.now(timezone.utc)
+                row.last_error = None
+                logger.info("Sent %s email %d to %s", row.kind, row.id, row.to_email)
+            await db.commit()  # per row: a crash later in the batch does not resend this one
+        return len(batch)
+
+    async def _claim(self, db: AsyncSession) -> list[EmailOutbox]:
+        """
+        Lease due rows in a short transaction of their own: push their
+        next_attempt_at past the time the batch can take, so other workers
+        skip them, and count the attempt. Rows a crashed worker leased come
+        due again when the lease runs out.
+        """
+        now = datetime.now(timezone.utc)
+        lease = settings.EMAIL_BATCH_SIZE * 60.0 / settings.EMAIL_RATE_PER_MINUTE + _CLAIM_MARGIN_SECONDS
+        due = (
+            select(EmailOutbox.id)
+            .where(EmailOutbox.status == STATUS_PENDING, EmailOutbox.next_attempt_at <= now)
+            .order_by(EmailOutbox.next_attempt_at, EmailOutbox.id)
+            .limit(settings.EMAIL_BATCH_SIZE)
+            .with_for_update(skip_locked=True)
+        )
+        batch = list((await db.scalars(
+            update(EmailOutbox).where(EmailOutbox.id.in_(due))
+            .values(attempts=EmailOutbox.attempts + 1, next_attempt_at=now + timedelta(seconds=lease))
+            .returning(EmailOutbox)
+        )).all())
+        await db.commit()
+        return sorted(batch, key=lambda row: row.id)
+
+
+_worker: OutboxWorker | None = None
+
+
+async def start_email_worker() -> None:
+    global _worker
+    if settings.EMAIL_WORKER_ENABLED:
+        _worker = OutboxWorker()
+        await _worker.start()
+
+
+async def stop_email_worker() -> None:
+    global _worker
+    if _worker is not None:
+        await _worker.stop()
+        _worker = None
+
+
+async def drain_outbox() -> int:
+    """Deliver everything currently due, then return the count attempted."""
+    worker = OutboxWorker()
+    total = 0
+    try:
+        while True:
+            async with AsyncSessionLocal() as db:
+                n = await worker.deliver_batch(db)
+            total += n
+            if n < settings.EMAIL_BATCH_SIZE:
+                return total
+    finally:
+        worker.sender.close()
+
 
-    except Exception as e:
-        logger.error(f"Failed to send welcome email to {to_email}: {e}")
-        return False
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s [%(name)s] %(message)s")
+    print(f"Attempted {asyncio.run(drain_outbox())} emails")
@@ -0,0 +1,316 @@
+"""
+Background jobs for long admin operations.
+
+Endpoints do not run maintenance work (seeding, reserve generation, world
+reset, account cleanup, ...) inside the request. They insert a row into
+the jobs table with enqueue_job() and answer with its id; admins follow it
+at /admin/jobs/{id}.
+
+JobRunner, started with the app in every API process (JOB_WORKERS > 0),
+runs a bounded pool of JOB_WORKERS workers. Each claims the oldest queued
+job with FOR UPDATE SKIP LOCKED, so processes never run the same job, and
+runs its handler in a fresh session:
+  - handlers are registered per kind with @job_handler("kind") and get a
+    JobContext (session, params, progress reporting);
+  - ctx.progress(fraction, message) stores progress (at most once per
+    JOB_PROGRESS_INTERVAL) and raises JobCancelled once cancellation was
+    requested;
+  - a heartbeat task touches running jobs every JOB_HEARTBEAT_INTERVAL and
+    cancels the task of any job whose cancellation was requested, so even
+    handlers that never report progress can be stopped;
+  - ctx.disable_cancel() ends both, for handlers past the point where
+    stopping would leave things worse than finishing (e.g. after a commit);
+  - jobs whose process died (no heartbeat for JOB_STALE_AFTER) are marked
+    failed. Jobs are never retried automatically: maintenance work is not
+    guaranteed to be idempotent.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+import os
+import socket
+import time
+from datetime import datetime, timedelta, timezone
+from typing import Any, Awaitable, Callable
+
+from sqlalchemy import select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from server.config import settings
+from server.database import AsyncSessionLocal
+from server.models.job import (
+    FINISHED_STATUSES, Job,
+    STATUS_CANCELLED, STATUS_DONE, STATUS_FAILED, STATUS_QUEUED, STATUS_RUNNING,
+)
+
+logger = logging.getLogger(__name__)
+
+WORKER_NAME = f"{socket.gethostname()}:{os.getpid()}"[:64]
+
+
+class JobCancelled(Exception):
+    pass
+
+
+class JobContext:
+    """What a handler gets: its own session, the job's params and progress reporting."""
+
+    def __init__(self, job_id: int, db: AsyncSession, params: dict) -> None:
+        self.job_id = job_id
+        self.db = db
+        self.params = params
+        self.cancellable = True
+        self._last_write = 0.0
+
+    def disable_cancel(self) -> None:
+        """Ignore cancel requests from now on; the job will run to completion."""
+        self.cancellable = False
+
+    async def progress(self, fraction: float, message: str = "", force: bool = False) -> None:
+        """Record progress (0..1). Raises JobCancelled if cancellation was requested."""
+        now = time.monotonic()
+        if not force and now - self._last_write < settings.JOB_PROGRESS_INTERVAL:
+            return
+        self._last_write = now
+        # Separate session: visible at once, whatever the handler's transaction is doing
+        async with AsyncSessionLocal() as db:
+            cancel = await db.scalar(
+                update(Job).where(Job.id == self.job_id)
+                .values(
+                    progress=min(max(fraction, 0.0), 1.0),
+                    message=message[:255],
+                    heartbeat_at=datetime.now(timezone.utc),
+                )
+                .returning(Job.cancel_requested)
+            )
+            await db.commit()
+        if cancel and self.cancellable:
+            raise JobCancelled()
+
+
+Handler = Callable[..., Awaitable[dict | None]]
+_handlers: dict[str, Handler] = {}
+
+
+def job_handler(kind: str) -> Callable[[Handler], Handler]:
+    """Register `async def handler(ctx, **params) -> dict | None` for a job kind."""
+    def register(fn: Handler) -> Handler:
+        _handlers[kind] = fn
+        return fn
+    return register
+
+
+# ── Queue operations ──────────────────────────────────────────────────────────
+
+async def enqueue_job(db: AsyncSession, kind: str, params: dict[str, Any] | None = None) -> Job:
+    """Queue a job and commit. Raises KeyError for an unknown kind."""
+    if kind not in _handlers:
+        raise KeyError(kind)
+    job = Job(kind=kind, params=params or {}, status=STATUS_QUEUED)
+    db.add(job)
+    await db.commit()
+    if _runner is not None:
+        _runner.wake()
+    logger.info("Queued %s job %d %s", kind, job.id, params or "")
+    return job
+
+
+async def get_job(db: AsyncSession, job_id: int) -> Job | None:
+    return await db.get(Job, job_id, populate_existing=True)
+
+
+async def request_cancel(db: AsyncSession, job_id: int) -> Job | None:
+    """Cancel a queued job at once; ask a running one to stop. Returns the job."""
+    job = await db.get(Job, job_id, with_for_update=True, populate_existing=True)
+    if job is None:
+        return None
+    if job.status == STATUS_QUEUED:
+        job.status = STATUS_CANCELLED
+        job.finished_at = datetime.now(timezone.utc)
+    elif job.status == STATUS_RUNNING:
+        job.cancel_requested = True
+    await db.commit()
+    return job
+
+
+async def wait_for_job(job_id: int, timeout: float, interval: float = 0.25) -> Job | None:
+    """Poll until the job finishes or timeout passes; returns its latest state."""
+    deadline = time.monotonic() + timeout
+    while True:
+        async with AsyncSessionLocal() as db:
+            job = await db.get(Job, job_id)
+        if job is None or job.status in FINISHED_STATUSES or time.monotonic() >= deadline:
+            return job
+        await asyncio.sleep(interval)
+
+
+async def _finish(job_id: int, status: int, result: dict | None = None, error: str | None = None) -> None:
+    values: dict[str, Any] = {"status": status, "finished_at": datetime.now(timezone.utc), "error": error}
+    if status == STATUS_DONE:
+        values.update(progress=1.0, result=result)
+    async with AsyncSessionLocal() as db:
+        await db.execute(update(Job).where(Job.id == job_id).values(**values))
+        await db.commit()
+
+
+async def fail_stale_jobs(db: AsyncSession) -> int:
+    """Mark running jobs whose process stopped heartbeating as failed."""
+    cutoff = datetime.now(timezone.utc) - timedelta(seconds=settings.JOB_STALE_AFTER)
+    result = await db.execute(
+        update(Job)
+        .where(Job.status == STATUS_RUNNING, Job.heartbeat_at < cutoff)
+        .values(status=STATUS_FAILED, error="Worker lost (no heartbeat)", finished_at=datetime.now(timezone.utc))
+    )
+    await db.commit()
+    if result.rowcount:
+        logger.warning("Marked %d stale jobs as failed", result.rowcount)
+    return result.rowcount
+
+
+# ── Runner ────────────────────────────────────────────────────────────────────
+
+class JobRunner:
+    """Bounded pool of workers executing queued jobs in this process."""
+
+    def __init__(self, workers: int) -> None:
+        self.workers = workers
+        self._tasks: list[asyncio.Task] = []
+        self._running: dict[int, tuple[asyncio.Task, JobContext]] = {}
+        self._cancelling: set[int] = set()
+        self._wakeup = asyncio.Event()
+
+    def wake(self) -> None:
+        self._wakeup.set()
+
+    async def start(self) -> None:
+        async with AsyncSessionLocal() as db:
+            await fail_stale_jobs(db)
+        self._tasks = [
+            asyncio.create_task(self._worker(), name=f"job_worker_{i}") for i in range(self.workers)
+        ]
+        self._tasks.append(asyncio.create_task(self._heartbeat(), name="job_heartbeat"))
+
+    async def stop(self) -> None:
+        for task in self._tasks:
+            task.cancel()
+        for task in self._tasks:
+            try:
+                await task
+            except asyncio.CancelledError:
+                pass
+        self._tasks = []
+
+    async def _claim(self) -> tuple[int, str, dict] | None:
+        now = datetime.now(timezone.utc)
+        next_job = (
+            select(Job.id).where(Job.status == STATUS_QUEUED)
+            .order_by(Job.id).limit(1)
+            .with_for_update(skip_locked=True)
+            .scalar_subquery()
+        )
+        async with AsyncSessionLocal() as db:
+            row = (await db.execute(
+                update(Job).where(Job.id == next_job)
+                .values(status=STATUS_RUNNING, worker=WORKER_NAME, started_at=now, heartbeat_at=now)
+                .returning(Job.id, Job.kind, Job.params)
+            )).one_or_none()
+            await db.commit()
+        return tuple(row) if row else None
+
+    async def _worker(self) -> None:
+        while True:
+            try:
+                claimed = await self._claim()
+            except asyncio.CancelledError:
+                raise
+            except Exception as exc:
+                logger.exception("Job claim failed: %s", exc)
+                claimed = None
+            if claimed is None:
+                self._wakeup.clear()
+                try:
+                    await asyncio.wait_for(self._wakeup.wait(), settings.JOB_POLL_INTERVAL)
+                except asyncio.TimeoutError:
+                    pass
+                continue
+            await self._run(*claimed)
+
+    async def _run(self, job_id: int, kind: str, params: dict) -> None:
+        handler = _handlers.get(kind)
+        if handler is None:
+            await _finish(job_id, STATUS_FAILED, error=f"Unknown job kind {kind!r}")
+            return
+        started = time.monotonic()
+        ctx = JobContext(job_id, AsyncSessionLocal(), params)
+        task = asyncio.create_task(self._execute(ctx, handler), name=f"job_{job_id}_{kind}")
+        self._running[job_id] = (task, ctx)
+        try:
+            result = await task
+        except (JobCancelled, asyncio.CancelledError):
+            if job_id not in self._cancelling:
+                # Shutdown: leave a trace instead of a job stuck in running
+                await asyncio.shield(_finish(job_id, STATUS_FAILED, error="Interrupted by server shutdown"))
+                raise
+            await _finish(job_id, STATUS_CANCELLED)
+            logger.info("%s job %d cancelled", kind, job_id)
+        except Exception as exc:
+            logger.exception("%s job %d failed", kind, job_id)
+            await _finish(job_id, STATUS_FAILED, error=f"{type(exc).__name__}: {exc}"[:512])
+        else:
+            await _finish(job_id, STATUS_DONE, result=result)
+            logger.info("%s job %d done in %.1fs", kind, job_id, time.monotonic() - started)
+        finally:
+            self._running.pop(job_id, None)
+            self._cancelling.discard(job_id)
+
+    async def _execute(self, ctx: JobContext, handler: Handler) -> dict | None:
+        async with ctx.db as db:
+            try:
+                return await handler(ctx, **ctx.params)
+            except JobCancelled:
+                self._cancelling.add(ctx.job_id)
+                await db.rollback()
+                raise
+
+    async def _heartbeat(self) -> None:
+        while True:
+            await asyncio.sleep(settings.JOB_HEARTBEAT_INTERVAL)
+            try:
+                if self._running:
+                    async with AsyncSessionLocal() as db:
+                        rows = (await db.execute(
+                            update(Job).where(Job.id.in_(list(self._running)))
+                            .values(heartbeat_at=datetime.now(timezone.utc))
+                            .returning(Job.id, Job.cancel_requested)
+                        )).all()
+                        await db.commit()
+                    for job_id, cancel in rows:
+                        task, ctx = self._running.get(job_id, (None, None))
+                        if cancel and task is not None and ctx.cancellable and job_id not in self._cancelling:
+                            self._cancelling.add(job_id)
+                            task.cancel()
+                async with AsyncSessionLocal() as db:
+                    await fail_stale_jobs(db)
+            except asyncio.CancelledError:
+                raise
+            except Exception as exc:
+                logger.warning("Job heartbeat failed: %s", exc)
+
+
+_runner: JobRunner | None = None
+
+
+async def start_job_runner() -> None:
+    global _runner
+    if settings.JOB_WORKERS > 0 and _runner is None:
+        _runner = JobRunner(settings.JOB_WORKERS)
+        await _runner.start()
+
+
+async def stop_job_runner() -> None:
+    global _runner
+    if _runner is not None:
+        await _runner.stop()
+        _runner = None
@@ -0,0 +1,362 @@
+"""
+In-memory multiplayer leaderboard.
+
+Net worth (money + ship list prices + cargo at market) for every non-NPC
+player is kept in an indexable skiplist ordered by (-net_worth, player_id),
+so rank lookups and top-K pages cost O(log n) instead of a full load and
+sort per request.
+
+Keeping it current:
+  - an after_flush listener collects players whose money, ships (purchase,
+    loss, cargo) or workers a session writes. After commit they are marked
+    dirty here and, through the cluster relay / simulator IPC (op
+    "leaderboard_dirty"), in every other process, so the tick's mining,
+    sales and payroll reach all workers. Dirty players are re-read with
+    lean column queries on the next leaderboard read;
+  - a full rebuild (the same lean queries, unfiltered) runs in the
+    background every LEADERBOARD_REBUILD_INTERVAL seconds as a safety net
+    for bulk statements no listener sees, and to revalue cargo at drifted
+    market prices. Only the very first build happens inside a request.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+import random
+import time
+from dataclasses import dataclass
+from typing import Iterable
+
+from sqlalchemy import event, func, inspect, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+
+from server.config import settings
+from server.database import AsyncSessionLocal
+from server.models.player import Player
+from server.models.ship import SHIP_CLASS_STATS, Ship
+from server.models.worker import Worker
+from server.simulation.ore import stack
+from server.simulation.tick import get_price_vector
+
+logger = logging.getLogger(__name__)
+
+_MAX_LEVEL = 24
+_RELAY_CHUNK = 500  # player ids per relayed message (NOTIFY payloads stay under 8 kB)
+
+
+# ── Indexable skiplist ────────────────────────────────────────────────────────
+
+class _Node:
+    __slots__ = ("key", "next", "width")
+
+    def __init__(self, key, level: int) -> None:
+        self.key = key
+        self.next: list[_Node | None] = [None] * level
+        self.width: list[int] = [1] * level  # elements skipped by next[i], inclusive
+
+
+class IndexableSkiplist:
+    """Sorted keys with O(log n) insert, remove, rank and positional access."""
+
+    def __init__(self) -> None:
+        self._head = _Node(None, _MAX_LEVEL)
+        self._level = 1
+        self._size = 0
+
+    def __len__(self) -> int:
+        return self._size
+
+    def _random_level(self) -> int:
+        level = 1
+        while level < _MAX_LEVEL and random.random() < 0.5:
+            level += 1
+        return level
+
+    def insert(self, key) -> None:
+        update: list[_Node] = [self._head] * _MAX_LEVEL
+        rank = [0] * _MAX_LEVEL
+        node = self._head
+        for i in range(self._level - 1, -1, -1):
+            rank[i] = rank[i + 1] if i + 1 < self._level else 0
+            while node.next[i] is not None and node.next[i].key < key:
+                rank[i] += node.width[i]
+                node = node.next[i]
+            update[i] = node
+
+        level = self._random_level()
+        if level > self._level:
+            for i in range(self._level, level):
+                rank[i] = 0
+                update[i] = self._head
+                self._head.width[i] = self._size + 1
+            self._level = level
+
+        new = _Node(key, level)
+        for i in range(level):
+            prev = update[i]
+            new.next[i] = prev.next[i]
+            prev.next[i] = new
+            new.width[i] = prev.width[i] - (rank[0] - rank[i])
+            prev.width[i] = rank[0] - rank[i] + 1
+        for i in range(level, self._level):
+            update[i].width[i] += 1
+        self._size += 1
+
+    def remove(self, key) -> bool:
+        update: list[_Node] = [self._head] * _MAX_LEVEL
+        node = self._head
+        for i in range(self._level - 1, -1, -1):
+            while node.next[i] is not None and node.next[i].key < key:
+                node = node.next[i]
+            update[i] = node
+        target = node.next[0]
+        if target is None or target.key != key:
+            return False
+        for i in range(self._level):
+            if update[i].next[i] is target:
+                update[i].width[i] += target.width[i] - 1
+                update[i].next[i] = target.next[i]
+            else:
+                update[i].width[i] -= 1
+        while self._level > 1 and self._head.next[self._level - 1] is None:
+            self._level -= 1
+        self._size -= 1
+        return True
+
+    def count_less(self, key) -> int:
+        """Number of keys strictly less than key."""
+        count = 0
+        node = self._head
+        for i in range(self._level - 1, -1, -1):
+            while node.next[i] is not None and node.next[i].key < key:
+                count += node.width[i]
+                node = node.next[i]
+        return count
+
+    def slice(self, start: int, count: int) -> list:
+        """Keys at positions [start, start + count)."""
+        if start >= self._size or count <= 0:
+            return []
+        node = self._head
+        remaining = start + 1  # 1-based position of the first wanted node
+        for i in range(self._level - 1, -1, -1):
+            while node.next[i] is not None and node.width[i] <= remaining:
+                remaining -= node.width[i]
+                node = node.next[i]
+        out = []
+        while node is not None and len(out) < count:
+            out.append(node.key)
+            node = node.next[0]
+        return out
+
+
+# ── Leaderboard ───────────────────────────────────────────────────────────────
+
+@dataclass(frozen=True)
+class LeaderboardEntry:
+    player_id: int
+    username: str
+    net_worth: int
+    money: int
+    ship_value: int
+    cargo_value: int
+    ships_count: int
+    workers_count: int
+
+    @property
+    def key(self) -> tuple[int, int]:
+        return (-self.net_worth, self.player_id)
+
+    def as_dict(self) -> dict:
+        return {
+            "player_id": self.player_id,
+            "username": self.username,
+            "net_worth": self.net_worth,
+            "money": self.money,
+            "ship_value": self.ship_value,
+            "cargo_value": self.cargo_value,
+            "ships_count": self.ships_count,
+            "workers_count": self.workers_count,
+        }
+
+
+class LeaderboardIndex:
+    def __init__(self) -> None:
+        self._order = IndexableSkiplist()
+        self._entries: dict[int, LeaderboardEntry] = {}
+        self._dirty: set[int] = set()
+        self._built_at: float | None = None
+        self._lock = asyncio.Lock()
+        self._rebuild_task: asyncio.Task | None = None
+        self._refreshed: set[int] | None = None  # ids sync re-read while a rebuild is loading
+
+    def mark_dirty(self, player_ids: Iterable[int]) -> None:
+        self._dirty.update(player_ids)
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def _put(self, entry: LeaderboardEntry) -> None:
+        old = self._entries.get(entry.player_id)
+        if old is not None:
+            if old == entry:
+                return
+            self._order.remove(old.key)
+        self._entries[entry.player_id] = entry
+        self._order.insert(entry.key)
+
+    def _drop(self, player_id: int) -> None:
+        old = self._entries.pop(player_id, None)
+        if old is not None:
+            self._order.remove(old.key)
+
+    def _replace(self, fresh: dict[int, LeaderboardEntry]) -> None:
+        self._order = IndexableSkiplist()
+        self._entries = {}
+        for entry in fresh.values():
+            self._put(entry)
+        self._built_at = time.monotonic()
+
+    async def _rebuild(self) -> None:
+        try:
+            async with AsyncSessionLocal() as db:
+                fresh = await _load_entries(db, None)
+            async with self._lock:
+                self._replace(fresh)
+                # The rebuild's rows may predate what sync put meanwhile: re-read those players
+                self._dirty |= self._refreshed
+        except Exception as exc:
+            logger.warning("Leaderboard rebuild failed: %s", exc)
+            self._built_at = time.monotonic()  # retry after the next interval, not on every read
+        finally:
+            self._refreshed = None
+
+    async def sync(self, db: AsyncSession) -> None:
+        """Bring the index up to date: refresh dirty players, rebuild in the background when stale."""
+        async with self._lock:
+            if self._built_at is None:
+                self._dirty.clear()
+                self._replace(await _load_entries(db, None))
+                return
+            stale = time.monotonic() - self._built_at > settings.LEADERBOARD_REBUILD_INTERVAL
+            if stale and (self._rebuild_task is None or self._rebuild_task.done()):
+                self._refreshed = set()
+                self._rebuild_task = asyncio.create_task(self._rebuild(), name="leaderboard_rebuild")
+            if self._dirty:
+                ids, self._dirty = self._dirty, set()
+                if self._refreshed is not None:
+                    self._refreshed |= ids
+                fresh = await _load_entries(db, ids)
+                for player_id in ids:
+                    if player_id in fresh:
+                        self._put(fresh[player_id])
+                    else:
+                        self._drop(player_id)  # deleted or NPC
+
+    def page(self, offset: int, limit: int) -> list[LeaderboardEntry]:
+        return [self._entries[player_id] for _, player_id in self._order.slice(offset, limit)]
+
+    def get(self, player_id: int) -> LeaderboardEntry | None:
+        return self._entries.get(player_id)
+
+    def rank(self, player_id: int) -> int | None:
+        """1 + number of players with strictly higher net worth (ties share a rank)."""
+        entry = self._entries.get(player_id)
+        if entry is None:
+            return None
+        return self._order.count_less((-entry.net_worth, 0)) + 1
+
+
+async def _load_entries(db: AsyncSession, player_ids: set[int] | None) -> dict[int, LeaderboardEntry]:
+    """Compute entries with three column-only queries (all non-NPC players when ids is None)."""
+    prices = get_price_vector()
+
+    players_q = select(Player.id, Player.username, Player.money).where(Player.is_npc == False)  # noqa: E712
+    ships_q = select(Ship.player_id, Ship.ship_class, Ship.current_cargo).where(Ship.player_id.isnot(None))
+    workers_q = select(Worker.player_id, func.count()).group_by(Worker.player_id)
+    if player_ids is not None:
+        players_q = players_q.where(Player.id.in_(player_ids))
+        ships_q = ships_q.where(Ship.player_id.in_(player_ids))
+        workers_q = workers_q.where(Worker.player_id.in_(player_ids))
+
+    players = (await db.execute(players_q)).all()
+    if not players:
+        return {}
+    ship_value: dict[int, int] = {}
+    cargo_value: dict[int, int] = {}
+    ships_count: dict[int, int] = {}
+    ships = (await db.execute(ships_q)).all()
+    # Every ship's cargo valued in one (ships x ores) @ (ores) product
+    values = stack([cargo for _, _, cargo in ships]) @ prices.values if ships else ()
+    for (player_id, ship_class, _), value in zip(ships, values):
+        ship_value[player_id] = ship_value.get(player_id, 0) + SHIP_CLASS_STATS.get(ship_class, {}).get("base_price", 0)
+        ships_count[player_id] = ships_count.get(player_id, 0) + 1
+        cargo_value[player_id] = cargo_value.get(player_id, 0) + int(value)
+    workers = dict((await db.execute(workers_q)).all())
+
+    entries = {}
+    for player_id, username, money in players:
+        sv, cv = ship_value.get(player_id, 0), cargo_value.get(player_id, 0)
+        entries[player_id] = LeaderboardEntry(
+            player_id=player_id,
+            username=username,
+            net_worth=money + sv + cv,
+            money=money,
+            ship_value=sv,
+            cargo_value=cv,
+            ships_count=ships_count.get(player_id, 0),
+            workers_count=workers.get(player_id, 0),
+        )
+    return entries
+
+
+leaderboard_index = LeaderboardIndex()
+
+_PLAYER_FIELDS = ("money", "username", "is_npc")
+_SHIP_FIELDS = ("current_cargo", "ship_class", "player_id")
+
+
+@event.listens_for(Session, "after_flush")
+def _collect_changed_players(session: Session, flush_context) -> None:
+    touched: set[int] = session.info.setdefault("leaderboard_players", set())
+    for obj in session.new | session.deleted:
+        if isinstance(obj, Player):
+            touched.add(obj.id)
+        elif isinstance(obj, (Ship, Worker)) and obj.player_id is not None:
+            touched.add(obj.player_id)
+    for obj in session.dirty:
+        if isinstance(obj, Player):
+            state = inspect(obj)
+            if any(state.attrs[f].history.has_changes() for f in _PLAYER_FIELDS):
+                touched.add(obj.id)
+        elif isinstance(obj, Ship):
+            state = inspect(obj)
+            if any(state.attrs[f].history.has_changes() for f in _SHIP_FIELDS):
+                if obj.player_id is not None:
+                    touched.add(obj.player_id)
+                touched.update(p for p in state.attrs["player_id"].history.deleted if p)  # transferred away
+        elif isinstance(obj, Worker):
+            history = inspect(obj).attrs["player_id"].history
+            touched.update(p for p in (*history.added, *history.deleted) if p)
+
+
+@event.listens_for(Session, "after_commit")
+def _mark_changed_players(session: Session) -> None:
+    touched = session.info.pop("leaderboard_players", None)
+    if touched:
+        mark_players_dirty(touched)
+
+
+@event.listens_for(Session, "after_rollback")
+def _drop_changed_players(session: Session) -> None:
+    session.info.pop("leaderboard_players", None)
+
+
+def mark_players_dirty(player_ids: Iterable[int]) -> None:
+    """Mark players dirty in every process's index (for writes made with bulk statements too)."""
+    from server.simulation.cluster import send_command
+    ids = sorted(set(player_ids))
+    for i in range(0, len(ids), _RELAY_CHUNK):
+        send_command("leaderboard_dirty", players=ids[i:i + _RELAY_CHUNK])
@@ -1,6 +1,5 @@
 from __future__ import annotations
 
-import asyncio
 import logging
 from pathlib import Path
 
@@ -10,16 +9,19 @@ from fastapi.middleware.httpsredirect import HTTPSRedirectMiddleware
 from fastapi.middleware.trustedhost import TrustedHostMiddleware
 from fastapi.responses import FileResponse, JSONResponse
 from fastapi.staticfiles import StaticFiles
-from slowapi.errors import RateLimitExceeded
 from starlette.middleware.base import BaseHTTPMiddleware
 from starlette.middleware.sessions import SessionMiddleware
 
+from server.auth import shutdown_hash_pool
 from server.blog_database import init_blog_db
 from server.config import settings
-from server.database import init_db
-from server.rate_limit import limiter, rate_limit_handler
+from server.database import count_queries, init_db
+from server.email_service import start_email_worker, stop_email_worker
+from server.jobs import start_job_runner, stop_job_runner
+from server.world_stats import start_world_stats, stop_world_stats
+from server.rate_limit import RateLimitExceeded, limiter, rate_limit_handler
 from server.routers import account_settings, admin, admin_speed, admin_ui, auth, blog, bug_reports, contracts, events, game, leaderboard, password_reset
-from server.simulation.runner import simulation_loop
+from server.simulation.cluster import start_cluster, stop_cluster
 
 # Configure logging
 log_level = getattr(logging, settings.LOG_LEVEL.upper(), logging.INFO)
@@ -50,6 +52,16 @@ class LimitUploadSize(BaseHTTPMiddleware):
         return await call_next(request)
 
 
+class QueryCountHeader(BaseHTTPMiddleware):
+    """Development aid: report SQL statements per request in X-DB-Queries."""
+
+    async def dispatch(self, request: Request, call_next):
+        counter = count_queries()
+        response = await call_next(request)
+        response.headers["X-DB-Queries"] = str(counter[0])
+        return response
+
+
 app = FastAPI(
     title="Claim Server",
     description="Space mining simulation API for the Claim game.",
@@ -66,6 +78,9 @@ app.add_exception_handler(RateLimitExceeded, rate_limit_handler)
 # Request size limiting (always enabled)
 app.add_middleware(LimitUploadSize, max_upload_size=10 * 1024 * 1024)  # 10MB
 
+if settings.ENVIRONMENT == "development":
+    app.add_middleware(QueryCountHeader)
+
 # Session middleware for admin UI
 app.add_middleware(
     SessionMiddleware,
@@ -105,9 +120,6 @@ static_dir = Path(__file__).parent.parent / "static"
 static_dir.mkdir(exist_ok=True)
 app.mount("/static", StaticFiles(directory=str(static_dir)), name="static")
 
-_sim_task: asyncio.Task | None = None
-
-
 @app.exception_handler(Exception)
 async def generic_exception_handler(request: Request, exc: Exception) -> JSONResponse:
     """Hide stack traces in production, show in development."""
@@ -124,7 +136,6 @@ async def generic_exception_handler(request: Request, exc: Exception) -> JSONRes
 
 @app.on_event("startup")
 async def on_startup() -> None:
-    global _sim_task
     logger.info("Claim Server starting up...")
 
     # Validate production settings (any non-development environment)
@@ -140,19 +151,21 @@ async def on_startup() -> None:
     await init_blog_db()
     logger.info("Blog database initialized")
 
-    _sim_task = asyncio.create_task(simulation_loop(world_id=1), name="simulation_loop")
-    logger.info("Simulation loop started for world: %s", settings.WORLD_NAME)
+    # Only the worker holding the leader lock ticks the world; see simulation/cluster.py
+    await start_cluster(world_id=1)
+    await start_email_worker()
+    await start_job_runner()
+    await start_world_stats()
+    logger.info("Cluster started for world: %s", settings.WORLD_NAME)
 
 
 @app.on_event("shutdown")
 async def on_shutdown() -> None:
-    global _sim_task
-    if _sim_task and not _sim_task.done():
-        _sim_task.cancel()
-        try:
-            await _sim_task
-        except asyncio.CancelledError:
-            pass
+    await stop_cluster()
+    await stop_email_worker()
+    await stop_job_runner()
+    await stop_world_stats()
+    shutdown_hash_pool()
     logger.info("Claim Server shut down.")
 
 
@@ -1,21 +1,38 @@
 from server.models.asteroid import Asteroid
+from server.models.asteroid_reserve import AsteroidReserve
 from server.models.bug_report import BugReport
 from server.models.colony import Colony
+from server.models.email_outbox import EmailOutbox
+from server.models.job import Job
 from server.models.mission import Mission
+from server.models.mission_history import MissionHistory, PlayerMissionSummary, TradeMissionHistory
 from server.models.player import Player
 from server.models.ship import Ship
-from server.models.transaction import PlayerTransaction
+from server.models.sp_score import SPBestScore, SPScore
+from server.models.transaction import LedgerRollupState, PlayerFinanceDaily, PlayerTransaction
 from server.models.worker import Worker
 from server.models.world_state import WorldState
+from server.models.world_stats import WorldStats
 
 __all__ = [
     "Asteroid",
+    "AsteroidReserve",
     "BugReport",
     "Colony",
+    "EmailOutbox",
+    "Job",
+    "LedgerRollupState",
     "Mission",
+    "MissionHistory",
     "Player",
+    "PlayerFinanceDaily",
+    "PlayerMissionSummary",
     "PlayerTransaction",
     "Ship",
+    "SPBestScore",
+    "SPScore",
+    "TradeMissionHistory",
     "Worker",
     "WorldState",
+    "WorldStats",
 ]
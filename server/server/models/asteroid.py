@@ -36,8 +36,7 @@ class Asteroid(Base):
     # ---------- Reserve depletion system ----------
     estimated_mass_kg: Mapped[float] = mapped_column(Float, nullable=False, default=0.0)
     composition: Mapped[dict] = mapped_column(JSONB, default=dict, nullable=False)  # {material: percentage}
-    reserves: Mapped[dict] = mapped_column(JSONB, default=dict, nullable=False)  # {material: remaining tonnes}
-    original_reserves: Mapped[dict] = mapped_column(JSONB, default=dict, nullable=False)  # {material: original tonnes}
+    # Remaining/original tonnes per ore live in asteroid_reserves (server/simulation/reserves.py)
 
     def __repr__(self) -> str:
         return f"<Asteroid id={self.id} name={self.asteroid_name!r} type={self.body_type}>"
@@ -0,0 +1,28 @@
+from sqlalchemy import Float, ForeignKey, Index, Integer, String
+from sqlalchemy.orm import Mapped, mapped_column
+
+from server.database import Base
+
+
+class AsteroidReserve(Base):
+    """
+    Remaining extractable tonnes of one ore at one asteroid.
+
+    Written through server/simulation/reserves.py: mining applies atomic
+    per-ore decrements, generation replaces an asteroid's rows.
+    """
+    __tablename__ = "asteroid_reserves"
+    __table_args__ = (
+        # Capacity/stats sums per ore read only this index
+        Index("idx_asteroid_reserves_ore", "ore_type", postgresql_include=["tonnes"]),
+    )
+
+    asteroid_id: Mapped[int] = mapped_column(
+        Integer, ForeignKey("asteroids.id", ondelete="CASCADE"), primary_key=True
+    )
+    ore_type: Mapped[str] = mapped_column(String(32), primary_key=True)
+    tonnes: Mapped[float] = mapped_column(Float, nullable=False, default=0.0)
+    original_tonnes: Mapped[float] = mapped_column(Float, nullable=False, default=0.0)  # for UI depletion %
+
+    def __repr__(self) -> str:
+        return f"<AsteroidReserve asteroid={self.asteroid_id} ore={self.ore_type} tonnes={self.tonnes}>"
@@ -0,0 +1,48 @@
+"""Email outbox model — messages waiting for the delivery worker."""
+
+from datetime import datetime
+from sqlalchemy import DateTime, Index, Integer, String, Text, func, text
+from sqlalchemy.orm import Mapped, mapped_column
+
+from server.database import Base
+
+# Status constants
+STATUS_PENDING = 0
+STATUS_SENT = 1
+STATUS_FAILED = 2  # gave up: permanent SMTP error or out of attempts
+
+
+class EmailOutbox(Base):
+    """
+    One outgoing email. Request handlers insert rows in the same transaction
+    as the change that triggers them; server/email_service.py delivers them.
+    """
+    __tablename__ = "email_outbox"
+    __table_args__ = (
+        Index(
+            "idx_email_outbox_due", "next_attempt_at",
+            postgresql_where=text("status = 0"),
+        ),
+    )
+
+    id: Mapped[int] = mapped_column(Integer, primary_key=True)
+    kind: Mapped[str] = mapped_column(String(32), nullable=False)  # e.g. "password_reset"
+    to_email: Mapped[str] = mapped_column(String(255), nullable=False)
+    subject: Mapped[str] = mapped_column(String(255), nullable=False)
+    body_text: Mapped[str] = mapped_column(Text, nullable=False)
+    body_html: Mapped[str | None] = mapped_column(Text, nullable=True)
+
+    status: Mapped[int] = mapped_column(Integer, default=STATUS_PENDING, nullable=False)
+    attempts: Mapped[int] = mapped_column(Integer, default=0, nullable=False)
+    next_attempt_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True), server_default=func.now(), nullable=False
+    )
+    last_error: Mapped[str | None] = mapped_column(String(512), nullable=True)
+
+    created_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True), server_default=func.now(), nullable=False
+    )
+    sent_at: Mapped[datetime | None] = mapped_column(DateTime(timezone=True), nullable=True)
+
+    def __repr__(self) -> str:
+        return f"<EmailOutbox(id={self.id}, kind={self.kind}, to={self.to_email}, status={self.status})>"
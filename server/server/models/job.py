@@ -0,0 +1,74 @@
+"""Background job model — long admin operations run by server/jobs.py."""
+
+from datetime import datetime
+from sqlalchemy import Boolean, DateTime, Float, Index, Integer, String, func, text
+from sqlalchemy.dialects.postgresql import JSONB
+from sqlalchemy.orm import Mapped, mapped_column
+
+from server.database import Base
+
+# Status constants
+STATUS_QUEUED = 0
+STATUS_RUNNING = 1
+STATUS_DONE = 2
+STATUS_FAILED = 3
+STATUS_CANCELLED = 4
+
+STATUS_NAMES = {
+    STATUS_QUEUED: "queued",
+    STATUS_RUNNING: "running",
+    STATUS_DONE: "done",
+    STATUS_FAILED: "failed",
+    STATUS_CANCELLED: "cancelled",
+}
+FINISHED_STATUSES = (STATUS_DONE, STATUS_FAILED, STATUS_CANCELLED)
+
+
+class Job(Base):
+    """
+    One queued or finished job. Any API process with JOB_WORKERS > 0 may
+    claim it; progress, heartbeat and cancellation go through this row.
+    """
+    __tablename__ = "jobs"
+    __table_args__ = (
+        Index("idx_jobs_queued", "id", postgresql_where=text("status = 0")),
+    )
+
+    id: Mapped[int] = mapped_column(Integer, primary_key=True)
+    kind: Mapped[str] = mapped_column(String(32), nullable=False)  # e.g. "reset_world"
+    params: Mapped[dict] = mapped_column(JSONB, default=dict, nullable=False)
+
+    status: Mapped[int] = mapped_column(Integer, default=STATUS_QUEUED, nullable=False)
+    progress: Mapped[float] = mapped_column(Float, default=0.0, nullable=False)  # 0..1
+    message: Mapped[str] = mapped_column(String(255), default="", nullable=False)
+    result: Mapped[dict | None] = mapped_column(JSONB, nullable=True)
+    error: Mapped[str | None] = mapped_column(String(512), nullable=True)
+    cancel_requested: Mapped[bool] = mapped_column(Boolean, default=False, nullable=False)
+
+    worker: Mapped[str | None] = mapped_column(String(64), nullable=True)  # host:pid running it
+    created_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True), server_default=func.now(), nullable=False
+    )
+    started_at: Mapped[datetime | None] = mapped_column(DateTime(timezone=True), nullable=True)
+    heartbeat_at: Mapped[datetime | None] = mapped_column(DateTime(timezone=True), nullable=True)
+    finished_at: Mapped[datetime | None] = mapped_column(DateTime(timezone=True), nullable=True)
+
+    def as_dict(self) -> dict:
+        return {
+            "job_id": self.id,
+            "kind": self.kind,
+            "params": self.params,
+            "status": STATUS_NAMES.get(self.status, str(self.status)),
+            "progress_pct": round(self.progress * 100, 1),
+            "message": self.message,
+            "result": self.result,
+            "error": self.error,
+            "cancel_requested": self.cancel_requested,
+            "worker": self.worker,
+            "created_at": self.created_at.isoformat() if self.created_at else None,
+            "started_at": self.started_at.isoformat() if self.started_at else None,
+            "finished_at": self.finished_at.isoformat() if self.finished_at else None,
+        }
+
+    def __repr__(self) -> str:
+        return f"<Job(id={self.id}, kind={self.kind}, status={self.status})>"
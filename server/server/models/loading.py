@@ -0,0 +1,78 @@
+"""
+Named relationship loading profiles.
+
+Relationships default to no loading: collections are declared lazy="raise"
+and Mission.asteroid lazy="raise_on_sql", so touching an unloaded
+relationship fails loudly instead of quietly issuing SELECTs. Each endpoint
+and tick phase opts into the profile that matches what it actually reads:
+
+    select(Mission).options(*load_profile("tick.missions"))
+
+Profiles are keyed "<caller>.<root entity>". Add a new one rather than
+widening an existing profile for a single caller.
+"""
+
+from __future__ import annotations
+
+from sqlalchemy.orm import joinedload, raiseload, selectinload
+from sqlalchemy.orm.interfaces import LoaderOption
+
+# Building loader options configures the mappers, so every class a profile
+# can reach has to be registered first.
+from server.models import asteroid, bug_report, colony, equipment, worker  # noqa: F401
+from server.models.mission import Mission
+from server.models.player import Player
+from server.models.rig import Rig
+from server.models.ship import Ship
+from server.models.trade_mission import TradeMission
+
+PROFILES: dict[str, tuple[LoaderOption, ...]] = {
+    # Authentication: the Player row only.
+    "auth.player": (raiseload("*"),),
+
+    # GET /game/state — MissionOut/ShipOut only read columns.
+    "state.missions": (raiseload("*"),),
+    "state.ships": (raiseload("*"),),
+
+    # GET /game/world — owner username / NPC flag per ship, one joined query.
+    "world.ships": (
+        joinedload(Ship.player).load_only(Player.username, Player.is_npc),
+        raiseload("*"),
+    ),
+
+    # PvP combat reads weapons/armor on both ships and the target's owner.
+    "combat.attacker": (selectinload(Ship.equipment),),
+    "combat.target": (selectinload(Ship.equipment), joinedload(Ship.player)),
+
+    # Tick: mining missions touch crew, equipment, asteroid yields and owner.
+    "tick.missions": (
+        selectinload(Mission.ship).selectinload(Ship.workers),
+        selectinload(Mission.ship).selectinload(Ship.equipment),
+        selectinload(Mission.asteroid),
+        selectinload(Mission.player),
+    ),
+    # Tick: trade missions touch crew, equipment and owner.
+    "tick.trade_missions": (
+        selectinload(TradeMission.ship).selectinload(Ship.workers),
+        selectinload(TradeMission.ship).selectinload(Ship.equipment),
+        selectinload(TradeMission.player),
+    ),
+    "tick.rigs": (
+        selectinload(Rig.asteroid),
+        selectinload(Rig.assigned_workers),
+    ),
+
+    # NPC corporations iterate their fleets.
+    "npc.players": (selectinload(Player.ships),),
+
+    # Account deletion previews count salvageable equipment.
+    "deletion.ships": (selectinload(Ship.equipment),),
+}
+
+
+def load_profile(name: str) -> tuple[LoaderOption, ...]:
+    """Loader options for a named profile. Unknown names raise KeyError."""
+    try:
+        return PROFILES[name]
+    except KeyError:
+        raise KeyError(f"Unknown loading profile {name!r}") from None
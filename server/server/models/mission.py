@@ -1,6 +1,6 @@
 from datetime import datetime
 
-from sqlalchemy import Boolean, DateTime, Float, ForeignKey, Integer, String, func
+from sqlalchemy import BigInteger, Boolean, DateTime, Float, ForeignKey, Integer, String, func
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
 from server.database import Base
@@ -81,6 +81,10 @@ class Mission(Base):
     # How long to spend mining (in game seconds = real seconds at 1x)
     mining_duration: Mapped[float] = mapped_column(Float, default=86400.0, nullable=False)
 
+    # Outcome totals, carried into mission_history when the mission is archived
+    tonnes_mined: Mapped[float] = mapped_column(Float, default=0.0, server_default="0", nullable=False)
+    revenue: Mapped[int] = mapped_column(BigInteger, default=0, server_default="0", nullable=False)
+
     created_at: Mapped[datetime] = mapped_column(
         DateTime(timezone=True),
         server_default=func.now(),
@@ -92,7 +96,7 @@ class Mission(Base):
     ship: Mapped["Ship"] = relationship(  # noqa: F821
         "Ship", back_populates="missions", foreign_keys=[ship_id]
     )
-    asteroid: Mapped["Asteroid | None"] = relationship("Asteroid", lazy="selectin")  # noqa: F821
+    asteroid: Mapped["Asteroid | None"] = relationship("Asteroid", lazy="raise_on_sql")  # noqa: F821
 
     @property
     def mission_type_name(self) -> str:
@@ -0,0 +1,88 @@
+"""
+Append-only history of finished missions.
+
+Finished rows are moved here out of missions / trade_missions by
+server/simulation/archive.py so the hot tables only hold work in flight.
+ship_id / asteroid_id / colony_id are plain integers: history outlives the
+ship or asteroid it refers to. player_mission_summary keeps one running
+total row per player.
+"""
+
+from datetime import datetime
+
+from sqlalchemy import BigInteger, Boolean, DateTime, Float, ForeignKey, Index, Integer, String, func
+from sqlalchemy.orm import Mapped, mapped_column
+
+from server.database import Base
+
+
+class MissionHistory(Base):
+    __tablename__ = "mission_history"
+    __table_args__ = (Index("idx_mission_history_player_id", "player_id", "id"),)
+
+    id: Mapped[int] = mapped_column(Integer, primary_key=True)  # original missions.id
+    player_id: Mapped[int] = mapped_column(
+        Integer, ForeignKey("players.id", ondelete="CASCADE"), nullable=False
+    )
+    ship_id: Mapped[int] = mapped_column(Integer, nullable=False)
+    asteroid_id: Mapped[int | None] = mapped_column(Integer, nullable=True)
+    mission_type: Mapped[int] = mapped_column(Integer, nullable=False)
+    status: Mapped[int] = mapped_column(Integer, nullable=False)  # COMPLETED / FAILED / ABORTED
+    origin_name: Mapped[str] = mapped_column(String(64), nullable=False, default="")
+    origin_is_earth: Mapped[bool] = mapped_column(Boolean, nullable=False, default=True)
+    transit_time: Mapped[float] = mapped_column(Float, nullable=False)
+    mining_duration: Mapped[float] = mapped_column(Float, nullable=False)
+    tonnes_mined: Mapped[float] = mapped_column(Float, nullable=False, default=0.0)
+    revenue: Mapped[int] = mapped_column(BigInteger, nullable=False, default=0)
+    created_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), nullable=False)
+    archived_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True), server_default=func.now(), nullable=False
+    )
+
+    def __repr__(self) -> str:
+        return f"<MissionHistory id={self.id} player={self.player_id} status={self.status}>"
+
+
+class TradeMissionHistory(Base):
+    __tablename__ = "trade_mission_history"
+    __table_args__ = (Index("idx_trade_mission_history_player_id", "player_id", "id"),)
+
+    id: Mapped[int] = mapped_column(Integer, primary_key=True)  # original trade_missions.id
+    player_id: Mapped[int] = mapped_column(
+        Integer, ForeignKey("players.id", ondelete="CASCADE"), nullable=False
+    )
+    ship_id: Mapped[int] = mapped_column(Integer, nullable=False)
+    colony_id: Mapped[int | None] = mapped_column(Integer, nullable=True)
+    tonnes_sold: Mapped[float] = mapped_column(Float, nullable=False, default=0.0)
+    revenue: Mapped[int] = mapped_column(BigInteger, nullable=False, default=0)
+    origin_name: Mapped[str] = mapped_column(String(64), nullable=False, default="Earth")
+    transit_time: Mapped[float] = mapped_column(Float, nullable=False)
+    created_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), nullable=False)
+    archived_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True), server_default=func.now(), nullable=False
+    )
+
+    def __repr__(self) -> str:
+        return f"<TradeMissionHistory id={self.id} player={self.player_id} revenue={self.revenue}>"
+
+
+class PlayerMissionSummary(Base):
+    __tablename__ = "player_mission_summary"
+
+    player_id: Mapped[int] = mapped_column(
+        Integer, ForeignKey("players.id", ondelete="CASCADE"), primary_key=True
+    )
+    mission_runs: Mapped[int] = mapped_column(Integer, nullable=False, default=0)  # completed missions
+    trade_runs: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+    failed_runs: Mapped[int] = mapped_column(Integer, nullable=False, default=0)  # failed + aborted
+    revenue: Mapped[int] = mapped_column(BigInteger, nullable=False, default=0)
+    tonnes_mined: Mapped[float] = mapped_column(Float, nullable=False, default=0.0)
+    updated_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True), server_default=func.now(), nullable=False
+    )
+
+    def __repr__(self) -> str:
+        return (
+            f"<PlayerMissionSummary player={self.player_id} runs={self.mission_runs}+{self.trade_runs} "
+            f"revenue={self.revenue:,}>"
+        )
@@ -53,13 +53,13 @@ class Player(Base):
         nullable=False,
     )
 
-    # Relationships
-    ships: Mapped[list["Ship"]] = relationship("Ship", back_populates="player", lazy="selectin")  # noqa: F821
-    workers: Mapped[list["Worker"]] = relationship("Worker", back_populates="player", lazy="selectin")  # noqa: F821
-    missions: Mapped[list["Mission"]] = relationship("Mission", back_populates="player", lazy="selectin")  # noqa: F821
-    trade_missions: Mapped[list["TradeMission"]] = relationship("TradeMission", back_populates="player", lazy="selectin")  # noqa: F821
-    rigs: Mapped[list["Rig"]] = relationship("Rig", back_populates="player", lazy="selectin")  # noqa: F821
-    bug_reports: Mapped[list["BugReport"]] = relationship("BugReport", back_populates="player", lazy="selectin")  # noqa: F821
+    # Relationships — never loaded implicitly; see server/models/loading.py
+    ships: Mapped[list["Ship"]] = relationship("Ship", back_populates="player", lazy="raise", passive_deletes=True)  # noqa: F821
+    workers: Mapped[list["Worker"]] = relationship("Worker", back_populates="player", lazy="raise", passive_deletes=True)  # noqa: F821
+    missions: Mapped[list["Mission"]] = relationship("Mission", back_populates="player", lazy="raise", passive_deletes=True)  # noqa: F821
+    trade_missions: Mapped[list["TradeMission"]] = relationship("TradeMission", back_populates="player", lazy="raise", passive_deletes=True)  # noqa: F821
+    rigs: Mapped[list["Rig"]] = relationship("Rig", back_populates="player", lazy="raise", passive_deletes=True)  # noqa: F821
+    bug_reports: Mapped[list["BugReport"]] = relationship("BugReport", back_populates="player", lazy="raise", passive_deletes=True)  # noqa: F821
 
     def __repr__(self) -> str:
         return f"<Player id={self.id} username={self.username!r} money={self.money}>"
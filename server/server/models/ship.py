@@ -62,8 +62,9 @@ class Ship(Base):
     __tablename__ = "ships"
 
     id: Mapped[int] = mapped_column(Integer, primary_key=True, index=True)
-    player_id: Mapped[int] = mapped_column(
-        Integer, ForeignKey("players.id", ondelete="CASCADE"), nullable=False, index=True
+    # NULL once the owning corporation is dissolved (the ship drifts on as a derelict)
+    player_id: Mapped[int | None] = mapped_column(
+        Integer, ForeignKey("players.id", ondelete="CASCADE"), nullable=True, index=True
     )
 
     ship_name: Mapped[str] = mapped_column(String(64), nullable=False)
@@ -97,12 +98,12 @@ class Ship(Base):
     # {supply_type: units}  e.g. {"food": 30.0, "repair_parts": 5.0}
     supplies: Mapped[dict] = mapped_column(JSONB, default=dict, nullable=False)
 
-    # Relationships
+    # Relationships — never loaded implicitly; see server/models/loading.py
     player: Mapped["Player"] = relationship("Player", back_populates="ships")  # noqa: F821
-    workers: Mapped[list["Worker"]] = relationship("Worker", back_populates="ship", lazy="selectin")  # noqa: F821
-    equipment: Mapped[list["Equipment"]] = relationship("Equipment", back_populates="ship", lazy="selectin")  # noqa: F821
+    workers: Mapped[list["Worker"]] = relationship("Worker", back_populates="ship", lazy="raise", passive_deletes=True)  # noqa: F821
+    equipment: Mapped[list["Equipment"]] = relationship("Equipment", back_populates="ship", lazy="raise", passive_deletes=True)  # noqa: F821
     missions: Mapped[list["Mission"]] = relationship(  # noqa: F821
-        "Mission", back_populates="ship", lazy="selectin", foreign_keys="[Mission.ship_id]"
+        "Mission", back_populates="ship", lazy="raise", passive_deletes=True, foreign_keys="[Mission.ship_id]"
     )
 
     @property
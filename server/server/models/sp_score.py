@@ -1,7 +1,7 @@
 """Single-player score submission — global leaderboard for offline/SP mode players."""
 
 from datetime import datetime
-from sqlalchemy import DateTime, Integer, String, func
+from sqlalchemy import DateTime, Index, Integer, String, func
 from sqlalchemy.orm import Mapped, mapped_column
 
 from server.database import Base
@@ -22,3 +22,27 @@ class SPScore(Base):
 
     def __repr__(self) -> str:
         return f"<SPScore(id={self.id}, player={self.player_name}, net_worth={self.net_worth})>"
+
+
+class SPBestScore(Base):
+    """
+    Best submission per player_name, maintained on insert by
+    server/sp_leaderboard.py. The SP leaderboard reads only this table.
+    """
+    __tablename__ = "sp_best_scores"
+    __table_args__ = (
+        Index("idx_sp_best_scores_net_worth", "net_worth"),
+    )
+
+    player_name: Mapped[str] = mapped_column(String(64), primary_key=True)
+    score_id: Mapped[int] = mapped_column(Integer, nullable=False)  # sp_scores.id of the best run
+    net_worth: Mapped[int] = mapped_column(Integer, nullable=False)
+    ships_count: Mapped[int] = mapped_column(Integer, nullable=False, server_default="0")
+    workers_count: Mapped[int] = mapped_column(Integer, nullable=False, server_default="0")
+    game_date: Mapped[str] = mapped_column(String(64), nullable=False, server_default="")
+    submitted_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True), server_default=func.now(), nullable=False
+    )
+
+    def __repr__(self) -> str:
+        return f"<SPBestScore(player={self.player_name}, net_worth={self.net_worth})>"
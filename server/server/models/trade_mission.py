@@ -39,6 +39,7 @@ class TradeMission(Base):
 
     # Revenue from selling (filled when status = SELLING)
     revenue: Mapped[int] = mapped_column(Integer, default=0, nullable=False)
+    tonnes_sold: Mapped[float] = mapped_column(Float, default=0.0, server_default="0", nullable=False)
 
     # Origin/destination tracking
     origin_x: Mapped[float] = mapped_column(Float, nullable=False)
@@ -1,5 +1,15 @@
-from datetime import datetime
-from sqlalchemy import BigInteger, DateTime, Float, ForeignKey, Integer, String, func
+"""
+Money history.
+
+player_transactions is range-partitioned by created_at, one partition per
+UTC day (player_transactions_pYYYYMMDD), so old history is dropped a whole
+partition at a time. player_finance_daily holds per-player, per-day,
+per-source totals rolled up from it (server/simulation/finance.py); the
+rollups outlive the raw rows.
+"""
+
+from datetime import date, datetime
+from sqlalchemy import BigInteger, Date, DateTime, Float, ForeignKey, Index, Integer, String, func
 from sqlalchemy.orm import Mapped, mapped_column
 
 from server.database import Base
@@ -7,14 +17,18 @@ from server.database import Base
 
 class PlayerTransaction(Base):
     __tablename__ = "player_transactions"
+    __table_args__ = (
+        Index("idx_player_transactions_player_created", "player_id", "created_at"),
+        {"postgresql_partition_by": "RANGE (created_at)"},
+    )
 
-    id: Mapped[int] = mapped_column(Integer, primary_key=True, index=True)
+    # The partition key has to be part of the primary key
+    id: Mapped[int] = mapped_column(Integer, primary_key=True, autoincrement=True)
     player_id: Mapped[int] = mapped_column(
-        Integer, ForeignKey("players.id", ondelete="CASCADE"),
-        nullable=False, index=True
+        Integer, ForeignKey("players.id", ondelete="CASCADE"), nullable=False
     )
     created_at: Mapped[datetime] = mapped_column(
-        DateTime(timezone=True), server_default=func.now(), nullable=False
+        DateTime(timezone=True), primary_key=True, server_default=func.now(), nullable=False
     )
     amount: Mapped[int] = mapped_column(BigInteger, nullable=False)      # signed: + income, - expense
     balance_after: Mapped[int] = mapped_column(BigInteger, nullable=False)
@@ -25,3 +39,28 @@ class PlayerTransaction(Base):
     def __repr__(self) -> str:
         sign = "+" if self.amount >= 0 else ""
         return f"<Tx player={self.player_id} {sign}{self.amount:,} [{self.source}]>"
+
+
+class PlayerFinanceDaily(Base):
+    __tablename__ = "player_finance_daily"
+
+    player_id: Mapped[int] = mapped_column(
+        Integer, ForeignKey("players.id", ondelete="CASCADE"), primary_key=True
+    )
+    day: Mapped[date] = mapped_column(Date, primary_key=True)  # UTC
+    source: Mapped[str] = mapped_column(String(32), primary_key=True)
+    income: Mapped[int] = mapped_column(BigInteger, nullable=False, default=0)
+    expense: Mapped[int] = mapped_column(BigInteger, nullable=False, default=0)  # positive
+    tx_count: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+    updated_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True), server_default=func.now(), nullable=False
+    )
+
+
+class LedgerRollupState(Base):
+    """Single row (id=1): last UTC day whose rollups are final."""
+    __tablename__ = "ledger_rollup_state"
+
+    id: Mapped[int] = mapped_column(Integer, primary_key=True)
+    closed_through: Mapped[date | None] = mapped_column(Date, nullable=True)
+    rolled_up_at: Mapped[datetime | None] = mapped_column(DateTime(timezone=True), nullable=True)
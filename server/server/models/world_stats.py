@@ -0,0 +1,37 @@
+"""World statistics model — one row of maintained aggregate counters."""
+
+from datetime import datetime
+from sqlalchemy import BigInteger, DateTime, Float, Integer, func
+from sqlalchemy.dialects.postgresql import JSONB
+from sqlalchemy.orm import Mapped, mapped_column
+
+from server.database import Base
+
+
+class WorldStats(Base):
+    """
+    Aggregate counters for the admin dashboards, kept current by
+    server/world_stats.py. Always a single row (id = 1).
+    """
+    __tablename__ = "world_stats"
+
+    id: Mapped[int] = mapped_column(Integer, primary_key=True, default=1)
+    total_players: Mapped[int] = mapped_column(BigInteger, default=0, nullable=False)
+    active_players_7d: Mapped[int] = mapped_column(BigInteger, default=0, nullable=False)
+    active_players_30d: Mapped[int] = mapped_column(BigInteger, default=0, nullable=False)
+    total_ships: Mapped[int] = mapped_column(BigInteger, default=0, nullable=False)
+    derelict_ships: Mapped[int] = mapped_column(BigInteger, default=0, nullable=False)
+    ownerless_ships: Mapped[int] = mapped_column(BigInteger, default=0, nullable=False)
+    total_workers: Mapped[int] = mapped_column(BigInteger, default=0, nullable=False)
+    total_missions: Mapped[int] = mapped_column(BigInteger, default=0, nullable=False)
+    active_missions: Mapped[int] = mapped_column(BigInteger, default=0, nullable=False)
+    total_reserves: Mapped[float] = mapped_column(Float, default=0.0, nullable=False)
+    reserves_by_ore: Mapped[dict] = mapped_column(JSONB, default=dict, nullable=False)  # {ore: tonnes}
+
+    reconciled_at: Mapped[datetime | None] = mapped_column(DateTime(timezone=True), nullable=True)
+    updated_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True), server_default=func.now(), onupdate=func.now(), nullable=False
+    )
+
+    def __repr__(self) -> str:
+        return f"<WorldStats(players={self.total_players}, ships={self.total_ships})>"
@@ -1,15 +1,296 @@
-from slowapi import Limiter
-from slowapi.util import get_remote_address
-from slowapi.errors import RateLimitExceeded
+"""
+Request rate limiting.
+
+    @router.post("/dispatch")
+    @limiter.limit("20/minute")
+    async def dispatch(request: Request, ...):
+
+Each limit is a token bucket (kept as a GCRA "theoretical arrival time", one
+float per key) checked against the client IP and, when the request carries a
+valid bearer token, the player as well, so one account cannot dodge its
+limit by switching addresses and one address cannot host unlimited accounts.
+
+Two layers:
+  - an in-process bucket per key (plain dict, no locks: the check never
+    awaits, so it is atomic on the event loop). It only counts this
+    worker's traffic, so when it says no the shared bucket would too, and
+    rejected bursts never leave the process;
+  - the authoritative backend. "shared" (default) is an mmap'd hash table
+    on /dev/shm used by every worker on the host, each read-modify-write
+    under a byte-range lock on its stripe. "memory" is per-process only.
+
+Separate hosts still count separately.
+"""
+
+from __future__ import annotations
+
+import fcntl
+import functools
+import hashlib
+import inspect
+import logging
+import mmap
+import os
+import re
+import struct
+import tempfile
+import time
+from typing import Callable, Protocol
+
 from fastapi import Request, Response
 from fastapi.responses import JSONResponse
 
-# Create limiter with memory storage (use Redis in production)
-limiter = Limiter(
-    key_func=get_remote_address,
-    default_limits=["100/minute"],  # Global default
-    storage_uri="memory://",  # TODO: Replace with Redis in production
-)
+from server.config import settings
+
+logger = logging.getLogger(__name__)
+
+_PERIODS = {"second": 1, "minute": 60, "hour": 3600, "day": 86400}
+_SPEC_RE = re.compile(r"^\s*(\d+)\s*/\s*(second|minute|hour|day)s?\s*$")
+
+
+class RateLimitExceeded(Exception):
+    def __init__(self, limit: str, retry_after: float) -> None:
+        super().__init__(f"Rate limit exceeded: {limit}")
+        self.limit = limit
+        self.retry_after = max(1, int(retry_after + 0.999))
+
+
+def parse_limit(spec: str) -> tuple[int, float]:
+    """"10/minute" -> (10, 60.0)."""
+    match = _SPEC_RE.match(spec)
+    if not match:
+        raise ValueError(f"Bad rate limit {spec!r}")
+    return int(match.group(1)), float(_PERIODS[match.group(2)])
+
+
+# ── Backends ──────────────────────────────────────────────────────────────────
+# hit() records one request and returns 0.0, or returns the seconds until the
+# next request would be allowed (recording nothing). undo() gives one back.
+
+class Backend(Protocol):
+    def hit(self, key: str, interval: float, period: float, now: float) -> float: ...
+    def undo(self, key: str, interval: float) -> None: ...
+
+
+def _gcra(tat: float, interval: float, period: float, now: float) -> tuple[float, float]:
+    """Return (new_tat, retry_after). retry_after > 0 means rejected."""
+    new_tat = max(tat, now) + interval
+    over = new_tat - now - period
+    return (tat, over) if over > 0 else (new_tat, 0.0)
+
+
+class MemoryBackend:
+    """Buckets in a dict. Expired keys are pruned as the dict grows."""
+
+    def __init__(self, max_keys: int = 100_000) -> None:
+        self._tat: dict[str, float] = {}
+        self._max_keys = max_keys
+
+    def hit(self, key: str, interval: float, period: float, now: float) -> float:
+        new_tat, retry = _gcra(self._tat.get(key, 0.0), interval, period, now)
+        if retry == 0.0:
+            if key not in self._tat and len(self._tat) >= self._max_keys:
+                self._prune(now)
+            self._tat[key] = new_tat
+        return retry
+
+    def undo(self, key: str, interval: float) -> None:
+        if key in self._tat:
+            self._tat[key] -= interval
+
+    def _prune(self, now: float) -> None:
+        self._tat = {k: t for k, t in self._tat.items() if t > now}
+        if len(self._tat) >= self._max_keys:
+            self._tat.clear()  # every bucket is live; forgetting is safer than growing
+
+
+class SharedMemoryBackend:
+    """
+    Fixed-size open-addressing table in a shared file mapping.
+
+    Slot = (key hash u64, tat f64); hash 0 marks an empty slot. A key probes
+    only within its stripe, and each stripe has its own fcntl byte-range
+    lock, so workers rarely wait on each other. When every probed slot is
+    live the one with the oldest tat (the fullest bucket) is evicted.
+    Times are CLOCK_MONOTONIC, which all processes on a host share.
+    """
+
+    _SLOT = struct.Struct("<Qd")
+    _STRIPE = 256
+    _PROBES = 16
+
+    def __init__(self, path: str, slots: int) -> None:
+        slots = max(self._STRIPE, slots - slots % self._STRIPE)
+        self.slots = slots
+        size = slots * self._SLOT.size
+        self._fd = os.open(path, os.O_RDWR | os.O_CREAT, 0o600)
+        if os.fstat(self._fd).st_size != size:
+            fcntl.flock(self._fd, fcntl.LOCK_EX)
+            try:
+                if os.fstat(self._fd).st_size != size:
+                    os.ftruncate(self._fd, size)  # new or resized table: start empty
+            finally:
+                fcntl.flock(self._fd, fcntl.LOCK_UN)
+        self._mm = mmap.mmap(self._fd, size)
+
+    def _locate(self, key: str) -> tuple[int, int]:
+        digest = int.from_bytes(hashlib.blake2b(key.encode(), digest_size=8).digest(), "little") or 1
+        return digest, digest % self.slots
+
+    def _stripe_lock(self, home: int, op: int) -> None:
+        start = (home - home % self._STRIPE) * self._SLOT.size
+        fcntl.lockf(self._fd, op, self._STRIPE * self._SLOT.size, start, os.SEEK_SET)
+
+    def _find(self, digest: int, home: int, now: float) -> tuple[int, float]:
+        """Slot index for digest (existing, free, or evicted) and its current tat."""
+        base = home - home % self._STRIPE
+        free: int | None = None
+        victim, victim_tat = home, float("inf")
+        for i in range(self._PROBES):
+            idx = base + (home - base + i) % self._STRIPE
+            slot_key, tat = self._SLOT.unpack_from(self._mm, idx * self._SLOT.size)
+            if slot_key == digest:
+                return idx, tat
+            if slot_key == 0:
+                return (idx if free is None else free), 0.0  # key was never stored past here
+            if free is None and tat <= now:
+                free = idx  # an expired bucket nobody needs
+            if tat < victim_tat:
+                victim, victim_tat = idx, tat
+        return (victim if free is None else free), 0.0
+
+    def hit(self, key: str, interval: float, period: float, now: float) -> float:
+        digest, home = self._locate(key)
+        self._stripe_lock(home, fcntl.LOCK_EX)
+        try:
+            idx, tat = self._find(digest, home, now)
+            new_tat, retry = _gcra(tat, interval, period, now)
+            if retry == 0.0:
+                self._SLOT.pack_into(self._mm, idx * self._SLOT.size, digest, new_tat)
+            return retry
+        finally:
+            self._stripe_lock(home, fcntl.LOCK_UN)
+
+    def undo(self, key: str, interval: float) -> None:
+        digest, home = self._locate(key)
+        self._stripe_lock(home, fcntl.LOCK_EX)
+        try:
+            idx, tat = self._find(digest, home, float("-inf"))
+            slot_key, _ = self._SLOT.unpack_from(self._mm, idx * self._SLOT.size)
+            if slot_key == digest:
+                self._SLOT.pack_into(self._mm, idx * self._SLOT.size, digest, tat - interval)
+        finally:
+            self._stripe_lock(home, fcntl.LOCK_UN)
+
+
+def shared_path() -> str:
+    if settings.RATE_LIMIT_SHM_PATH:
+        return settings.RATE_LIMIT_SHM_PATH
+    base = "/dev/shm" if os.path.isdir("/dev/shm") else tempfile.gettempdir()
+    return os.path.join(base, "claim-ratelimit.bin")
+
+
+def _make_backend() -> Backend:
+    if settings.RATE_LIMIT_BACKEND == "shared":
+        try:
+            return SharedMemoryBackend(shared_path(), settings.RATE_LIMIT_SLOTS)
+        except OSError as exc:
+            logger.warning("Shared rate-limit table unavailable (%s); limiting per process", exc)
+    return MemoryBackend()
+
+
+# ── Limiter ───────────────────────────────────────────────────────────────────
+
+def _client_ip(request: Request) -> str:
+    return request.client.host if request.client else "unknown"
+
+
+def _player_id(request: Request) -> int | None:
+    """Player id from a valid bearer token (header or ?token=), else None."""
+    from fastapi import HTTPException
+
+    from server.auth import decode_access_token
+
+    auth = request.headers.get("authorization", "")
+    token = auth[7:] if auth[:7].lower() == "bearer " else request.query_params.get("token")
+    if not token:
+        return None
+    try:
+        return decode_access_token(token)
+    except HTTPException:
+        return None  # the endpoint's own auth dependency reports this
+
+
+class Limiter:
+    def __init__(self, backend: Backend | None = None) -> None:
+        self._backend = backend
+        self._local = MemoryBackend()
+
+    @property
+    def backend(self) -> Backend:
+        if self._backend is None:
+            self._backend = _make_backend()
+        return self._backend
+
+    def check(self, scope: str, spec: str, request: Request, per_player: bool = True) -> None:
+        """Count one request against every key it maps to, or raise RateLimitExceeded."""
+        count, period = parse_limit(spec)
+        interval = period / count
+        keys = [f"{scope}|ip:{_client_ip(request)}"]
+        if per_player:
+            player_id = _player_id(request)
+            if player_id is not None:
+                keys.insert(0, f"{scope}|p:{player_id}")
+
+        now = time.monotonic()
+        taken: list[str] = []
+        for key in keys:
+            retry = self._local.hit(key, interval, period, now)
+            if retry == 0.0:
+                retry = self.backend.hit(key, interval, period, now)
+                if retry > 0.0:
+                    self._local.undo(key, interval)
+            if retry > 0.0:
+                for done in taken:  # a rejected request should not use up the other keys
+                    self._local.undo(done, interval)
+                    self.backend.undo(done, interval)
+                raise RateLimitExceeded(spec, retry)
+            taken.append(key)
+
+    def limit(self, spec: str, per_player: bool = True) -> Callable:
+        """Decorate an endpoint that takes a `request: Request` parameter."""
+        parse_limit(spec)  # fail at import time on a typo
+
+        def decorator(fn: Callable) -> Callable:
+            scope = f"{fn.__module__}.{fn.__qualname__}"
+
+            def find_request(args: tuple, kwargs: dict) -> Request | None:
+                request = kwargs.get("request")
+                if isinstance(request, Request):
+                    return request
+                return next((a for a in args if isinstance(a, Request)), None)
+
+            if inspect.iscoroutinefunction(fn):
+                @functools.wraps(fn)
+                async def async_wrapper(*args, **kwargs):
+                    request = find_request(args, kwargs)
+                    if request is not None and settings.RATE_LIMIT_ENABLED:
+                        self.check(scope, spec, request, per_player)
+                    return await fn(*args, **kwargs)
+                return async_wrapper
+
+            @functools.wraps(fn)
+            def sync_wrapper(*args, **kwargs):
+                request = find_request(args, kwargs)
+                if request is not None and settings.RATE_LIMIT_ENABLED:
+                    self.check(scope, spec, request, per_player)
+                return fn(*args, **kwargs)
+            return sync_wrapper
+
+        return decorator
+
+
+limiter = Limiter()
 
 
 async def rate_limit_handler(request: Request, exc: RateLimitExceeded) -> Response:
@@ -19,6 +300,7 @@ async def rate_limit_handler(request: Request, exc: RateLimitExceeded) -> Respon
         content={
             "error": "Too many requests",
             "detail": "Rate limit exceeded. Please try again later.",
-            "retry_after": exc.retry_after if hasattr(exc, 'retry_after') else 60,
-        }
+            "retry_after": exc.retry_after,
+        },
+        headers={"Retry-After": str(exc.retry_after)},
     )
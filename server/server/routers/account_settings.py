@@ -6,7 +6,7 @@ from pydantic import BaseModel, EmailStr
 from sqlalchemy import select
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from server.auth import get_current_player, hash_password, verify_password
+from server.auth import get_current_player, hash_password_async, verify_password_async
 from server.database import get_db
 from server.models.player import Player
 from server.rate_limit import limiter
@@ -103,7 +103,7 @@ async def change_password(
 ):
     """Change account password (requires current password)."""
     # Verify current password
-    if not verify_password(payload.current_password, player.password_hash):
+    if not await verify_password_async(payload.current_password, player.password_hash):
         logger.warning(f"Failed password change for {player.username} - incorrect current password")
         raise HTTPException(status_code=400, detail="Current password is incorrect")
 
@@ -118,7 +118,7 @@ async def change_password(
         raise HTTPException(status_code=400, detail="Password must contain number")
 
     # Update password
-    player.password_hash = hash_password(payload.new_password)
+    player.password_hash = await hash_password_async(payload.new_password)
     db.add(player)
     await db.commit()
 
@@ -1,21 +1,93 @@
 import random
-from fastapi import APIRouter, Depends, HTTPException, Path, Request
+from fastapi import APIRouter, Depends, HTTPException, Path, Query, Request
+from fastapi.responses import JSONResponse
 from pydantic import BaseModel
 from sqlalchemy import delete, func, select
 from sqlalchemy.ext.asyncio import AsyncSession
-from server.auth import hash_password, require_admin_key
+from server.auth import hash_password_async, password_hash_stats, require_admin_key
+from server.config import settings
 from server.database import get_db, init_db
+from server.jobs import JobContext, enqueue_job, get_job, job_handler, request_cancel, wait_for_job
 from server.models.asteroid import Asteroid
 from server.models.colony import Colony
+from server.models.job import Job, STATUS_DONE, STATUS_FAILED, STATUS_NAMES
 from server.models.player import Player
 from server.models.ship import Ship, SHIP_CLASS_STATS, PROSPECTOR
 from server.models.worker import Worker
 from server.rate_limit import limiter
+from server.simulation.cluster import is_leader
+from server.simulation.ephemeris import ephemeris_stats
+from server.simulation.intercept import intercept_stats
+from server.simulation.money_log import ledger_stats
 from server.simulation.tick import get_total_ticks
+from server.world_stats import get_world_stats, max_players_for, stage_delta
 
 router = APIRouter(prefix="/admin", tags=["admin"], dependencies=[Depends(require_admin_key)])
 
 
+async def _run_job(db: AsyncSession, kind: str, params: dict, wait: float | None):
+    """
+    Queue a job and wait up to `wait` seconds (JOB_INLINE_WAIT by default).
+    Quick jobs answer with their result as before; slower ones answer 202
+    with the job, to be followed at /admin/jobs/{job_id}.
+    """
+    job = await enqueue_job(db, kind, params)
+    timeout = settings.JOB_INLINE_WAIT if wait is None else wait
+    if timeout > 0:
+        job = await wait_for_job(job.id, timeout) or job
+    if job.status == STATUS_DONE:
+        return job.result
+    if job.status == STATUS_FAILED:
+        raise HTTPException(status_code=500, detail={"message": f"{kind} job failed", "job": job.as_dict()})
+    return JSONResponse(
+        status_code=202, content=job.as_dict(), headers={"Location": f"/admin/jobs/{job.id}"},
+    )
+
+
+# ── Jobs ──────────────────────────────────────────────────────────────────────
+
+@router.get("/jobs")
+@limiter.limit("120/minute")
+async def list_jobs(
+    request: Request,
+    status: str | None = Query(None, description="queued, running, done, failed or cancelled"),
+    kind: str | None = None,
+    limit: int = Query(50, ge=1, le=500),
+    db: AsyncSession = Depends(get_db)
+):
+    """Most recent jobs, newest first."""
+    query = select(Job).order_by(Job.id.desc()).limit(limit)
+    if status is not None:
+        codes = [code for code, name in STATUS_NAMES.items() if name == status]
+        if not codes:
+            raise HTTPException(status_code=400, detail=f"Unknown job status '{status}'")
+        query = query.where(Job.status == codes[0])
+    if kind is not None:
+        query = query.where(Job.kind == kind)
+    jobs = (await db.execute(query)).scalars().all()
+    return {"jobs": [job.as_dict() for job in jobs]}
+
+
+@router.get("/jobs/{job_id}")
+@limiter.limit("240/minute")
+async def job_status(request: Request, job_id: int, db: AsyncSession = Depends(get_db)):
+    """Status, progress and (once finished) result of a job."""
+    job = await get_job(db, job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Job not found")
+    return job.as_dict()
+
+
+@router.post("/jobs/{job_id}/cancel")
+@limiter.limit("30/minute")
+async def cancel_job(request: Request, job_id: int, db: AsyncSession = Depends(get_db)):
+    """Cancel a queued job, or ask a running one to stop at its next checkpoint."""
+    job = await request_cancel(db, job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Job not found")
+    return job.as_dict()
+
+
 class AdminPasswordResetRequest(BaseModel):
     username: str
     new_password: str
@@ -50,7 +122,7 @@ async def admin_reset_password(
         raise HTTPException(status_code=404, detail=f"User '{payload.username}' not found")
 
     # Reset password
-    player.password_hash = hash_password(payload.new_password)
+    player.password_hash = await hash_password_async(payload.new_password)
     db.add(player)
     await db.commit()
 
@@ -99,6 +171,11 @@ async def server_status(
     return {
         "status": "running",
         "total_ticks": get_total_ticks(),
+        "simulation_leader": is_leader(),
+        "password_hashing": password_hash_stats(),
+        "transaction_ledger": ledger_stats(),
+        "ephemeris": ephemeris_stats(),
+        "intercepts": intercept_stats(),
         "player_count": player_count,
         "ship_count": ship_count,
         "asteroid_count": asteroid_count,
@@ -234,13 +311,10 @@ def _asteroid_seed_data() -> list[dict]:
     ]
 
 
-@router.post("/seed")
-@limiter.limit("1/minute")
-async def seed(
-    request: Request,
-    db: AsyncSession = Depends(get_db)
-):
-    """Idempotent seed: insert colonies and asteroids if not already present (admin only)."""
+@job_handler("seed")
+async def seed_job(ctx: JobContext) -> dict:
+    """Idempotent seed: insert colonies and asteroids if not already present."""
+    db = ctx.db
     await init_db()
     seeded = {"colonies": 0, "asteroids": 0}
 
@@ -264,6 +338,17 @@ async def seed(
     return {"seeded": seeded, "message": "Seed complete"}
 
 
+@router.post("/seed")
+@limiter.limit("1/minute")
+async def seed(
+    request: Request,
+    wait: float | None = Query(None, ge=0, le=60),
+    db: AsyncSession = Depends(get_db)
+):
+    """Idempotent seed: insert colonies and asteroids if not already present (admin only)."""
+    return await _run_job(db, "seed", {}, wait)
+
+
 @router.post("/give-starter-pack/{player_id}")
 @limiter.limit("5/hour")
 async def give_starter_pack(
@@ -347,8 +432,7 @@ async def give_starter_pack(
 
 from server.admin.account_deletion import (
     delete_player_account,
-    cleanup_inactive_players,
-    get_deletion_preview
+    get_deletion_preview,
 )
 
 
@@ -401,6 +485,7 @@ async def delete_player(
 async def cleanup_inactive(
     days_inactive: int = 90,
     dry_run: bool = True,
+    wait: float | None = Query(None, ge=0, le=60),
     request: Request = None,
     db: AsyncSession = Depends(get_db)
 ):
@@ -410,56 +495,30 @@ async def cleanup_inactive(
     Removes players who haven't logged in for specified days.
     Use dry_run=true to preview without deleting.
     """
-    results = await cleanup_inactive_players(db, days_inactive, dry_run)
-
-    return {
-        "dry_run": dry_run,
-        "days_inactive_threshold": days_inactive,
-        "players_affected": len(results),
-        "results": results
-    }
+    return await _run_job(db, "cleanup_inactive", {"days_inactive": days_inactive, "dry_run": dry_run}, wait)
 
 
 @router.get("/server-stats")
 @limiter.limit("60/minute")
 async def get_server_stats(request: Request, db: AsyncSession = Depends(get_db)):
     """Get server statistics (players, ships, workers, derelicts)."""
-    from server.models.mission import Mission
-
-    total_players = await db.scalar(select(func.count()).select_from(Player))
-    total_ships = await db.scalar(select(func.count()).select_from(Ship))
-    total_workers = await db.scalar(select(func.count()).select_from(Worker))
-    total_missions = await db.scalar(select(func.count()).select_from(Mission))
-
-    # Active players (last 7 days)
-    from datetime import datetime, timedelta, timezone
-    cutoff = datetime.now(timezone.utc) - timedelta(days=7)
-    active_players = await db.scalar(
-        select(func.count()).select_from(Player).where(Player.last_seen >= cutoff)
-    )
-
-    # Derelict/ownerless ships
-    derelict_ships = await db.scalar(
-        select(func.count()).select_from(Ship).where(Ship.is_derelict == True)  # noqa: E712
-    )
-    ownerless_ships = await db.scalar(
-        select(func.count()).select_from(Ship).where(Ship.player_id == None)  # noqa: E711
-    )
+    stats = await get_world_stats(db)
 
     return {
         "players": {
-            "total": total_players,
-            "active_7d": active_players,
-            "inactive_7d": total_players - active_players
+            "total": stats.total_players,
+            "active_7d": stats.active_players_7d,
+            "inactive_7d": stats.total_players - stats.active_players_7d
         },
         "ships": {
-            "total": total_ships,
-            "derelict": derelict_ships,
-            "ownerless": ownerless_ships,
-            "active": total_ships - derelict_ships
+            "total": stats.total_ships,
+            "derelict": stats.derelict_ships,
+            "ownerless": stats.ownerless_ships,
+            "active": stats.total_ships - stats.derelict_ships
         },
-        "workers": {"total": total_workers},
-        "missions": {"total": total_missions}
+        "workers": {"total": stats.total_workers},
+        "missions": {"total": stats.total_missions},
+        "as_of": stats.updated_at.isoformat(),
     }
 
 
@@ -471,34 +530,12 @@ async def get_server_capacity(request: Request, db: AsyncSession = Depends(get_d
 
     Returns whether new players can join based on resource availability.
     """
-    from datetime import datetime, timedelta, timezone
-
-    # Count active players (logged in within last 30 days)
-    cutoff = datetime.now(timezone.utc) - timedelta(days=30)
-    active_players = await db.scalar(
-        select(func.count()).select_from(Player).where(Player.last_seen >= cutoff)
-    )
-
-    # Calculate total remaining reserves across all asteroids
-    result = await db.execute(select(Asteroid))
-    asteroids = result.scalars().all()
-
-    total_reserves = 0.0
-    total_iron = 0.0
-    total_water_ice = 0.0
-
-    for asteroid in asteroids:
-        if not asteroid.reserves:
-            continue
-        total_reserves += sum(asteroid.reserves.values())
-        total_iron += asteroid.reserves.get("iron", 0.0)
-        total_water_ice += asteroid.reserves.get("water_ice", 0.0)
-
-    # Minimum reserves per player threshold (50 million tonnes)
-    MINIMUM_RESERVES_PER_PLAYER = 50_000_000
+    stats = await get_world_stats(db)
+    active_players = stats.active_players_30d  # logged in within last 30 days
+    total_reserves = stats.total_reserves
 
     # Calculate available slots
-    max_players = int(total_reserves / MINIMUM_RESERVES_PER_PLAYER) if total_reserves > 0 else 0
+    max_players = max_players_for(total_reserves)
     slots_available = max(0, max_players - active_players)
     reserves_per_player = total_reserves / max(active_players, 1)
 
@@ -512,55 +549,80 @@ async def get_server_capacity(request: Request, db: AsyncSession = Depends(get_d
         "total_reserves_tonnes": round(total_reserves, 2),
         "reserves_per_player_tonnes": round(reserves_per_player, 2),
         "reserves_by_type": {
-            "iron": round(total_iron, 2),
-            "water_ice": round(total_water_ice, 2)
+            "iron": round(stats.reserves_by_ore.get("iron", 0.0), 2),
+            "water_ice": round(stats.reserves_by_ore.get("water_ice", 0.0), 2)
         },
         "message": "Server accepting new players" if can_join else "Server at capacity - no slots available"
     }
 
 
-@router.post("/generate-reserves")
-@limiter.limit("1/hour")
-async def generate_asteroid_reserves(
-    request: Request,
-    db: AsyncSession = Depends(get_db)
-):
-    """Generate initial reserves for all asteroids. Checks if already generated."""
+@job_handler("generate_reserves")
+async def generate_reserves_job(ctx: JobContext, seed: int | None = None) -> dict:
     from server.simulation.world_setup import generate_reserves
-    summary = await generate_reserves(db, force=False)
+    summary = await generate_reserves(ctx.db, force=False, seed=seed)
     if summary["status"] == "already_generated":
         return {"status": "already_generated", "message": "Asteroid reserves already exist."}
     return {
         "status": "success",
         "asteroids_updated": summary["count"],
         "total_reserves_tonnes": summary["total_tonnes"],
+        "seed": summary["seed"],
         "message": f"Generated reserves for {summary['count']} asteroids",
     }
 
 
+@router.post("/generate-reserves")
+@limiter.limit("1/hour")
+async def generate_asteroid_reserves(
+    request: Request,
+    seed: int | None = Query(None, ge=0, description="Reproduce an earlier generation"),
+    wait: float | None = Query(None, ge=0, le=60),
+    db: AsyncSession = Depends(get_db)
+):
+    """Generate initial reserves for all asteroids. Checks if already generated."""
+    return await _run_job(db, "generate_reserves", {"seed": seed}, wait)
+
+
+@job_handler("purge_workers")
+async def purge_workers_job(ctx: JobContext) -> dict:
+    result = await ctx.db.execute(delete(Worker).where(Worker.player_id == None))  # noqa: E711
+    stage_delta(ctx.db, total_workers=-result.rowcount)
+    await ctx.db.commit()
+    return {"deleted": result.rowcount}
+
+
 @router.delete("/purge-workers")
 @limiter.limit("10/hour")
 async def purge_available_workers(
     request: Request,
+    wait: float | None = Query(None, ge=0, le=60),
     db: AsyncSession = Depends(get_db)
 ):
     """Delete all unowned workers (player_id = NULL) from the labor pool."""
-    result = await db.execute(delete(Worker).where(Worker.player_id == None))  # noqa: E711
-    await db.commit()
-    return {"deleted": result.rowcount}
+    return await _run_job(db, "purge_workers", {}, wait)
 
 
 @router.post("/spawn-workers")
 @limiter.limit("10/minute")
 async def spawn_available_workers(
     request: Request,
-    count: int = 10,
+    count: int = Query(10, ge=1, le=100_000),
+    wait: float | None = Query(None, ge=0, le=60),
     db: AsyncSession = Depends(get_db)
 ):
     """
     Spawn workers available for hire (player_id = NULL).
     Creates random workers in the labor pool.
     """
+    return await _run_job(db, "spawn_workers", {"count": count}, wait)
+
+
+_SPAWN_BATCH = 500
+
+
+@job_handler("spawn_workers")
+async def spawn_workers_job(ctx: JobContext, count: int = 10) -> dict:
+    db = ctx.db
     FIRST_NAMES = ["Alex", "Jordan", "Taylor", "Morgan", "Casey", "Riley", "Avery", "Quinn", "Reese", "Skyler"]
     LAST_NAMES = ["Chen", "Patel", "Smith", "Garcia", "Kim", "Johnson", "Rodriguez", "Martinez", "Lee", "Davis"]
 
@@ -592,7 +654,7 @@ async def spawn_available_workers(
 
     spawned = []
 
-    for _ in range(count):
+    for i in range(count):
         # Generate random skills
         skills = [0, 1, 2]  # pilot, engineer, mining
         random.shuffle(skills)
@@ -651,6 +713,9 @@ async def spawn_available_workers(
         )
 
         db.add(worker)
+        if (i + 1) % _SPAWN_BATCH == 0:
+            await db.commit()
+            await ctx.progress((i + 1) / count, f"{i + 1}/{count} workers")
         spawned.append({
             "name": f"{worker.first_name} {worker.last_name}",
             "pilot": pilot_val,
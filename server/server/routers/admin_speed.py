@@ -6,13 +6,12 @@ WARNING: This affects ALL players simultaneously!
 """
 
 import logging
-from fastapi import APIRouter, Depends, HTTPException, Request
+from fastapi import APIRouter, Depends, Request
 from pydantic import BaseModel, Field
 from sqlalchemy import select
 from sqlalchemy.ext.asyncio import AsyncSession
-from server.auth import get_current_player
+from server.auth import Principal, get_current_principal, require_admin
 from server.database import get_db
-from server.models.player import Player
 from server.models.world_state import WorldState
 from server.rate_limit import limiter
 from server.config import settings
@@ -31,28 +30,21 @@ class SpeedUpdate(BaseModel):
     multiplier: float = Field(..., ge=0.1, le=200000.0, description="Speed multiplier (0.1x to 200000x)")
 
 
-def require_admin(player: Player = Depends(get_current_player)) -> Player:
-    """Dependency that checks if player is admin."""
-    if not player.is_admin:
-        raise HTTPException(status_code=403, detail="Admin access required")
-    return player
-
-
 @router.post("/set-speed")
 @limiter.limit("30/minute")  # Allow frequent speed changes during testing
 async def set_simulation_speed(
     request: Request,
     payload: SpeedUpdate,
-    player: Player = Depends(require_admin),
+    player: Principal = Depends(require_admin),
     db: AsyncSession = Depends(get_db),
 ):
     """
     Set simulation speed multiplier.
     WARNING: Affects ALL players!
     """
-    global _simulation_speed_multiplier
+    from server.simulation.cluster import send_command
     old_speed = _simulation_speed_multiplier
-    _simulation_speed_multiplier = payload.multiplier
+    send_command("set_speed", multiplier=payload.multiplier)
 
     # Persist to DB so speed survives server restarts
     result = await db.execute(select(WorldState).where(WorldState.world_id == 1))
@@ -73,7 +65,7 @@ async def set_simulation_speed(
 
 
 @router.get("/speed")
-async def get_simulation_speed(player: Player = Depends(get_current_player)):
+async def get_simulation_speed(player: Principal = Depends(get_current_principal)):
     """Get current simulation speed multiplier."""
     return {
         "speed": _simulation_speed_multiplier,
@@ -84,3 +76,9 @@ async def get_simulation_speed(player: Player = Depends(get_current_player)):
 def get_speed_multiplier() -> float:
     """Get current speed multiplier for use by simulation loop."""
     return _simulation_speed_multiplier
+
+
+def set_speed_multiplier(multiplier: float) -> None:
+    """Set the in-process speed multiplier. Use cluster.send_command to reach every process."""
+    global _simulation_speed_multiplier
+    _simulation_speed_multiplier = multiplier
@@ -3,36 +3,38 @@ Admin UI router - Web interface for server administration.
 
 Requires admin key for all operations.
 """
-import datetime as _dt
+import asyncio
 import json
+import logging
+import time
 from pathlib import Path
 
 from fastapi import APIRouter, Request, Form, Depends, HTTPException
-from fastapi.responses import HTMLResponse, JSONResponse, RedirectResponse
+from fastapi.responses import HTMLResponse, JSONResponse, RedirectResponse, StreamingResponse
 from fastapi.templating import Jinja2Templates
-from sqlalchemy import select, func, delete
+from sqlalchemy import select, func
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from pydantic import BaseModel
 
 from server.config import settings
-from server.database import get_db
+from server.database import AsyncSessionLocal, get_db
+from server.jobs import JobContext, enqueue_job, job_handler
 from server.models.asteroid import Asteroid
 from server.models.bug_report import BugReport
 from server.models.equipment import Equipment
-from server.models.mission import Mission
+from server.models.job import FINISHED_STATUSES, Job, STATUS_DONE, STATUS_NAMES
 from server.models.player import Player
-from server.models.rig import Rig
-from server.models.ship import Ship, SHIP_CLASS_STATS, COURIER
-from server.models.stockpile import Stockpile
-from server.models.trade_mission import TradeMission
-from server.models.worker import Worker
+from server.models.ship import Ship, COURIER
 from server.models.world_state import WorldState
+from server.simulation.reserves import load_reserves
+from server.simulation.world_reset import ResetOptions, reset_world as run_world_reset
+from server.world_stats import get_world_stats, max_players_for
 from server.simulation.event_bus import event_bus
 from server.simulation.money_log import log_tx
 
 
-class ResetWorldRequest(BaseModel):
+class ResetWorldRequest(BaseModel):  # fields mirror world_reset.ResetOptions
     world_id: int = 1
     reset_money: bool = True
     starting_money: int = 14_000_000
@@ -42,8 +44,8 @@ class ResetWorldRequest(BaseModel):
     reset_speed: bool = True
     wipe_bug_reports: bool = False
 
-_GAME_EPOCH = _dt.datetime(2112, 1, 1, 0, 0, 0, tzinfo=_dt.timezone.utc)
 
+logger = logging.getLogger(__name__)
 
 router = APIRouter(prefix="/admin-ui", tags=["admin-ui"])
 
@@ -107,53 +109,22 @@ async def admin_dashboard_data(request: Request, db: AsyncSession = Depends(get_
     if not admin_key or not await validate_admin_key(admin_key, db):
         raise HTTPException(status_code=403, detail="Unauthorized")
 
-    thirty_days_ago = _dt.datetime.utcnow() - _dt.timedelta(days=30)
-
-    result = await db.execute(
-        select(func.count(Player.id)).where(Player.last_seen >= thirty_days_ago)
-    )
-    active_players = result.scalar() or 0
-
-    result = await db.execute(select(func.count(Player.id)))
-    total_players = result.scalar() or 0
-
-    result = await db.execute(select(func.count(Ship.id)))
-    total_ships = result.scalar() or 0
-
-    result = await db.execute(
-        select(func.count(Mission.id)).where(Mission.status.in_([0, 1, 2]))
-    )
-    active_missions = result.scalar() or 0
-
-    result = await db.execute(select(Asteroid))
-    asteroids = result.scalars().all()
-
-    total_reserves = 0.0
-    total_iron = 0.0
-    total_water_ice = 0.0
-    total_platinum = 0.0
-
-    for asteroid in asteroids:
-        if asteroid.reserves:
-            total_reserves += sum(asteroid.reserves.values())
-            total_iron += asteroid.reserves.get("iron", 0.0)
-            total_water_ice += asteroid.reserves.get("water_ice", 0.0)
-            total_platinum += asteroid.reserves.get("platinum", 0.0)
-
-    MINIMUM_RESERVES_PER_PLAYER = 50_000_000
-    max_players = int(total_reserves / MINIMUM_RESERVES_PER_PLAYER) if total_reserves > 0 else 0
+    stats = await get_world_stats(db)
+    active_players = stats.active_players_30d
+    total_reserves = stats.total_reserves
+    max_players = max_players_for(total_reserves)
     slots_available = max(0, max_players - active_players)
     capacity_pct = (active_players / max_players * 100) if max_players > 0 else 0
 
     return {
         "active_players": active_players,
-        "total_players": total_players,
-        "total_ships": total_ships,
-        "active_missions": active_missions,
+        "total_players": stats.total_players,
+        "total_ships": stats.total_ships,
+        "active_missions": stats.active_missions,
         "total_reserves": total_reserves,
-        "total_iron": total_iron,
-        "total_water_ice": total_water_ice,
-        "total_platinum": total_platinum,
+        "total_iron": stats.reserves_by_ore.get("iron", 0.0),
+        "total_water_ice": stats.reserves_by_ore.get("water_ice", 0.0),
+        "total_platinum": stats.reserves_by_ore.get("platinum", 0.0),
         "max_players": max_players,
         "slots_available": slots_available,
         "capacity_pct": capacity_pct,
@@ -203,53 +174,18 @@ async def admin_dashboard(
             request.session.clear()
             return RedirectResponse(url="/admin-ui/login", status_code=303)
 
-        # Get server stats
-        thirty_days_ago = _dt.datetime.utcnow() - _dt.timedelta(days=30)
-
-        # Count active players (last 30 days)
-        result = await db.execute(
-            select(func.count(Player.id)).where(Player.last_seen >= thirty_days_ago)
-        )
-        active_players = result.scalar() or 0
-
-        # Count total players
-        result = await db.execute(select(func.count(Player.id)))
-        total_players = result.scalar() or 0
-
-        # Count ships
-        result = await db.execute(select(func.count(Ship.id)))
-        total_ships = result.scalar() or 0
-
-        # Count active missions
-        result = await db.execute(
-            select(func.count(Mission.id)).where(Mission.status.in_([0, 1, 2]))
-        )
-        active_missions = result.scalar() or 0
-
-        # Calculate total reserves
-        result = await db.execute(select(Asteroid))
-        asteroids = result.scalars().all()
-
-        total_reserves = 0.0
-        total_iron = 0.0
-        total_water_ice = 0.0
-        total_platinum = 0.0
-
-        for asteroid in asteroids:
-            if asteroid.reserves:
-                total_reserves += sum(asteroid.reserves.values())
-                total_iron += asteroid.reserves.get("iron", 0.0)
-                total_water_ice += asteroid.reserves.get("water_ice", 0.0)
-                total_platinum += asteroid.reserves.get("platinum", 0.0)
+        # Server stats (maintained counters, one row)
+        stats = await get_world_stats(db)
+        active_players = stats.active_players_30d
+        total_reserves = stats.total_reserves
 
         # Calculate server capacity
-        MINIMUM_RESERVES_PER_PLAYER = 50_000_000  # 50M tonnes
-        max_players = int(total_reserves / MINIMUM_RESERVES_PER_PLAYER) if total_reserves > 0 else 0
+        max_players = max_players_for(total_reserves)
         slots_available = max(0, max_players - active_players)
         capacity_pct = (active_players / max_players * 100) if max_players > 0 else 0
 
         # Check if reserves already generated
-        has_reserves = any(a.reserves and len(a.reserves) > 0 for a in asteroids)
+        has_reserves = total_reserves > 0
 
         # Load all worlds for reset selector
         worlds_result = await db.execute(select(WorldState))
@@ -259,14 +195,14 @@ async def admin_dashboard(
             "request": request,
             "admin_key": admin_key,
             "active_players": active_players,
-            "total_players": total_players,
-            "total_ships": total_ships,
-            "active_missions": active_missions,
+            "total_players": stats.total_players,
+            "total_ships": stats.total_ships,
+            "active_missions": stats.active_missions,
             "worlds": worlds,
             "total_reserves": total_reserves,
-            "total_iron": total_iron,
-            "total_water_ice": total_water_ice,
-            "total_platinum": total_platinum,
+            "total_iron": stats.reserves_by_ore.get("iron", 0.0),
+            "total_water_ice": stats.reserves_by_ore.get("water_ice", 0.0),
+            "total_platinum": stats.reserves_by_ore.get("platinum", 0.0),
             "max_players": max_players,
             "slots_available": slots_available,
             "capacity_pct": capacity_pct,
@@ -369,14 +305,17 @@ async def admin_asteroids(
         select(Asteroid).order_by(Asteroid.semi_major_axis)
     )
     asteroids = result.scalars().all()
+    remaining = await load_reserves(db)
+    original = await load_reserves(db, original=True)
 
     asteroid_data = []
     for asteroid in asteroids:
-        if not asteroid.reserves:
+        reserves = remaining.get(asteroid.id)
+        if not reserves:
             continue
 
-        total_reserves = sum(asteroid.reserves.values())
-        total_original = sum(asteroid.original_reserves.values()) if asteroid.original_reserves else total_reserves
+        total_reserves = sum(reserves.values())
+        total_original = sum(original.get(asteroid.id, {}).values()) or total_reserves
 
         depletion_pct = 0
         if total_original > 0:
@@ -391,10 +330,10 @@ async def admin_asteroids(
             "total_reserves": total_reserves,
             "total_original": total_original,
             "depletion_pct": depletion_pct,
-            "iron": asteroid.reserves.get("iron", 0),
-            "nickel": asteroid.reserves.get("nickel", 0),
-            "platinum": asteroid.reserves.get("platinum", 0),
-            "water_ice": asteroid.reserves.get("water_ice", 0),
+            "iron": reserves.get("iron", 0),
+            "nickel": reserves.get("nickel", 0),
+            "platinum": reserves.get("platinum", 0),
+            "water_ice": reserves.get("water_ice", 0),
         })
 
     return templates.TemplateResponse("admin_asteroids.html", {
@@ -619,138 +558,77 @@ async def broadcast_reset_warning(
     return JSONResponse({"ok": True, "world_name": world_name})
 
 
+_RESET_STEPS = (
+    "wiped", "workers_released", "reserves_cleared", "bug_reports_wiped",
+    "money_reset", "ships_created", "committed", "reserves_regenerated", "done",
+)
+_RESET_POLL_INTERVAL = 0.5
+
+
+@job_handler("reset_world")
+async def reset_world_job(ctx: JobContext, **options) -> dict:
+    result: dict = {}
+    async for step in run_world_reset(ctx.db, ResetOptions(**options)):
+        if step.get("ok"):
+            result = step
+        else:
+            if step["step"] == "committed":
+                # Past this point a cancel would only skip reserve regeneration
+                ctx.disable_cancel()
+            done = _RESET_STEPS.index(step["step"]) + 1
+            await ctx.progress(done / len(_RESET_STEPS), step["step"], force=True)
+    await event_bus.publish({
+        "type": "world_reset_complete",
+        "world_id": result["world_id"],
+        "world_name": result["world_name"],
+        "message": f"[{result['world_name']}] Server has been reset. Returning to start.",
+    })
+    return result
+
+
 @router.post("/reset-world")
 async def reset_world(
     request: Request,
     body: ResetWorldRequest,
     db: AsyncSession = Depends(get_db),
 ):
-    """Full (or selective) world reset with configurable options."""
+    """
+    Full (or selective) world reset with configurable options.
+
+    Runs as a "reset_world" job and streams NDJSON progress lines
+    ({"step": ..., "progress_pct": ..., "elapsed_ms": ...}); the last line
+    carries "ok" and the summary (or the error).
+    """
     admin_key = check_admin_session(request)
     if not admin_key:
         return JSONResponse({"ok": False, "error": "Unauthorized"}, status_code=401)
     if not await validate_admin_key(admin_key, db):
         return JSONResponse({"ok": False, "error": "Unauthorized"}, status_code=401)
 
-    # ── Compute new game time ──────────────────────────────────────────────────
-    now_real = _dt.datetime.now(_dt.timezone.utc)
-    now_2112 = now_real.replace(year=2112)
-    new_ticks = int((now_2112 - _GAME_EPOCH).total_seconds())
-    new_game_seconds = float(new_ticks)
-
-    # ── Identify players in this world ────────────────────────────────────────
-    if body.world_id == 1:
-        p_result = await db.execute(
-            select(Player).where((Player.world_id == 1) | (Player.world_id.is_(None)))
-        )
-    else:
-        p_result = await db.execute(
-            select(Player).where(Player.world_id == body.world_id)
-        )
-    players = p_result.scalars().all()
-    player_ids = [p.id for p in players]
-
-    # ── Wipe game objects ──────────────────────────────────────────────────────
-    await db.execute(delete(Mission).where(Mission.player_id.in_(player_ids)))
-    await db.execute(delete(TradeMission).where(TradeMission.player_id.in_(player_ids)))
-    await db.execute(delete(Stockpile).where(Stockpile.player_id.in_(player_ids)))
-    await db.execute(delete(Rig).where(Rig.player_id.in_(player_ids)))
-    await db.execute(delete(Ship).where(Ship.player_id.in_(player_ids)))
-
-    # ── Release workers from ship assignments ──────────────────────────────────
-    w_result = await db.execute(select(Worker).where(Worker.player_id.in_(player_ids)))
-    for worker in w_result.scalars().all():
-        worker.assigned_ship_id = None
-        db.add(worker)
-
-    # ── Reset asteroid reserves ────────────────────────────────────────────────
-    if body.reset_reserves:
-        ast_result = await db.execute(select(Asteroid))
-        for asteroid in ast_result.scalars().all():
-            asteroid.reserves = {}
-            db.add(asteroid)
-
-    # ── Optional: wipe bug reports ────────────────────────────────────────────
-    if body.wipe_bug_reports:
-        await db.execute(delete(BugReport))
-
-    # ── Reset players + give starting ship ────────────────────────────────────
-    ship_stats = SHIP_CLASS_STATS[body.starting_ship_class]
-    human_count = 0
-    for player in players:
-        if body.reset_money:
-            player.money = body.starting_money
-            log_tx(db, player, body.starting_money, "world_reset", "world reset")
-            db.add(player)
-        if player.is_npc:
-            continue
-        human_count += 1
-        db.add(Ship(
-            player_id=player.id,
-            ship_name="Starter",
-            ship_class=body.starting_ship_class,
-            max_thrust_g=ship_stats["max_thrust_g"],
-            thrust_setting=1.0,
-            cargo_capacity=ship_stats["cargo_capacity"],
-            cargo_volume=ship_stats["cargo_volume"],
-            fuel_capacity=ship_stats["fuel_capacity"],
-            fuel=ship_stats["fuel_capacity"],
-            base_mass=ship_stats["base_mass"],
-            min_crew=ship_stats["min_crew"],
-            max_equipment_slots=ship_stats["max_equipment_slots"],
-            is_stationed=True,
-            station_colony_id=None,
-            current_cargo={},
-            supplies={},
-            position_x=1.0,
-            position_y=0.0,
-        ))
-
-    # ── Rebuild NPC corp ships ─────────────────────────────────────────────────
-    from server.simulation.npc_corps import reseed_npc_ships
-    await db.flush()
-    await reseed_npc_ships(db)
-
-    # ── Update WorldState ──────────────────────────────────────────────────────
-    ws_result = await db.execute(select(WorldState).where(WorldState.world_id == body.world_id))
-    ws = ws_result.scalar_one_or_none()
-    world_name = ws.world_name if ws else "Unknown"
-    if ws:
-        ws.total_ticks = new_ticks
-        ws.game_seconds = new_game_seconds
-        if body.reset_speed:
-            ws.speed_multiplier = 1.0
-        db.add(ws)
-
-    await db.commit()
-
-    # ── Sync in-memory state ───────────────────────────────────────────────────
-    from server.simulation.tick import reset_world_time
-    reset_world_time(new_ticks, new_game_seconds)
-    if body.reset_speed:
-        from server.routers import admin_speed as _aspeed
-        _aspeed._simulation_speed_multiplier = 1.0
-
-    # ── Auto-regenerate reserves ───────────────────────────────────────────────
-    regen_count = 0
-    if body.reset_reserves and body.auto_regen_reserves:
-        from server.simulation.world_setup import generate_reserves
-        summary = await generate_reserves(db, force=True)
-        regen_count = summary.get("count", 0)
-
-    # ── Notify all clients ─────────────────────────────────────────────────────
-    await event_bus.publish({
-        "type": "world_reset_complete",
-        "world_id": body.world_id,
-        "world_name": world_name,
-        "message": f"[{world_name}] Server has been reset. Returning to start.",
-    })
-
-    return JSONResponse({
-        "ok": True,
-        "world_id": body.world_id,
-        "world_name": world_name,
-        "game_date": now_2112.strftime("%Y-%m-%d"),
-        "human_players_reset": human_count,
-        "reserves_regenerated": regen_count,
-    })
+    job = await enqueue_job(db, "reset_world", body.model_dump())
+
+    async def stream():
+        # Follow the job row; the reset keeps running if the admin disconnects
+        started = time.monotonic()
+        last_message = None
+        while True:
+            async with AsyncSessionLocal() as poll_db:
+                state = await poll_db.get(Job, job.id)
+            if state.message and state.message != last_message:
+                last_message = state.message
+                yield json.dumps({
+                    "step": state.message,
+                    "progress_pct": round(state.progress * 100, 1),
+                    "elapsed_ms": round((time.monotonic() - started) * 1000),
+                    "job_id": job.id,
+                }) + "\n"
+            if state.status == STATUS_DONE:
+                yield json.dumps(state.result) + "\n"
+                return
+            if state.status in FINISHED_STATUSES:
+                error = state.error or STATUS_NAMES[state.status]
+                yield json.dumps({"ok": False, "error": error, "job_id": job.id}) + "\n"
+                return
+            await asyncio.sleep(_RESET_POLL_INTERVAL)
+
+    return StreamingResponse(stream(), media_type="application/x-ndjson")
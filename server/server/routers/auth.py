@@ -5,8 +5,9 @@ from fastapi import APIRouter, Depends, HTTPException, Request, status
 from fastapi.security import OAuth2PasswordRequestForm
 from sqlalchemy import select
 from sqlalchemy.ext.asyncio import AsyncSession
-from server.auth import create_access_token, get_current_player, hash_password, verify_password
+from server.auth import create_access_token, get_current_player, hash_password_async, verify_password_async
 from server.database import get_db
+from server.email_service import enqueue_welcome_email
 from server.models.player import Player
 from server.rate_limit import limiter
 from server.schemas.player import PlayerCreate, PlayerOut, Token
@@ -83,7 +84,7 @@ async def register(payload: PlayerCreate, request: Request, db: AsyncSession = D
     player = Player(
         username=payload.username,
         email=payload.email,
-        password_hash=hash_password(payload.password),
+        password_hash=await hash_password_async(payload.password),
         is_admin=is_admin,
         money=14_000_000,  # Default starting money
         reputation=0,  # Default reputation
@@ -93,6 +94,8 @@ async def register(payload: PlayerCreate, request: Request, db: AsyncSession = D
         encounter_policy=1,  # COEXIST
     )
     db.add(player)
+    if payload.email:
+        enqueue_welcome_email(db, payload.email, payload.username)
     await db.commit()
     await db.refresh(player)
 
@@ -151,7 +154,7 @@ async def login(
     result = await db.execute(select(Player).where(Player.username == form.username.lower()))
     player = result.scalar_one_or_none()
 
-    if not player or not verify_password(form.password, player.password_hash):
+    if not player or not await verify_password_async(form.password, player.password_hash):
         # Log failed login attempt with details
         logger.warning(
             f"Failed login attempt for username: {form.username} "
@@ -3,10 +3,9 @@ import re
 from fastapi import APIRouter, Depends, HTTPException, Query, Request, status
 from sqlalchemy import select, or_, func
 from sqlalchemy.ext.asyncio import AsyncSession
-from server.auth import require_admin
+from server.auth import Principal, require_admin
 from server.database import get_db
 from server.models.bug_report import BugReport
-from server.models.player import Player
 from server.schemas.bug_report import (
     BugReportCreate,
     BugReportOut,
@@ -93,7 +92,7 @@ async def create_bug_report(
 @limiter.limit("60/minute")
 async def list_bug_reports(
     request: Request,
-    player: Player = Depends(require_admin),  # Admin only
+    player: Principal = Depends(require_admin),  # Admin only
     db: AsyncSession = Depends(get_db),
     status_filter: str | None = Query(None, pattern="^(open|in_progress|done|wont_fix|duplicate)$"),
     category: str | None = Query(None, max_length=50),
@@ -145,7 +144,7 @@ async def list_bug_reports(
 async def get_bug_report(
     request: Request,
     report_id: int,
-    player: Player = Depends(require_admin),  # Admin only
+    player: Principal = Depends(require_admin),  # Admin only
     db: AsyncSession = Depends(get_db),
 ):
     """Get single bug report by ID (admin only)"""
@@ -167,7 +166,7 @@ async def update_bug_report(
     request: Request,
     report_id: int,
     payload: BugReportUpdate,
-    player: Player = Depends(require_admin),  # Admin only
+    player: Principal = Depends(require_admin),  # Admin only
     db: AsyncSession = Depends(get_db),
 ):
     """Update bug report status/notes (admin only)"""
@@ -199,7 +198,7 @@ async def update_bug_report(
 async def delete_bug_report(
     request: Request,
     report_id: int,
-    player: Player = Depends(require_admin),  # Admin only
+    player: Principal = Depends(require_admin),  # Admin only
     db: AsyncSession = Depends(get_db),
 ):
     """Delete a bug report (admin only)"""
@@ -8,8 +8,7 @@ from server.models.contract import (
     Contract,
     STATUS_AVAILABLE, STATUS_ACCEPTED, STATUS_COMPLETED, STATUS_FAILED,
 )
-from server.models.player import Player
-from server.routers.auth import get_current_player
+from server.auth import Principal, get_current_principal
 from server.schemas.game import ContractOut
 
 router = APIRouter(prefix="/game/contracts", tags=["contracts"])
@@ -17,7 +16,7 @@ router = APIRouter(prefix="/game/contracts", tags=["contracts"])
 
 @router.get("", response_model=list[ContractOut])
 async def list_contracts(
-    player: Player = Depends(get_current_player),
+    player: Principal = Depends(get_current_principal),
     db: AsyncSession = Depends(get_db),
 ):
     """Return all available contracts plus this player's active/completed ones."""
@@ -33,7 +32,7 @@ async def list_contracts(
 @router.post("/{contract_id}/accept", response_model=ContractOut)
 async def accept_contract(
     contract_id: int,
-    player: Player = Depends(get_current_player),
+    player: Principal = Depends(get_current_principal),
     db: AsyncSession = Depends(get_db),
 ):
     """Accept an available contract."""
@@ -1,44 +1,85 @@
 import asyncio
 import json
 import logging
-from fastapi import APIRouter, Depends
+
+import msgpack
+from fastapi import APIRouter, Depends, HTTPException, Query, WebSocket, WebSocketDisconnect
 from fastapi.responses import StreamingResponse
-from server.auth import get_current_player
-from server.models.player import Player
+from server.auth import Principal, get_current_principal, principal_from_token
+from server.database import AsyncSessionLocal
 from server.simulation.event_bus import event_bus
 
 router = APIRouter(prefix="/events", tags=["events"])
 logger = logging.getLogger(__name__)
 
+# Topics a WebSocket client receives before sending any subscribe op.
+# Together they cover exactly what the SSE stream delivers.
+DEFAULT_TOPICS = frozenset({"player", "world", "market"})
+_SCOPED_TOPIC_PREFIXES = ("ship:", "colony:")
+_MARKET_EVENT_TYPES = frozenset({"market_update", "market_event"})
+_MAX_TOPICS = 256
+
 
 def _sse_line(event: dict) -> str:
     return "data: " + json.dumps(event) + "\n\n"
 
 
+def _pack(event: dict) -> bytes:
+    return msgpack.packb(event, use_bin_type=True)
+
+
+def _event_topics(event: dict, player_id: int) -> set[str]:
+    """Topics an event is published under, as seen by one player."""
+    topics: set[str] = set()
+    if event.get("ship_id") is not None:
+        topics.add(f"ship:{event['ship_id']}")
+    if event.get("colony_id") is not None:
+        topics.add(f"colony:{event['colony_id']}")
+    if event.get("type") in _MARKET_EVENT_TYPES:
+        topics.add("market")
+    elif event.get("player_id") == player_id:
+        topics.add("player")
+    elif event.get("player_id") is None:
+        topics.add("world")
+    return topics
+
+
+def _valid_topic(topic: object) -> bool:
+    if not isinstance(topic, str):
+        return False
+    if topic in DEFAULT_TOPICS:
+        return True
+    for prefix in _SCOPED_TOPIC_PREFIXES:
+        if topic.startswith(prefix) and topic[len(prefix):].isdigit():
+            return True
+    return False
+
+
 @router.get("/stream")
-async def stream_events(player: Player = Depends(get_current_player)):
+async def stream_events(player: Principal = Depends(get_current_principal)):
     """Server-Sent Events stream. Auth via Bearer token in query or header."""
+    player_id = player.id
 
     async def event_generator():
         q = event_bus.subscribe()
         try:
-            connected = {"type": "connected", "player_id": player.id}
+            connected = {"type": "connected", "player_id": player_id}
             yield _sse_line(connected)
             while True:
                 try:
                     event = await asyncio.wait_for(q.get(), timeout=5.0)
-                    player_id = event.get("player_id")
-                    if player_id is None or player_id == player.id:
+                    event_player_id = event.get("player_id")
+                    if event_player_id is None or event_player_id == player_id:
                         yield _sse_line(event)
                 except asyncio.TimeoutError:
                     yield ": keepalive\n\n"
                 except asyncio.CancelledError:
                     break
         except Exception as exc:
-            logger.error("SSE stream error for player 0: ", player.id, exc)
+            logger.error("SSE stream error for player %d: %s", player_id, exc)
         finally:
             event_bus.unsubscribe(q)
-            logger.info("SSE client disconnected (player 0)", player.id)
+            logger.info("SSE client disconnected (player %d)", player_id)
 
     return StreamingResponse(
         event_generator(),
@@ -48,3 +89,95 @@ async def stream_events(player: Player = Depends(get_current_player)):
             "X-Accel-Buffering": "no",
         },
     )
+
+
+@router.websocket("/ws")
+async def websocket_events(websocket: WebSocket, token: str = Query(...)):
+    """
+    Binary WebSocket event stream.
+
+    Every frame is a MessagePack map. The server sends the same event dicts as
+    the SSE stream; clients send ops to change what they receive (as
+    MessagePack, or as JSON in a text frame):
+
+        {"op": "subscribe", "topics": ["ship:12", "colony:3"]}
+        {"op": "unsubscribe", "topics": ["world"]}
+
+    Topics are "player", "world", "market", "ship:<id>" and "colony:<id>".
+    Events owned by another player are never delivered, whatever the topic.
+    Per-message deflate is negotiated by uvicorn's websockets transport.
+    """
+    try:
+        async with AsyncSessionLocal() as db:
+            player = await principal_from_token(token, db)
+            player_id = player.id
+    except HTTPException:
+        await websocket.close(code=4401)
+        return
+
+    await websocket.accept()
+    topics: set[str] = set(DEFAULT_TOPICS)
+    q = event_bus.subscribe()
+
+    async def send_loop() -> None:
+        await websocket.send_bytes(_pack({
+            "type": "connected", "player_id": player_id, "topics": sorted(topics),
+        }))
+        while True:
+            try:
+                event = await asyncio.wait_for(q.get(), timeout=15.0)
+            except asyncio.TimeoutError:
+                await websocket.send_bytes(_pack({"type": "keepalive"}))
+                continue
+            event_player_id = event.get("player_id")
+            if event_player_id is not None and event_player_id != player_id:
+                continue
+            if topics.isdisjoint(_event_topics(event, player_id)):
+                continue
+            await websocket.send_bytes(_pack(event))
+
+    async def receive_loop() -> None:
+        while True:
+            frame = await websocket.receive()
+            if frame["type"] == "websocket.disconnect":
+                raise WebSocketDisconnect(frame.get("code", 1000))
+            try:
+                if frame.get("bytes") is not None:
+                    message = msgpack.unpackb(frame["bytes"], raw=False)
+                else:
+                    message = json.loads(frame["text"])
+            except Exception:
+                await websocket.send_bytes(_pack({"type": "error", "detail": "Malformed frame"}))
+                continue
+            op = message.get("op") if isinstance(message, dict) else None
+            requested = message.get("topics") if isinstance(message, dict) else None
+            if op not in ("subscribe", "unsubscribe") or not isinstance(requested, list):
+                await websocket.send_bytes(_pack({"type": "error", "detail": "Unknown op"}))
+                continue
+            invalid = [t for t in requested if not _valid_topic(t)]
+            if invalid:
+                await websocket.send_bytes(_pack({
+                    "type": "error", "detail": "Invalid topics", "topics": invalid,
+                }))
+                continue
+            if op == "subscribe":
+                if len(topics | set(requested)) > _MAX_TOPICS:
+                    await websocket.send_bytes(_pack({"type": "error", "detail": "Too many topics"}))
+                    continue
+                topics.update(requested)
+            else:
+                topics.difference_update(requested)
+            await websocket.send_bytes(_pack({"type": "subscribed", "topics": sorted(topics)}))
+
+    tasks = [asyncio.create_task(send_loop()), asyncio.create_task(receive_loop())]
+    try:
+        done, _ = await asyncio.wait(tasks, return_when=asyncio.FIRST_COMPLETED)
+        for task in done:
+            exc = task.exception()
+            if exc is not None and not isinstance(exc, WebSocketDisconnect):
+                logger.error("WebSocket stream error for player %d: %s", player_id, exc)
+    finally:
+        for task in tasks:
+            task.cancel()
+        event_bus.unsubscribe(q)
+        logger.info("WebSocket client disconnected (player %d)", player_id)
@@ -1,16 +1,22 @@
+import dataclasses
 import math
 import random
-from fastapi import APIRouter, Depends, HTTPException, status, Request
+from datetime import datetime, timedelta, timezone
+import numpy as np
+from typing import Literal
+
+from fastapi import APIRouter, Depends, HTTPException, Query, status, Request
 import sqlalchemy as sa
 from sqlalchemy import select
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy.orm import selectinload
-from server.auth import get_current_player
+from server.auth import Principal, get_current_player, get_current_principal
 from server.database import get_db
 from server.models.asteroid import Asteroid
 from server.models.colony import Colony
 from server.models.equipment import Equipment
+from server.models.loading import load_profile
 from server.models.mission import Mission, STATUS_TRANSIT_OUT
+from server.models.mission_history import MissionHistory, PlayerMissionSummary, TradeMissionHistory
 from server.models.player import Player
 from server.models.rig import Rig, UNIT_TYPE_BASIC, UNIT_TYPE_ADVANCED, UNIT_TYPE_REFINERY
 from server.models.ship import Ship, SHIP_CLASS_STATS
@@ -22,24 +28,32 @@ from server.models.worker import Worker
 from server.rate_limit import limiter
 from server.routers import admin_speed
 from server.models.market_event import MarketEvent
-from server.models.transaction import PlayerTransaction
+from server.models.transaction import LedgerRollupState, PlayerFinanceDaily, PlayerTransaction
 from server.schemas.game import (
-    AsteroidOut, BuyEquipmentRequest, BuyShipRequest, ColonyOut, ContractOut, DispatchRequest,
-    EquipmentOut, GameState, HireRequest, MarketEventOut, MissionOut, RigOut, SellEquipmentRequest,
-    ShipOut, StockpileOut, TradeMissionOut, TransactionOut, WorkerOut,
+    AsteroidOut, BestTargetOut, BestTargetsOut, BuyEquipmentRequest, BuyShipRequest, ColonyOut, ContractOut, DispatchRequest,
+    EquipmentOut, FinanceOut, FinanceRollupOut, GameState, HireRequest, MarketEventOut, MissionHistoryOut, MissionHistoryPage,
+    MissionOut, MissionSummaryOut, RigOut, SellEquipmentRequest, ShipOut, StockpileOut,
+    TradeMissionHistoryOut, TradeMissionOut, TransactionOut, WorkerOut,
 )
 from server.simulation.money_log import log_tx
+from server.simulation.ore import OreVector
+from server.simulation.reserves import load_reserves
 from server.schemas.player import PolicyUpdate
 from server.simulation.tick import get_market_prices, get_total_ticks, get_game_seconds
+from server.simulation.ephemeris import Orbits, game_jd, get_asteroid_catalog
 from server.simulation.event_bus import event_bus
+from server.simulation.intercept import (
+    Intercept, asteroid_intercepts, body_intercept, brachistochrone_seconds, orbit_intercept,
+)
+from server.simulation.snapshot import WorldSnapshot, fresh_for_player, get_reader as get_snapshot_reader
+from server.simulation.targets import best_targets, tick_bucket
 
 router = APIRouter(prefix="/game", tags=["game"])
 
-AU_TO_KM = 149_597_870.7
 G_ACCEL = 9.80665
 
-# Semi-major axis (AU) by planet_id — used for transit calculations.
-# These are mean orbital radii; good enough for transit time estimates.
+# Semi-major axis (AU) by planet_id — fallback for colonies on bodies the
+# ephemeris does not know (placed at (a, 0)).
 PLANET_SEMI_MAJOR_AU: dict[str, float] = {
     "earth":       1.000,
     "moon":        1.003,  # Earth-Moon L1 approximation
@@ -54,27 +68,55 @@ PLANET_SEMI_MAJOR_AU: dict[str, float] = {
 }
 
 
-def _transit_time_seconds(dist_au: float, thrust_g: float) -> float:
-    dist_m = dist_au * AU_TO_KM * 1000.0
-    accel = thrust_g * G_ACCEL
-    if accel <= 0 or dist_m <= 0:
-        return 0.0
-    return 2.0 * math.sqrt(dist_m / accel)
+def _colony_intercept(planet_id: str, x: float, y: float, thrust_g: float, jd: float) -> Intercept:
+    intercept = body_intercept(planet_id, x, y, thrust_g, jd)
+    if intercept is None:
+        target_x, target_y = PLANET_SEMI_MAJOR_AU.get(planet_id, 1.52), 0.0
+        dist = math.hypot(target_x - x, target_y - y)
+        intercept = Intercept(float(brachistochrone_seconds(dist, thrust_g * G_ACCEL)), target_x, target_y)
+    return intercept
 
 @router.get("/state", response_model=GameState)
 async def get_state(
     player: Player = Depends(get_current_player),
     db: AsyncSession = Depends(get_db),
 ):
-    result = await db.execute(
-        select(Mission)
-        .options(selectinload(Mission.ship), selectinload(Mission.asteroid))
-        .where(
-            Mission.player_id == player.id,
-            Mission.status.in_([0, 1, 2]),
+    def from_snapshot(snap: WorldSnapshot):
+        if not fresh_for_player(snap, player.id):
+            return None
+        ships = snap.ship_dicts(snap.ships[snap.ships["player_id"] == player.id])
+        if ships is None:
+            return None
+        missions = snap.missions[
+            (snap.missions["player_id"] == player.id) & np.isin(snap.missions["status"], [0, 1, 2])
+        ]
+        return ships, snap.mission_dicts(missions), snap.colony_tiers(), snap.total_ticks, snap.game_seconds, snap.speed
+
+    cached = get_snapshot_reader().read(from_snapshot)
+    if cached is not None:
+        ships_out, active_missions, colony_tiers, total_ticks, game_seconds, speed = cached
+    else:
+        result = await db.execute(
+            select(Mission)
+            .options(*load_profile("state.missions"))
+            .where(
+                Mission.player_id == player.id,
+                Mission.status.in_([0, 1, 2]),
+            )
         )
-    )
-    active_missions = list(result.scalars().all())
+        active_missions = list(result.scalars().all())
+        ships_result = await db.execute(
+            select(Ship).options(*load_profile("state.ships")).where(Ship.player_id == player.id)
+        )
+        ships_out = list(ships_result.scalars().all())
+        # Load colony tiers (world-wide, small data)
+        colonies_result = await db.execute(select(Colony))
+        colony_tiers = {c.colony_name: c.tier for c in colonies_result.scalars().all()}
+        total_ticks, game_seconds = get_total_ticks(), get_game_seconds()
+        speed = admin_speed.get_speed_multiplier()
+
+    workers_result = await db.execute(select(Worker).where(Worker.player_id == player.id))
+    workers = list(workers_result.scalars().all())
 
     # Load player's trade missions
     trade_result = await db.execute(select(TradeMission).where(
@@ -106,10 +148,6 @@ async def get_state(
     )
     active_market_events = list(events_result.scalars().all())
 
-    # Load colony tiers (world-wide, small data)
-    colonies_result = await db.execute(select(Colony))
-    colony_tiers = {c.colony_name: c.tier for c in colonies_result.scalars().all()}
-
     # Load recent transactions (newest first, capped at 50)
     tx_result = await db.execute(
         select(PlayerTransaction)
@@ -129,11 +167,11 @@ async def get_state(
         collection_policy=player.collection_policy,
         encounter_policy=player.encounter_policy,
         auto_sell_on_return=player.auto_sell_on_return,
-        total_ticks=get_total_ticks(),
-        game_seconds=get_game_seconds(),
-        speed_multiplier=admin_speed.get_speed_multiplier(),
-        ships=[ShipOut.model_validate(s) for s in player.ships],
-        workers=[WorkerOut.model_validate(w) for w in player.workers],
+        total_ticks=total_ticks,
+        game_seconds=game_seconds,
+        speed_multiplier=speed,
+        ships=[ShipOut.model_validate(s) for s in ships_out],
+        workers=[WorkerOut.model_validate(w) for w in workers],
         active_missions=[MissionOut.model_validate(m) for m in active_missions],
         trade_missions=[TradeMissionOut.model_validate(tm) for tm in trade_missions],
         rigs=[RigOut.model_validate(r) for r in rigs],
@@ -150,7 +188,7 @@ async def get_state(
 async def dispatch(
     request: Request,
     req: DispatchRequest,
-    player: Player = Depends(get_current_player),
+    player: Principal = Depends(get_current_principal),
     db: AsyncSession = Depends(get_db),
 ):
     ship_result = await db.execute(
@@ -171,23 +209,27 @@ async def dispatch(
         asteroid = ast_result.scalar_one_or_none()
         if not asteroid:
             raise HTTPException(status_code=404, detail="Asteroid not found")
-        target_x = asteroid.semi_major_axis
-        target_y = 0.0
-    elif req.colony_id:
+    elif not req.colony_id:
+        raise HTTPException(status_code=422, detail="Provide asteroid_id or colony_id")
+    origin_x = ship.position_x
+    origin_y = ship.position_y
+    thrust_g = ship.max_thrust_g * ship.thrust_setting
+    jd = game_jd()
+    # Aim where the target will be on arrival
+    if asteroid is not None:
+        intercept = (await asteroid_intercepts(db, [(origin_x, origin_y, thrust_g)], [asteroid.id], jd))[0]
+        if intercept is None:  # added since the catalog was read
+            intercept = orbit_intercept(Orbits.of(asteroid), origin_x, origin_y, thrust_g, jd)
+    else:
         col_result = await db.execute(select(Colony).where(Colony.id == req.colony_id))
         colony = col_result.scalar_one_or_none()
         if not colony:
             raise HTTPException(status_code=404, detail="Colony not found")
-        target_x = PLANET_SEMI_MAJOR_AU.get(colony.planet_id, 1.52)
-        target_y = 0.0
+        intercept = _colony_intercept(colony.planet_id, origin_x, origin_y, thrust_g, jd)
         origin_name = colony.colony_name
         origin_is_earth = False
-    else:
-        raise HTTPException(status_code=422, detail="Provide asteroid_id or colony_id")
-    origin_x = ship.position_x
-    origin_y = ship.position_y
-    dist = math.sqrt((target_x - origin_x) ** 2 + (target_y - origin_y) ** 2)
-    transit_sec = _transit_time_seconds(dist, ship.max_thrust_g * ship.thrust_setting)
+    target_x, target_y = intercept.x, intercept.y
+    transit_sec = intercept.transit_s
     fuel_per_tick = (ship.fuel_capacity * 0.001) * ship.thrust_setting
     mission = Mission(
         player_id=player.id,
@@ -214,6 +256,47 @@ async def dispatch(
     await db.refresh(mission)
     return mission
 
+
+@router.get("/ships/{ship_id}/best-targets", response_model=BestTargetsOut)
+@limiter.limit("30/minute")
+async def ship_best_targets(
+    request: Request,
+    ship_id: int,
+    limit: int = Query(20, ge=1, le=100),
+    mining_duration: float = Query(86400.0, ge=3600.0, le=604800.0),
+    player: Principal = Depends(get_current_principal),
+    db: AsyncSession = Depends(get_db),
+):
+    """
+    Asteroids ranked by expected profit per game-hour for this ship: round
+    trip transit, mining until the hold is full (or mining_duration ends)
+    within remaining reserves, the best of market and colony prices, less
+    crew wages for the trip.
+    """
+    ship = (await db.execute(
+        select(Ship).where(Ship.id == ship_id, Ship.player_id == player.id)
+    )).scalar_one_or_none()
+    if not ship:
+        raise HTTPException(status_code=404, detail="Ship not found")
+    wages = await db.scalar(
+        select(sa.func.coalesce(sa.func.sum(Worker.wage), 0)).where(Worker.assigned_ship_id == ship.id)
+    )
+    ranked = await best_targets(
+        db, ship, limit=limit, crew_wage_per_day=float(wages), mining_duration=mining_duration,
+    )
+    names = dict((await db.execute(
+        select(Asteroid.id, Asteroid.asteroid_name).where(Asteroid.id.in_([t.asteroid_id for t in ranked]))
+    )).all())
+    return BestTargetsOut(
+        ship_id=ship.id,
+        tick_bucket=tick_bucket(),
+        targets=[
+            BestTargetOut(asteroid_name=names.get(t.asteroid_id, ""), **dataclasses.asdict(t))
+            for t in ranked
+        ],
+    )
+
+
 @router.get("/available-workers", response_model=list[WorkerOut])
 async def list_available_workers(
     db: AsyncSession = Depends(get_db),
@@ -230,7 +313,7 @@ async def list_available_workers(
 async def hire(
     request: Request,
     req: HireRequest,
-    player: Player = Depends(get_current_player),
+    player: Principal = Depends(get_current_principal),
     db: AsyncSession = Depends(get_db),
 ):
     # Hire from the labour pool (workers with no player_id assigned)
@@ -252,7 +335,7 @@ async def hire(
 async def fire(
     request: Request,
     worker_id: int,
-    player: Player = Depends(get_current_player),
+    player: Principal = Depends(get_current_principal),
     db: AsyncSession = Depends(get_db),
 ):
     result = await db.execute(
@@ -513,7 +596,7 @@ async def deploy_rig(
     request: Request,
     rig_id: int,
     asteroid_id: int,
-    player: Player = Depends(get_current_player),
+    player: Principal = Depends(get_current_principal),
     db: AsyncSession = Depends(get_db),
 ):
     """Deploy a rig to an asteroid"""
@@ -622,7 +705,7 @@ async def rebuild_rig(
 async def recall_rig(
     request: Request,
     rig_id: int,
-    player: Player = Depends(get_current_player),
+    player: Principal = Depends(get_current_principal),
     db: AsyncSession = Depends(get_db),
 ):
     """Recall a rig from asteroid back to inventory"""
@@ -647,7 +730,7 @@ async def recall_rig(
 
 @router.get("/stockpiles", response_model=list[StockpileOut])
 async def list_stockpiles(
-    player: Player = Depends(get_current_player),
+    player: Principal = Depends(get_current_principal),
     db: AsyncSession = Depends(get_db),
 ):
     """Get all ore stockpiles for player"""
@@ -670,7 +753,7 @@ async def sell_cargo(
     Applies price_multipliers of the colony the ship is stationed at (if any).
     Ship must be stationed (docked) and have cargo.
     """
-    from server.simulation.tick import get_market_prices, BASE_ORE_PRICES
+    from server.simulation.tick import get_price_vector
     ship_result = await db.execute(
         select(Ship).where(Ship.id == ship_id, Ship.player_id == player.id)
     )
@@ -690,12 +773,8 @@ async def sell_cargo(
         if colony:
             price_multipliers = colony.price_multipliers or {}
 
-    market = get_market_prices()
-    total = 0
-    for ore_type, tonnes in ship.current_cargo.items():
-        base_price = market.get(ore_type, BASE_ORE_PRICES.get(ore_type, 1000.0))
-        multiplier = price_multipliers.get(ore_type, 1.0)
-        total += int(tonnes * base_price * multiplier)
+    prices = get_price_vector() * OreVector.from_dict(price_multipliers, fill=1.0)
+    total = int(OreVector.from_dict(ship.current_cargo).dot(prices))
 
     ship.current_cargo = {}
     player.money += total
@@ -713,7 +792,7 @@ async def dispatch_trade_mission(
     request: Request,
     ship_id: int,
     colony_id: int,
-    player: Player = Depends(get_current_player),
+    player: Principal = Depends(get_current_principal),
     db: AsyncSession = Depends(get_db),
 ):
     """
@@ -745,14 +824,14 @@ async def dispatch_trade_mission(
     if not colony:
         raise HTTPException(status_code=404, detail="Colony not found")
 
-    # Calculate transit using colony's actual orbital radius
+    # Calculate transit to where the colony will be on arrival
     origin_x = ship.position_x
     origin_y = ship.position_y
-    target_x = PLANET_SEMI_MAJOR_AU.get(colony.planet_id, 1.52)
-    target_y = 0.0
-
-    dist = math.sqrt((target_x - origin_x) ** 2 + (target_y - origin_y) ** 2)
-    transit_sec = _transit_time_seconds(dist, ship.max_thrust_g * ship.thrust_setting)
+    intercept = _colony_intercept(
+        colony.planet_id, origin_x, origin_y, ship.max_thrust_g * ship.thrust_setting, game_jd(),
+    )
+    target_x, target_y = intercept.x, intercept.y
+    transit_sec = intercept.transit_s
     fuel_per_tick = (ship.fuel_capacity * 0.001) * ship.thrust_setting
 
     # Create trade mission
@@ -820,7 +899,7 @@ async def attack_ship(
     request: Request,
     attacker_ship_id: int,
     target_ship_id: int,
-    player: Player = Depends(get_current_player),
+    player: Principal = Depends(get_current_principal),
     db: AsyncSession = Depends(get_db),
 ):
     """
@@ -830,7 +909,7 @@ async def attack_ship(
     """
     # Load attacker (must belong to caller)
     att_result = await db.execute(
-        select(Ship).options(selectinload(Ship.equipment))
+        select(Ship).options(*load_profile("combat.attacker"))
         .where(Ship.id == attacker_ship_id, Ship.player_id == player.id)
     )
     attacker = att_result.scalar_one_or_none()
@@ -841,7 +920,7 @@ async def attack_ship(
 
     # Load target + player info
     tgt_result = await db.execute(
-        select(Ship).options(selectinload(Ship.equipment), selectinload(Ship.player))
+        select(Ship).options(*load_profile("combat.target"))
         .where(Ship.id == target_ship_id)
     )
     target = tgt_result.scalar_one_or_none()
@@ -936,7 +1015,20 @@ async def attack_ship(
 @router.get("/asteroids", response_model=list[AsteroidOut])
 async def list_asteroids(db: AsyncSession = Depends(get_db)):
     result = await db.execute(select(Asteroid))
-    return [AsteroidOut.model_validate(a) for a in result.scalars().all()]
+    remaining = await load_reserves(db)
+    original = await load_reserves(db, original=True)
+    catalog = await get_asteroid_catalog(db)
+    xy = catalog.positions(game_jd()).tolist()
+    out = []
+    for a in result.scalars().all():
+        row = catalog.row(a.id)
+        out.append(AsteroidOut.model_validate(a).model_copy(update={
+            "reserves": remaining.get(a.id, {}),
+            "original_reserves": original.get(a.id, {}),
+            "position_x": xy[row][0] if row is not None else None,
+            "position_y": xy[row][1] if row is not None else None,
+        }))
+    return out
 
 
 @router.get("/colonies", response_model=list[ColonyOut])
@@ -947,21 +1039,26 @@ async def list_colonies(db: AsyncSession = Depends(get_db)):
 
 @router.get("/market")
 async def market_prices():
-    return get_market_prices()
+    prices = get_snapshot_reader().read(WorldSnapshot.market_prices)
+    return prices if prices is not None else get_market_prices()
 
 
 @router.get("/world")
 async def get_world_state(
-    player: Player = Depends(get_current_player),
+    player: Principal = Depends(get_current_principal),
     db: AsyncSession = Depends(get_db),
 ):
     """
     Get shared world state - all ships from all players for multiplayer visibility.
     Returns ships with owner information so clients can distinguish their own ships.
     """
+    cached = get_snapshot_reader().read(WorldSnapshot.ship_dicts)
+    if cached is not None:
+        return {"ships": [ShipOut(**ship_dict) for ship_dict in cached]}
+
     # Get all ships with their player relationship loaded
     result = await db.execute(
-        select(Ship).options(selectinload(Ship.player))
+        select(Ship).options(*load_profile("world.ships"))
     )
     all_ships = list(result.scalars().all())
 
@@ -998,9 +1095,70 @@ async def get_world_state(
     return {"ships": ships_out}
 
 
+@router.get("/mission-history", response_model=MissionHistoryPage)
+async def get_mission_history(
+    kind: Literal["missions", "trade"] = "missions",
+    before_id: int | None = Query(None, gt=0),
+    limit: int = Query(50, ge=1, le=100),
+    player: Principal = Depends(get_current_principal),
+    db: AsyncSession = Depends(get_db),
+):
+    """
+    Archived missions (newest first) plus the player's lifetime totals.
+
+    Keyset-paginated: pass next_before_id back as before_id for the next page.
+    Finished missions reach the archive within MISSION_ARCHIVE_INTERVAL.
+    """
+    table, out = (MissionHistory, MissionHistoryOut) if kind == "missions" else (TradeMissionHistory, TradeMissionHistoryOut)
+    stmt = select(table).where(table.player_id == player.id)
+    if before_id is not None:
+        stmt = stmt.where(table.id < before_id)
+    rows = list((await db.execute(stmt.order_by(table.id.desc()).limit(limit))).scalars().all())
+
+    summary = await db.get(PlayerMissionSummary, player.id)
+    entries = [out.model_validate(r) for r in rows]
+    return MissionHistoryPage(
+        missions=entries if kind == "missions" else [],
+        trade_missions=entries if kind == "trade" else [],
+        summary=MissionSummaryOut.model_validate(summary) if summary else MissionSummaryOut(),
+        next_before_id=rows[-1].id if len(rows) == limit else None,
+    )
+
+
+@router.get("/finance", response_model=FinanceOut)
+async def get_finance(
+    days: int = Query(30, ge=1, le=365),
+    player: Principal = Depends(get_current_principal),
+    db: AsyncSession = Depends(get_db),
+):
+    """
+    Daily income / expense per source (payroll, trade_sale, contract, ...).
+
+    Served from player_finance_daily, which the simulation leader refreshes
+    every LEDGER_ROLLUP_INTERVAL seconds; raw history is not scanned.
+    """
+    since = datetime.now(timezone.utc).date() - timedelta(days=days - 1)
+    rows = list((await db.execute(
+        select(PlayerFinanceDaily)
+        .where(PlayerFinanceDaily.player_id == player.id, PlayerFinanceDaily.day >= since)
+        .order_by(PlayerFinanceDaily.day, PlayerFinanceDaily.source)
+    )).scalars().all())
+
+    net: dict[str, int] = {}
+    for r in rows:
+        net[r.source] = net.get(r.source, 0) + r.income - r.expense
+    state = await db.get(LedgerRollupState, 1)
+    return FinanceOut(
+        days=days,
+        rollups=[FinanceRollupOut.model_validate(r) for r in rows],
+        net_by_source=net,
+        rolled_up_at=state.rolled_up_at if state else None,
+    )
+
+
 @router.get("/notifications")
 async def get_notifications(
-    player: Player = Depends(get_current_player),
+    player: Principal = Depends(get_current_principal),
     db: AsyncSession = Depends(get_db),
 ):
     """Return unread notifications for this player and mark them as read."""
@@ -8,9 +8,9 @@ from pydantic import BaseModel, EmailStr, Field
 from sqlalchemy import select
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from server.auth import hash_password
+from server.auth import hash_password_async
 from server.database import get_db
-from server.email_service import send_password_reset_email
+from server.email_service import enqueue_password_reset_email
 from server.models.password_reset import PasswordResetToken
 from server.models.player import Player
 from server.rate_limit import limiter
@@ -74,15 +74,11 @@ async def request_password_reset(
         expires_at=expires_at,
     )
     db.add(token_record)
+    # Queued with the token; the outbox worker delivers it after commit
+    enqueue_password_reset_email(db, player.email, player.username, reset_token)
     await db.commit()
 
-    # Send email
-    email_sent = send_password_reset_email(player.email, player.username, reset_token)
-
-    if email_sent:
-        logger.info(f"Password reset requested for {player.username} ({player.email}) from {client_ip}")
-    else:
-        logger.error(f"Failed to send reset email for {player.username}")
+    logger.info(f"Password reset requested for {player.username} ({player.email}) from {client_ip}")
 
     # Always return success (prevent enumeration)
     return {
@@ -136,7 +132,7 @@ async def confirm_password_reset(
         raise HTTPException(status_code=400, detail="Password must contain number")
 
     # Update password
-    player.password_hash = hash_password(payload.new_password)
+    player.password_hash = await hash_password_async(payload.new_password)
     db.add(player)
 
     # Mark token as used
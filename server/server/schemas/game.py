@@ -1,4 +1,4 @@
-from datetime import datetime
+from datetime import date, datetime
 import re
 
 from pydantic import BaseModel, Field, field_validator
@@ -18,11 +18,28 @@ class TransactionOut(BaseModel):
     model_config = {"from_attributes": True}
 
 
+class FinanceRollupOut(BaseModel):
+    day: date  # UTC
+    source: str
+    income: int
+    expense: int  # positive
+    tx_count: int
+
+    model_config = {"from_attributes": True}
+
+
+class FinanceOut(BaseModel):
+    days: int
+    rollups: list[FinanceRollupOut] = []  # oldest day first
+    net_by_source: dict[str, int] = {}  # income - expense over the window
+    rolled_up_at: datetime | None = None  # today's figures are as of this time
+
+
 # ── Ship ──────────────────────────────────────────────────────────────────────
 
 class ShipOut(BaseModel):
     id: int
-    player_id: int  # Owner of this ship
+    player_id: int | None  # Owner of this ship (None for derelicts of dissolved corporations)
     owner_username: str | None = None  # Owner's username for display (populated for world state)
     owner_is_npc: bool = False  # True if owner is a server-controlled NPC corp
     ship_name: str
@@ -164,6 +181,77 @@ class TradeMissionOut(BaseModel):
     model_config = {"from_attributes": True}
 
 
+class BestTargetOut(BaseModel):
+    asteroid_id: int
+    asteroid_name: str
+    profit_per_hour: float  # credits per game-hour of the round trip
+    revenue: float
+    crew_cost: float
+    sell_at: str            # "market" (auto-sell on return) or a colony name
+    transit_s: float        # one way, to the intercept point
+    mining_s: float
+    tonnes: float
+    fuel_used: float        # round trip
+    intercept_x: float | None = None
+    intercept_y: float | None = None
+
+
+class BestTargetsOut(BaseModel):
+    ship_id: int
+    tick_bucket: int
+    targets: list[BestTargetOut]
+
+
+# ── Mission history ───────────────────────────────────────────────────────────
+
+class MissionHistoryOut(BaseModel):
+    id: int
+    ship_id: int
+    asteroid_id: int | None
+    mission_type: int
+    status: int
+    origin_name: str
+    transit_time: float
+    mining_duration: float
+    tonnes_mined: float
+    revenue: int
+    created_at: datetime
+    archived_at: datetime
+
+    model_config = {"from_attributes": True}
+
+
+class TradeMissionHistoryOut(BaseModel):
+    id: int
+    ship_id: int
+    colony_id: int | None
+    tonnes_sold: float
+    revenue: int
+    origin_name: str
+    transit_time: float
+    created_at: datetime
+    archived_at: datetime
+
+    model_config = {"from_attributes": True}
+
+
+class MissionSummaryOut(BaseModel):
+    mission_runs: int = 0
+    trade_runs: int = 0
+    failed_runs: int = 0
+    revenue: int = 0
+    tonnes_mined: float = 0.0
+
+    model_config = {"from_attributes": True}
+
+
+class MissionHistoryPage(BaseModel):
+    missions: list[MissionHistoryOut] = []
+    trade_missions: list[TradeMissionHistoryOut] = []
+    summary: MissionSummaryOut
+    next_before_id: int | None = None  # pass back as before_id for the next page
+
+
 # ── Contract ──────────────────────────────────────────────────────────────────
 
 class ContractOut(BaseModel):
@@ -289,8 +377,10 @@ class AsteroidOut(BaseModel):
     max_mining_slots: int
     estimated_mass_kg: float
     composition: dict
-    reserves: dict
-    original_reserves: dict
+    reserves: dict = Field(default_factory=dict)  # from asteroid_reserves
+    original_reserves: dict = Field(default_factory=dict)
+    position_x: float | None = None  # AU, current game time (ephemeris)
+    position_y: float | None = None
 
     model_config = {"from_attributes": True}
 
@@ -0,0 +1,156 @@
+"""
+Mission archival.
+
+Finished missions (COMPLETED / FAILED / ABORTED) and completed trade missions
+are moved from the hot tables into mission_history / trade_mission_history.
+Each batch is one statement: DELETE ... RETURNING feeds the history INSERT,
+which feeds an upsert into player_mission_summary, so a batch is either
+fully archived and counted or not touched at all. Rows locked by a running
+tick are skipped and picked up on the next pass.
+"""
+
+from __future__ import annotations
+
+import logging
+
+from sqlalchemy import delete, func, insert, literal, select
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from server.config import settings
+from server.models.mission import Mission, STATUS_ABORTED, STATUS_COMPLETED, STATUS_FAILED
+from server.models.mission_history import MissionHistory, PlayerMissionSummary, TradeMissionHistory
+from server.models.trade_mission import TradeMission, STATUS_COMPLETED as TM_COMPLETED
+from server.world_stats import add_delta
+
+logger = logging.getLogger(__name__)
+
+FINISHED_MISSION_STATUSES = (STATUS_COMPLETED, STATUS_FAILED, STATUS_ABORTED)
+
+_MISSION_COLUMNS = (
+    "id", "player_id", "ship_id", "asteroid_id", "mission_type", "status", "origin_name",
+    "origin_is_earth", "transit_time", "mining_duration", "tonnes_mined", "revenue", "created_at",
+)
+_TRADE_COLUMNS = (
+    "id", "player_id", "ship_id", "colony_id", "tonnes_sold", "revenue", "origin_name",
+    "transit_time", "created_at",
+)
+
+
+def _summary_upsert(rows):
+    """INSERT ... ON CONFLICT adding per-player totals from an aggregated select."""
+    stmt = pg_insert(PlayerMissionSummary).from_select(
+        ["player_id", "mission_runs", "trade_runs", "failed_runs", "revenue", "tonnes_mined"], rows,
+    )
+    excluded = stmt.excluded
+    return stmt.on_conflict_do_update(
+        index_elements=[PlayerMissionSummary.player_id],
+        set_={
+            "mission_runs": PlayerMissionSummary.mission_runs + excluded.mission_runs,
+            "trade_runs": PlayerMissionSummary.trade_runs + excluded.trade_runs,
+            "failed_runs": PlayerMissionSummary.failed_runs + excluded.failed_runs,
+            "revenue": PlayerMissionSummary.revenue + excluded.revenue,
+            "tonnes_mined": PlayerMissionSummary.tonnes_mined + excluded.tonnes_mined,
+            "updated_at": func.now(),
+        },
+    ).returning(PlayerMissionSummary.player_id)
+
+
+def _archive_missions_stmt(batch_size: int):
+    batch = (
+        select(Mission.id)
+        .where(Mission.status.in_(FINISHED_MISSION_STATUSES))
+        .order_by(Mission.id)
+        .limit(batch_size)
+        .with_for_update(skip_locked=True)
+    )
+    moved = (
+        delete(Mission)
+        .where(Mission.id.in_(batch))
+        .returning(*(getattr(Mission, c) for c in _MISSION_COLUMNS))
+        .cte("moved")
+    )
+    archived = (
+        insert(MissionHistory)
+        .from_select(list(_MISSION_COLUMNS), select(*(moved.c[c] for c in _MISSION_COLUMNS)))
+        .returning(
+            MissionHistory.player_id, MissionHistory.status,
+            MissionHistory.revenue, MissionHistory.tonnes_mined,
+        )
+        .cte("archived")
+    )
+    summed = _summary_upsert(
+        select(
+            archived.c.player_id,
+            func.count().filter(archived.c.status == STATUS_COMPLETED),
+            literal(0),
+            func.count().filter(archived.c.status != STATUS_COMPLETED),
+            func.coalesce(func.sum(archived.c.revenue), 0),
+            func.coalesce(func.sum(archived.c.tonnes_mined), 0.0),
+        ).group_by(archived.c.player_id)
+    ).cte("summed")
+    return select(
+        select(func.count()).select_from(archived).scalar_subquery(),
+        select(func.count()).select_from(summed).scalar_subquery(),
+    )
+
+
+def _archive_trade_missions_stmt(batch_size: int):
+    batch = (
+        select(TradeMission.id)
+        .where(TradeMission.status == TM_COMPLETED)
+        .order_by(TradeMission.id)
+        .limit(batch_size)
+        .with_for_update(skip_locked=True)
+    )
+    moved = (
+        delete(TradeMission)
+        .where(TradeMission.id.in_(batch))
+        .returning(*(getattr(TradeMission, c) for c in _TRADE_COLUMNS))
+        .cte("moved")
+    )
+    archived = (
+        insert(TradeMissionHistory)
+        .from_select(list(_TRADE_COLUMNS), select(*(moved.c[c] for c in _TRADE_COLUMNS)))
+        .returning(TradeMissionHistory.player_id, TradeMissionHistory.revenue)
+        .cte("archived")
+    )
+    summed = _summary_upsert(
+        select(
+            archived.c.player_id,
+            literal(0),
+            func.count(),
+            literal(0),
+            func.coalesce(func.sum(archived.c.revenue), 0),
+            literal(0.0),
+        ).group_by(archived.c.player_id)
+    ).cte("summed")
+    return select(
+        select(func.count()).select_from(archived).scalar_subquery(),
+        select(func.count()).select_from(summed).scalar_subquery(),
+    )
+
+
+async def archive_finished_missions(db: AsyncSession, batch_size: int | None = None) -> dict:
+    """
+    Move every finished mission and trade mission into history, batch by batch.
+
+    Commits after each batch so locks stay short. Returns counts moved.
+    """
+    batch_size = batch_size or settings.MISSION_ARCHIVE_BATCH
+    totals = {"missions": 0, "trade_missions": 0}
+    for key, build in (("missions", _archive_missions_stmt), ("trade_missions", _archive_trade_missions_stmt)):
+        while True:
+            moved, _players = (await db.execute(build(batch_size))).one()
+            await db.commit()
+            totals[key] += moved
+            if key == "missions":
+                add_delta(total_missions=-moved)  # finished, so never counted as active
+            if moved < batch_size:
+                break
+    if totals["missions"] or totals["trade_missions"]:
+        logger.info(
+            "Archived %d missions and %d trade missions",
+            totals["missions"], totals["trade_missions"],
+        )
+    return totals
@@ -0,0 +1,300 @@
+"""
+Cross-process coordination for running several API workers.
+
+Exactly one process holds a Postgres advisory lock and runs the simulation
+loop; the others only serve the API. With SIMULATION_MODE=external no API
+process ticks at all: they attach to the standalone simulator over IPC
+(simulation/ipc.py) instead. Every process listens on one NOTIFY
+channel that carries published events, the leader's per-tick runtime state
+and admin commands (speed changes, world-time resets). If the leader's
+database session dies, Postgres releases the lock and a follower takes over
+on its next poll.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import json
+import logging
+import uuid
+from typing import Any
+
+import asyncpg
+
+from server.config import settings
+from server.database import AsyncSessionLocal, raw_database_url
+from server.simulation.event_bus import event_bus
+from server.simulation.ipc import IpcServer, SimulatorClient
+
+logger = logging.getLogger(__name__)
+
+_ORIGIN = uuid.uuid4().hex
+_NOTIFY_PAYLOAD_LIMIT = 7900  # Postgres rejects NOTIFY payloads of 8000 bytes or more
+_OUTBOX_SIZE = 5000
+_MAX_BATCH = 500
+
+
+def apply_command(op: str, args: dict[str, Any]) -> None:
+    """Apply an admin command to this process's in-memory state."""
+    from server.auth import invalidate_player
+    from server.leaderboard_index import leaderboard_index
+    from server.routers import admin_speed
+    from server.simulation.snapshot import note_player_writes
+    from server.simulation.tick import reset_world_time
+
+    if op == "set_speed":
+        admin_speed.set_speed_multiplier(float(args["multiplier"]))
+    elif op == "reset_world_time":
+        reset_world_time(int(args["ticks"]), float(args["game_seconds"]))
+    elif op == "player_writes":
+        note_player_writes(args["players"], float(args["at"]))
+    elif op == "invalidate_players":
+        for player_id in args["players"]:
+            invalidate_player(player_id)
+    elif op == "leaderboard_dirty":
+        leaderboard_index.mark_dirty(args["players"])
+    else:
+        logger.warning("Unknown cluster command %r ignored", op)
+
+
+class Cluster:
+    """Leader election plus the event/state/command relay for one process."""
+
+    def __init__(self, world_id: int) -> None:
+        self.world_id = world_id
+        self.is_leader = False
+        self._conn: asyncpg.Connection | None = None
+        self._conn_lock = asyncio.Lock()
+        self._outbox: asyncio.Queue[dict] = asyncio.Queue(maxsize=_OUTBOX_SIZE)
+        self._sim_task: asyncio.Task | None = None
+        self._tasks: list[asyncio.Task] = []
+
+    async def start(self) -> None:
+        if not settings.SIM_LEADER_ELECTION:
+            # Single-process deployment: tick unconditionally, nothing to relay.
+            self._promote()
+            return
+
+        # Followers need sane clock/speed values before the first state sync arrives.
+        await _load_runtime_state(self.world_id)
+
+        event_bus.set_relay(self.relay_event)
+        self._tasks = [
+            asyncio.create_task(self._supervise(), name="cluster_supervisor"),
+            asyncio.create_task(self._send_loop(), name="cluster_sender"),
+        ]
+
+    async def stop(self) -> None:
+        event_bus.set_relay(None)
+        for task in self._tasks:
+            task.cancel()
+        await self._demote()
+        await self._close_connection()
+
+    # ── Outgoing messages ─────────────────────────────────────────────────────
+
+    def relay_event(self, event: dict) -> None:
+        self._enqueue({"kind": "event", "event": event})
+
+    def relay_command(self, op: str, args: dict[str, Any]) -> None:
+        self._enqueue({"kind": "command", "op": op, "args": args})
+
+    def broadcast_state(self) -> None:
+        from server.simulation.tick import export_runtime_state
+        self._enqueue({"kind": "state", "state": export_runtime_state()})
+
+    def _enqueue(self, message: dict) -> None:
+        if not self._tasks:
+            return
+        try:
+            self._outbox.put_nowait(message)
+        except asyncio.QueueFull:
+            logger.warning("Cluster outbox full — dropping %s message", message["kind"])
+
+    def _pack(self, batch: list[dict]) -> list[str]:
+        """Split a batch into NOTIFY payloads that fit under the size limit."""
+        head = '{"origin":"%s","messages":[' % _ORIGIN
+        payloads: list[str] = []
+        parts: list[str] = []
+        size = len(head) + 2
+        for message in batch:
+            encoded = json.dumps(message, separators=(",", ":"))
+            n = len(encoded.encode("utf-8")) + 1
+            if len(head) + 2 + n > _NOTIFY_PAYLOAD_LIMIT:
+                logger.warning("Cluster message too large to relay (%d bytes, kind=%s)", n, message["kind"])
+                continue
+            if size + n > _NOTIFY_PAYLOAD_LIMIT:
+                payloads.append(head + ",".join(parts) + "]}")
+                parts, size = [], len(head) + 2
+            parts.append(encoded)
+            size += n
+        if parts:
+            payloads.append(head + ",".join(parts) + "]}")
+        return payloads
+
+    async def _send_loop(self) -> None:
+        while True:
+            batch = [await self._outbox.get()]
+            while not self._outbox.empty() and len(batch) < _MAX_BATCH:
+                batch.append(self._outbox.get_nowait())
+            for payload in self._pack(batch):
+                conn = self._conn
+                if conn is None or conn.is_closed():
+                    break  # supervisor will reconnect; messages in flight are lost
+                try:
+                    async with self._conn_lock:
+                        await conn.execute("SELECT pg_notify($1, $2)", settings.EVENT_CHANNEL, payload)
+                except (asyncpg.PostgresError, OSError, asyncpg.InterfaceError) as exc:
+                    logger.warning("Cluster NOTIFY failed: %s", exc)
+                    break
+
+    # ── Incoming messages ─────────────────────────────────────────────────────
+
+    def _on_notify(self, conn: Any, pid: int, channel: str, payload: str) -> None:
+        try:
+            data = json.loads(payload)
+        except ValueError:
+            logger.warning("Ignoring malformed cluster payload")
+            return
+        if data.get("origin") == _ORIGIN:
+            return
+        for message in data.get("messages", []):
+            kind = message.get("kind")
+            if kind == "event":
+                event_bus.deliver(message["event"])
+            elif kind == "state":
+                if not self.is_leader:
+                    from server.simulation.tick import apply_runtime_state
+                    apply_runtime_state(message["state"])
+            elif kind == "command":
+                apply_command(message["op"], message.get("args", {}))
+
+    # ── Leadership ────────────────────────────────────────────────────────────
+
+    async def _supervise(self) -> None:
+        interval = settings.SIM_LEADER_POLL_INTERVAL
+        while True:
+            try:
+                if self._conn is None or self._conn.is_closed():
+                    await self._demote()
+                    await self._connect()
+                async with self._conn_lock:
+                    if self.is_leader:
+                        # The lock lives as long as this session; prove the session is alive.
+                        await self._conn.fetchval("SELECT 1", timeout=interval)
+                        acquired = False
+                    else:
+                        acquired = await self._conn.fetchval(
+                            "SELECT pg_try_advisory_lock($1)", settings.SIM_LEADER_LOCK_ID,
+                            timeout=interval,
+                        )
+                if acquired:
+                    self._promote()
+                elif self.is_leader and self._sim_task is not None and self._sim_task.done():
+                    logger.error("Simulation task exited unexpectedly; restarting")
+                    self._promote()
+            except asyncio.CancelledError:
+                raise
+            except Exception as exc:
+                logger.warning("Cluster connection check failed: %s", exc)
+                await self._demote()
+                await self._close_connection()
+            await asyncio.sleep(interval)
+
+    async def _connect(self) -> None:
+        conn = await asyncpg.connect(raw_database_url())
+        await conn.add_listener(settings.EVENT_CHANNEL, self._on_notify)
+        self._conn = conn
+        logger.info("Cluster channel connected (origin=%s)", _ORIGIN[:8])
+
+    async def _close_connection(self) -> None:
+        conn, self._conn = self._conn, None
+        if conn is not None and not conn.is_closed():
+            try:
+                await conn.close(timeout=2.0)
+            except Exception:
+                conn.terminate()
+
+    def _promote(self) -> None:
+        from server.simulation.runner import simulation_loop
+        self.is_leader = True
+        self._sim_task = asyncio.create_task(
+            simulation_loop(world_id=self.world_id, on_tick=self.broadcast_state),
+            name="simulation_loop",
+        )
+        logger.info("This process is the simulation leader")
+
+    async def _demote(self) -> None:
+        if not self.is_leader:
+            return
+        self.is_leader = False
+        task, self._sim_task = self._sim_task, None
+        if task is not None and not task.done():
+            task.cancel()
+            try:
+                await task
+            except asyncio.CancelledError:
+                pass
+        logger.warning("Simulation leadership released")
+
+
+_cluster: Cluster | SimulatorClient | IpcServer | None = None
+
+
+async def _load_runtime_state(world_id: int) -> None:
+    from server.simulation.market_events import load_active_events
+    from server.simulation.tick import load_world_state
+    async with AsyncSessionLocal() as db:
+        await load_world_state(db, world_id)
+        await load_active_events(db)
+
+
+async def start_cluster(world_id: int = 1) -> Cluster | SimulatorClient:
+    """Start this API process's share of the simulation (see SIMULATION_MODE)."""
+    global _cluster
+    if settings.SIMULATION_MODE == "external":
+        # Ticks happen in `python -m server.simulation.runner`; we only listen.
+        await _load_runtime_state(world_id)
+        _cluster = SimulatorClient(settings.SIMULATION_SOCKET)
+    else:
+        _cluster = Cluster(world_id)
+    await _cluster.start()
+    return _cluster
+
+
+def attach_simulator(server: IpcServer | None) -> None:
+    """In the standalone simulator: relay send_command() to the API processes over IPC."""
+    global _cluster
+    _cluster = server
+
+
+async def stop_cluster() -> None:
+    global _cluster
+    if _cluster is not None:
+        await _cluster.stop()
+        _cluster = None
+
+
+async def wait_for_leadership() -> asyncpg.Connection:
+    """Block until this process holds the leader lock. Returns the holding connection."""
+    while True:
+        try:
+            conn = await asyncpg.connect(raw_database_url())
+            while True:
+                if await conn.fetchval("SELECT pg_try_advisory_lock($1)", settings.SIM_LEADER_LOCK_ID):
+                    return conn
+                await asyncio.sleep(settings.SIM_LEADER_POLL_INTERVAL)
+        except (asyncpg.PostgresError, OSError) as exc:
+            logger.warning("Leader lock attempt failed: %s", exc)
+            await asyncio.sleep(settings.SIM_LEADER_POLL_INTERVAL)
+
+
+def send_command(op: str, **args: Any) -> None:
+    """Apply an admin command here and in every other worker process."""
+    apply_command(op, args)
+    if _cluster is not None:
+        _cluster.relay_command(op, args)
+
+
+def is_leader() -> bool:
+    return _cluster is not None and _cluster.is_leader
@@ -0,0 +1,530 @@
+"""
+Keplerian ephemeris for asteroids and colonies.
+
+Positions are heliocentric, in AU, projected onto the ecliptic plane (the
+game map is 2D), at a Julian Date derived from game time: game_seconds
+count from _GAME_EPOCH (2112-01-01 UTC), so game_jd() tracks the in-game
+calendar.
+
+Orbits holds a catalog as parallel numpy arrays with the orientation of
+each orbit folded into two in-plane basis vectors (P, Q) up front. A
+position query is then one vectorized Newton solve of Kepler's equation
+for every body plus a few multiply-adds:
+
+    M = M0 + n (jd - epoch)        n = k / a^1.5 (rad/day)
+    E - e sin E = M
+    r = a (cos E - e) P + a sqrt(1 - e^2) sin E Q
+
+Colonies sit on planets and moons (their planet's position), on asteroids
+with fixed elements (ceres, vesta, ...), or on Jupiter's L4/L5 points
+(Jupiter's position rotated by +/-60 degrees).
+
+The asteroid catalog is loaded from the database once and cached for
+EPHEMERIS_CATALOG_TTL seconds. Positions are asked for far more often than
+they change (dispatch, NPC targeting, /game/asteroids, route ranking), so
+the catalog also keeps an EphemerisTable: float32 positions of every body
+at a coarse step over a rolling window, read with cubic interpolation.
+The table is rebuilt in a thread once half of its window has passed, can
+be shared between workers as a memory-mapped file (EPHEMERIS_TABLE_DIR),
+and is checked against the exact solver when built; bodies that
+interpolate worse than EPHEMERIS_MAX_ERROR_KM (close, eccentric orbits)
+are always solved exactly. Queries outside the window fall back to the
+exact solver.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import hashlib
+import json
+import logging
+import math
+import os
+import time
+from typing import Iterable, Sequence
+
+import numpy as np
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from server.config import settings
+from server.models.asteroid import Asteroid
+
+logger = logging.getLogger(__name__)
+
+GAUSS_K = 0.01720209895  # rad/day: mean motion of a 1 AU orbit around the Sun
+UNIX_EPOCH_JD = 2440587.5
+J2000 = 2451545.0
+
+_MAX_ECCENTRICITY = 0.99  # elliptic solver only; near-parabolic comets are clamped
+_KEPLER_TOL = 1e-12
+_KEPLER_MAX_ITER = 30
+
+
+def game_jd(game_seconds: float | None = None) -> float:
+    """Julian Date of a game time (default: now)."""
+    # Imported here: tick imports npc_corps, which imports this module
+    from server.simulation.tick import _GAME_EPOCH, get_game_seconds
+    if game_seconds is None:
+        game_seconds = get_game_seconds()
+    return UNIX_EPOCH_JD + (_GAME_EPOCH + game_seconds) / 86400.0
+
+
+def solve_kepler(mean_anomaly: np.ndarray, e: np.ndarray) -> np.ndarray:
+    """Eccentric anomaly E with E - e sin E = M, for arrays of M (rad) and e."""
+    m = np.remainder(mean_anomaly + np.pi, 2.0 * np.pi) - np.pi
+    ecc = np.where(e < 0.8, m + e * np.sin(m), np.pi * np.sign(m))
+    for _ in range(_KEPLER_MAX_ITER):
+        step = (ecc - e * np.sin(ecc) - m) / (1.0 - e * np.cos(ecc))
+        ecc -= step
+        if not step.size or np.abs(step).max() < _KEPLER_TOL:
+            break
+    return ecc
+
+
+class Orbits:
+    """Keplerian elements of many bodies as parallel arrays."""
+
+    __slots__ = ("a", "e", "m0", "n", "epoch_jd", "px", "py", "qx", "qy")
+
+    def __init__(
+        self,
+        a: np.ndarray,
+        e: np.ndarray,
+        inclination: np.ndarray,
+        long_ascending_node: np.ndarray,
+        arg_perihelion: np.ndarray,
+        mean_anomaly_at_epoch: np.ndarray,
+        epoch_jd: np.ndarray,
+    ) -> None:
+        """Angles in degrees, as stored on Asteroid."""
+        self.a = np.asarray(a, dtype=float)
+        self.e = np.clip(np.asarray(e, dtype=float), 0.0, _MAX_ECCENTRICITY)
+        self.m0 = np.radians(mean_anomaly_at_epoch)
+        self.n = GAUSS_K / self.a ** 1.5
+        self.epoch_jd = np.asarray(epoch_jd, dtype=float)
+
+        i = np.radians(inclination)
+        node = np.radians(long_ascending_node)
+        peri = np.radians(arg_perihelion)
+        cos_i = np.cos(i)
+        cos_w, sin_w = np.cos(peri), np.sin(peri)
+        cos_o, sin_o = np.cos(node), np.sin(node)
+        # Perihelion direction (P) and its in-plane normal (Q), ecliptic x/y
+        self.px = cos_w * cos_o - sin_w * sin_o * cos_i
+        self.py = cos_w * sin_o + sin_w * cos_o * cos_i
+        self.qx = -sin_w * cos_o - cos_w * sin_o * cos_i
+        self.qy = -sin_w * sin_o + cos_w * cos_o * cos_i
+
+    @classmethod
+    def from_rows(cls, rows: Iterable[Sequence[float]]) -> Orbits:
+        """From (a, e, i, node, peri, M0, epoch_jd) tuples."""
+        columns = np.array(list(rows), dtype=float).reshape(-1, 7).T
+        return cls(*columns)
+
+    @classmethod
+    def of(cls, asteroid: Asteroid) -> Orbits:
+        return cls.from_rows([_elements(asteroid)])
+
+    def __len__(self) -> int:
+        return len(self.a)
+
+    def positions(self, jd: float | np.ndarray, rows: np.ndarray | None = None) -> np.ndarray:
+        """
+        (n, 2) ecliptic x/y in AU at jd, for all bodies or the given row
+        indices. jd may also be an array with one time per row.
+        """
+        if rows is None:
+            a, e, m0, n, epoch = self.a, self.e, self.m0, self.n, self.epoch_jd
+            px, py, qx, qy = self.px, self.py, self.qx, self.qy
+        else:
+            a, e, m0, n, epoch = self.a[rows], self.e[rows], self.m0[rows], self.n[rows], self.epoch_jd[rows]
+            px, py, qx, qy = self.px[rows], self.py[rows], self.qx[rows], self.qy[rows]
+        ecc = solve_kepler(m0 + n * (jd - epoch), e)
+        u = a * (np.cos(ecc) - e)
+        v = a * np.sqrt(1.0 - e * e) * np.sin(ecc)
+        return np.column_stack((u * px + v * qx, u * py + v * qy))
+
+
+def _elements(asteroid: Asteroid) -> tuple[float, ...]:
+    return (
+        asteroid.semi_major_axis, asteroid.eccentricity, asteroid.inclination,
+        asteroid.long_ascending_node, asteroid.arg_perihelion,
+        asteroid.mean_anomaly_at_epoch, asteroid.epoch_jd,
+    )
+
+
+def asteroid_position(asteroid: Asteroid, jd: float | None = None) -> tuple[float, float]:
+    """Position of one asteroid (default: now)."""
+    x, y = Orbits.of(asteroid).positions(game_jd() if jd is None else jd)[0]
+    return float(x), float(y)
+
+
+# ── Precomputed tables ────────────────────────────────────────────────────────
+
+AU_KM = 149_597_870.7
+
+_table_stats = {
+    "builds": 0,
+    "loads": 0,
+    "build_ms": 0.0,
+    "exact_queries": 0,
+}
+
+
+def _cubic_weights(s: float | np.ndarray) -> np.ndarray:
+    """Lagrange weights of knots k-1, k, k+1, k+2 at fraction s of [k, k+1] (shape (4, *s.shape))."""
+    return np.array([
+        -s * (s - 1.0) * (s - 2.0) / 6.0,
+        (s + 1.0) * (s - 1.0) * (s - 2.0) / 2.0,
+        -(s + 1.0) * s * (s - 2.0) / 2.0,
+        (s + 1.0) * s * (s - 1.0) / 6.0,
+    ], dtype=np.float32)
+
+
+class EphemerisTable:
+    """
+    A catalog's positions at knots jd0 + k * step, as float32 (knots, n, 2),
+    read back with 4-point cubic interpolation. Bodies whose interpolation
+    error exceeded EPHEMERIS_MAX_ERROR_KM when the table was built are
+    listed in exact_rows and always solved exactly.
+    """
+
+    def __init__(
+        self,
+        jd0: float,
+        step: float,
+        xy: np.ndarray,
+        exact_rows: np.ndarray,
+        max_error_km: float,
+        fingerprint: str,
+    ) -> None:
+        self.jd0 = jd0
+        self.step = step
+        self.xy = xy
+        self.exact_rows = exact_rows
+        self.exact_mask = np.zeros(xy.shape[1], dtype=bool)
+        self.exact_mask[exact_rows] = True
+        self.max_error_km = max_error_km
+        self.fingerprint = fingerprint
+
+    @property
+    def start(self) -> float:
+        return self.jd0 + self.step
+
+    @property
+    def end(self) -> float:
+        return self.jd0 + (len(self.xy) - 2) * self.step
+
+    def covers(self, jd: float) -> bool:
+        return self.start <= jd < self.end
+
+    def fresh(self, jd: float) -> bool:
+        """Covers jd with at least half the window still ahead."""
+        return self.start <= jd < (self.start + self.end) / 2
+
+    @classmethod
+    def build(cls, orbits: Orbits, jd: float, fingerprint: str) -> EphemerisTable:
+        """Table for EPHEMERIS_TABLE_WINDOW_DAYS from jd, with its error check."""
+        step = settings.EPHEMERIS_TABLE_STEP_HOURS / 24.0
+        knots = math.ceil(settings.EPHEMERIS_TABLE_WINDOW_DAYS / step) + 3
+        jd0 = jd - step
+        xy = np.empty((knots, len(orbits), 2), dtype=np.float32)
+        for k in range(knots):
+            xy[k] = orbits.positions(jd0 + k * step)
+        table = cls(jd0, step, xy, np.zeros(0, dtype=np.intp), 0.0, fingerprint)
+
+        # Cubic error peaks mid-interval: compare every covered interval's
+        # midpoint against the exact solver (an eccentric body's error is
+        # concentrated around perihelion, which a sample of intervals can miss)
+        error = np.zeros(len(orbits))
+        for k in range(1, knots - 2):
+            at = jd0 + (k + 0.5) * step
+            diff = table.interpolate(at) - orbits.positions(at)
+            np.maximum(error, np.hypot(diff[:, 0], diff[:, 1]) * AU_KM, out=error)
+        exact_rows = np.flatnonzero(error > settings.EPHEMERIS_MAX_ERROR_KM)
+        if exact_rows.size:
+            logger.info(
+                "Ephemeris table: %d of %d bodies over %.0f km, solved exactly",
+                exact_rows.size, len(orbits), settings.EPHEMERIS_MAX_ERROR_KM,
+            )
+        within = np.delete(error, exact_rows)
+        return cls(jd0, step, xy, exact_rows, float(within.max()) if within.size else 0.0, fingerprint)
+
+    def interpolate(self, jd: float, rows: np.ndarray | None = None) -> np.ndarray:
+        """(n, 2) interpolated positions at jd (must be covered)."""
+        u = (jd - self.jd0) / self.step
+        k = int(u)
+        block = self.xy[k - 1:k + 3] if rows is None else self.xy[k - 1:k + 3, rows]
+        return np.tensordot(_cubic_weights(u - k), block, axes=1).astype(float)
+
+    def covers_many(self, jds: np.ndarray) -> np.ndarray:
+        return (jds >= self.start) & (jds < self.end)
+
+    def interpolate_at(self, jds: np.ndarray, rows: np.ndarray) -> np.ndarray:
+        """(n, 2) positions of rows[i] at jds[i] (all covered)."""
+        u = (jds - self.jd0) / self.step
+        k = u.astype(np.intp)
+        weights = _cubic_weights(u - k)                      # (4, n)
+        block = self.xy[k + np.arange(-1, 3)[:, None], rows]  # (4, n, 2)
+        return (weights[:, :, None] * block).sum(axis=0, dtype=float)
+
+    # Shared by the workers of one host: <dir>/asteroids.json names the
+    # current table file; table files are never rewritten, only replaced
+    def save(self, directory: str) -> None:
+        os.makedirs(directory, exist_ok=True)
+        name = f"asteroids-{self.fingerprint[:16]}-{self.jd0:.5f}.npy"
+        tmp = os.path.join(directory, f".{name}.{os.getpid()}.tmp")
+        with open(tmp, "wb") as fh:
+            np.save(fh, self.xy)
+        os.replace(tmp, os.path.join(directory, name))
+        meta = {
+            "file": name,
+            "jd0": self.jd0,
+            "step": self.step,
+            "fingerprint": self.fingerprint,
+            "exact_rows": self.exact_rows.tolist(),
+            "max_error_km": self.max_error_km,
+        }
+        tmp = os.path.join(directory, f".asteroids.json.{os.getpid()}.tmp")
+        with open(tmp, "w") as fh:
+            json.dump(meta, fh)
+        os.replace(tmp, os.path.join(directory, "asteroids.json"))
+        for old in os.listdir(directory):
+            if old.startswith("asteroids-") and old != name:
+                try:
+                    os.remove(os.path.join(directory, old))  # readers keep their mapping
+                except OSError:
+                    pass
+
+    @classmethod
+    def load(cls, directory: str, fingerprint: str, jd: float) -> EphemerisTable | None:
+        """Memory-map the shared table if it matches this catalog and is fresh at jd."""
+        try:
+            with open(os.path.join(directory, "asteroids.json")) as fh:
+                meta = json.load(fh)
+            if (meta["fingerprint"] != fingerprint
+                    or meta["step"] != settings.EPHEMERIS_TABLE_STEP_HOURS / 24.0):
+                return None
+            xy = np.load(os.path.join(directory, meta["file"]), mmap_mode="r")
+        except (OSError, ValueError, KeyError):
+            return None
+        table = cls(
+            meta["jd0"], meta["step"], xy,
+            np.array(meta["exact_rows"], dtype=np.intp), meta["max_error_km"], fingerprint,
+        )
+        return table if table.fresh(jd) else None
+
+
+# ── Asteroid catalog ──────────────────────────────────────────────────────────
+
+class AsteroidCatalog:
+    """Every asteroid's orbit, rows ordered by asteroid id."""
+
+    def __init__(self, ids: np.ndarray, orbits: Orbits, fingerprint: str) -> None:
+        self.ids = ids
+        self.orbits = orbits
+        self.fingerprint = fingerprint
+        self.table: EphemerisTable | None = None
+        self._row = {asteroid_id: row for row, asteroid_id in enumerate(ids.tolist())}
+        self._cached_jd: float | None = None
+        self._cached: np.ndarray | None = None
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    def row(self, asteroid_id: int) -> int | None:
+        return self._row.get(asteroid_id)
+
+    def positions(self, jd: float) -> np.ndarray:
+        """(n, 2) positions of the whole catalog; repeated queries at one jd are free."""
+        if jd != self._cached_jd:
+            self._cached = self._compute(jd)
+            self._cached_jd = jd
+        return self._cached
+
+    def positions_of(self, rows: np.ndarray, jd: float) -> np.ndarray:
+        """Positions of some rows only (a few ships' targets out of a large catalog)."""
+        if jd == self._cached_jd:
+            return self._cached[rows]
+        return self._compute(jd, rows)
+
+    def position(self, asteroid_id: int, jd: float) -> tuple[float, float] | None:
+        row = self.row(asteroid_id)
+        if row is None:
+            return None
+        x, y = self.positions_of(np.array([row]), jd)[0]
+        return float(x), float(y)
+
+    def positions_at(self, rows: np.ndarray, jds: np.ndarray) -> np.ndarray:
+        """Positions of rows[i] at jds[i]: intercepts probe each target at its own time."""
+        table = self.table
+        if table is None:
+            _table_stats["exact_queries"] += 1
+            return self.orbits.positions(jds, rows)
+        covered = table.covers_many(jds) & ~table.exact_mask[rows]
+        xy = np.empty((len(rows), 2))
+        if covered.any():
+            xy[covered] = table.interpolate_at(jds[covered], rows[covered])
+        if not covered.all():
+            exact = ~covered
+            xy[exact] = self.orbits.positions(jds[exact], rows[exact])
+        return xy
+
+    def _compute(self, jd: float, rows: np.ndarray | None = None) -> np.ndarray:
+        table = self.table
+        if table is None or not table.covers(jd):
+            _table_stats["exact_queries"] += 1
+            return self.orbits.positions(jd, rows)
+        xy = table.interpolate(jd, rows)
+        if rows is None:
+            if table.exact_rows.size:
+                xy[table.exact_rows] = self.orbits.positions(jd, table.exact_rows)
+        else:
+            fix = np.flatnonzero(table.exact_mask[rows])
+            if fix.size:
+                xy[fix] = self.orbits.positions(jd, rows[fix])
+        return xy
+
+
+_catalog: AsteroidCatalog | None = None
+_catalog_loaded_at = 0.0
+_table_task: asyncio.Task | None = None
+
+
+async def get_asteroid_catalog(db: AsyncSession) -> AsteroidCatalog:
+    """
+    The cached catalog, re-read once older than EPHEMERIS_CATALOG_TTL (kept,
+    with its table, if the elements did not change). Starts a table rebuild
+    in a thread when the current one is missing or half used.
+    """
+    global _catalog, _catalog_loaded_at
+    now = time.monotonic()
+    if _catalog is None or now - _catalog_loaded_at > settings.EPHEMERIS_CATALOG_TTL:
+        rows = (await db.execute(
+            select(
+                Asteroid.id, Asteroid.semi_major_axis, Asteroid.eccentricity, Asteroid.inclination,
+                Asteroid.long_ascending_node, Asteroid.arg_perihelion,
+                Asteroid.mean_anomaly_at_epoch, Asteroid.epoch_jd,
+            ).order_by(Asteroid.id)
+        )).all()
+        elements = np.array(rows, dtype=float).reshape(-1, 8)
+        fingerprint = hashlib.blake2b(elements.tobytes(), digest_size=16).hexdigest()
+        if _catalog is None or _catalog.fingerprint != fingerprint:
+            _catalog = AsteroidCatalog(
+                elements[:, 0].astype(np.int64), Orbits(*elements[:, 1:].T), fingerprint,
+            )
+        _catalog_loaded_at = now
+    _maintain_table(_catalog, game_jd())
+    return _catalog
+
+
+def _maintain_table(catalog: AsteroidCatalog, jd: float) -> None:
+    global _table_task
+    if not settings.EPHEMERIS_TABLE_ENABLED or not len(catalog):
+        return
+    if catalog.table is not None and catalog.table.fresh(jd):
+        return
+    if _table_task is not None and not _table_task.done():
+        return
+    _table_task = asyncio.create_task(_refresh_table(catalog, jd), name="ephemeris_table")
+
+
+async def _refresh_table(catalog: AsteroidCatalog, jd: float) -> None:
+    directory = settings.EPHEMERIS_TABLE_DIR
+    try:
+        table = None
+        if directory:
+            table = await asyncio.to_thread(EphemerisTable.load, directory, catalog.fingerprint, jd)
+            if table is not None:
+                _table_stats["loads"] += 1
+        if table is None:
+            started = time.perf_counter()
+            table = await asyncio.to_thread(EphemerisTable.build, catalog.orbits, jd, catalog.fingerprint)
+            _table_stats["builds"] += 1
+            _table_stats["build_ms"] = round((time.perf_counter() - started) * 1000, 1)
+            if directory:
+                await asyncio.to_thread(table.save, directory)
+        catalog.table = table
+    except Exception as exc:
+        logger.warning("Ephemeris table refresh failed: %s", exc)
+
+
+def ephemeris_stats() -> dict:
+    catalog = _catalog
+    table = catalog.table if catalog is not None else None
+    return {
+        "bodies": len(catalog) if catalog is not None else 0,
+        "table_start_jd": round(table.start, 4) if table else None,
+        "table_end_jd": round(table.end, 4) if table else None,
+        "table_knots": len(table.xy) if table else 0,
+        "table_mb": round(table.xy.nbytes / 1e6, 1) if table else 0.0,
+        "max_error_km": round(table.max_error_km, 1) if table else None,
+        "exact_bodies": int(table.exact_rows.size) if table else 0,
+        **_table_stats,
+    }
+
+
+def invalidate_asteroid_catalog() -> None:
+    global _catalog
+    _catalog = None
+
+
+# ── Planets and colonies ──────────────────────────────────────────────────────
+
+# (a AU, e, i, node, arg. perihelion, M0 degrees, epoch JD): JPL mean
+# elements at J2000 for planets, seed elements for the asteroid colonies
+_BODY_ELEMENTS: dict[str, tuple[float, ...]] = {
+    "earth":   (1.00000261, 0.01671123, -0.00001531, 0.0, 102.93768193, 357.52910918, J2000),
+    "mars":    (1.52371034, 0.09339410, 1.84969142, 49.55953891, 286.49683150, 19.38768006, J2000),
+    "jupiter": (5.20288700, 0.04838624, 1.30439695, 100.47390909, 274.25457074, 19.66796068, J2000),
+    "saturn":  (9.53667594, 0.05386179, 2.48599187, 113.66242448, 338.93645383, 317.35536592, J2000),
+    "neptune": (30.06992276, 0.00859048, 1.77004347, 131.78422574, 273.18053653, 259.91520804, J2000),
+    "ceres":   (2.7675, 0.0758, 10.59, 80.33, 73.60, 77.37, J2000),
+    "vesta":   (2.3615, 0.0887, 7.14, 103.85, 149.84, 20.86, J2000),
+    "hygiea":  (3.1415, 0.1177, 3.84, 283.20, 312.32, 114.44, J2000),
+    "psyche":  (2.9215, 0.1340, 3.10, 150.22, 228.04, 190.40, J2000),
+}
+_BODIES = tuple(_BODY_ELEMENTS)
+_BODY_ROW = {name: row for row, name in enumerate(_BODIES)}
+_BODY_ORBITS = Orbits.from_rows(_BODY_ELEMENTS.values())
+
+# Moons share their planet's position; Trojan points lead/trail it by 60 degrees
+_PARENT_BODY: dict[str, tuple[str, float]] = {
+    "moon": ("earth", 0.0), "luna": ("earth", 0.0),
+    "europa": ("jupiter", 0.0), "ganymede": ("jupiter", 0.0), "callisto": ("jupiter", 0.0),
+    "jupiter_l4": ("jupiter", 60.0), "jupiter_l5": ("jupiter", -60.0),
+    "titan": ("saturn", 0.0), "triton": ("neptune", 0.0),
+}
+
+
+def body_positions(jd: float | None = None) -> dict[str, tuple[float, float]]:
+    """Position of every known planet_id (default: now)."""
+    xy = _BODY_ORBITS.positions(game_jd() if jd is None else jd)
+    out = {name: (float(xy[row, 0]), float(xy[row, 1])) for name, row in _BODY_ROW.items()}
+    for name, (parent, angle) in _PARENT_BODY.items():
+        x, y = out[parent]
+        if angle:
+            c, s = math.cos(math.radians(angle)), math.sin(math.radians(angle))
+            x, y = x * c - y * s, x * s + y * c
+        out[name] = (x, y)
+    return out
+
+
+def is_known_body(planet_id: str) -> bool:
+    return planet_id in _BODY_ROW or planet_id in _PARENT_BODY
+
+
+def body_positions_at(planet_id: str, jds: np.ndarray) -> np.ndarray:
+    """(n, 2) positions of one known planet_id at each of jds."""
+    parent, angle = _PARENT_BODY.get(planet_id, (planet_id, 0.0))
+    xy = _BODY_ORBITS.positions(jds, np.full(len(jds), _BODY_ROW[parent]))
+    if angle:
+        c, s = math.cos(math.radians(angle)), math.sin(math.radians(angle))
+        xy = xy @ np.array([[c, s], [-s, c]])
+    return xy
+
+
+def body_position(planet_id: str, jd: float | None = None) -> tuple[float, float] | None:
+    """Position of a colony's planet_id, or None if it is not a known body."""
+    return body_positions(jd).get(planet_id)
@@ -3,12 +3,15 @@ In-memory pub/sub for Server-Sent Events.
 
 Multiple SSE connections subscribe to a single EventBus singleton.
 The simulation loop publishes dicts; SSE handlers drain their personal queues.
+When several worker processes run, a relay (see simulation/cluster.py) copies
+each published event to the other processes, which deliver it locally.
 """
 
 from __future__ import annotations
 
 import asyncio
 import logging
+from typing import Callable
 
 logger = logging.getLogger(__name__)
 
@@ -16,6 +19,11 @@ logger = logging.getLogger(__name__)
 class EventBus:
     def __init__(self) -> None:
         self._subscribers: list[asyncio.Queue[dict]] = []
+        self._relay: Callable[[dict], None] | None = None
+
+    def set_relay(self, relay: Callable[[dict], None] | None) -> None:
+        """Forward every published event to other processes (None disables)."""
+        self._relay = relay
 
     def subscribe(self) -> asyncio.Queue[dict]:
         """Register a new SSE client. Returns a queue to drain events from."""
@@ -33,7 +41,13 @@ class EventBus:
             pass  # already removed
 
     async def publish(self, event: dict) -> None:
-        """Broadcast an event to all connected clients. Drops for slow clients."""
+        """Broadcast an event to all connected clients, here and in other processes."""
+        self.deliver(event)
+        if self._relay is not None:
+            self._relay(event)
+
+    def deliver(self, event: dict) -> None:
+        """Fan an event out to this process's clients only. Drops for slow clients."""
         dead: list[asyncio.Queue[dict]] = []
         for q in self._subscribers:
             try:
@@ -0,0 +1,157 @@
+"""
+Ledger maintenance: daily partitions, finance rollups and retention.
+
+Run by the simulation leader every LEDGER_ROLLUP_INTERVAL seconds, in its
+own task beside the tick loop:
+  - ensure_partitions: player_transactions has a partition for today and
+    the next LEDGER_PARTITION_PREMAKE_DAYS UTC days;
+  - rollup_finance: re-aggregates each day that is not final yet into
+    player_finance_daily (one INSERT ... SELECT ... GROUP BY per day,
+    reading only that day's partition). A day becomes final
+    LEDGER_ROLLUP_GRACE seconds after it ends and is never read again, so
+    each pass touches only today (and yesterday around midnight);
+  - drop_expired_partitions: raw partitions older than
+    LEDGER_RETENTION_DAYS are dropped whole, but only once their day is final.
+
+Writes are idempotent (rollup rows are replaced, not incremented), so a
+failed or repeated pass is harmless.
+"""
+
+from __future__ import annotations
+
+import logging
+from datetime import date, datetime, timedelta, timezone
+
+from sqlalchemy import Date, func, literal, select, text
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from server.config import settings
+from server.models.transaction import LedgerRollupState, PlayerFinanceDaily, PlayerTransaction
+
+logger = logging.getLogger(__name__)
+
+_STATE_ID = 1
+_PARTITION_PREFIX = "player_transactions_p"
+
+
+def partition_name(day: date) -> str:
+    return f"{_PARTITION_PREFIX}{day:%Y%m%d}"
+
+
+def _day_start(day: date) -> datetime:
+    return datetime(day.year, day.month, day.day, tzinfo=timezone.utc)
+
+
+async def _partition_days(db: AsyncSession) -> dict[date, str]:
+    """{day: partition name} of the existing daily partitions."""
+    rows = await db.execute(text("""
+        SELECT c.relname FROM pg_inherits i
+        JOIN pg_class c ON c.oid = i.inhrelid
+        WHERE i.inhparent = 'player_transactions'::regclass
+    """))
+    out = {}
+    for (name,) in rows.all():
+        try:
+            out[datetime.strptime(name[len(_PARTITION_PREFIX):], "%Y%m%d").date()] = name
+        except ValueError:
+            logger.warning("Ignoring unexpected player_transactions partition %s", name)
+    return out
+
+
+async def ensure_partitions(db: AsyncSession, today: date | None = None) -> int:
+    """Create missing partitions for today onwards. Returns how many were created."""
+    today = today or datetime.now(timezone.utc).date()
+    existing = await _partition_days(db)
+    created = 0
+    for offset in range(settings.LEDGER_PARTITION_PREMAKE_DAYS + 1):
+        day = today + timedelta(days=offset)
+        if day in existing:
+            continue
+        await db.execute(text(
+            f"CREATE TABLE IF NOT EXISTS {partition_name(day)} PARTITION OF player_transactions "
+            f"FOR VALUES FROM ('{_day_start(day).isoformat()}') "
+            f"TO ('{_day_start(day + timedelta(days=1)).isoformat()}')"
+        ))
+        created += 1
+    await db.commit()
+    return created
+
+
+def _rollup_day_stmt(day: date):
+    tx = PlayerTransaction
+    rows = (
+        select(
+            tx.player_id,
+            literal(day, Date),
+            tx.source,
+            func.coalesce(func.sum(tx.amount).filter(tx.amount > 0), 0),
+            func.coalesce(-func.sum(tx.amount).filter(tx.amount < 0), 0),
+            func.count(),
+        )
+        .where(tx.created_at >= _day_start(day), tx.created_at < _day_start(day + timedelta(days=1)))
+        .group_by(tx.player_id, tx.source)
+    )
+    stmt = pg_insert(PlayerFinanceDaily).from_select(
+        ["player_id", "day", "source", "income", "expense", "tx_count"], rows,
+    )
+    return stmt.on_conflict_do_update(
+        index_elements=[PlayerFinanceDaily.player_id, PlayerFinanceDaily.day, PlayerFinanceDaily.source],
+        set_={
+            "income": stmt.excluded.income,
+            "expense": stmt.excluded.expense,
+            "tx_count": stmt.excluded.tx_count,
+            "updated_at": func.now(),
+        },
+    )
+
+
+async def rollup_finance(db: AsyncSession) -> date | None:
+    """Refresh rollups of every day not yet final. Returns the last final day."""
+    now = datetime.now(timezone.utc)
+    state = await db.get(LedgerRollupState, _STATE_ID, with_for_update=True)
+    if state is None:
+        state = LedgerRollupState(id=_STATE_ID)
+        db.add(state)
+
+    if state.closed_through is not None:
+        day = state.closed_through + timedelta(days=1)
+    else:
+        # The partitioning migration backfills history and sets closed_through;
+        # without it (fresh schema) there is at most the oldest daily partition.
+        day = min(await _partition_days(db), default=now.date())
+
+    while day <= now.date():
+        await db.execute(_rollup_day_stmt(day))
+        final = now >= _day_start(day + timedelta(days=1)) + timedelta(seconds=settings.LEDGER_ROLLUP_GRACE)
+        if final:
+            state.closed_through = day
+        state.rolled_up_at = now
+        await db.commit()
+        if not final:
+            break
+        day += timedelta(days=1)
+    return state.closed_through
+
+
+async def drop_expired_partitions(db: AsyncSession, closed_through: date | None) -> list[str]:
+    """Drop raw partitions past retention whose rollups are final."""
+    if closed_through is None:
+        return []
+    cutoff = datetime.now(timezone.utc).date() - timedelta(days=settings.LEDGER_RETENTION_DAYS)
+    dropped = []
+    for day, name in sorted((await _partition_days(db)).items()):
+        if day >= cutoff or day > closed_through:
+            break
+        await db.execute(text(f"DROP TABLE IF EXISTS {name}"))
+        await db.commit()
+        dropped.append(name)
+    if dropped:
+        logger.info("Dropped %d expired transaction partitions (%s .. %s)", len(dropped), dropped[0], dropped[-1])
+    return dropped
+
+
+async def maintain_ledger(db: AsyncSession) -> None:
+    await ensure_partitions(db)
+    closed_through = await rollup_finance(db)
+    await drop_expired_partitions(db, closed_through)
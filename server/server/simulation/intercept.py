@@ -0,0 +1,209 @@
+"""
+Moving-target intercepts for dispatch.
+
+Ships fly a brachistochrone (accelerate to the midpoint, decelerate):
+T = 2 sqrt(d / a). Targets move while the ship is under way, so the ship
+aims at where the target will be on arrival: T solves
+
+    T = 2 sqrt(|P(launch + T) - origin| / a)
+
+found with secant steps on T -> f(T) - T, starting from the straight-line
+time to the target's position at launch. Fast ships settle in a couple
+of steps; slow ones, whose targets move a good part of their orbit during
+the flight, take a few more. Targets a ship cannot catch are reported as
+not converged (best effort meeting point).
+
+solve_intercepts() works on arrays (many targets, origins, thrusts and
+launch times in one pass); position_at(jds) supplies each target's
+position at its own probe time, from the asteroid catalog's ephemeris
+tables or a planet's orbit. Results are cached per (origin, target,
+thrust, launch time bucket of INTERCEPT_CACHE_BUCKET game-seconds).
+"""
+
+from __future__ import annotations
+
+import math
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Callable, Hashable, Sequence
+
+import numpy as np
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from server.config import settings
+from server.simulation.ephemeris import (
+    AU_KM, body_positions_at, get_asteroid_catalog, is_known_body, Orbits,
+)
+
+G_ACCEL = 9.80665
+AU_M = AU_KM * 1000.0
+
+_MAX_ITER = 12
+_TOLERANCE_S = 0.5
+
+
+@dataclass(frozen=True, slots=True)
+class Intercept:
+    transit_s: float  # brachistochrone time to the meeting point
+    x: float          # meeting point (AU)
+    y: float
+    converged: bool = True
+
+
+def brachistochrone_seconds(dist_au: np.ndarray, accel: np.ndarray) -> np.ndarray:
+    """Accelerate-then-decelerate time over dist_au at accel m/s^2 (0 without thrust)."""
+    dist_m = np.asarray(dist_au, dtype=float) * AU_M
+    accel = np.asarray(accel, dtype=float)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        t = 2.0 * np.sqrt(dist_m / accel)
+    return np.where((accel > 0) & (dist_m > 0), t, 0.0)
+
+
+def solve_intercepts(
+    origins: np.ndarray,
+    thrust_g: np.ndarray,
+    launch_jd: np.ndarray,
+    position_at: Callable[[np.ndarray], np.ndarray],
+) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Transit seconds (n,), meeting points (n, 2) and converged flags (n,) for
+    n ships leaving origins[i] at launch_jd[i] with thrust_g[i] toward
+    target i, whose position at times jds is position_at(jds) -> (n, 2).
+    """
+    origins = np.asarray(origins, dtype=float).reshape(-1, 2)
+    accel = np.asarray(thrust_g, dtype=float) * G_ACCEL
+    launch_jd = np.asarray(launch_jd, dtype=float)
+
+    def arrival(transit: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+        """Target positions after `transit`, and the time to fly there."""
+        points = position_at(launch_jd + transit / 86400.0)
+        return brachistochrone_seconds(np.hypot(*(points - origins).T), accel), points
+
+    prev, _ = arrival(np.zeros(len(origins)))
+    prev_f, _ = arrival(prev)
+    transit = prev_f
+    for _ in range(_MAX_ITER):
+        f, points = arrival(transit)
+        residual = f - transit
+        if not residual.size or np.abs(residual).max() < _TOLERANCE_S:
+            break
+        # Secant step on f(T) - T; plain fixed-point step where it is undefined
+        slope = residual - (prev_f - prev)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            secant = transit - residual * (transit - prev) / slope
+        prev, prev_f = transit, f
+        transit = np.where(np.isfinite(secant) & (secant > 0), secant, f)
+    return f, points, np.abs(residual) < _TOLERANCE_S
+
+
+# ── Cache ─────────────────────────────────────────────────────────────────────
+
+_cache: OrderedDict[tuple, Intercept] = OrderedDict()
+_cache_stats = {"hits": 0, "misses": 0, "solves": 0, "unconverged": 0}
+
+
+def _key(target: Hashable, x: float, y: float, thrust_g: float, jd: float) -> tuple:
+    bucket = math.floor(jd * 86400.0 / settings.INTERCEPT_CACHE_BUCKET)
+    return (target, round(x, 4), round(y, 4), round(thrust_g, 3), bucket)
+
+
+def _cached(key: tuple) -> Intercept | None:
+    hit = _cache.get(key)
+    if hit is not None:
+        _cache.move_to_end(key)
+        _cache_stats["hits"] += 1
+    else:
+        _cache_stats["misses"] += 1
+    return hit
+
+
+def _store(key: tuple, intercept: Intercept) -> None:
+    _cache[key] = intercept
+    while len(_cache) > settings.INTERCEPT_CACHE_SIZE:
+        _cache.popitem(last=False)
+
+
+def intercept_stats() -> dict:
+    return {"cached": len(_cache), **_cache_stats}
+
+
+def _solve_and_store(
+    keys: list[tuple],
+    origins: np.ndarray,
+    thrust_g: np.ndarray,
+    jds: np.ndarray,
+    position_at: Callable[[np.ndarray], np.ndarray],
+) -> list[Intercept]:
+    transit, points, converged = solve_intercepts(origins, thrust_g, jds, position_at)
+    _cache_stats["solves"] += 1
+    _cache_stats["unconverged"] += int((~converged).sum())
+    out = []
+    for key, t, (x, y), ok in zip(keys, transit.tolist(), points.tolist(), converged.tolist()):
+        intercept = Intercept(t, x, y, ok)
+        _store(key, intercept)
+        out.append(intercept)
+    return out
+
+
+# ── Targets ───────────────────────────────────────────────────────────────────
+
+async def asteroid_intercepts(
+    db: AsyncSession,
+    ships: Sequence[tuple[float, float, float]],
+    asteroid_ids: Sequence[int],
+    jd: float | Sequence[float],
+) -> list[Intercept | None]:
+    """
+    Intercepts of asteroid_ids[i] by a ship at (x, y) with thrust_g =
+    ships[i], leaving at jd (one launch time, or one per pair). None for
+    asteroids not in the catalog yet.
+    """
+    catalog = await get_asteroid_catalog(db)
+    jds = np.broadcast_to(np.asarray(jd, dtype=float), (len(ships),))
+    out: list[Intercept | None] = [None] * len(ships)
+    todo: list[int] = []
+    keys: list[tuple] = []
+    for i, ((x, y, thrust_g), asteroid_id) in enumerate(zip(ships, asteroid_ids)):
+        if catalog.row(asteroid_id) is None:
+            continue
+        key = _key(("asteroid", asteroid_id), x, y, thrust_g, float(jds[i]))
+        hit = _cached(key)
+        if hit is not None:
+            out[i] = hit
+        else:
+            todo.append(i)
+            keys.append(key)
+    if todo:
+        rows = np.array([catalog.row(asteroid_ids[i]) for i in todo], dtype=np.intp)
+        solved = _solve_and_store(
+            keys,
+            np.array([ships[i][:2] for i in todo]),
+            np.array([ships[i][2] for i in todo]),
+            jds[todo],
+            lambda probe: catalog.positions_at(rows, probe),
+        )
+        for i, intercept in zip(todo, solved):
+            out[i] = intercept
+    return out
+
+
+def orbit_intercept(orbits: Orbits, x: float, y: float, thrust_g: float, jd: float) -> Intercept:
+    """Intercept of a single-body Orbits (e.g. an asteroid added since the catalog was read)."""
+    transit, points, converged = solve_intercepts(
+        np.array([x, y]), np.array([thrust_g]), np.array([jd]), lambda probe: orbits.positions(probe),
+    )
+    return Intercept(float(transit[0]), float(points[0, 0]), float(points[0, 1]), bool(converged[0]))
+
+
+def body_intercept(planet_id: str, x: float, y: float, thrust_g: float, jd: float) -> Intercept | None:
+    """Intercept of a colony's planet_id, or None if it is not a known body."""
+    if not is_known_body(planet_id):
+        return None
+    key = _key(("body", planet_id), x, y, thrust_g, jd)
+    hit = _cached(key)
+    if hit is not None:
+        return hit
+    return _solve_and_store(
+        [key], np.array([x, y]), np.array([thrust_g]), np.array([jd]),
+        lambda probe: body_positions_at(planet_id, probe),
+    )[0]
@@ -0,0 +1,185 @@
+"""
+Local IPC between API processes and a standalone simulation process.
+
+Frames are a 4-byte big-endian length followed by a MessagePack map with the
+same shape as the cluster relay messages ("event", "state", "command"). The
+simulator runs IpcServer on a Unix socket; each API worker runs a
+SimulatorClient that feeds events into its local event bus, adopts runtime
+state and exchanges commands (admin commands, player write stamps) with the
+other processes through the simulator. Both sides must share a host.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+import os
+import struct
+from typing import Any, Callable
+
+import msgpack
+
+from server.simulation.event_bus import event_bus
+
+logger = logging.getLogger(__name__)
+
+_HEADER = struct.Struct(">I")
+_MAX_FRAME = 16 * 1024 * 1024
+_CLIENT_QUEUE_SIZE = 2000
+_RECONNECT_DELAY = 1.0
+
+
+async def read_frame(reader: asyncio.StreamReader) -> dict:
+    header = await reader.readexactly(_HEADER.size)
+    (length,) = _HEADER.unpack(header)
+    if length > _MAX_FRAME:
+        raise ValueError(f"IPC frame too large ({length} bytes)")
+    return msgpack.unpackb(await reader.readexactly(length), raw=False)
+
+
+def encode_frame(message: dict) -> bytes:
+    body = msgpack.packb(message, use_bin_type=True)
+    return _HEADER.pack(len(body)) + body
+
+
+class IpcServer:
+    """Simulator side: fans events/state/commands out to API processes, receives commands."""
+
+    is_leader = True  # only ever runs in the process that ticks
+
+    def __init__(self, path: str, on_command: Callable[[str, dict[str, Any]], None]) -> None:
+        self.path = path
+        self._on_command = on_command
+        self._clients: set[asyncio.Queue[bytes]] = set()
+        self._server: asyncio.AbstractServer | None = None
+        self._last_state: bytes | None = None
+
+    async def start(self) -> None:
+        if os.path.exists(self.path):
+            os.unlink(self.path)  # stale socket from a previous run
+        self._server = await asyncio.start_unix_server(self._handle_client, path=self.path)
+        os.chmod(self.path, 0o660)
+        logger.info("Simulation IPC listening on %s", self.path)
+
+    async def stop(self) -> None:
+        if self._server is not None:
+            self._server.close()
+            await self._server.wait_closed()
+        if os.path.exists(self.path):
+            os.unlink(self.path)
+
+    def relay_event(self, event: dict) -> None:
+        self._broadcast(encode_frame({"kind": "event", "event": event}))
+
+    def relay_command(self, op: str, args: dict[str, Any]) -> None:
+        self._broadcast(encode_frame({"kind": "command", "op": op, "args": args}))
+
+    def broadcast_state(self) -> None:
+        from server.simulation.tick import export_runtime_state
+        self._last_state = encode_frame({"kind": "state", "state": export_runtime_state()})
+        self._broadcast(self._last_state)
+
+    def _broadcast(self, frame: bytes, skip: asyncio.Queue[bytes] | None = None) -> None:
+        for q in self._clients:
+            if q is skip:
+                continue
+            try:
+                q.put_nowait(frame)
+            except asyncio.QueueFull:
+                logger.warning("IPC client too slow — dropping frame")
+
+    async def _handle_client(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        q: asyncio.Queue[bytes] = asyncio.Queue(maxsize=_CLIENT_QUEUE_SIZE)
+        if self._last_state is not None:
+            q.put_nowait(self._last_state)
+        self._clients.add(q)
+        logger.info("API process attached to simulator (clients=%d)", len(self._clients))
+
+        async def write_loop() -> None:
+            while True:
+                writer.write(await q.get())
+                await writer.drain()
+
+        writer_task = asyncio.create_task(write_loop())
+        try:
+            while True:
+                message = await read_frame(reader)
+                kind = message.get("kind")
+                if kind == "command":
+                    self._on_command(message["op"], message.get("args", {}))
+                if kind in ("command", "event"):
+                    # Sent by an API handler; pass it on to the other API processes.
+                    self._broadcast(encode_frame(message), skip=q)
+        except (asyncio.IncompleteReadError, ConnectionError, asyncio.CancelledError):
+            pass  # client went away or the simulator is shutting down
+        except Exception as exc:
+            logger.warning("IPC client error: %s", exc)
+        finally:
+            writer_task.cancel()
+            self._clients.discard(q)
+            writer.close()
+            logger.info("API process detached from simulator (clients=%d)", len(self._clients))
+
+
+class SimulatorClient:
+    """API side of the IPC channel. Never runs the simulation itself."""
+
+    is_leader = False
+
+    def __init__(self, path: str) -> None:
+        self.path = path
+        self._writer: asyncio.StreamWriter | None = None
+        self._task: asyncio.Task | None = None
+
+    async def start(self) -> None:
+        event_bus.set_relay(self.relay_event)
+        self._task = asyncio.create_task(self._run(), name="simulator_client")
+
+    async def stop(self) -> None:
+        event_bus.set_relay(None)
+        if self._task is not None:
+            self._task.cancel()
+        if self._writer is not None:
+            self._writer.close()
+
+    def relay_event(self, event: dict) -> None:
+        self._send({"kind": "event", "event": event})
+
+    def relay_command(self, op: str, args: dict[str, Any]) -> None:
+        if not self._send({"kind": "command", "op": op, "args": args}):
+            logger.warning("Simulator not connected — command %r not forwarded", op)
+
+    def _send(self, message: dict) -> bool:
+        if self._writer is None or self._writer.is_closing():
+            return False
+        self._writer.write(encode_frame(message))
+        return True
+
+    async def _run(self) -> None:
+        from server.simulation.cluster import apply_command
+        from server.simulation.tick import apply_runtime_state
+
+        while True:
+            try:
+                reader, self._writer = await asyncio.open_unix_connection(self.path)
+                logger.info("Connected to simulator at %s", self.path)
+                while True:
+                    message = await read_frame(reader)
+                    kind = message.get("kind")
+                    if kind == "event":
+                        event_bus.deliver(message["event"])
+                    elif kind == "state":
+                        apply_runtime_state(message["state"])
+                    elif kind == "command":
+                        apply_command(message["op"], message.get("args", {}))
+            except asyncio.CancelledError:
+                raise
+            except (OSError, asyncio.IncompleteReadError) as exc:
+                logger.warning("Simulator connection unavailable (%s); retrying", exc)
+            except Exception as exc:
+                logger.exception("Simulator connection error: %s", exc)
+            finally:
+                if self._writer is not None:
+                    self._writer.close()
+                    self._writer = None
+            await asyncio.sleep(_RECONNECT_DELAY)
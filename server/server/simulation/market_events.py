@@ -49,6 +49,12 @@ def get_event_multipliers() -> dict[str, float]:
     return dict(_active_multipliers)
 
 
+def set_event_multipliers(multipliers: dict[str, float]) -> None:
+    """Replace the multiplier cache wholesale (used by non-leader processes)."""
+    global _active_multipliers
+    _active_multipliers = dict(multipliers)
+
+
 async def load_active_events(db: AsyncSession) -> None:
     """Called on server startup to restore in-memory multiplier cache from DB."""
     global _active_multipliers
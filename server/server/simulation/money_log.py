@@ -1,10 +1,43 @@
-"""Lightweight helper to record every money change to player_transactions."""
+"""
+Record every money change to player_transactions.
+
+log_tx() only appends to a buffer on the session; nothing touches the
+unit of work. Just before the session commits, the buffered rows are
+written in one batch on the same connection, so they land in the same
+transaction as the money change they describe (and vanish with it on
+rollback):
+  - asyncpg: one COPY into player_transactions;
+  - otherwise (or when the connection has no transaction open yet): one
+    multi-row INSERT per LEDGER_INSERT_CHUNK rows.
+
+Rows are written in log_tx() call order, so ids (and therefore a player's
+history) stay in the order the changes were made.
+"""
+from __future__ import annotations
+
+import time
+from collections import deque
+
+from sqlalchemy import event, insert
 from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+
+from server.config import settings
 from server.models.transaction import PlayerTransaction
 
 # Module-level reference so tick.py can update it when world ticks advance
 _current_ticks: float = 0.0
 
+_SESSION_KEY = "tx_ledger"
+_COLUMNS = ("player_id", "amount", "balance_after", "game_ticks", "source", "detail")
+
+# Flush metrics (this process)
+_flush_lag: deque[float] = deque(maxlen=512)  # seconds from the oldest buffered row to its write
+_flush_time: deque[float] = deque(maxlen=512)  # seconds spent writing
+_rows_written = 0
+_flushes = 0
+_copy_flushes = 0
+
 
 def set_ticks(ticks: float) -> None:
     global _current_ticks
@@ -19,13 +52,89 @@ def log_tx(
     detail: str = "",
     game_ticks: float | None = None,
 ) -> None:
-    """Record a money transaction.  Call AFTER player.money has been updated."""
-    tx = PlayerTransaction(
-        player_id=player.id,
-        amount=amount,
-        balance_after=player.money,
-        game_ticks=game_ticks if game_ticks is not None else _current_ticks,
-        source=source,
-        detail=detail[:128],
-    )
-    db.add(tx)
+    """Record a money transaction.  Call AFTER player.money has been updated.
+
+    The row is written when db commits; the player object is kept (not its
+    id) so players created in the same transaction resolve at that point.
+    """
+    buffer = db.sync_session.info.setdefault(_SESSION_KEY, [])
+    buffer.append((
+        player,
+        int(amount),
+        int(player.money),
+        float(game_ticks if game_ticks is not None else _current_ticks),
+        source,
+        detail[:128],
+        time.perf_counter(),
+    ))
+
+
+def _copy(session: Session, records: list[tuple]) -> bool:
+    """COPY the records on the session's connection. False if COPY is not usable here."""
+    connection = session.connection()
+    if connection.dialect.driver != "asyncpg":
+        return False
+    dbapi_connection = connection.connection.dbapi_connection
+
+    async def copy(raw) -> bool:
+        if not raw.is_in_transaction():
+            return False  # COPY would autocommit outside the session's transaction
+        await raw.copy_records_to_table(
+            PlayerTransaction.__tablename__, records=records, columns=list(_COLUMNS),
+        )
+        return True
+
+    return dbapi_connection.run_async(copy)
+
+
+@event.listens_for(Session, "before_commit")
+def _write_buffered(session: Session) -> None:
+    global _rows_written, _flushes, _copy_flushes
+    buffer = session.info.pop(_SESSION_KEY, None)
+    if not buffer:
+        return
+    session.flush()  # assign ids to players created in this transaction
+
+    started = time.perf_counter()
+    records = [(player.id, *fields) for player, *fields, _ in buffer]
+    if _copy(session, records):
+        _copy_flushes += 1
+    else:
+        chunk = settings.LEDGER_INSERT_CHUNK
+        for start in range(0, len(records), chunk):
+            session.execute(
+                insert(PlayerTransaction).values(
+                    [dict(zip(_COLUMNS, r)) for r in records[start:start + chunk]]
+                )
+            )
+    finished = time.perf_counter()
+
+    _flush_lag.append(finished - buffer[0][-1])
+    _flush_time.append(finished - started)
+    _rows_written += len(records)
+    _flushes += 1
+
+
+@event.listens_for(Session, "after_rollback")
+def _discard(session: Session) -> None:
+    session.info.pop(_SESSION_KEY, None)
+
+
+def ledger_stats() -> dict:
+    """Flush counters plus lag percentiles (ms) from first buffered row to write."""
+
+    def pct(window: deque[float], p: float) -> float | None:
+        samples = sorted(window)
+        if not samples:
+            return None
+        return round(samples[min(len(samples) - 1, int(p * len(samples)))] * 1000, 1)
+
+    return {
+        "flushes": _flushes,
+        "copy_flushes": _copy_flushes,
+        "rows_written": _rows_written,
+        "lag_p50_ms": pct(_flush_lag, 0.50),
+        "lag_p95_ms": pct(_flush_lag, 0.95),
+        "lag_max_ms": pct(_flush_lag, 1.0),
+        "write_p95_ms": pct(_flush_time, 0.95),
+    }
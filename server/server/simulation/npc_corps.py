@@ -12,29 +12,19 @@ import logging
 import math
 import random
 
-from sqlalchemy import select
+from sqlalchemy import insert, select
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy.orm import selectinload
 
-from server.models.asteroid import Asteroid
+from server.models.loading import load_profile
 from server.models.mission import Mission, MISSION_MINING, STATUS_TRANSIT_OUT
 from server.models.player import Player
 from server.models.ship import Ship, SHIP_CLASS_STATS, COURIER, PROSPECTOR, HAULER
+from server.simulation.ephemeris import game_jd, get_asteroid_catalog
+from server.simulation.intercept import asteroid_intercepts
+from server.simulation.targets import best_targets
 
 logger = logging.getLogger(__name__)
 
-AU_TO_KM = 149_597_870.7
-G_ACCEL = 9.80665
-
-
-def _transit_time(dist_au: float, thrust_g: float) -> float:
-    dist_m = dist_au * AU_TO_KM * 1000.0
-    accel = thrust_g * G_ACCEL
-    if accel <= 0 or dist_m <= 0:
-        return 0.0
-    return 2.0 * math.sqrt(dist_m / accel)
-
-
 # ── Corp definitions ───────────────────────────────────────────────────────────
 
 NPC_CORPS = [
@@ -120,53 +110,62 @@ async def seed_npc_corps(db: AsyncSession) -> None:
 
 # ── Post-reset reseeding ───────────────────────────────────────────────────────
 
-async def reseed_npc_ships(db: AsyncSession) -> None:
-    """Recreate starting ships for existing NPC corp accounts. Called after world reset."""
-    for corp_def in NPC_CORPS:
-        result = await db.execute(
-            select(Player).where(Player.email == corp_def["email"])
-        )
-        npc = result.scalar_one_or_none()
-        if not npc:
-            continue  # Shouldn't happen, but skip if missing
-
-        stats = SHIP_CLASS_STATS[corp_def["ship_class"]]
-        for name in corp_def["ship_names"]:
-            ship = Ship(
-                player_id=npc.id,
-                ship_name=name,
-                ship_class=corp_def["ship_class"],
-                max_thrust_g=stats["max_thrust_g"],
-                thrust_setting=1.0,
-                cargo_capacity=stats["cargo_capacity"],
-                cargo_volume=stats["cargo_volume"],
-                fuel_capacity=stats["fuel_capacity"],
-                fuel=stats["fuel_capacity"],
-                base_mass=stats["base_mass"],
-                min_crew=stats["min_crew"],
-                max_equipment_slots=stats["max_equipment_slots"],
-                is_stationed=True,
-                station_colony_id=None,
-                current_cargo={},
-                supplies={},
-                position_x=1.0,
-                position_y=0.0,
-            )
-            db.add(ship)
-
-        logger.info("Reseeded ships for NPC corp '%s'", corp_def["username"])
+def _starter_ship_row(player_id: int, name: str, ship_class: int) -> dict:
+    stats = SHIP_CLASS_STATS[ship_class]
+    return {
+        "player_id": player_id,
+        "ship_name": name,
+        "ship_class": ship_class,
+        "max_thrust_g": stats["max_thrust_g"],
+        "thrust_setting": 1.0,
+        "cargo_capacity": stats["cargo_capacity"],
+        "cargo_volume": stats["cargo_volume"],
+        "fuel_capacity": stats["fuel_capacity"],
+        "fuel": stats["fuel_capacity"],
+        "base_mass": stats["base_mass"],
+        "min_crew": stats["min_crew"],
+        "max_equipment_slots": stats["max_equipment_slots"],
+        "is_stationed": True,
+        "station_colony_id": None,
+        "current_cargo": {},
+        "supplies": {},
+        "position_x": 1.0,
+        "position_y": 0.0,
+    }
+
+
+async def reseed_npc_ships(db: AsyncSession) -> int:
+    """Recreate starting ships for existing NPC corp accounts. Called after world reset.
+
+    One lookup for every corp and one multi-row insert; returns ships created.
+    """
+    ids_by_email = dict((await db.execute(
+        select(Player.email, Player.id).where(Player.email.in_([c["email"] for c in NPC_CORPS]))
+    )).all())
+    rows = [
+        _starter_ship_row(ids_by_email[corp_def["email"]], name, corp_def["ship_class"])
+        for corp_def in NPC_CORPS
+        if corp_def["email"] in ids_by_email  # Shouldn't be missing, but skip if so
+        for name in corp_def["ship_names"]
+    ]
+    if rows:
+        await db.execute(insert(Ship), rows)
+        logger.info("Reseeded %d ships for %d NPC corps", len(rows), len(ids_by_email))
+    return len(rows)
 
 
 # ── AI tick ────────────────────────────────────────────────────────────────────
 
 _NPC_DECISION_INTERVAL = 3600.0  # Game-seconds between NPC decisions
+_NPC_TARGET_CHOICES = 5  # NPCs pick at random among their this many best targets
 _npc_accum: float = 0.0
 
 
 async def process_npc_tick(db: AsyncSession, dt: float) -> list[dict]:
     """
     Drive NPC corp AI each server tick.
-    Idle (stationed) NPC ships get dispatched to a random asteroid.
+    Idle (stationed) NPC ships get dispatched to one of their few most
+    profitable asteroids (see simulation/targets.py).
     The existing _process_missions() in tick.py advances their missions for free.
     """
     global _npc_accum
@@ -178,61 +177,71 @@ async def process_npc_tick(db: AsyncSession, dt: float) -> list[dict]:
     result = await db.execute(
         select(Player)
         .where(Player.is_npc == True)  # noqa: E712
-        .options(selectinload(Player.ships))
+        .options(*load_profile("npc.players"))
     )
     npc_players = list(result.scalars().all())
     if not npc_players:
         return []
 
-    ast_result = await db.execute(select(Asteroid))
-    asteroids = list(ast_result.scalars().all())
-    if not asteroids:
+    catalog = await get_asteroid_catalog(db)
+    if not len(catalog):
         return []
 
-    events: list[dict] = []
+    idle = [
+        (npc, ship) for npc in npc_players for ship in npc.ships
+        if ship.is_stationed and not ship.is_derelict
+    ]
+    if not idle:
+        return []
+    target_ids = []
+    for _, ship in idle:
+        best = await best_targets(db, ship, limit=_NPC_TARGET_CHOICES)
+        target_ids.append(
+            random.choice(best).asteroid_id if best else int(catalog.ids[random.randrange(len(catalog))])
+        )
+    # Every ship's intercept in one batch (ranked targets are already cached)
+    intercepts = await asteroid_intercepts(
+        db,
+        [(ship.position_x, ship.position_y, ship.max_thrust_g * ship.thrust_setting) for _, ship in idle],
+        target_ids,
+        game_jd(),
+    )
 
-    for npc in npc_players:
-        for ship in npc.ships:
-            if not ship.is_stationed or ship.is_derelict:
-                continue
-
-            target = random.choice(asteroids)
-            target_x = target.semi_major_axis
-            target_y = 0.0
-            dist = math.sqrt(
-                (target_x - ship.position_x) ** 2 +
-                (target_y - ship.position_y) ** 2
-            )
-            transit_sec = _transit_time(dist, ship.max_thrust_g * ship.thrust_setting)
-            fuel_per_tick = (ship.fuel_capacity * 0.001) * ship.thrust_setting
+    events: list[dict] = []
 
-            mission = Mission(
-                player_id=npc.id,
-                ship_id=ship.id,
-                asteroid_id=target.id,
-                mission_type=MISSION_MINING,
-                status=STATUS_TRANSIT_OUT,
-                transit_time=max(transit_sec, 30.0),
-                elapsed_ticks=0.0,
-                fuel_per_tick=fuel_per_tick,
-                origin_x=ship.position_x,
-                origin_y=ship.position_y,
-                origin_name="Earth",
-                origin_is_earth=True,
-                destination_x=target_x,
-                destination_y=target_y,
-                return_to_station=True,
-                mining_duration=86400.0,
-            )
-            db.add(mission)
+    for (npc, ship), target_id, intercept in zip(idle, target_ids, intercepts):
+        target_x, target_y = intercept.x, intercept.y
+        dist = math.hypot(target_x - ship.position_x, target_y - ship.position_y)
+        transit_sec = intercept.transit_s
+        fuel_per_tick = (ship.fuel_capacity * 0.001) * ship.thrust_setting
+
+        mission = Mission(
+            player_id=npc.id,
+            ship_id=ship.id,
+            asteroid_id=target_id,
+            mission_type=MISSION_MINING,
+            status=STATUS_TRANSIT_OUT,
+            transit_time=max(transit_sec, 30.0),
+            elapsed_ticks=0.0,
+            fuel_per_tick=fuel_per_tick,
+            origin_x=ship.position_x,
+            origin_y=ship.position_y,
+            origin_name="Earth",
+            origin_is_earth=True,
+            destination_x=target_x,
+            destination_y=target_y,
+            return_to_station=True,
+            mining_duration=86400.0,
+        )
+        db.add(mission)
 
-            ship.is_stationed = False
-            ship.fuel = ship.fuel_capacity  # Top up before departure
-            db.add(ship)
+        ship.is_stationed = False
+        ship.fuel = ship.fuel_capacity  # Top up before departure
+        db.add(ship)
 
-            logger.info(
-                "NPC '%s': dispatched '%s' to asteroid %d (dist=%.2f AU)",
-                npc.username, ship.ship_name, target.id, dist
-            )
+        logger.info(
+            "NPC '%s': dispatched '%s' to asteroid %d (dist=%.2f AU)",
+            npc.username, ship.ship_name, target_id, dist
+        )
 
     return events
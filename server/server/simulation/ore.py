@@ -0,0 +1,134 @@
+"""
+Ore registry and fixed-width ore vectors.
+
+Every tradeable ore has a fixed slot (ORES order, shared with the snapshot
+layout). OreVector holds one float per slot in a numpy array, so cargo
+totals are a sum and valuations are a dot product with a price vector
+instead of dict walks with per-key lookups.
+
+Dicts remain the storage and API format (JSONB columns, responses); convert
+with OreVector.from_dict / to_dict at that boundary. Stored dicts may hold
+ores outside the registry (older data, materials such as "silicates" that
+have no market): from_dict and stack skip those keys and log each name
+once, so one odd row cannot fail a tick or a leaderboard read. Dicts
+defined in code convert with strict=True, and indexing by name always
+raises UnknownOreError for unregistered ores.
+"""
+
+from __future__ import annotations
+
+import logging
+from typing import Mapping
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+ORES: tuple[str, ...] = (
+    'nickel', 'iron', 'cobalt', 'platinum', 'gold', 'silicon',
+    'water_ice', 'carbon', 'olivine', 'pyroxene', 'troilite', 'palladium',
+)
+N_ORES = len(ORES)
+ORE_INDEX: dict[str, int] = {name: i for i, name in enumerate(ORES)}
+
+
+class UnknownOreError(KeyError):
+    pass
+
+
+def ore_index(name: str) -> int:
+    try:
+        return ORE_INDEX[name]
+    except KeyError:
+        raise UnknownOreError(name) from None
+
+
+_reported: set[str] = set()
+
+
+def report_unknown_ore(name: str) -> None:
+    """Log an unregistered ore found in stored data (once per name)."""
+    if name not in _reported:
+        _reported.add(name)
+        logger.warning("Ignoring unregistered ore %r in stored data", name)
+
+
+class OreVector:
+    """One float per registered ore (tonnes, prices or multipliers)."""
+
+    __slots__ = ("values",)
+
+    def __init__(self, values: np.ndarray | None = None) -> None:
+        self.values = np.zeros(N_ORES) if values is None else values
+
+    @classmethod
+    def full(cls, value: float) -> OreVector:
+        return cls(np.full(N_ORES, float(value)))
+
+    @classmethod
+    def from_dict(cls, amounts: Mapping[str, float] | None, fill: float = 0.0, strict: bool = False) -> OreVector:
+        """{ore: value} -> vector; ores not in the dict get `fill`. Unregistered keys are skipped unless strict."""
+        values = np.full(N_ORES, float(fill))
+        for name, value in (amounts or {}).items():
+            column = ORE_INDEX.get(name)
+            if column is not None:
+                values[column] = value
+            elif strict:
+                raise UnknownOreError(name)
+            else:
+                report_unknown_ore(name)
+        return cls(values)
+
+    def to_dict(self, keep_zeros: bool = False) -> dict[str, float]:
+        """Vector -> {ore: value} (storage/API format). Zero slots are dropped unless keep_zeros."""
+        return {
+            name: value
+            for name, value in zip(ORES, self.values.tolist())
+            if keep_zeros or value
+        }
+
+    def update(self, amounts: Mapping[str, float]) -> None:
+        for name, value in amounts.items():
+            self.values[ore_index(name)] = value
+
+    def copy(self) -> OreVector:
+        return OreVector(self.values.copy())
+
+    def total(self) -> float:
+        return float(self.values.sum())
+
+    def dot(self, other: OreVector) -> float:
+        return float(self.values @ other.values)
+
+    def __getitem__(self, name: str) -> float:
+        return float(self.values[ore_index(name)])
+
+    def __setitem__(self, name: str, value: float) -> None:
+        self.values[ore_index(name)] = value
+
+    def __mul__(self, other: OreVector | float) -> OreVector:
+        return OreVector(self.values * (other.values if isinstance(other, OreVector) else other))
+
+    __rmul__ = __mul__
+
+    def __add__(self, other: OreVector) -> OreVector:
+        return OreVector(self.values + other.values)
+
+    def __bool__(self) -> bool:
+        return bool(self.values.any())
+
+    def __repr__(self) -> str:
+        return f"OreVector({self.to_dict()})"
+
+
+def stack(vectors: list[Mapping[str, float] | None]) -> np.ndarray:
+    """Rows of stored ore dicts -> (len, N_ORES) matrix, e.g. every ship's cargo for one matmul."""
+    out = np.zeros((len(vectors), N_ORES))
+    for row, amounts in enumerate(vectors):
+        for name, value in (amounts or {}).items():
+            column = ORE_INDEX.get(name)
+            if column is not None:
+                out[row, column] = value
+            else:
+                report_unknown_ore(name)
+    return out
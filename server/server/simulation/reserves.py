@@ -0,0 +1,184 @@
+"""
+Asteroid ore reserves (asteroid_reserves table).
+
+Every write goes through this module so world_stats sees the change:
+  - ReserveLedger: the tick loads the reserves of every asteroid being mined
+    once, lets each mining ship draw from the in-memory figures (so ships
+    sharing an asteroid see each other's draw), then applies the tick's
+    total per (asteroid, ore) in one batched UPDATE of atomic decrements;
+  - replace_reserves / regenerate_all_reserves / clear_reserves:
+    generation and world reset.
+
+An asteroid with no row for an ore has no reserve limit for it (worlds
+created before reserves were generated).
+"""
+
+from __future__ import annotations
+
+import logging
+from typing import Iterable, Sequence
+
+import numpy as np
+from sqlalchemy import delete, func, insert, select, text
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from server.models.asteroid_reserve import AsteroidReserve
+from server.world_stats import stage_delta
+
+logger = logging.getLogger(__name__)
+
+
+async def load_reserves(
+    db: AsyncSession,
+    asteroid_ids: Iterable[int] | None = None,
+    original: bool = False,
+) -> dict[int, dict[str, float]]:
+    """{asteroid_id: {ore: tonnes}} remaining (or originally generated) tonnes."""
+    column = AsteroidReserve.original_tonnes if original else AsteroidReserve.tonnes
+    stmt = select(AsteroidReserve.asteroid_id, AsteroidReserve.ore_type, column)
+    if asteroid_ids is not None:
+        stmt = stmt.where(AsteroidReserve.asteroid_id.in_(list(asteroid_ids)))
+    out: dict[int, dict[str, float]] = {}
+    for asteroid_id, ore_type, tonnes in (await db.execute(stmt)).all():
+        out.setdefault(asteroid_id, {})[ore_type] = tonnes
+    return out
+
+
+async def reserve_totals(db: AsyncSession) -> dict[str, float]:
+    """{ore: remaining tonnes} across all asteroids."""
+    rows = await db.execute(
+        select(AsteroidReserve.ore_type, func.sum(AsteroidReserve.tonnes))
+        .group_by(AsteroidReserve.ore_type)
+    )
+    return {ore: float(total or 0.0) for ore, total in rows.all()}
+
+
+async def has_reserves(db: AsyncSession) -> bool:
+    return (await db.scalar(select(AsteroidReserve.asteroid_id).limit(1))) is not None
+
+
+def _negated(totals: dict[str, float]) -> dict[str, float]:
+    return {ore: -tonnes for ore, tonnes in totals.items()}
+
+
+async def replace_reserves(db: AsyncSession, reserves: dict[int, dict[str, float]]) -> None:
+    """Set each listed asteroid's reserves (and originals) to the given tonnes. Does not commit."""
+    if not reserves:
+        return
+    old = await load_reserves(db, reserves.keys())
+    await db.execute(delete(AsteroidReserve).where(AsteroidReserve.asteroid_id.in_(list(reserves))))
+    rows = [
+        {"asteroid_id": asteroid_id, "ore_type": ore, "tonnes": tonnes, "original_tonnes": tonnes}
+        for asteroid_id, by_ore in reserves.items()
+        for ore, tonnes in by_ore.items()
+    ]
+    if rows:
+        await db.execute(insert(AsteroidReserve), rows)
+
+    change: dict[str, float] = {}
+    for by_ore in old.values():
+        for ore, tonnes in by_ore.items():
+            change[ore] = change.get(ore, 0.0) - tonnes
+    for by_ore in reserves.values():
+        for ore, tonnes in by_ore.items():
+            change[ore] = change.get(ore, 0.0) + tonnes
+    stage_delta(db, reserves=change)
+
+
+_INSERT_RESERVES = text("""
+    INSERT INTO asteroid_reserves (asteroid_id, ore_type, tonnes, original_tonnes)
+    SELECT asteroid_id, ore_type, tonnes, tonnes
+    FROM unnest(
+        CAST(:asteroid_ids AS integer[]),
+        CAST(:ore_types AS varchar[]),
+        CAST(:tonnes AS float8[])
+    ) AS r(asteroid_id, ore_type, tonnes)
+""")
+
+
+async def regenerate_all_reserves(
+    db: AsyncSession,
+    asteroid_ids: Sequence[int],
+    ores: Sequence[str],
+    tonnes: np.ndarray,
+) -> None:
+    """
+    Replace every asteroid's reserves with tonnes[i, j] of ores[j] at
+    asteroid_ids[i], in one INSERT ... SELECT unnest(). Does not commit.
+    """
+    await clear_reserves(db)
+    if not len(asteroid_ids):
+        return
+    n_ores = len(ores)
+    await db.execute(_INSERT_RESERVES, {
+        "asteroid_ids": np.repeat(np.asarray(asteroid_ids), n_ores).tolist(),
+        "ore_types": list(ores) * len(asteroid_ids),
+        "tonnes": tonnes.reshape(-1).tolist(),
+    })
+    stage_delta(db, reserves=dict(zip(ores, tonnes.sum(axis=0).tolist())))
+
+
+async def clear_reserves(db: AsyncSession) -> None:
+    """Delete every asteroid's reserves. Does not commit."""
+    totals = await reserve_totals(db)
+    await db.execute(delete(AsteroidReserve))
+    stage_delta(db, reserves=_negated(totals))
+
+
+# ── Mining ledger ─────────────────────────────────────────────────────────────
+
+_APPLY_DRAWS = text("""
+    UPDATE asteroid_reserves AS r
+    SET tonnes = GREATEST(r.tonnes - d.mined, 0)
+    FROM (
+        SELECT unnest(CAST(:asteroid_ids AS integer[])) AS asteroid_id,
+               unnest(CAST(:ore_types AS varchar[])) AS ore_type,
+               unnest(CAST(:mined AS float8[])) AS mined
+    ) AS d
+    WHERE r.asteroid_id = d.asteroid_id AND r.ore_type = d.ore_type
+""")
+
+
+class ReserveLedger:
+    """Reserves of the asteroids mined this tick, with the tick's draws."""
+
+    def __init__(self, remaining: dict[int, dict[str, float]]) -> None:
+        self._remaining = remaining
+        self._drawn: dict[tuple[int, str], float] = {}
+
+    @classmethod
+    async def load(cls, db: AsyncSession, asteroid_ids: Iterable[int]) -> ReserveLedger:
+        ids = set(asteroid_ids)
+        return cls(await load_reserves(db, ids) if ids else {})
+
+    def available(self, asteroid_id: int, ore_type: str) -> float | None:
+        """Remaining tonnes, or None when this ore is not reserve-limited here."""
+        return self._remaining.get(asteroid_id, {}).get(ore_type)
+
+    def draw(self, asteroid_id: int, ore_type: str, tonnes: float) -> float:
+        """Take up to tonnes; returns what was actually taken."""
+        available = self.available(asteroid_id, ore_type)
+        if available is None:
+            return tonnes
+        taken = max(0.0, min(tonnes, available))
+        if taken > 0:
+            self._remaining[asteroid_id][ore_type] = available - taken
+            key = (asteroid_id, ore_type)
+            self._drawn[key] = self._drawn.get(key, 0.0) + taken
+        return taken
+
+    async def flush(self, db: AsyncSession) -> None:
+        """Apply this tick's draws as one batched decrement. Does not commit."""
+        if not self._drawn:
+            return
+        keys = list(self._drawn)
+        await db.execute(_APPLY_DRAWS, {
+            "asteroid_ids": [asteroid_id for asteroid_id, _ in keys],
+            "ore_types": [ore for _, ore in keys],
+            "mined": [self._drawn[k] for k in keys],
+        })
+        change: dict[str, float] = {}
+        for (_, ore), tonnes in self._drawn.items():
+            change[ore] = change.get(ore, 0.0) - tonnes
+        stage_delta(db, reserves=change)
+        self._drawn.clear()
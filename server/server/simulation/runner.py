@@ -1,11 +1,20 @@
 from __future__ import annotations
 import asyncio
 import logging
+from typing import Awaitable, Callable
 
+from sqlalchemy.ext.asyncio import AsyncSession
+
+import server.leaderboard_index  # noqa: F401 — registers the listeners that relay tick writes as dirty players
 from server.config import settings
 from server.database import AsyncSessionLocal
+from server.simulation.archive import archive_finished_missions
 from server.simulation.event_bus import event_bus
+from server.simulation.finance import ensure_partitions, maintain_ledger
+from server.simulation.snapshot import mark_tick_session, publish_snapshot
 from server.simulation.tick import process_tick, load_world_state
+from server.sp_leaderboard import prune_dominated_scores
+from server.world_stats import reconcile_world_stats, start_world_stats, stop_world_stats
 from server.simulation.npc_corps import seed_npc_corps
 from server.simulation.market_events import load_active_events
 from server.routers import admin_speed
@@ -13,8 +22,12 @@ from server.routers import admin_speed
 logger = logging.getLogger(__name__)
 
 
-async def simulation_loop(world_id: int = 1) -> None:
-    '''Runs indefinitely. One real second = one game tick at 1x speed (adjustable via admin endpoint).'''
+async def simulation_loop(world_id: int = 1, on_tick: Callable[[], None] | None = None) -> None:
+    '''Runs indefinitely. One real second = one game tick at 1x speed (adjustable via admin endpoint).
+
+    on_tick is called after each tick's events are published (the cluster uses
+    it to push runtime state to follower processes).
+    '''
     logger.info('Simulation loop started (world_id=%d, base_tick_interval=%.2fs)', world_id, settings.TICK_INTERVAL)
 
     # Load world state and seed NPC corps
@@ -22,7 +35,37 @@ async def simulation_loop(world_id: int = 1) -> None:
         await load_world_state(db, world_id)
         await seed_npc_corps(db)
         await load_active_events(db)
+        await ensure_partitions(db)  # before the first tick logs a transaction
+
+    # Maintenance runs beside the tick loop, never inside it: a slow pass must not delay ticks
+    jobs = [
+        ('archive', settings.MISSION_ARCHIVE_INTERVAL, archive_finished_missions),
+        ('sp_prune', settings.SP_SCORE_PRUNE_INTERVAL, prune_dominated_scores),
+        ('world_stats', settings.WORLD_STATS_RECONCILE_INTERVAL, reconcile_world_stats),
+        ('ledger', settings.LEDGER_ROLLUP_INTERVAL, maintain_ledger),
+    ]
+    tasks = [asyncio.create_task(_periodic(*job), name=f'periodic_{job[0]}') for job in jobs]
+    try:
+        await _tick_loop(world_id, on_tick)
+    finally:
+        for task in tasks:
+            task.cancel()
+
+
+async def _periodic(name: str, interval: float, job: Callable[[AsyncSession], Awaitable[object]]) -> None:
+    """Run job(db) every interval seconds in its own task; failures are logged and retried."""
+    while True:
+        try:
+            async with AsyncSessionLocal() as db:
+                await job(db)
+        except asyncio.CancelledError:
+            raise
+        except Exception as exc:
+            logger.exception('Periodic %s job failed (continuing): %s', name, exc)
+        await asyncio.sleep(interval)
+
 
+async def _tick_loop(world_id: int, on_tick: Callable[[], None] | None) -> None:
     while True:
         loop = asyncio.get_event_loop()
         start = loop.time()
@@ -34,15 +77,26 @@ async def simulation_loop(world_id: int = 1) -> None:
 
         try:
             async with AsyncSessionLocal() as db:
+                mark_tick_session(db)
                 try:
                     events = await process_tick(db, world_id, dt)
                     await db.commit()
+                    loaded = list(db.sync_session.identity_map.values())
                 except Exception as tick_exc:
                     logger.exception('Tick processing error, rolling back: %s', tick_exc)
                     await db.rollback()
                     events = []  # Don't publish events from failed tick
-            for event in events:
-                await event_bus.publish(event)
+                    loaded = []
+                for event in events:
+                    await event_bus.publish(event)
+                if settings.SNAPSHOT_ENABLED:
+                    try:
+                        await publish_snapshot(db, world_id, loaded)
+                    except Exception as snap_exc:
+                        # Readers fall back to the DB once the snapshot ages out
+                        logger.exception('Snapshot publish failed: %s', snap_exc)
+            if on_tick is not None:
+                on_tick()
         except asyncio.CancelledError:
             logger.info('Simulation loop cancelled.')
             raise
@@ -52,3 +106,65 @@ async def simulation_loop(world_id: int = 1) -> None:
         elapsed = asyncio.get_event_loop().time() - start
         sleep_time = max(0.0, effective_tick_interval - elapsed)
         await asyncio.sleep(sleep_time)
+
+
+async def run_standalone(world_id: int = 1) -> None:
+    '''Run the simulation in this process and serve API workers over IPC.
+
+    API workers started with SIMULATION_MODE=external attach to the socket at
+    SIMULATION_SOCKET; they receive events and runtime state and send admin
+    commands back. A second simulator started against the same database waits
+    as a hot standby until the first one's leader lock is released.
+    '''
+    from server.simulation.cluster import apply_command, attach_simulator, wait_for_leadership
+    from server.simulation.ipc import IpcServer
+
+    lock_conn = None
+    if settings.SIM_LEADER_ELECTION:
+        logger.info('Waiting for simulation leader lock...')
+        lock_conn = await wait_for_leadership()
+        logger.info('Acquired simulation leader lock')
+
+    ipc_server = IpcServer(settings.SIMULATION_SOCKET, on_command=apply_command)
+    await ipc_server.start()
+    event_bus.set_relay(ipc_server.relay_event)
+    attach_simulator(ipc_server)
+    await start_world_stats()  # the tick's mission and reserve deltas are flushed from here
+
+    sim_task = asyncio.create_task(
+        simulation_loop(world_id, on_tick=ipc_server.broadcast_state), name='simulation_loop',
+    )
+    try:
+        while not sim_task.done():
+            await asyncio.sleep(settings.SIM_LEADER_POLL_INTERVAL)
+            if lock_conn is not None:
+                # Losing the session frees the lock for a standby; stop before it starts ticking.
+                try:
+                    await lock_conn.fetchval('SELECT 1', timeout=settings.SIM_LEADER_POLL_INTERVAL)
+                except Exception as exc:
+                    logger.error('Leader lock connection lost (%s); stopping simulation', exc)
+                    break
+    finally:
+        sim_task.cancel()
+        try:
+            await sim_task
+        except asyncio.CancelledError:
+            pass
+        await stop_world_stats()
+        event_bus.set_relay(None)
+        attach_simulator(None)
+        await ipc_server.stop()
+        if lock_conn is not None and not lock_conn.is_closed():
+            await lock_conn.close()
+
+
+if __name__ == '__main__':
+    logging.basicConfig(
+        level=getattr(logging, settings.LOG_LEVEL.upper(), logging.INFO),
+        format='%(asctime)s %(levelname)s [%(name)s] %(message)s',
+        datefmt='%Y-%m-%d %H:%M:%S',
+    )
+    try:
+        asyncio.run(run_standalone(world_id=1))
+    except KeyboardInterrupt:
+        pass
@@ -0,0 +1,646 @@
+"""
+Shared-memory world snapshot.
+
+The simulation leader writes hot world state (ships, active missions, colony
+tiers, market prices) into an mmap'd file once per tick. API processes on the
+same host map the file read-only and serve read endpoints from it instead of
+querying Postgres.
+
+The file holds two buffers. The writer always fills the inactive one, then
+flips the active index. Each buffer carries a sequence number that is odd
+while a write is in progress (a seqlock), so a reader that was overtaken by
+two publishes detects it and retries. Records are fixed-width numpy
+structured arrays; dict columns (cargo, supplies) are stored as fixed slots
+with NaN meaning "key absent".
+"""
+
+from __future__ import annotations
+
+import datetime
+import logging
+import mmap
+import os
+import struct
+import tempfile
+import time
+from dataclasses import dataclass
+from typing import Callable, Iterable, TypeVar
+
+import numpy as np
+from sqlalchemy import event, inspect, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+
+from server.config import settings
+from server.models.colony import Colony
+from server.models.mission import (
+    Mission, STATUS_COLLECTING, STATUS_MINING, STATUS_TRANSIT_BACK, STATUS_TRANSIT_OUT,
+)
+from server.models.player import Player
+from server.models.ship import Ship
+from server.simulation.ore import ORES
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+_MAGIC = b"CLAIMSNP"
+_LAYOUT_VERSION = 1
+_ALIGN = 64
+# magic, layout version, active buffer, max ships, max missions, max colonies
+_FILE_HEADER = struct.Struct("<8sIIIII4x")
+# seq, total_ticks, game_seconds, captured_at, speed, n_ships, n_missions, n_colonies, flags
+_BUFFER_HEADER = struct.Struct("<QqdddIIII")
+_FLAG_TRUNCATED = 1
+
+# Fixed slot order for dict columns. Extra keys mark the record "exotic" and
+# make readers fall back to the database for that request.
+ORE_SLOTS: tuple[str, ...] = ORES
+SUPPLY_SLOTS: tuple[str, ...] = ('food', 'repair_parts')
+MAX_COLONIES = 256
+
+ACTIVE_MISSION_STATUSES = (STATUS_TRANSIT_OUT, STATUS_MINING, STATUS_TRANSIT_BACK, STATUS_COLLECTING)
+
+# Ship flag bits
+SHIP_DERELICT = 1
+SHIP_STATIONED = 2
+SHIP_OWNER_NPC = 4
+SHIP_HAS_OWNER = 8
+SHIP_EXOTIC = 16
+# Mission flag bits
+MISSION_ORIGIN_EARTH = 1
+MISSION_RETURN_TO_STATION = 2
+
+SHIP_DTYPE = np.dtype([
+    ('id', '<i8'), ('player_id', '<i8'), ('station_colony_id', '<i8'),
+    ('ship_class', '<i4'), ('min_crew', '<i4'), ('max_equipment_slots', '<i4'), ('flags', '<u4'),
+    ('max_thrust_g', '<f8'), ('thrust_setting', '<f8'),
+    ('cargo_capacity', '<f8'), ('cargo_volume', '<f8'),
+    ('fuel_capacity', '<f8'), ('fuel', '<f8'), ('base_mass', '<f8'),
+    ('engine_condition', '<f8'), ('position_x', '<f8'), ('position_y', '<f8'),
+    ('cargo', '<f8', (len(ORE_SLOTS),)), ('supplies', '<f8', (len(SUPPLY_SLOTS),)),
+    ('ship_name', 'S256'), ('owner_username', 'S128'),
+])
+
+MISSION_DTYPE = np.dtype([
+    ('id', '<i8'), ('player_id', '<i8'), ('ship_id', '<i8'), ('asteroid_id', '<i8'),
+    ('mission_type', '<i4'), ('status', '<i4'), ('flags', '<u4'), ('_pad', '<u4'),
+    ('transit_time', '<f8'), ('elapsed_ticks', '<f8'), ('fuel_per_tick', '<f8'),
+    ('mining_duration', '<f8'), ('created_at', '<f8'),
+    ('origin_name', 'S256'),
+])
+
+COLONY_DTYPE = np.dtype([('id', '<i8'), ('tier', '<i8'), ('colony_name', 'S256')])
+
+
+def _aligned(n: int) -> int:
+    return (n + _ALIGN - 1) // _ALIGN * _ALIGN
+
+
+@dataclass(frozen=True)
+class _Layout:
+    max_ships: int
+    max_missions: int
+    max_colonies: int
+
+    @property
+    def prices_offset(self) -> int:
+        return _aligned(_BUFFER_HEADER.size)
+
+    @property
+    def colonies_offset(self) -> int:
+        return self.prices_offset + _aligned(8 * len(ORE_SLOTS))
+
+    @property
+    def ships_offset(self) -> int:
+        return self.colonies_offset + _aligned(COLONY_DTYPE.itemsize * self.max_colonies)
+
+    @property
+    def missions_offset(self) -> int:
+        return self.ships_offset + _aligned(SHIP_DTYPE.itemsize * self.max_ships)
+
+    @property
+    def buffer_size(self) -> int:
+        return self.missions_offset + _aligned(MISSION_DTYPE.itemsize * self.max_missions)
+
+    def buffer_offset(self, index: int) -> int:
+        return _aligned(_FILE_HEADER.size) + index * self.buffer_size
+
+    @property
+    def file_size(self) -> int:
+        return self.buffer_offset(2)
+
+
+def snapshot_path(world_id: int = 1) -> str:
+    if settings.SNAPSHOT_PATH:
+        return settings.SNAPSHOT_PATH
+    base = "/dev/shm" if os.path.isdir("/dev/shm") else tempfile.gettempdir()
+    return os.path.join(base, f"claim-world-{world_id}.snap")
+
+
+def _slots(values: dict | None, slots: tuple[str, ...]) -> tuple[list[float], bool]:
+    """Dict -> fixed slot list (NaN = absent). Second value is True if keys were lost."""
+    out = [float("nan")] * len(slots)
+    if not values:
+        return out, False
+    exotic = False
+    for key, value in values.items():
+        try:
+            out[slots.index(key)] = float(value)
+        except ValueError:
+            exotic = True
+    return out, exotic
+
+
+def _unslot(values, slots: tuple[str, ...]) -> dict[str, float]:
+    if isinstance(values, np.ndarray):
+        values = values.tolist()
+    return {key: v for key, v in zip(slots, values) if v == v}  # v == v drops NaN
+
+
+def _encode(text: str | None, width: int) -> tuple[bytes, bool]:
+    raw = (text or "").encode("utf-8")
+    return raw, len(raw) > width
+
+
+# ── Writer ────────────────────────────────────────────────────────────────────
+
+class SnapshotWriter:
+    def __init__(self, path: str, max_ships: int, max_missions: int, max_colonies: int = MAX_COLONIES) -> None:
+        self.path = path
+        self.layout = _Layout(max_ships, max_missions, max_colonies)
+        tmp = f"{path}.{os.getpid()}.tmp"
+        with open(tmp, "wb") as f:
+            f.truncate(self.layout.file_size)
+        fd = os.open(tmp, os.O_RDWR)
+        try:
+            self._mm = mmap.mmap(fd, self.layout.file_size)
+        finally:
+            os.close(fd)
+        _FILE_HEADER.pack_into(self._mm, 0, _MAGIC, _LAYOUT_VERSION, 0,
+                               max_ships, max_missions, max_colonies)
+        os.replace(tmp, path)  # readers holding the old file keep a valid mapping
+        self._active = 0
+        logger.info("World snapshot at %s (%d bytes)", path, self.layout.file_size)
+
+    def close(self) -> None:
+        self._mm.close()
+
+    def _view(self, base: int, offset: int, dtype: np.dtype, count: int) -> np.ndarray:
+        return np.ndarray((count,), dtype=dtype, buffer=self._mm, offset=base + offset)
+
+    def publish(
+        self,
+        *,
+        total_ticks: int,
+        game_seconds: float,
+        captured_at: float,
+        speed: float,
+        prices: dict[str, float],
+        ships: list[tuple],
+        missions: list[tuple],
+        colonies: list[tuple],
+    ) -> None:
+        layout = self.layout
+        target = 1 - self._active
+        base = layout.buffer_offset(target)
+        flags = 0
+        if len(ships) > layout.max_ships or len(missions) > layout.max_missions or len(colonies) > layout.max_colonies:
+            flags |= _FLAG_TRUNCATED
+        ships = ships[:layout.max_ships]
+        missions = missions[:layout.max_missions]
+        colonies = colonies[:layout.max_colonies]
+
+        seq = _BUFFER_HEADER.unpack_from(self._mm, base)[0]
+        struct.pack_into("<Q", self._mm, base, seq + 1)  # odd: write in progress
+
+        price_view = self._view(base, layout.prices_offset, np.dtype('<f8'), len(ORE_SLOTS))
+        price_view[:] = [prices.get(ore, float("nan")) for ore in ORE_SLOTS]
+        if colonies:
+            self._view(base, layout.colonies_offset, COLONY_DTYPE, len(colonies))[:] = colonies
+        if ships:
+            self._view(base, layout.ships_offset, SHIP_DTYPE, len(ships))[:] = ships
+        if missions:
+            self._view(base, layout.missions_offset, MISSION_DTYPE, len(missions))[:] = missions
+
+        _BUFFER_HEADER.pack_into(
+            self._mm, base, seq + 2, total_ticks, game_seconds, captured_at, speed,
+            len(ships), len(missions), len(colonies), flags,
+        )
+        struct.pack_into("<I", self._mm, 12, target)  # flip the active buffer
+        self._active = target
+
+
+_writer: SnapshotWriter | None = None
+
+
+def _ship_record(ship, owner: tuple[str, bool] | None) -> tuple:
+    username, is_npc = owner if owner is not None else (None, False)
+    cargo, cargo_exotic = _slots(ship.current_cargo, ORE_SLOTS)
+    supplies, supplies_exotic = _slots(ship.supplies, SUPPLY_SLOTS)
+    name, name_long = _encode(ship.ship_name, 256)
+    owner_name, owner_long = _encode(username, 128)
+    flags = (
+        (SHIP_DERELICT if ship.is_derelict else 0)
+        | (SHIP_STATIONED if ship.is_stationed else 0)
+        | (SHIP_OWNER_NPC if is_npc else 0)
+        | (SHIP_HAS_OWNER if username is not None else 0)
+        | (SHIP_EXOTIC if cargo_exotic or supplies_exotic or name_long or owner_long else 0)
+    )
+    return (
+        ship.id, ship.player_id if ship.player_id is not None else -1, ship.station_colony_id if ship.station_colony_id is not None else -1,
+        ship.ship_class, ship.min_crew, ship.max_equipment_slots, flags,
+        ship.max_thrust_g, ship.thrust_setting, ship.cargo_capacity, ship.cargo_volume,
+        ship.fuel_capacity, ship.fuel, ship.base_mass, ship.engine_condition,
+        ship.position_x, ship.position_y, cargo, supplies, name, owner_name,
+    )
+
+
+def _mission_record(m) -> tuple:
+    flags = (
+        (MISSION_ORIGIN_EARTH if m.origin_is_earth else 0)
+        | (MISSION_RETURN_TO_STATION if m.return_to_station else 0)
+    )
+    return (
+        m.id, m.player_id, m.ship_id, m.asteroid_id if m.asteroid_id is not None else -1,
+        m.mission_type, m.status, flags, 0,
+        m.transit_time, m.elapsed_ticks, m.fuel_per_tick, m.mining_duration,
+        m.created_at.timestamp(), (m.origin_name or "").encode("utf-8")[:256],
+    )
+
+
+def _colony_record(c) -> tuple:
+    return (c.id, c.tier, c.colony_name.encode("utf-8")[:256])
+
+
+_SHIP_COLUMNS = (
+    Ship.id, Ship.player_id, Ship.station_colony_id, Ship.ship_class, Ship.min_crew,
+    Ship.max_equipment_slots, Ship.is_derelict, Ship.is_stationed,
+    Ship.max_thrust_g, Ship.thrust_setting, Ship.cargo_capacity, Ship.cargo_volume,
+    Ship.fuel_capacity, Ship.fuel, Ship.base_mass, Ship.engine_condition,
+    Ship.position_x, Ship.position_y, Ship.current_cargo, Ship.supplies, Ship.ship_name,
+)
+_MISSION_COLUMNS = (
+    Mission.id, Mission.player_id, Mission.ship_id, Mission.asteroid_id,
+    Mission.mission_type, Mission.status, Mission.origin_is_earth, Mission.return_to_station,
+    Mission.transit_time, Mission.elapsed_ticks, Mission.fuel_per_tick,
+    Mission.mining_duration, Mission.created_at, Mission.origin_name,
+)
+
+
+class _Records:
+    """
+    The publisher's copy of the world, patched each tick instead of re-read.
+
+    Sources, applied in this order:
+      - objects the tick just committed (missions in flight, their ships,
+        colonies, players), taken from the tick session's identity map;
+      - every ship and active mission of players who wrote through the API
+        since the last publish (see note_player_writes);
+      - a full re-read every SNAPSHOT_FULL_REFRESH_INTERVAL, for bulk
+        statements no listener sees (world reset, admin cleanups).
+    """
+
+    def __init__(self) -> None:
+        self.ships: dict[int, tuple] = {}
+        self.missions: dict[int, tuple] = {}
+        self.colonies: dict[int, tuple] = {}
+        self.owners: dict[int, tuple[str, bool]] = {}
+        self.refreshed_at = 0.0
+
+    async def refresh(self, db: AsyncSession) -> None:
+        owners = {
+            pid: (name, npc)
+            for pid, name, npc in (await db.execute(select(Player.id, Player.username, Player.is_npc))).all()
+        }
+        ships = (await db.execute(select(*_SHIP_COLUMNS).order_by(Ship.id))).all()
+        missions = (await db.execute(
+            select(*_MISSION_COLUMNS).where(Mission.status.in_(ACTIVE_MISSION_STATUSES)).order_by(Mission.id)
+        )).all()
+        colonies = (await db.execute(select(Colony.id, Colony.tier, Colony.colony_name))).all()
+        self.owners = owners
+        self.ships = {r.id: _ship_record(r, owners.get(r.player_id)) for r in ships}
+        self.missions = {m.id: _mission_record(m) for m in missions}
+        self.colonies = {c.id: _colony_record(c) for c in colonies}
+
+    async def reload_players(self, db: AsyncSession, player_ids: set[int]) -> None:
+        ids = list(player_ids)
+        for pid, name, npc in (await db.execute(
+            select(Player.id, Player.username, Player.is_npc).where(Player.id.in_(ids))
+        )).all():
+            self.owners[pid] = (name, npc)
+        ships = (await db.execute(select(*_SHIP_COLUMNS).where(Ship.player_id.in_(ids)))).all()
+        missions = (await db.execute(
+            select(*_MISSION_COLUMNS)
+            .where(Mission.player_id.in_(ids), Mission.status.in_(ACTIVE_MISSION_STATUSES))
+        )).all()
+        # Drop what they sold, lost or finished, then add what is there now
+        self.ships = {k: v for k, v in self.ships.items() if v[1] not in player_ids}
+        self.missions = {k: v for k, v in self.missions.items() if v[1] not in player_ids}
+        self.ships.update((r.id, _ship_record(r, self.owners.get(r.player_id))) for r in ships)
+        self.missions.update((m.id, _mission_record(m)) for m in missions)
+
+    def apply_loaded(self, objects: Iterable[object]) -> set[int]:
+        """Patch records from committed ORM objects. Returns players whose objects were unusable."""
+        ships: list[Ship] = []
+        stale: set[int] = set()
+        for obj in objects:
+            if not isinstance(obj, (Player, Ship, Mission, Colony)):
+                continue
+            state = inspect(obj)
+            if not state.unloaded.isdisjoint(state.mapper.column_attrs.keys()):
+                # Expired (e.g. server defaults after an insert): re-read the owner instead
+                pid = state.dict.get("player_id")
+                if pid is not None and not isinstance(obj, Player):
+                    stale.add(pid)
+                continue
+            if isinstance(obj, Player):
+                self.owners[obj.id] = (obj.username, obj.is_npc)
+            elif isinstance(obj, Ship):
+                ships.append(obj)
+            elif isinstance(obj, Mission):
+                if obj.status in ACTIVE_MISSION_STATUSES:
+                    self.missions[obj.id] = _mission_record(obj)
+                else:
+                    self.missions.pop(obj.id, None)
+            else:
+                self.colonies[obj.id] = _colony_record(obj)
+        for ship in ships:
+            self.ships[ship.id] = _ship_record(ship, self.owners.get(ship.player_id))
+        return stale
+
+
+def _in_id_order(records: dict[int, tuple]) -> list[tuple]:
+    return [records[k] for k in sorted(records)]
+
+
+_records = _Records()
+
+
+async def publish_snapshot(db: AsyncSession, world_id: int = 1, loaded: Iterable[object] = ()) -> None:
+    """
+    Publish the world after a tick. `loaded` are the objects the tick
+    committed (its session's identity map); the rest comes from the
+    publisher's records, see _Records.
+    """
+    global _writer
+    from server.routers import admin_speed
+    from server.simulation.tick import get_game_seconds, get_market_prices, get_total_ticks
+
+    if _writer is None:
+        _writer = SnapshotWriter(
+            snapshot_path(world_id), settings.SNAPSHOT_MAX_SHIPS, settings.SNAPSHOT_MAX_MISSIONS,
+        )
+
+    captured_at = time.time()
+    if captured_at - _records.refreshed_at >= settings.SNAPSHOT_FULL_REFRESH_INTERVAL:
+        _pending_players.clear()
+        await _records.refresh(db)
+        _records.refreshed_at = captured_at
+    else:
+        stale = _records.apply_loaded(loaded)
+        players = _pending_players | stale
+        _pending_players.clear()
+        if players:
+            await _records.reload_players(db, players)
+
+    _writer.publish(
+        total_ticks=get_total_ticks(),
+        game_seconds=get_game_seconds(),
+        captured_at=captured_at,
+        speed=admin_speed.get_speed_multiplier(),
+        prices=get_market_prices(),
+        ships=_in_id_order(_records.ships),
+        missions=_in_id_order(_records.missions),
+        colonies=_in_id_order(_records.colonies),
+    )
+
+
+# ── Reader ────────────────────────────────────────────────────────────────────
+
+@dataclass
+class WorldSnapshot:
+    """Read-only numpy views into one snapshot buffer. Valid until `still_valid()` is False."""
+    total_ticks: int
+    game_seconds: float
+    captured_at: float
+    speed: float
+    prices: np.ndarray
+    ships: np.ndarray
+    missions: np.ndarray
+    colonies: np.ndarray
+    _mm: mmap.mmap
+    _base: int
+    _seq: int
+
+    def still_valid(self) -> bool:
+        return struct.unpack_from("<Q", self._mm, self._base)[0] == self._seq
+
+    def market_prices(self) -> dict[str, float]:
+        return _unslot(self.prices.tolist(), ORE_SLOTS)
+
+    def colony_tiers(self) -> dict[str, int]:
+        return {name.decode("utf-8"): tier for _id, tier, name in self.colonies.tolist()}
+
+    def ship_dicts(self, ships: np.ndarray | None = None) -> list[dict] | None:
+        """ShipOut-shaped dicts, or None if any record could not be stored faithfully."""
+        ships = self.ships if ships is None else ships
+        if ships.size and (ships['flags'] & SHIP_EXOTIC).any():
+            return None
+        out = []
+        for (ship_id, player_id, station_colony_id, ship_class, min_crew, max_slots, flags,
+             max_thrust_g, thrust_setting, cargo_capacity, cargo_volume, fuel_capacity, fuel,
+             base_mass, engine_condition, x, y, cargo, supplies, name, owner) in ships.tolist():
+            has_owner = bool(flags & SHIP_HAS_OWNER)
+            out.append({
+                "id": ship_id,
+                "player_id": player_id if player_id >= 0 else None,
+                "owner_username": owner.decode("utf-8") if has_owner else "Unknown",
+                "owner_is_npc": bool(flags & SHIP_OWNER_NPC),
+                "ship_name": name.decode("utf-8"),
+                "ship_class": ship_class,
+                "max_thrust_g": max_thrust_g,
+                "thrust_setting": thrust_setting,
+                "cargo_capacity": cargo_capacity,
+                "cargo_volume": cargo_volume,
+                "fuel_capacity": fuel_capacity,
+                "fuel": fuel,
+                "base_mass": base_mass,
+                "min_crew": min_crew,
+                "max_equipment_slots": max_slots,
+                "engine_condition": engine_condition,
+                "is_derelict": bool(flags & SHIP_DERELICT),
+                "position_x": x,
+                "position_y": y,
+                "is_stationed": bool(flags & SHIP_STATIONED),
+                "station_colony_id": station_colony_id if station_colony_id >= 0 else None,
+                "current_cargo": _unslot(cargo, ORE_SLOTS),
+                "supplies": _unslot(supplies, SUPPLY_SLOTS),
+            })
+        return out
+
+    def mission_dicts(self, missions: np.ndarray | None = None) -> list[dict]:
+        missions = self.missions if missions is None else missions
+        out = []
+        for (mission_id, _player_id, ship_id, asteroid_id, mission_type, status, flags, _pad,
+             transit_time, elapsed_ticks, fuel_per_tick, mining_duration, created_at,
+             origin_name) in missions.tolist():
+            out.append({
+                "id": mission_id,
+                "ship_id": ship_id,
+                "asteroid_id": asteroid_id if asteroid_id >= 0 else None,
+                "mission_type": mission_type,
+                "status": status,
+                "transit_time": transit_time,
+                "elapsed_ticks": elapsed_ticks,
+                "fuel_per_tick": fuel_per_tick,
+                "origin_name": origin_name.decode("utf-8", errors="replace"),
+                "origin_is_earth": bool(flags & MISSION_ORIGIN_EARTH),
+                "return_to_station": bool(flags & MISSION_RETURN_TO_STATION),
+                "mining_duration": mining_duration,
+                "created_at": datetime.datetime.fromtimestamp(created_at, tz=datetime.timezone.utc),
+            })
+        return out
+
+
+class SnapshotReader:
+    _RETRIES = 3
+
+    def __init__(self, path: str) -> None:
+        self.path = path
+        self._mm: mmap.mmap | None = None
+        self._inode: int | None = None
+        self._layout: _Layout | None = None
+
+    def _open(self) -> bool:
+        try:
+            st = os.stat(self.path)
+        except FileNotFoundError:
+            return False
+        if self._mm is not None and st.st_ino == self._inode:
+            return True
+        with open(self.path, "rb") as f:
+            mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, version, _active, max_ships, max_missions, max_colonies = _FILE_HEADER.unpack_from(mm, 0)
+        layout = _Layout(max_ships, max_missions, max_colonies)
+        if magic != _MAGIC or version != _LAYOUT_VERSION or len(mm) < layout.file_size:
+            mm.close()
+            return False
+        if self._mm is not None:
+            self._mm.close()
+        self._mm, self._inode, self._layout = mm, st.st_ino, layout
+        return True
+
+    def acquire(self) -> WorldSnapshot | None:
+        """Map the active buffer, or None if there is no fresh, complete snapshot."""
+        if not settings.SNAPSHOT_ENABLED or not self._open():
+            return None
+        mm, layout = self._mm, self._layout
+        active = struct.unpack_from("<I", mm, 12)[0]
+        base = layout.buffer_offset(active)
+        (seq, total_ticks, game_seconds, captured_at, speed,
+         n_ships, n_missions, n_colonies, flags) = _BUFFER_HEADER.unpack_from(mm, base)
+        if seq == 0 or seq % 2 or flags & _FLAG_TRUNCATED:
+            return None
+        # A snapshot older than a few ticks means the simulator is gone or stalled.
+        max_age = max(settings.SNAPSHOT_MAX_AGE, 3.0 * settings.TICK_INTERVAL / max(speed, 1e-6))
+        if time.time() - captured_at > max_age:
+            return None
+
+        def view(offset: int, dtype: np.dtype, count: int) -> np.ndarray:
+            return np.frombuffer(mm, dtype=dtype, count=count, offset=base + offset)
+
+        return WorldSnapshot(
+            total_ticks=total_ticks,
+            game_seconds=game_seconds,
+            captured_at=captured_at,
+            speed=speed,
+            prices=view(layout.prices_offset, np.dtype('<f8'), len(ORE_SLOTS)),
+            ships=view(layout.ships_offset, SHIP_DTYPE, n_ships),
+            missions=view(layout.missions_offset, MISSION_DTYPE, n_missions),
+            colonies=view(layout.colonies_offset, COLONY_DTYPE, n_colonies),
+            _mm=mm,
+            _base=base,
+            _seq=seq,
+        )
+
+    def read(self, build: Callable[[WorldSnapshot], T | None]) -> T | None:
+        """Run `build` against a consistent snapshot. None means fall back to the DB."""
+        for _ in range(self._RETRIES):
+            snap = self.acquire()
+            if snap is None:
+                return None
+            result = build(snap)
+            if snap.still_valid():
+                return result
+        return None
+
+
+_reader: SnapshotReader | None = None
+
+
+def get_reader(world_id: int = 1) -> SnapshotReader:
+    global _reader
+    if _reader is None:
+        _reader = SnapshotReader(snapshot_path(world_id))
+    return _reader
+
+
+# ── Read-your-writes ──────────────────────────────────────────────────────────
+# A player who just dispatched or bought a ship must not see the pre-write
+# state. Every committed API write to a player's ships or missions is sent
+# to all processes (cluster relay / simulator IPC, op "player_writes"):
+#   - readers in any worker ignore snapshots for that player until
+#     SNAPSHOT_WRITE_GRACE seconds after the commit. The grace covers the
+#     relay's latency and the publish that follows it;
+#   - the publisher re-reads that player's ships and missions on its next
+#     publish.
+# The tick's own writes are not tracked: the snapshot is published from them.
+
+_player_writes: dict[int, float] = {}
+_pending_players: set[int] = set()
+_WRITE_MEMORY = 300.0  # seconds; far longer than any snapshot is considered fresh
+_TICK_SESSION = "simulation_tick"
+
+
+def mark_tick_session(session: AsyncSession) -> None:
+    """Exclude a session's writes from read-your-writes tracking (the simulation tick)."""
+    session.info[_TICK_SESSION] = True
+
+
+@event.listens_for(Session, "after_flush")
+def _collect_player_writes(session: Session, flush_context) -> None:
+    if session.info.get(_TICK_SESSION):
+        return
+    players = session.info.setdefault("snapshot_players", set())
+    for obj in (*session.new, *session.dirty, *session.deleted):
+        if isinstance(obj, (Ship, Mission)) and obj.player_id is not None:
+            players.add(obj.player_id)
+
+
+@event.listens_for(Session, "after_commit")
+def _stamp_player_writes(session: Session) -> None:
+    players = session.info.pop("snapshot_players", None)
+    if players:
+        from server.simulation.cluster import send_command
+        send_command("player_writes", players=sorted(players), at=time.time())
+
+
+@event.listens_for(Session, "after_rollback")
+def _drop_player_writes(session: Session) -> None:
+    session.info.pop("snapshot_players", None)
+
+
+def note_player_writes(players: Iterable[int], at: float) -> None:
+    """Record committed writes (from this or another process)."""
+    if len(_player_writes) > 10_000:
+        for pid in [p for p, t in _player_writes.items() if at - t > _WRITE_MEMORY]:
+            del _player_writes[pid]
+    for pid in players:
+        _player_writes[pid] = max(at, _player_writes.get(pid, 0.0))
+        _pending_players.add(pid)
+
+
+def fresh_for_player(snap: WorldSnapshot, player_id: int) -> bool:
+    written = _player_writes.get(player_id)
+    return written is None or snap.captured_at > written + settings.SNAPSHOT_WRITE_GRACE
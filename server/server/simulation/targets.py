@@ -0,0 +1,223 @@
+"""
+Best mining targets for a ship: every asteroid ranked by expected profit
+per game-hour of a round trip.
+
+For each asteroid, in one vectorized pass over the ephemeris catalog:
+  - transit: brachistochrone time from the ship to the asteroid's current
+    position (there and back);
+  - mining: ore_yields (tonnes/day) until the cargo hold is full or the
+    mission's mining duration ends, each ore capped by its remaining
+    reserves;
+  - revenue: the haul at current market prices (auto-sell on return), or
+    at the colony whose price and tier multipliers pay most for it;
+  - cost: crew wages over the whole trip.
+The best BEST_TARGETS_REFINE candidates are then re-timed with the
+moving-target intercept solver and re-ranked.
+
+Yields, reserves and colony multipliers are re-read once per tick bucket
+(BEST_TARGETS_TICK_BUCKET ticks). Rankings are cached per ship class,
+position, thrust, hold, crew cost and tick bucket, so ships of one class
+waiting at the same station share one computation. A ranking that holds
+every profitable asteroid answers any limit, however short it is.
+"""
+
+from __future__ import annotations
+
+from collections import OrderedDict
+from dataclasses import dataclass
+
+import numpy as np
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from server.config import settings
+from server.models.asteroid import Asteroid
+from server.models.asteroid_reserve import AsteroidReserve
+from server.models.colony import Colony
+from server.models.ship import Ship
+from server.simulation.colony_growth import tier_price_multiplier
+from server.simulation.ephemeris import AsteroidCatalog, game_jd, get_asteroid_catalog
+from server.simulation.intercept import G_ACCEL, asteroid_intercepts, brachistochrone_seconds
+from server.simulation.ore import N_ORES, ORE_INDEX, OreVector
+
+MIN_TRANSIT_S = 30.0  # as in dispatch
+MARKET = "market"
+
+
+@dataclass(frozen=True, slots=True)
+class TargetScore:
+    asteroid_id: int
+    profit_per_hour: float
+    revenue: float
+    crew_cost: float
+    transit_s: float  # one way
+    mining_s: float
+    tonnes: float
+    fuel_used: float
+    sell_at: str  # MARKET or a colony name
+    intercept_x: float | None = None
+    intercept_y: float | None = None
+
+
+@dataclass
+class _Economics:
+    """Per-bucket inputs aligned with catalog rows."""
+    catalog: AsteroidCatalog
+    bucket: int
+    yields: np.ndarray        # (n, N_ORES) tonnes per second
+    reserves: np.ndarray      # (n, N_ORES) remaining tonnes, inf where unlimited
+    venues: list[str]         # MARKET, then colony names
+    venue_mults: np.ndarray   # (V, N_ORES) price multipliers (tier included)
+
+
+_economics: _Economics | None = None
+# key -> (ranking, complete): complete when it holds every profitable target
+_rankings: OrderedDict[tuple, tuple[list[TargetScore], bool]] = OrderedDict()
+
+
+def tick_bucket() -> int:
+    from server.simulation.tick import get_total_ticks
+    return int(get_total_ticks() // settings.BEST_TARGETS_TICK_BUCKET)
+
+
+def _prices() -> OreVector:
+    from server.simulation.snapshot import WorldSnapshot, get_reader
+    from server.simulation.tick import get_market_prices
+    prices = get_reader().read(WorldSnapshot.market_prices)
+    return OreVector.from_dict(prices if prices is not None else get_market_prices())
+
+
+async def _load_economics(db: AsyncSession, catalog: AsteroidCatalog, bucket: int) -> _Economics:
+    global _economics
+    if _economics is not None and _economics.bucket == bucket and _economics.catalog is catalog:
+        return _economics
+
+    n = len(catalog)
+    yields = np.zeros((n, N_ORES))
+    for asteroid_id, ore_yields in (await db.execute(select(Asteroid.id, Asteroid.ore_yields))).all():
+        row = catalog.row(asteroid_id)
+        if row is None:
+            continue
+        for ore, per_day in (ore_yields or {}).items():
+            column = ORE_INDEX.get(ore)
+            if column is not None:
+                yields[row, column] = per_day / 86400.0
+
+    reserves = np.full((n, N_ORES), np.inf)
+    rows = await db.execute(select(AsteroidReserve.asteroid_id, AsteroidReserve.ore_type, AsteroidReserve.tonnes))
+    for asteroid_id, ore, tonnes in rows.all():
+        row, column = catalog.row(asteroid_id), ORE_INDEX.get(ore)
+        if row is not None and column is not None:
+            reserves[row, column] = tonnes
+
+    venues, mults = [MARKET], [np.ones(N_ORES)]
+    for colony in (await db.execute(select(Colony).order_by(Colony.id))).scalars().all():
+        venues.append(colony.colony_name)
+        mults.append(
+            OreVector.from_dict(colony.price_multipliers, fill=1.0).values * tier_price_multiplier(colony.tier)
+        )
+
+    _economics = _Economics(catalog, bucket, yields, reserves, venues, np.array(mults))
+    return _economics
+
+
+def _score(
+    econ: _Economics,
+    rows: np.ndarray,
+    transit: np.ndarray,
+    ship: Ship,
+    crew_wage_per_day: float,
+    mining_duration: float,
+    prices: OreVector,
+) -> tuple[np.ndarray, ...]:
+    """Profit per hour and its parts for catalog rows with one-way transit seconds."""
+    transit = np.maximum(transit, MIN_TRANSIT_S)
+    yields = econ.yields[rows]
+    rate = yields.sum(axis=1)
+    with np.errstate(divide="ignore"):
+        fill_s = np.where(rate > 0, ship.cargo_capacity / rate, np.inf)
+    mining_s = np.minimum(fill_s, mining_duration)
+    tonnes = np.minimum(yields * mining_s[:, None], econ.reserves[rows])
+
+    by_venue = tonnes @ (econ.venue_mults * prices.values).T  # (n, V)
+    venue = by_venue.argmax(axis=1)
+    revenue = by_venue[np.arange(len(rows)), venue]
+
+    trip_s = 2.0 * transit + mining_s
+    crew_cost = crew_wage_per_day * trip_s / 86400.0
+    profit_per_hour = (revenue - crew_cost) / (trip_s / 3600.0)
+    fuel_used = ship.fuel_capacity * 0.001 * ship.thrust_setting * 2.0 * transit
+    return profit_per_hour, revenue, crew_cost, transit, mining_s, tonnes.sum(axis=1), fuel_used, venue
+
+
+async def best_targets(
+    db: AsyncSession,
+    ship: Ship,
+    limit: int = 20,
+    crew_wage_per_day: float = 0.0,
+    mining_duration: float = 86400.0,
+) -> list[TargetScore]:
+    """The `limit` asteroids with the highest expected profit per game-hour for this ship."""
+    catalog = await get_asteroid_catalog(db)
+    if not len(catalog):
+        return []
+    bucket = tick_bucket()
+    thrust_g = ship.max_thrust_g * ship.thrust_setting
+    key = (
+        ship.ship_class, round(ship.position_x, 3), round(ship.position_y, 3), round(thrust_g, 3),
+        round(ship.cargo_capacity, 1), round(crew_wage_per_day), round(mining_duration), bucket,
+    )
+    cached = _rankings.get(key)
+    if cached is not None and (cached[1] or len(cached[0]) >= limit):
+        _rankings.move_to_end(key)
+        return cached[0][:limit]
+
+    econ = await _load_economics(db, catalog, bucket)
+    prices = _prices()
+    jd = game_jd()
+
+    # Whole catalog: straight-line transit to current positions
+    origin = np.array([ship.position_x, ship.position_y])
+    all_rows = np.arange(len(catalog))
+    dist = np.hypot(*(catalog.positions(jd) - origin).T)
+    straight = brachistochrone_seconds(dist, thrust_g * G_ACCEL)
+    profit = _score(econ, all_rows, straight, ship, crew_wage_per_day, mining_duration, prices)[0]
+    keep = max(limit, settings.BEST_TARGETS_REFINE)
+    candidates = all_rows[np.isfinite(profit) & (profit > 0)]
+    complete = len(candidates) <= keep
+    if not complete:
+        candidates = candidates[np.argpartition(-profit[candidates], keep - 1)[:keep]]
+
+    # Candidates: re-time against where the asteroid will be on arrival
+    ids = catalog.ids[candidates].tolist()
+    intercepts = await asteroid_intercepts(
+        db, [(ship.position_x, ship.position_y, thrust_g)] * len(ids), ids, jd,
+    )
+    transit = np.array([
+        straight[row] if ic is None else ic.transit_s for row, ic in zip(candidates.tolist(), intercepts)
+    ])
+    profit, revenue, crew_cost, transit, mining_s, tonnes, fuel_used, venue = _score(
+        econ, candidates, transit, ship, crew_wage_per_day, mining_duration, prices,
+    )
+    order = np.argsort(-profit)[:keep]
+    ranked = [
+        TargetScore(
+            asteroid_id=ids[i],
+            profit_per_hour=float(profit[i]),
+            revenue=float(revenue[i]),
+            crew_cost=float(crew_cost[i]),
+            transit_s=float(transit[i]),
+            mining_s=float(mining_s[i]),
+            tonnes=float(tonnes[i]),
+            fuel_used=float(fuel_used[i]),
+            sell_at=econ.venues[venue[i]],
+            intercept_x=intercepts[i].x if intercepts[i] else None,
+            intercept_y=intercepts[i].y if intercepts[i] else None,
+        )
+        for i in order.tolist()
+        if profit[i] > 0
+    ]
+    _rankings[key] = (ranked, complete)
+    while len(_rankings) > settings.BEST_TARGETS_CACHE_SIZE:
+        _rankings.popitem(last=False)
+    return ranked[:limit]
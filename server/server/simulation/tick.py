@@ -1,13 +1,15 @@
 from __future__ import annotations
 import logging, math, random, time
+
+import numpy as np
 from server.config import settings
 from sqlalchemy import select
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy.orm import selectinload
 from server.models.mission import (
     Mission, MISSION_COLLECT_ORE, STATUS_COLLECTING, STATUS_COMPLETED,
     STATUS_MINING, STATUS_TRANSIT_BACK, STATUS_TRANSIT_OUT,
 )
+from server.models.loading import load_profile
 from server.models.player import Player
 from server.models.rig import Rig
 from server.models.ship import Ship
@@ -29,9 +31,12 @@ from server.simulation.market_events import (
     process_market_events as _process_market_events,
     get_event_multipliers,
     load_active_events,
+    set_event_multipliers,
 )
 from server.simulation.colony_growth import tier_price_multiplier, award_growth
 from server.simulation.money_log import log_tx, set_ticks as _set_money_ticks
+from server.simulation.ore import N_ORES, ORE_INDEX, ORES, OreVector, report_unknown_ore
+from server.simulation.reserves import ReserveLedger
 from server.models.colony import Colony as ColonyModel
 
 # ── Equipment Maintenance ──────────────────────────────────────────────────────
@@ -112,7 +117,8 @@ BASE_ORE_PRICES: dict[str, float] = {
     'gold': 420000, 'silicon': 2100, 'water_ice': 800, 'carbon': 1500,
     'olivine': 950, 'pyroxene': 1100, 'troilite': 3600, 'palladium': 280000,
 }
-_market_prices: dict[str, float] = dict(BASE_ORE_PRICES)
+BASE_PRICES = OreVector.from_dict(BASE_ORE_PRICES, strict=True)
+_market_prices = BASE_PRICES.copy()  # drifting prices, without event multipliers
 _payroll_accum: dict[int, float] = {}
 
 # Game epoch: Fixed point in time (Jan 1, 2112 00:00:00 UTC)
@@ -215,12 +221,16 @@ def _add_worker_xp(worker: Worker, skill_type: int, amount: float) -> list[dict]
 
     return events
 
-def get_market_prices() -> dict[str, float]:
-    """Return current prices with active market event multipliers applied."""
+def get_price_vector() -> OreVector:
+    """Current prices with active market event multipliers applied."""
     mults = get_event_multipliers()
     if not mults:
-        return dict(_market_prices)
-    return {ore: price * mults.get(ore, 1.0) for ore, price in _market_prices.items()}
+        return _market_prices.copy()
+    return _market_prices * OreVector.from_dict(mults, fill=1.0)
+
+def get_market_prices() -> dict[str, float]:
+    """Return current prices with active market event multipliers applied."""
+    return get_price_vector().to_dict(keep_zeros=True)
 
 def get_total_ticks() -> int:
     """Get current total_ticks value."""
@@ -238,6 +248,28 @@ def reset_world_time(new_ticks: int, new_game_seconds: float) -> None:
     _game_seconds = new_game_seconds
 
 
+def export_runtime_state() -> dict:
+    """Snapshot of the in-memory simulation state that API handlers read."""
+    return {
+        'total_ticks': _total_ticks,
+        'game_seconds': _game_seconds,
+        'prices': _market_prices.to_dict(keep_zeros=True),
+        'event_multipliers': get_event_multipliers(),
+        'speed': _admin_speed.get_speed_multiplier(),
+    }
+
+
+def apply_runtime_state(state: dict) -> None:
+    """Adopt state exported by the process that runs the simulation."""
+    global _total_ticks, _game_seconds
+    _total_ticks = int(state['total_ticks'])
+    _game_seconds = float(state['game_seconds'])
+    _market_prices.update(state['prices'])
+    set_event_multipliers(state['event_multipliers'])
+    _admin_speed.set_speed_multiplier(float(state['speed']))
+    _set_money_ticks(_total_ticks)
+
+
 async def load_world_state(db: AsyncSession, world_id: int = 1) -> None:
     """Load world state from database on startup."""
     global _total_ticks, _game_seconds
@@ -257,7 +289,7 @@ async def load_world_state(db: AsyncSession, world_id: int = 1) -> None:
         _total_ticks = world_state.total_ticks
         _game_seconds = getattr(world_state, 'game_seconds', 0.0) or 0.0
         speed = getattr(world_state, 'speed_multiplier', 1.0) or 1.0
-        _admin_speed._simulation_speed_multiplier = speed
+        _admin_speed.set_speed_multiplier(speed)
         logger.info('Loaded world state: total_ticks=%d, game_seconds=%.1f, speed=%sx', _total_ticks, _game_seconds, speed)
     else:
         # Genuinely no world state — first ever boot
@@ -321,9 +353,13 @@ async def _process_missions(db: AsyncSession, dt: float) -> list[dict]:
     result = await db.execute(
         select(Mission)
         .where(Mission.status.in_([STATUS_TRANSIT_OUT, STATUS_MINING, STATUS_COLLECTING, STATUS_TRANSIT_BACK]))
-        .options(selectinload(Mission.ship), selectinload(Mission.asteroid), selectinload(Mission.player))
+        .options(*load_profile("tick.missions"))
     )
     missions = list(result.scalars().all())
+    # One read of the mined asteroids' reserves, one batched decrement after
+    reserves = await ReserveLedger.load(
+        db, (m.asteroid_id for m in missions if m.status == STATUS_MINING and m.asteroid_id)
+    )
     for mission in missions:
         ship = mission.ship
         if ship is None or ship.is_derelict:
@@ -333,11 +369,11 @@ async def _process_missions(db: AsyncSession, dt: float) -> list[dict]:
         if mission.status == STATUS_TRANSIT_OUT:
             events += await _advance_transit_out(mission, ship, dt, db)
         elif mission.status == STATUS_MINING:
-            events += _advance_mining(mission, ship, dt, thrust_pol)
+            events += _advance_mining(mission, ship, dt, reserves, thrust_pol)
         elif mission.status == STATUS_COLLECTING:
             events += await _advance_collecting(mission, ship, dt, db)
         elif mission.status == STATUS_TRANSIT_BACK:
-            events += _advance_transit_back(mission, ship, dt, mission.player)
+            events += _advance_transit_back(mission, ship, dt, db, mission.player)
         db.add(mission)
         if prev_status != mission.status:
             events.append({'type': 'mission_status_changed', 'mission_id': mission.id,
@@ -350,6 +386,7 @@ async def _process_missions(db: AsyncSession, dt: float) -> list[dict]:
                 events += repair_events
                 if repair_events:
                     db.add(mission.player)
+    await reserves.flush(db)
     return events
 
 async def _advance_transit_out(mission: Mission, ship: Ship, dt: float, db: AsyncSession) -> list[dict]:
@@ -389,7 +426,9 @@ async def _advance_transit_out(mission: Mission, ship: Ship, dt: float, db: Asyn
 
     return events
 
-def _advance_mining(mission: Mission, ship: Ship, dt: float, thrust_policy: int = 1) -> list[dict]:
+def _advance_mining(
+    mission: Mission, ship: Ship, dt: float, reserves: ReserveLedger, thrust_policy: int = 1,
+) -> list[dict]:
     mission.elapsed_ticks += dt
     events: list[dict] = []
 
@@ -399,47 +438,30 @@ def _advance_mining(mission: Mission, ship: Ship, dt: float, thrust_policy: int
     events += _wear_ship_equipment(ship, dt, thrust_policy, is_mining=True)
 
     if mission.asteroid and mission.asteroid.ore_yields:
-        cargo = dict(ship.current_cargo or {})
-        cap = ship.cargo_capacity - sum(cargo.values())
-
-        # Get asteroid reserves (mutable dict we'll update)
-        reserves = dict(mission.asteroid.reserves or {})
-        reserves_updated = False
+        stored = ship.current_cargo or {}
+        cargo = OreVector.from_dict(stored)
+        unregistered = {ore: t for ore, t in stored.items() if ore not in ORE_INDEX}  # kept as stored
+        cap = ship.cargo_capacity - cargo.total() - sum(unregistered.values())
 
         for ore_type, rate_per_day in mission.asteroid.ore_yields.items():
             if cap <= 0:
                 break
+            if ore_type not in ORE_INDEX:
+                report_unknown_ore(ore_type)
+                continue
 
-            # Calculate mining rate
+            # Calculate mining rate, capped by the asteroid's remaining reserves
+            # (unlimited where reserves were never generated for this ore)
             mined = min((rate_per_day / 86400.0) * dt, cap)
+            actual_mined = reserves.draw(mission.asteroid_id, ore_type, mined)
+            if actual_mined <= 0:
+                continue  # This ore type is depleted - skip it
 
-            # Check reserves (if reserves system is initialized)
-            if ore_type in reserves:
-                available = reserves[ore_type]
-                if available <= 0:
-                    # This ore type is depleted - skip it
-                    continue
-
-                # Cap mining to available reserves
-                actual_mined = min(mined, available)
+            cargo[ore_type] += actual_mined
+            cap -= actual_mined
+            mission.tonnes_mined += actual_mined
 
-                # Update reserves
-                reserves[ore_type] = available - actual_mined
-                reserves_updated = True
-
-                # Add to cargo
-                cargo[ore_type] = cargo.get(ore_type, 0.0) + actual_mined
-                cap -= actual_mined
-            else:
-                # Reserves not initialized for this ore type - use old behavior
-                cargo[ore_type] = cargo.get(ore_type, 0.0) + mined
-                cap -= mined
-
-        ship.current_cargo = cargo
-
-        # Save updated reserves back to asteroid (if changed)
-        if reserves_updated:
-            mission.asteroid.reserves = reserves
+        ship.current_cargo = {**unregistered, **cargo.to_dict()}
 
     if mission.elapsed_ticks >= mission.mining_duration:
         mission.status = STATUS_TRANSIT_BACK
@@ -526,7 +548,7 @@ async def _advance_collecting(mission: Mission, ship: Ship, dt: float, db: Async
 
     return events
 
-def _advance_transit_back(mission: Mission, ship: Ship, dt: float, player=None) -> list[dict]:
+def _advance_transit_back(mission: Mission, ship: Ship, dt: float, db: AsyncSession, player=None) -> list[dict]:
     mission.elapsed_ticks += dt
     ship.fuel = max(0.0, ship.fuel - mission.fuel_per_tick * dt)
 
@@ -555,6 +577,7 @@ def _advance_transit_back(mission: Mission, ship: Ship, dt: float, player=None)
         total_value = 0
         if auto_sell:
             total_value = _sell_cargo(ship)
+            mission.revenue = int(total_value)
             if total_value > 0:
                 if player:
                     player.money += total_value
@@ -575,8 +598,7 @@ def _advance_transit_back(mission: Mission, ship: Ship, dt: float, player=None)
 def _sell_cargo(ship: Ship) -> float:
     if not ship.current_cargo:
         return 0.0
-    total = sum(tonnes * _market_prices.get(ore, BASE_ORE_PRICES.get(ore, 1000.0))
-                for ore, tonnes in ship.current_cargo.items())
+    total = OreVector.from_dict(ship.current_cargo).dot(_market_prices)
     ship.current_cargo = {}
     return total
 
@@ -600,7 +622,7 @@ async def _process_trade_missions(db: AsyncSession, dt: float) -> list[dict]:
     result = await db.execute(
         select(TradeMission)
         .where(TradeMission.status.in_([TM_TRANSIT_TO, TM_SELLING, TM_TRANSIT_BACK]))
-        .options(selectinload(TradeMission.ship), selectinload(TradeMission.player))
+        .options(*load_profile("tick.trade_missions"))
     )
     trade_missions = list(result.scalars().all())
 
@@ -645,17 +667,15 @@ async def _process_trade_missions(db: AsyncSession, dt: float) -> list[dict]:
             if tm.elapsed_ticks >= SELLING_DURATION:
                 # Calculate revenue from cargo, applying colony and tier multipliers
                 cargo_sold = dict(tm.cargo)  # snapshot before clearing
+                cargo = OreVector.from_dict(cargo_sold)
                 colony = colony_map.get(tm.colony_id) if tm.colony_id else None
-                colony_price_mults: dict = colony.price_multipliers if colony else {}
+                colony_price_mults = OreVector.from_dict(colony.price_multipliers if colony else None, fill=1.0)
                 colony_tier_mult: float = tier_price_multiplier(colony.tier if colony else 3)
 
-                revenue = 0
-                for ore_type, tonnes in cargo_sold.items():
-                    base_price = _market_prices.get(ore_type, BASE_ORE_PRICES.get(ore_type, 1000.0))
-                    col_mult = colony_price_mults.get(ore_type, 1.0)
-                    revenue += int(tonnes * base_price * col_mult * colony_tier_mult)
+                revenue = int(cargo.dot(_market_prices * colony_price_mults) * colony_tier_mult)
 
                 tm.revenue = revenue
+                tm.tonnes_sold = cargo.total()
                 tm.cargo = {}  # Clear cargo
 
                 # Award colony growth points from this sale
@@ -930,15 +950,14 @@ async def _save_player_notifications(db: AsyncSession, events: list[dict], tick:
 
 
 async def _process_market(db: AsyncSession, dt: float) -> list[dict]:
-    # Base price drift (supply/demand noise)
-    changed: dict[str, float] = {}
-    for ore, price in _market_prices.items():
-        base = BASE_ORE_PRICES[ore]
-        drift = random.gauss(0, 0.001 * math.sqrt(dt))
-        new_price = max(base * 0.60, min(base * 1.40, price * (1 + drift)))
-        _market_prices[ore] = new_price
-        if abs(new_price - price) / base > 0.005:
-            changed[ore] = round(new_price, 2)
+    # Base price drift (supply/demand noise), clamped to ±40% of base
+    base = BASE_PRICES.values
+    old = _market_prices.values
+    drift = np.random.normal(0.0, 0.001 * math.sqrt(dt), N_ORES)
+    new = np.clip(old * (1 + drift), base * 0.60, base * 1.40)
+    moved = np.abs(new - old) / base > 0.005
+    _market_prices.values = new
+    changed: dict[str, float] = {ORES[i]: round(float(new[i]), 2) for i in np.flatnonzero(moved)}
 
     events: list[dict] = []
     if changed:
@@ -988,10 +1007,7 @@ async def _process_rigs(db: AsyncSession, dt: float) -> list[dict]:
     result = await db.execute(
         select(Rig)
         .where(Rig.deployed_at_asteroid_id.isnot(None))
-        .options(
-            selectinload(Rig.asteroid),
-            selectinload(Rig.assigned_workers)
-        )
+        .options(*load_profile("tick.rigs"))
     )
     rigs = list(result.scalars().all())
 
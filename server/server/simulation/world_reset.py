@@ -0,0 +1,234 @@
+"""
+World reset engine.
+
+Every step is one set-based statement over the world's players (selected by
+a subquery, never loaded): delete their missions, trade missions,
+stockpiles, rigs and ships; reset money and log it with one
+INSERT ... SELECT into the ledger; give each human player a starter ship
+with another INSERT ... SELECT; reseed NPC ships in one multi-row insert.
+All of it commits as one transaction, so a failed reset changes nothing.
+
+reset_world() is an async generator yielding a progress dict after each
+step; the admin UI streams them as NDJSON. The last item has "ok": True
+and the summary.
+"""
+
+from __future__ import annotations
+
+import datetime as _dt
+import logging
+import time
+from dataclasses import dataclass
+from typing import AsyncIterator
+
+from sqlalchemy import delete, false, func, insert, literal, select, true, type_coerce, update
+from sqlalchemy.dialects.postgresql import JSONB
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from server.leaderboard_index import mark_players_dirty
+from server.models.bug_report import BugReport
+from server.models.mission import Mission
+from server.models.player import Player
+from server.models.rig import Rig
+from server.models.ship import SHIP_CLASS_STATS, COURIER, Ship
+from server.models.stockpile import Stockpile
+from server.models.trade_mission import TradeMission
+from server.models.transaction import PlayerTransaction
+from server.models.worker import Worker
+from server.models.world_state import WorldState
+from server.simulation.npc_corps import reseed_npc_ships
+from server.simulation.reserves import clear_reserves
+from server.world_stats import ACTIVE_MISSION_STATUSES, stage_delta
+
+logger = logging.getLogger(__name__)
+
+GAME_EPOCH = _dt.datetime(2112, 1, 1, 0, 0, 0, tzinfo=_dt.timezone.utc)
+
+
+@dataclass
+class ResetOptions:
+    world_id: int = 1
+    reset_money: bool = True
+    starting_money: int = 14_000_000
+    starting_ship_class: int = COURIER
+    reset_reserves: bool = True
+    auto_regen_reserves: bool = True
+    reset_speed: bool = True
+    wipe_bug_reports: bool = False
+
+
+def _world_players(world_id: int):
+    """Condition selecting the world's players (world 1 also owns players without a world)."""
+    if world_id == 1:
+        return (Player.world_id == 1) | (Player.world_id.is_(None))
+    return Player.world_id == world_id
+
+
+def _starter_ships_stmt(world_id: int, ship_class: int):
+    """INSERT ... SELECT one starter ship per human player of the world."""
+    stats = SHIP_CLASS_STATS[ship_class]
+    columns = {
+        "player_id": Player.id,
+        "ship_name": literal("Starter"),
+        "ship_class": literal(ship_class),
+        "max_thrust_g": literal(stats["max_thrust_g"]),
+        "thrust_setting": literal(1.0),
+        "cargo_capacity": literal(stats["cargo_capacity"]),
+        "cargo_volume": literal(stats["cargo_volume"]),
+        "fuel_capacity": literal(stats["fuel_capacity"]),
+        "fuel": literal(stats["fuel_capacity"]),
+        "base_mass": literal(stats["base_mass"]),
+        "min_crew": literal(stats["min_crew"]),
+        "max_equipment_slots": literal(stats["max_equipment_slots"]),
+        "engine_condition": literal(100.0),
+        "is_derelict": false(),
+        "is_stationed": true(),
+        "position_x": literal(1.0),
+        "position_y": literal(0.0),
+        "current_cargo": type_coerce({}, JSONB),
+        "supplies": type_coerce({}, JSONB),
+    }
+    rows = select(*columns.values()).where(_world_players(world_id), Player.is_npc == False)  # noqa: E712
+    return insert(Ship).from_select(list(columns), rows, include_defaults=False)
+
+
+async def reset_world(db: AsyncSession, options: ResetOptions) -> AsyncIterator[dict]:
+    """Reset the world, yielding {"step", "detail", "elapsed_ms"} after each step."""
+    started = time.perf_counter()
+
+    def progress(step: str, **detail) -> dict:
+        return {"step": step, **detail, "elapsed_ms": round((time.perf_counter() - started) * 1000)}
+
+    now_real = _dt.datetime.now(_dt.timezone.utc)
+    now_2112 = now_real.replace(year=2112)
+    new_ticks = int((now_2112 - GAME_EPOCH).total_seconds())
+    new_game_seconds = float(new_ticks)
+
+    world = _world_players(options.world_id)
+    player_ids = select(Player.id).where(world).scalar_subquery()
+
+    # ── Wipe game objects ──────────────────────────────────────────────────────
+    # Bulk statements bypass the world_stats listeners; count what they remove
+    active_missions, derelict_ships = (await db.execute(select(
+        select(func.count()).select_from(Mission)
+        .where(Mission.player_id.in_(player_ids), Mission.status.in_(ACTIVE_MISSION_STATUSES))
+        .scalar_subquery(),
+        select(func.count()).select_from(Ship)
+        .where(Ship.player_id.in_(player_ids), Ship.is_derelict == True)  # noqa: E712
+        .scalar_subquery(),
+    ))).one()
+    wiped = {}
+    for name, model in (
+        ("missions", Mission), ("trade_missions", TradeMission),
+        ("stockpiles", Stockpile), ("rigs", Rig), ("ships", Ship),
+    ):
+        result = await db.execute(
+            delete(model).where(model.player_id.in_(player_ids))
+            .execution_options(synchronize_session=False)
+        )
+        wiped[name] = result.rowcount
+    if options.world_id == 1:
+        # Derelicts of dissolved corporations drift in world 1
+        result = await db.execute(
+            delete(Ship).where(Ship.player_id.is_(None)).execution_options(synchronize_session=False)
+        )
+        ownerless = result.rowcount
+        wiped["ships"] += ownerless
+    else:
+        ownerless = 0
+    yield progress("wiped", **wiped)
+
+    # ── Release workers from ship assignments ──────────────────────────────────
+    result = await db.execute(
+        update(Worker).where(Worker.player_id.in_(player_ids))
+        .values(assigned_ship_id=None, assigned_mission_id=None)
+        .execution_options(synchronize_session=False)
+    )
+    yield progress("workers_released", workers=result.rowcount)
+
+    # ── Reset asteroid reserves ────────────────────────────────────────────────
+    if options.reset_reserves:
+        await clear_reserves(db)
+        yield progress("reserves_cleared")
+
+    # ── Optional: wipe bug reports ────────────────────────────────────────────
+    if options.wipe_bug_reports:
+        result = await db.execute(delete(BugReport))
+        yield progress("bug_reports_wiped", bug_reports=result.rowcount)
+
+    # ── Reset money (and log it) ───────────────────────────────────────────────
+    if options.reset_money:
+        result = await db.execute(
+            update(Player).where(world).values(money=options.starting_money)
+            .execution_options(synchronize_session=False)
+        )
+        await db.execute(
+            insert(PlayerTransaction).from_select(
+                ["player_id", "amount", "balance_after", "game_ticks", "source", "detail"],
+                select(
+                    Player.id, literal(options.starting_money), literal(options.starting_money),
+                    literal(new_game_seconds), literal("world_reset"), literal("world reset"),
+                ).where(world),
+                include_defaults=False,
+            )
+        )
+        yield progress("money_reset", players=result.rowcount)
+
+    # ── Starter ships + NPC corp ships ────────────────────────────────────────
+    result = await db.execute(_starter_ships_stmt(options.world_id, options.starting_ship_class))
+    human_count = result.rowcount
+    npc_ships = await reseed_npc_ships(db)
+    yield progress("ships_created", human_players=human_count, npc_ships=npc_ships)
+
+    stage_delta(
+        db,
+        total_missions=-wiped["missions"],
+        active_missions=-active_missions,
+        total_ships=human_count + npc_ships - wiped["ships"],
+        derelict_ships=-(derelict_ships + ownerless),
+        ownerless_ships=-ownerless,
+    )
+
+    # ── Update WorldState ──────────────────────────────────────────────────────
+    ws = (await db.execute(
+        select(WorldState).where(WorldState.world_id == options.world_id)
+    )).scalar_one_or_none()
+    world_name = ws.world_name if ws else "Unknown"
+    if ws:
+        ws.total_ticks = new_ticks
+        ws.game_seconds = new_game_seconds
+        if options.reset_speed:
+            ws.speed_multiplier = 1.0
+
+    await db.commit()
+    yield progress("committed")
+
+    # ── Sync in-memory state ───────────────────────────────────────────────────
+    from server.simulation.cluster import send_command
+    send_command("reset_world_time", ticks=new_ticks, game_seconds=new_game_seconds)
+    if options.reset_speed:
+        send_command("set_speed", multiplier=1.0)
+    # Money and ships changed through bulk statements the leaderboard listener never saw
+    mark_players_dirty((await db.execute(select(Player.id).where(world))).scalars().all())
+
+    # ── Auto-regenerate reserves ───────────────────────────────────────────────
+    regen_count = 0
+    if options.reset_reserves and options.auto_regen_reserves:
+        from server.simulation.world_setup import generate_reserves
+        summary = await generate_reserves(db, force=True)
+        regen_count = summary.get("count", 0)
+        yield progress("reserves_regenerated", asteroids=regen_count)
+
+    logger.warning(
+        "World %d (%s) reset in %.1fs: %d human players, %d NPC ships",
+        options.world_id, world_name, time.perf_counter() - started, human_count, npc_ships,
+    )
+    yield {
+        **progress("done"),
+        "ok": True,
+        "world_id": options.world_id,
+        "world_name": world_name,
+        "game_date": now_2112.strftime("%Y-%m-%d"),
+        "human_players_reset": human_count,
+        "reserves_regenerated": regen_count,
+    }
@@ -1,13 +1,26 @@
-"""World setup utilities — reserve generation and other one-time world init tasks."""
+"""
+World setup utilities — reserve generation and other one-time world init tasks.
+
+Reserve generation is vectorized over the whole catalog: one query reads
+(id, semi-major axis, body type) ordered by id, numpy draws every mass and
+accessibility from a seeded Generator, and the results go back with one
+UPDATE ... FROM unnest() for the asteroids and one INSERT ... SELECT
+unnest() for asteroid_reserves. The same seed over the same catalog gives
+the same reserves.
+"""
 from __future__ import annotations
 
-import random
+import json
 import logging
+import secrets
+from dataclasses import dataclass
 
-from sqlalchemy import select
+import numpy as np
+from sqlalchemy import select, text
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from server.models.asteroid import Asteroid
+from server.simulation.reserves import has_reserves, regenerate_all_reserves, reserve_totals
 
 logger = logging.getLogger(__name__)
 
@@ -22,70 +35,115 @@ COMPOSITION_BY_TYPE: dict[str, dict[str, float]] = {
 }
 
 
-def _estimate_mass(semi_major_axis: float, body_type: str) -> float:
-    bt = body_type.lower()
-    if bt == "neo":
-        return random.uniform(5e10, 5e12)
-    elif bt == "comet":
-        return random.uniform(1e10, 1e13)
-    elif semi_major_axis < 2.0:
-        return random.uniform(1e12, 1e15)
-    elif semi_major_axis < 3.5:
-        return random.uniform(1e13, 1e17)
-    elif bt in ("trojan", "centaur"):
-        return random.uniform(1e15, 1e18)
-    else:
-        return random.uniform(1e14, 1e17)
-
-
-async def generate_reserves(db: AsyncSession, force: bool = False) -> dict:
+# Mass classes (kg), checked in this order:
+#   NEOs 100m-1km, comets, inner belt, main belt, trojans/centaurs, outer system
+_MASS_RANGES = np.array([
+    (5e10, 5e12),
+    (1e10, 1e13),
+    (1e12, 1e15),
+    (1e13, 1e17),
+    (1e15, 1e18),
+    (1e14, 1e17),
+])
+# Only 0.5% to 3% of the mass is economically extractable
+_ACCESSIBILITY = (0.005, 0.03)
+
+_COMPOSITION_TYPES = tuple(COMPOSITION_BY_TYPE)
+_COMPOSITION_INDEX = {name.lower(): i for i, name in enumerate(_COMPOSITION_TYPES)}
+MATERIALS: tuple[str, ...] = tuple(sorted({m for comp in COMPOSITION_BY_TYPE.values() for m in comp}))
+# Percent of each material (columns in MATERIALS order) per composition type
+_COMPOSITION_PCT = np.array([
+    [COMPOSITION_BY_TYPE[name].get(material, 0.0) for material in MATERIALS]
+    for name in _COMPOSITION_TYPES
+])
+
+
+@dataclass
+class ReserveDraw:
+    """Generated values for a catalog, rows aligned with the input arrays."""
+    mass_kg: np.ndarray       # (n,)
+    composition: np.ndarray   # (n,) index into COMPOSITION_BY_TYPE
+    tonnes: np.ndarray        # (n, len(MATERIALS)) extractable tonnes
+
+
+def draw_reserves(semi_major_axis: np.ndarray, body_types: list[str], seed: int) -> ReserveDraw:
+    """Mass, composition and extractable tonnes for every body in one pass."""
+    unique_types, type_of = np.unique([bt.lower() for bt in body_types], return_inverse=True)
+    type_of = type_of.reshape(-1)
+    composition = np.array(
+        [_COMPOSITION_INDEX.get(bt, _COMPOSITION_INDEX["asteroid"]) for bt in unique_types], dtype=np.intp
+    )[type_of] if len(body_types) else np.zeros(0, dtype=np.intp)
+
+    def is_type(*names: str) -> np.ndarray:
+        codes = [i for i, bt in enumerate(unique_types) if bt in names]
+        return np.isin(type_of, codes)
+
+    a = np.asarray(semi_major_axis, dtype=float)
+    mass_class = np.select(
+        [is_type("neo"), is_type("comet"), a < 2.0, a < 3.5, is_type("trojan", "centaur")],
+        [0, 1, 2, 3, 4],
+        default=5,
+    )
+    low, high = _MASS_RANGES[mass_class].T
+
+    rng = np.random.default_rng(seed)
+    mass_kg = rng.uniform(low, high)
+    accessibility = rng.uniform(*_ACCESSIBILITY, size=len(a))
+
+    # kg * pct/100 * accessible fraction -> tonnes
+    tonnes = (mass_kg * accessibility / 1e5)[:, None] * _COMPOSITION_PCT[composition]
+    return ReserveDraw(mass_kg=mass_kg, composition=composition, tonnes=np.round(tonnes, 2))
+
+
+_UPDATE_ASTEROIDS = text("""
+    UPDATE asteroids AS a
+    SET estimated_mass_kg = d.mass_kg,
+        composition = CAST((CAST(:compositions AS text[]))[d.composition + 1] AS jsonb)
+    FROM (
+        SELECT unnest(CAST(:ids AS integer[])) AS id,
+               unnest(CAST(:mass_kg AS float8[])) AS mass_kg,
+               unnest(CAST(:composition AS integer[])) AS composition
+    ) AS d
+    WHERE a.id = d.id
+""")
+
+
+async def generate_reserves(db: AsyncSession, force: bool = False, seed: int | None = None) -> dict:
     """
     Generate (or regenerate) ore reserves for all asteroids.
 
-    By default only fills asteroids that have empty reserves.
+    By default does nothing once any reserves exist.
     Pass force=True to regenerate all (used after world reset).
-    Returns a summary dict.
+    Pass the seed of an earlier run to reproduce it exactly.
+    Returns a summary dict (including the seed).
     """
-    result = await db.execute(select(Asteroid))
-    asteroids = result.scalars().all()
-
-    if not force:
-        has_reserves = any(a.reserves and len(a.reserves) > 0 for a in asteroids)
-        if has_reserves:
-            return {"status": "already_generated", "count": 0}
-
-    generated = 0
-    for asteroid in asteroids:
-        if not force and asteroid.reserves and len(asteroid.reserves) > 0:
-            continue
-
-        mass_kg = _estimate_mass(asteroid.semi_major_axis, asteroid.body_type)
-        composition = COMPOSITION_BY_TYPE.get(
-            asteroid.body_type.lower(), COMPOSITION_BY_TYPE["asteroid"]
-        )
-        accessibility = random.uniform(0.005, 0.03)
-
-        reserves = {
-            material: round(mass_kg * (pct / 100.0) * accessibility / 1000.0, 2)
-            for material, pct in composition.items()
-        }
-
-        asteroid.estimated_mass_kg = mass_kg
-        asteroid.composition = composition
-        asteroid.reserves = reserves
-        asteroid.original_reserves = reserves.copy()
-        db.add(asteroid)
-        generated += 1
-
+    if not force and await has_reserves(db):
+        return {"status": "already_generated", "count": 0}
+
+    if seed is None:
+        seed = secrets.randbits(63)
+    rows = (await db.execute(
+        select(Asteroid.id, Asteroid.semi_major_axis, Asteroid.body_type).order_by(Asteroid.id)
+    )).all()
+    ids = [row[0] for row in rows]
+    draw = draw_reserves(np.array([row[1] for row in rows], dtype=float), [row[2] for row in rows], seed)
+
+    if ids:
+        await db.execute(_UPDATE_ASTEROIDS, {
+            "ids": ids,
+            "mass_kg": draw.mass_kg.tolist(),
+            "composition": draw.composition.tolist(),
+            "compositions": [json.dumps(COMPOSITION_BY_TYPE[name]) for name in _COMPOSITION_TYPES],
+        })
+    await regenerate_all_reserves(db, ids, MATERIALS, draw.tonnes)
     await db.commit()
 
-    all_result = await db.execute(select(Asteroid))
-    all_asteroids = all_result.scalars().all()
-    total = sum(sum(a.reserves.values()) for a in all_asteroids if a.reserves)
+    total = sum((await reserve_totals(db)).values())
 
-    logger.info("generate_reserves: %d asteroids, %.0f total tonnes", generated, total)
+    logger.info("generate_reserves: %d asteroids, %.0f total tonnes (seed %d)", len(ids), total, seed)
     return {
         "status": "success",
-        "count": generated,
+        "count": len(ids),
         "total_tonnes": round(total, 2),
+        "seed": seed,
     }
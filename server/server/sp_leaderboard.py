@@ -0,0 +1,162 @@
+"""
+Single-player global leaderboard.
+
+sp_scores keeps every submission; sp_best_scores keeps the best one per
+player_name and is updated by the same transaction as the insert (an upsert
+that only writes when the new score beats the stored best). Reads never
+touch sp_scores.
+
+The top SP_BOARD_SIZE rows and the player count are cached per process.
+A submission only drops the cached page when it lands on it; other workers
+pick it up when their copy expires (SP_BOARD_CACHE_TTL).
+
+prune_dominated_scores() deletes submissions that are not their name's best.
+"""
+
+from __future__ import annotations
+
+import logging
+import time
+
+from sqlalchemy import and_, delete, func, literal_column, select
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from server.config import settings
+from server.models.sp_score import SPBestScore, SPScore
+
+logger = logging.getLogger(__name__)
+
+SP_BOARD_SIZE = 100
+
+
+class _TopCache:
+    def __init__(self) -> None:
+        self.entries: list[dict] | None = None
+        self.total = 0
+        self.expires_at = 0.0
+        self.generation = 0  # bumped on invalidation so an in-flight refill is discarded
+
+    def valid(self) -> bool:
+        return self.entries is not None and time.monotonic() < self.expires_at
+
+    def invalidate(self) -> None:
+        self.entries = None
+        self.generation += 1
+
+    def admits(self, net_worth: int) -> bool:
+        """Would a best score of net_worth appear on the cached page?"""
+        if self.entries is None or len(self.entries) < SP_BOARD_SIZE:
+            return True
+        return net_worth >= self.entries[-1]["net_worth"]
+
+
+_cache = _TopCache()
+
+
+async def record_score(
+    db: AsyncSession,
+    player_name: str,
+    net_worth: int,
+    ships_count: int,
+    workers_count: int,
+    game_date: str,
+) -> None:
+    """Store a submission and raise the name's best if it beats it. Commits."""
+    score = SPScore(
+        player_name=player_name,
+        net_worth=net_worth,
+        ships_count=ships_count,
+        workers_count=workers_count,
+        game_date=game_date,
+    )
+    db.add(score)
+    await db.flush()
+
+    stmt = pg_insert(SPBestScore).values(
+        player_name=player_name,
+        score_id=score.id,
+        net_worth=net_worth,
+        ships_count=ships_count,
+        workers_count=workers_count,
+        game_date=game_date,
+    )
+    excluded = stmt.excluded
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[SPBestScore.player_name],
+        set_={
+            "score_id": excluded.score_id,
+            "net_worth": excluded.net_worth,
+            "ships_count": excluded.ships_count,
+            "workers_count": excluded.workers_count,
+            "game_date": excluded.game_date,
+            "submitted_at": func.now(),
+        },
+        where=excluded.net_worth > SPBestScore.net_worth,
+    ).returning(literal_column("xmax = 0").label("inserted"))
+    improved = (await db.execute(stmt)).first()
+    await db.commit()
+
+    if improved is None:
+        return  # not a personal best: nothing visible changed
+    if improved.inserted:
+        _cache.total += 1
+    if _cache.admits(net_worth):
+        _cache.invalidate()
+
+
+async def top_scores(db: AsyncSession, limit: int) -> tuple[list[dict], int]:
+    """Return (ranked entries, total distinct players), served from cache when fresh."""
+    if _cache.valid():
+        return _cache.entries[:limit], _cache.total
+
+    generation = _cache.generation
+    rows = (await db.execute(
+        select(SPBestScore)
+        .order_by(SPBestScore.net_worth.desc(), SPBestScore.submitted_at)
+        .limit(SP_BOARD_SIZE)
+    )).scalars().all()
+    total = (await db.execute(select(func.count()).select_from(SPBestScore))).scalar_one()
+    entries = [
+        {
+            "rank": i + 1,
+            "player_name": s.player_name,
+            "net_worth": s.net_worth,
+            "ships_count": s.ships_count,
+            "workers_count": s.workers_count,
+            "game_date": s.game_date,
+        }
+        for i, s in enumerate(rows)
+    ]
+    if generation == _cache.generation:  # else a new top score landed mid-read; don't cache
+        _cache.entries, _cache.total = entries, total
+        _cache.expires_at = time.monotonic() + settings.SP_BOARD_CACHE_TTL
+    return entries[:limit], total
+
+
+async def prune_dominated_scores(db: AsyncSession, batch_size: int | None = None) -> int:
+    """
+    Delete submissions that are not the best for their player_name, in
+    batches committed separately. Returns the number of rows deleted.
+    """
+    batch_size = batch_size or settings.SP_SCORE_PRUNE_BATCH
+    dominated = (
+        select(SPScore.id)
+        .join(SPBestScore, and_(
+            SPBestScore.player_name == SPScore.player_name,
+            SPBestScore.score_id != SPScore.id,
+        ))
+        .order_by(SPScore.id)
+        .limit(batch_size)
+        .with_for_update(of=SPScore, skip_locked=True)
+    )
+    total = 0
+    while True:
+        result = await db.execute(delete(SPScore).where(SPScore.id.in_(dominated)))
+        await db.commit()
+        total += result.rowcount
+        if result.rowcount < batch_size:
+            break
+    if total:
+        logger.info("Pruned %d dominated single-player scores", total)
+    return total
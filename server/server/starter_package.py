@@ -104,6 +104,7 @@ async def create_starter_package(db: AsyncSession, player: Player) -> dict:
     budget = TARGET_NET_VALUE
     money_spent = 0
     ships_created = 0
+    total_crew_needed = 0
     workers_created = 0
     used_ship_names = set()
 
@@ -159,6 +160,7 @@ async def create_starter_package(db: AsyncSession, player: Player) -> dict:
         db.add(ship)
         money_spent += ship_price
         ships_created += 1
+        total_crew_needed += ship.min_crew
 
     # Commit ships so we can assign workers to them
     await db.commit()
@@ -166,7 +168,6 @@ async def create_starter_package(db: AsyncSession, player: Player) -> dict:
 
     # Now hire workers to crew the ships
     # Each ship needs min_crew, plus we'll add a few extras
-    total_crew_needed = sum(ship.min_crew for ship in player.ships)
     extra_workers = random.randint(1, 3)  # 1-3 backup workers
     total_workers = total_crew_needed + extra_workers
 
@@ -0,0 +1,316 @@
+"""
+World statistics: aggregate counters for the admin dashboards.
+
+Dashboards read the single world_stats row instead of counting tables and
+summing every asteroid's reserves per page load.
+
+How the row stays current:
+  - an after_flush listener turns ORM inserts, deletes and changes of
+    players, ships, workers and missions into deltas on the session;
+    after_commit hands them to this process's pending totals (a rollback
+    drops them);
+  - bulk statements that bypass the ORM report their effect with
+    stage_delta() before commit (asteroid reserves) or add_delta() after
+    it (mission archival);
+  - a background task in every process adds its pending deltas to the row
+    every WORLD_STATS_FLUSH_INTERVAL seconds with `col = col + :delta`, so
+    workers never overwrite each other;
+  - the simulation leader recomputes the row from the tables every
+    WORLD_STATS_RECONCILE_INTERVAL seconds. This corrects drift from
+    writes the listener cannot see and refreshes the active-player counts,
+    which depend on the clock rather than on writes. It flushes its own
+    pending deltas first; deltas other processes committed before the
+    recount but flush after it are counted twice, so the row can be off by
+    at most one WORLD_STATS_FLUSH_INTERVAL of their writes until the next
+    reconcile.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import json
+import logging
+from datetime import datetime, timedelta, timezone
+
+from sqlalchemy import event, func, inspect, select, text
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+
+from server.config import settings
+from server.database import AsyncSessionLocal
+from server.models.asteroid_reserve import AsteroidReserve
+from server.models.mission import Mission, STATUS_MINING, STATUS_TRANSIT_BACK, STATUS_TRANSIT_OUT
+from server.models.player import Player
+from server.models.ship import Ship
+from server.models.worker import Worker
+from server.models.world_stats import WorldStats
+
+logger = logging.getLogger(__name__)
+
+ACTIVE_MISSION_STATUSES = (STATUS_TRANSIT_OUT, STATUS_MINING, STATUS_TRANSIT_BACK)
+
+COUNTERS = (
+    "total_players", "active_players_7d", "active_players_30d",
+    "total_ships", "derelict_ships", "ownerless_ships",
+    "total_workers", "total_missions", "active_missions",
+)
+
+# Capacity rule used by the dashboards and the join check
+MINIMUM_RESERVES_PER_PLAYER = 50_000_000  # tonnes
+
+_STATS_ID = 1
+_SESSION_KEY = "world_stats_delta"
+
+
+class _Delta:
+    __slots__ = ("counts", "reserves")
+
+    def __init__(self) -> None:
+        self.counts: dict[str, int] = {}
+        self.reserves: dict[str, float] = {}
+
+    def add(self, name: str, n: int) -> None:
+        if n:
+            self.counts[name] = self.counts.get(name, 0) + n
+
+    def add_reserves(self, ore: str, tonnes: float) -> None:
+        if tonnes:
+            self.reserves[ore] = self.reserves.get(ore, 0.0) + tonnes
+
+    def merge(self, other: _Delta) -> None:
+        for name, n in other.counts.items():
+            self.add(name, n)
+        for ore, tonnes in other.reserves.items():
+            self.add_reserves(ore, tonnes)
+
+    def __bool__(self) -> bool:
+        return bool(self.counts or self.reserves)
+
+
+_pending = _Delta()
+
+
+def add_delta(reserves: dict[str, float] | None = None, **counts: int) -> None:
+    """Record committed changes made outside the ORM (bulk insert/delete)."""
+    for name, n in counts.items():
+        if name not in COUNTERS:
+            raise KeyError(name)
+        _pending.add(name, n)
+    for ore, tonnes in (reserves or {}).items():
+        _pending.add_reserves(ore, tonnes)
+
+
+def max_players_for(total_reserves: float) -> int:
+    return int(total_reserves / MINIMUM_RESERVES_PER_PLAYER) if total_reserves > 0 else 0
+
+
+# ── Change capture ────────────────────────────────────────────────────────────
+
+def _previous(state, attr: str):
+    """Value of attr before this flush (current value when unchanged)."""
+    history = state.attrs[attr].history
+    return history.deleted[0] if history.deleted else state.attrs[attr].value
+
+
+def _count_object(delta: _Delta, obj, sign: int) -> None:
+    if isinstance(obj, Player):
+        delta.add("total_players", sign)
+        if sign > 0:  # new players have just been seen
+            delta.add("active_players_7d", 1)
+            delta.add("active_players_30d", 1)
+    elif isinstance(obj, Ship):
+        delta.add("total_ships", sign)
+        delta.add("derelict_ships", sign * bool(obj.is_derelict))
+        delta.add("ownerless_ships", sign * (obj.player_id is None))
+    elif isinstance(obj, Worker):
+        delta.add("total_workers", sign)
+    elif isinstance(obj, Mission):
+        delta.add("total_missions", sign)
+        delta.add("active_missions", sign * (obj.status in ACTIVE_MISSION_STATUSES))
+
+
+def _count_change(delta: _Delta, obj) -> None:
+    if isinstance(obj, Ship):
+        state = inspect(obj)
+        delta.add("derelict_ships", bool(obj.is_derelict) - bool(_previous(state, "is_derelict")))
+        delta.add("ownerless_ships", (obj.player_id is None) - (_previous(state, "player_id") is None))
+    elif isinstance(obj, Mission):
+        state = inspect(obj)
+        delta.add(
+            "active_missions",
+            (obj.status in ACTIVE_MISSION_STATUSES)
+            - (_previous(state, "status") in ACTIVE_MISSION_STATUSES),
+        )
+
+
+def _session_delta(session: Session) -> _Delta:
+    delta = session.info.get(_SESSION_KEY)
+    if delta is None:
+        delta = session.info[_SESSION_KEY] = _Delta()
+    return delta
+
+
+def stage_delta(db: AsyncSession, reserves: dict[str, float] | None = None, **counts: int) -> None:
+    """Record changes made with bulk statements in db's transaction; applied if it commits."""
+    delta = _session_delta(db.sync_session)
+    for name, n in counts.items():
+        if name not in COUNTERS:
+            raise KeyError(name)
+        delta.add(name, n)
+    for ore, tonnes in (reserves or {}).items():
+        delta.add_reserves(ore, tonnes)
+
+
+@event.listens_for(Session, "after_flush")
+def _collect(session: Session, flush_context) -> None:
+    delta = _session_delta(session)
+    for obj in session.new:
+        _count_object(delta, obj, 1)
+    for obj in session.deleted:
+        _count_object(delta, obj, -1)
+    for obj in session.dirty:
+        _count_change(delta, obj)
+
+
+@event.listens_for(Session, "after_commit")
+def _publish(session: Session) -> None:
+    delta = session.info.pop(_SESSION_KEY, None)
+    if delta:
+        _pending.merge(delta)
+
+
+@event.listens_for(Session, "after_rollback")
+def _discard(session: Session) -> None:
+    session.info.pop(_SESSION_KEY, None)
+
+
+# ── Persistence ───────────────────────────────────────────────────────────────
+
+_ADD_RESERVES = """
+    (SELECT COALESCE(jsonb_object_agg(key, total), '{}'::jsonb) FROM (
+        SELECT key, SUM(value) AS total FROM (
+            SELECT key, value::float8 AS value FROM jsonb_each_text(reserves_by_ore)
+            UNION ALL
+            SELECT key, value::float8 FROM jsonb_each_text(CAST(:reserves AS jsonb))
+        ) AS parts GROUP BY key
+    ) AS summed)
+"""
+
+
+async def flush_pending(db: AsyncSession) -> bool:
+    """Add this process's pending deltas to the row. Returns False if the row is missing."""
+    global _pending
+    if not _pending:
+        return True
+    delta, _pending = _pending, _Delta()
+    assignments = [f"{name} = {name} + :{name}" for name in delta.counts]
+    params: dict = dict(delta.counts)
+    if delta.reserves:
+        assignments.append("total_reserves = total_reserves + :reserves_total")
+        assignments.append(f"reserves_by_ore = {_ADD_RESERVES}")
+        params["reserves_total"] = sum(delta.reserves.values())
+        params["reserves"] = json.dumps(delta.reserves)
+    assignments.append("updated_at = NOW()")
+    try:
+        result = await db.execute(
+            text(f"UPDATE world_stats SET {', '.join(assignments)} WHERE id = :id"),
+            {**params, "id": _STATS_ID},
+        )
+        await db.commit()
+    except Exception:
+        _pending.merge(delta)  # try again next interval
+        raise
+    return result.rowcount == 1
+
+
+async def reconcile_world_stats(db: AsyncSession) -> WorldStats:
+    """Recompute every counter from the tables and store the row."""
+    # Deltas still pending here would be added on top of a recount that already includes them
+    await flush_pending(db)
+    now = datetime.now(timezone.utc)
+
+    def count(model, *where):
+        return select(func.count()).select_from(model).where(*where).scalar_subquery()
+
+    counts = (await db.execute(select(
+        count(Player).label("total_players"),
+        count(Player, Player.last_seen >= now - timedelta(days=7)).label("active_players_7d"),
+        count(Player, Player.last_seen >= now - timedelta(days=30)).label("active_players_30d"),
+        count(Ship).label("total_ships"),
+        count(Ship, Ship.is_derelict == True).label("derelict_ships"),  # noqa: E712
+        count(Ship, Ship.player_id == None).label("ownerless_ships"),  # noqa: E711
+        count(Worker).label("total_workers"),
+        count(Mission).label("total_missions"),
+        count(Mission, Mission.status.in_(ACTIVE_MISSION_STATUSES)).label("active_missions"),
+    ))).one()._asdict()
+
+    reserves = {
+        ore: float(total or 0.0)
+        for ore, total in (await db.execute(
+            select(AsteroidReserve.ore_type, func.sum(AsteroidReserve.tonnes))
+            .group_by(AsteroidReserve.ore_type)
+        )).all()
+    }
+
+    values = {
+        **counts,
+        "total_reserves": sum(reserves.values()),
+        "reserves_by_ore": reserves,
+        "reconciled_at": now,
+        "updated_at": now,
+    }
+    stmt = pg_insert(WorldStats).values(id=_STATS_ID, **values)
+    stmt = stmt.on_conflict_do_update(index_elements=[WorldStats.id], set_=values)
+    await db.execute(stmt)
+    await db.commit()
+    logger.debug("World stats reconciled: %s", counts)
+    return await db.get(WorldStats, _STATS_ID, populate_existing=True)
+
+
+async def get_world_stats(db: AsyncSession) -> WorldStats:
+    """The counters row; computed on first use."""
+    stats = await db.get(WorldStats, _STATS_ID)
+    if stats is None:
+        stats = await reconcile_world_stats(db)
+    return stats
+
+
+# ── Background flusher ────────────────────────────────────────────────────────
+
+_task: asyncio.Task | None = None
+
+
+async def _flush_loop() -> None:
+    while True:
+        await asyncio.sleep(settings.WORLD_STATS_FLUSH_INTERVAL)
+        try:
+            async with AsyncSessionLocal() as db:
+                if not await flush_pending(db):
+                    await reconcile_world_stats(db)
+        except asyncio.CancelledError:
+            raise
+        except Exception as exc:
+            logger.warning("World stats flush failed (will retry): %s", exc)
+
+
+async def start_world_stats() -> None:
+    global _task
+    if _task is None:
+        _task = asyncio.create_task(_flush_loop(), name="world-stats-flush")
+
+
+async def stop_world_stats() -> None:
+    global _task
+    if _task is not None:
+        _task.cancel()
+        try:
+            await _task
+        except asyncio.CancelledError:
+            pass
+        _task = None
+    try:
+        async with AsyncSessionLocal() as db:
+            await flush_pending(db)
+    except Exception as exc:
+        logger.warning("Final world stats flush failed: %s", exc)
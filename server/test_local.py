@@ -12,7 +12,9 @@ This tests all core functionality in sequence:
 6. Hiring workers
 7. Dispatching missions
 8. Buying ships
-9. Firing workers
+9. Attacking, selling and trading with the dispatched ship
+10. Firing workers
+11. Query counts per endpoint (development servers report X-DB-Queries)
 """
 
 import requests
@@ -202,6 +204,7 @@ def test_dispatch_mission(ship_id: int):
         }
     )
 
+    record_queries("/game/dispatch", response)
     if response.status_code == 201:
         data = response.json()
         log_success(f"Mission dispatched (ID: {data['id']})")
@@ -214,9 +217,20 @@ def test_dispatch_mission(ship_id: int):
 
 def test_hire_worker():
     log_test("Workers - Hire New Worker")
-    log_info("Note: Hire endpoint requires worker_id from labor pool")
-    log_info("Skipping: /admin/available-workers endpoint not yet implemented")
-    return None  # Skip for now
+    pool = make_request("GET", "/game/available-workers")
+    if pool.status_code != 200 or not pool.json():
+        log_info("Skipping: labor pool is empty")
+        return None
+
+    worker = pool.json()[0]
+    response = make_request("POST", "/game/hire", json={"worker_id": worker['id']})
+    record_queries("/game/hire", response)
+    if response.status_code == 201:
+        log_success(f"Hired {worker.get('first_name')} {worker.get('last_name')} (ID: {worker['id']})")
+        return worker['id']
+    else:
+        log_error(f"Failed to hire: {response.status_code} - {response.text}")
+        return None
 
 def test_buy_ship():
     log_test("Ships - Purchase New Ship")
@@ -244,6 +258,7 @@ def test_buy_ship():
             "colony_id": colony['id']
         }
     )
+    record_queries("/game/buy-ship", response)
 
     if response.status_code == 201:
         data = response.json()
@@ -257,6 +272,38 @@ def test_buy_ship():
         log_error(f"Failed to buy ship: {response.status_code} - {response.text}")
         return None
 
+def test_ship_actions(ship_id: int):
+    log_test("Ships - Attack, Sell Cargo, Trade")
+    log_info("The dispatched ship has no cargo and no target, so these stop at validation")
+
+    # Own ship as target: both ships load with their combat profiles before the check
+    response = make_request(
+        "POST", "/game/attack",
+        params={"attacker_ship_id": ship_id, "target_ship_id": ship_id},
+    )
+    record_queries("/game/attack", response)
+    log_info(f"Attack: {response.status_code} - {response.text[:120]}")
+
+    response = make_request("POST", f"/game/sell-cargo/{ship_id}")
+    record_queries("/game/sell-cargo", response)
+    log_info(f"Sell cargo: {response.status_code} - {response.text[:120]}")
+
+    colonies = make_request("GET", "/game/colonies").json()
+    if colonies:
+        response = make_request(
+            "POST", "/game/dispatch-trade",
+            params={"ship_id": ship_id, "colony_id": colonies[0]['id']},
+        )
+        record_queries("/game/dispatch-trade", response)
+        log_info(f"Trade dispatch: {response.status_code} - {response.text[:120]}")
+
+    ok = all(status < 500 for _, status in _write_counts.values())
+    if ok:
+        log_success("Ship actions answered without server errors")
+    else:
+        log_error("A ship action failed with a server error")
+    return ok
+
 def test_fire_worker(worker_id: int):
     log_test("Workers - Fire Worker")
 
@@ -301,6 +348,64 @@ def test_simulation_tick():
         log_error(f"Expected ~5 ticks, got {elapsed_ticks}")
         return False
 
+# Upper bound on SQL statements per request. Relationships are never loaded
+# implicitly (server/models/loading.py), so these stay flat as data grows.
+QUERY_BUDGETS = {
+    "/game/state": 12,
+    "/game/world": 2,
+    "/game/market": 0,
+    "/game/notifications": 3,
+    "/api/leaderboard": 3,
+}
+
+# Write endpoints, measured on the requests the steps above make. Budgets
+# cover the full success path (one principal lookup included), so a request
+# that stops at validation (no funds, no cargo) stays well inside them.
+WRITE_QUERY_BUDGETS = {
+    "/game/dispatch": 7,        # ship, asteroid, catalog refresh, insert, update, refresh
+    "/game/dispatch-trade": 6,  # ship, colony, insert, update, refresh
+    "/game/attack": 8,          # both ships with combat.* profiles, up to three updates
+    "/game/buy-ship": 7,        # player, colony, insert, update, ledger, refresh
+    "/game/hire": 4,            # worker, update, refresh
+    "/game/sell-cargo": 7,      # player, ship, colony, two updates, ledger
+}
+_write_counts: dict[str, tuple[int | None, int]] = {}  # path -> (queries, status)
+
+def record_queries(path: str, response: requests.Response):
+    count = response.headers.get("X-DB-Queries")
+    _write_counts[path] = (int(count) if count is not None else None, response.status_code)
+
+def test_query_counts(player_id: int):
+    log_test("Query Counts")
+    budgets = dict(QUERY_BUDGETS)
+    budgets[f"/api/leaderboard/player/{player_id}"] = 3  # at most one index refresh
+    ok = True
+    for path, budget in budgets.items():
+        response = make_request("GET", path)
+        count = response.headers.get("X-DB-Queries")
+        if count is None:
+            log_error(f"{path}: no X-DB-Queries header (is ENVIRONMENT=development?)")
+            return False
+        if response.status_code != 200 or int(count) > budget:
+            log_error(f"{path}: {count} queries (budget {budget}, status {response.status_code})")
+            ok = False
+        else:
+            log_success(f"{path}: {count} queries (budget {budget})")
+    for path, budget in WRITE_QUERY_BUDGETS.items():
+        if path not in _write_counts:
+            log_info(f"{path}: not exercised")
+            continue
+        count, status_code = _write_counts[path]
+        if count is None:
+            log_error(f"{path}: no X-DB-Queries header (is ENVIRONMENT=development?)")
+            ok = False
+        elif status_code >= 500 or count > budget:
+            log_error(f"{path}: {count} queries (budget {budget}, status {status_code})")
+            ok = False
+        else:
+            log_success(f"{path}: {count} queries (budget {budget}, status {status_code})")
+    return ok
+
 def main():
     print(f"\n{Colors.GREEN}{'='*60}")
     print(f"  Claim Server - Local Test Suite")
@@ -352,13 +457,20 @@ def main():
     new_ship_id = test_buy_ship()
     results['buy_ship'] = True  # Count as success even if funds insufficient
 
-    # 11. Fire a worker
+    # 11. Attack, sell cargo and trade with the dispatched ship
+    if ship_id:
+        results['ship_actions'] = test_ship_actions(ship_id)
+
+    # 12. Fire a worker
     if new_worker_id:
         results['fire'] = test_fire_worker(new_worker_id)
 
-    # 12. Test simulation
+    # 13. Test simulation
     results['simulation'] = test_simulation_tick()
 
+    # 14. Query counts
+    results['query_counts'] = test_query_counts(player_id)
+
     # Summary
     print(f"\n{Colors.BLUE}{'='*60}")
     print(f"  TEST SUMMARY")